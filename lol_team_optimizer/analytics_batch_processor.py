@@ -8,10 +8,13 @@ support for long-running operations.
 
 import asyncio
 import logging
+import os
+import shutil
+import tempfile
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, Future
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable, Tuple, Union, Set
 from queue import Queue, Empty
@@ -384,15 +387,23 @@ class BatchProcessor:
         batch_id: str,
         tasks: List[BatchTask],
         max_workers: Optional[int] = None,
-        progress_callback: Optional[Callable[[BatchProgress], None]] = None
+        progress_callback: Optional[Callable[[BatchProgress], None]] = None,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple = ()
     ) -> BatchResult:
         """Process batch of tasks using process pool.
         
+        Task functions and arguments are pickled to the workers, so they must
+        be module-level functions with small arguments; per-worker state such
+        as an analytics engine is set up once by `initializer`.
+        
         Args:
             batch_id: Unique identifier for the batch
             tasks: List of tasks to process
             max_workers: Maximum number of worker processes
             progress_callback: Optional progress callback function
+            initializer: Optional function run once in each worker process
+            initargs: Arguments for the initializer
             
         Returns:
             BatchResult with processing results
@@ -422,7 +433,8 @@ class BatchProcessor:
             results = {}
             errors = {}
             
-            with ProcessPoolExecutor(max_workers=workers) as executor:
+            with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                                     initargs=initargs) as executor:
                 # Submit all tasks
                 future_to_task = {}
                 for task in sorted_tasks:
@@ -633,6 +645,44 @@ class BatchProcessor:
             }
 
 
+@dataclass(frozen=True)
+class PlayerAnalysisTask:
+    """Descriptor of one player analysis shipped to a worker process."""
+    
+    puuid: str
+    filters: Optional[AnalyticsFilters] = None
+
+
+# Analytics engine of a worker process, built once by _init_analytics_worker
+_worker_engine = None
+
+
+def _init_analytics_worker(config: Config, scratch_directory: str) -> None:
+    """
+    Process pool initializer: build an analytics engine over a read-only match store.
+    
+    The worker's own caches go to a private directory under
+    `scratch_directory`; results are cached by the parent process.
+    """
+    global _worker_engine
+    from .match_manager import MatchManager
+    from .baseline_manager import BaselineManager
+    from .analytics_cache_manager import AnalyticsCacheManager
+    from .historical_analytics_engine import HistoricalAnalyticsEngine
+    
+    worker_config = replace(config, cache_directory=tempfile.mkdtemp(dir=scratch_directory))
+    match_manager = MatchManager(worker_config, read_only=True)
+    _worker_engine = HistoricalAnalyticsEngine(
+        worker_config, match_manager, BaselineManager(worker_config, match_manager),
+        cache_manager=AnalyticsCacheManager(worker_config)
+    )
+
+
+def _worker_analyze_player(task: PlayerAnalysisTask) -> PlayerAnalytics:
+    """Process pool task: analyze one player with the worker's engine."""
+    return _worker_engine.analyze_player_performance(task.puuid, filters=task.filters)
+
+
 class AnalyticsBatchProcessor:
     """Specialized batch processor for analytics operations."""
     
@@ -649,6 +699,11 @@ class AnalyticsBatchProcessor:
         self.match_manager = match_manager
         self.batch_processor = BatchProcessor(config)
         self.logger = logging.getLogger(__name__)
+        
+        # Batches of at least process_batch_min players are analyzed in
+        # process_workers worker processes (0 = one per CPU, 1 = threads only)
+        self.process_workers = config.analytics_batch_workers
+        self.process_batch_min = config.analytics_process_batch_min
     
     def batch_analyze_players(
         self,
@@ -658,6 +713,9 @@ class AnalyticsBatchProcessor:
     ) -> BatchResult:
         """Batch analyze multiple players.
         
+        Large batches are spread over worker processes (see
+        batch_analyze_players_multiprocess); small ones run in threads.
+        
         Args:
             puuids: List of player PUUIDs to analyze
             filters: Optional filters to apply
@@ -666,6 +724,12 @@ class AnalyticsBatchProcessor:
         Returns:
             BatchResult with player analytics
         """
+        workers = self.process_workers or os.cpu_count() or 1
+        if workers > 1 and len(puuids) >= self.process_batch_min:
+            return self.batch_analyze_players_multiprocess(
+                puuids, filters, progress_callback, max_workers=workers
+            )
+        
         batch_id = f"player_analysis_{int(time.time())}"
         
         # Create tasks for each player
@@ -685,6 +749,79 @@ class AnalyticsBatchProcessor:
             batch_id, tasks, progress_callback=progress_callback
         )
     
+    def batch_analyze_players_multiprocess(
+        self,
+        puuids: List[str],
+        filters: Optional[AnalyticsFilters] = None,
+        progress_callback: Optional[Callable[[BatchProgress], None]] = None,
+        max_workers: Optional[int] = None
+    ) -> BatchResult:
+        """Batch analyze multiple players in worker processes.
+        
+        Each worker opens a read-only view of the match store once; tasks are
+        sent as PlayerAnalysisTask descriptors and PlayerAnalytics results
+        come back pickled. Players already in the analytics cache are not
+        sent, and new results are cached here.
+        
+        Args:
+            puuids: List of player PUUIDs to analyze
+            filters: Optional filters to apply
+            progress_callback: Optional progress callback
+            max_workers: Worker processes (defaults to one per CPU)
+            
+        Returns:
+            BatchResult with player analytics
+        """
+        batch_id = f"player_analysis_{int(time.time())}"
+        engine = self.analytics_engine
+        
+        cached = {}
+        tasks = []
+        for i, puuid in enumerate(puuids):
+            task_id = f"analyze_player_{puuid}"
+            cache_key = engine._player_cache_key("player_analytics", puuid, filters=str(filters))
+            result = engine.cache_manager.get_cached_analytics(cache_key)
+            if result:
+                cached[task_id] = result
+                continue
+            
+            tasks.append(BatchTask(
+                task_id=task_id,
+                function=_worker_analyze_player,
+                args=(PlayerAnalysisTask(puuid, filters),),
+                priority=len(puuids) - i  # Process in order
+            ))
+        
+        if not tasks:
+            progress = BatchProgress(batch_id=batch_id, total_tasks=len(cached),
+                                     completed_tasks=len(cached), start_time=datetime.now(),
+                                     end_time=datetime.now())
+            return BatchResult(batch_id=batch_id, progress=progress, results=cached)
+        
+        self.logger.info(f"Starting multiprocess batch analysis for {len(tasks)} players "
+                         f"({len(cached)} cached)")
+        scratch_directory = tempfile.mkdtemp(prefix="analytics-workers-", dir=self.config.cache_directory)
+        try:
+            batch_result = self.batch_processor.process_batch_multiprocess(
+                batch_id, tasks, max_workers=max_workers, progress_callback=progress_callback,
+                initializer=_init_analytics_worker, initargs=(self.config, scratch_directory)
+            )
+        finally:
+            shutil.rmtree(scratch_directory, ignore_errors=True)
+        
+        for task in tasks:
+            result = batch_result.results.get(task.task_id)
+            if result is not None:
+                puuid = task.args[0].puuid
+                engine._cache_player_result(
+                    engine._player_cache_key("player_analytics", puuid, filters=str(filters)), puuid, result
+                )
+        
+        batch_result.results.update(cached)
+        batch_result.progress.total_tasks += len(cached)
+        batch_result.progress.completed_tasks += len(cached)
+        return batch_result
+    
     def batch_analyze_champions(
         self,
         champion_analyses: List[Tuple[str, int, str]],  # (puuid, champion_id, role)
@@ -8,13 +8,14 @@ performance and reduce computation time for frequently accessed analytics.
 import json
 import pickle
 import hashlib
+import sqlite3
 import time
 import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional, List, Tuple, Union
+from typing import Any, Callable, Dict, Optional, List, Set, Tuple, Union
 from dataclasses import dataclass, field, asdict
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 import logging
 
 from .config import Config
@@ -50,6 +51,7 @@ class CacheEntry:
     access_count: int = 0
     ttl_seconds: Optional[int] = None
     size_bytes: int = 0
+    dependencies: List[str] = field(default_factory=list)  # invalidated with invalidate_dependency
     
     def __post_init__(self):
         """Initialize cache entry."""
@@ -86,6 +88,28 @@ class CacheEntry:
         self.access_count += 1
 
 
+def cache_namespace(key: str) -> str:
+    """Get the namespace of a cache key: its text before the first ':' (or '_')."""
+    for separator in (':', '_'):
+        if separator in key:
+            return key.split(separator, 1)[0]
+    return key
+
+
+@dataclass
+class NamespaceStatistics:
+    """Request statistics for one cache key namespace."""
+    
+    hits: int = 0
+    misses: int = 0
+    
+    @property
+    def hit_rate(self) -> float:
+        """Calculate namespace hit rate."""
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
 @dataclass
 class CacheStatistics:
     """Cache performance statistics."""
@@ -100,6 +124,18 @@ class CacheStatistics:
     memory_cache_size_bytes: int = 0
     persistent_cache_entries: int = 0
     persistent_cache_size_bytes: int = 0
+    namespaces: Dict[str, NamespaceStatistics] = field(default_factory=dict)
+    
+    def record_request(self, key: str, hit: bool) -> None:
+        """Count a lookup of ``key`` overall and in its namespace."""
+        self.total_requests += 1
+        namespace = self.namespaces.setdefault(cache_namespace(key), NamespaceStatistics())
+        if hit:
+            self.cache_hits += 1
+            namespace.hits += 1
+        else:
+            self.cache_misses += 1
+            namespace.misses += 1
     
     @property
     def hit_rate(self) -> float:
@@ -122,7 +158,13 @@ class CacheStatistics:
 
 
 class LRUCache:
-    """Least Recently Used cache implementation."""
+    """
+    Least Recently Used cache implementation.
+    
+    Entries are bounded by count and total size; the least recently used are
+    evicted first. Each entry's dependencies are indexed, so invalidating a
+    dependency only touches the entries that list it.
+    """
     
     def __init__(self, max_size: int = 1000, max_size_bytes: int = 50 * 1024 * 1024):
         """Initialize LRU cache.
@@ -134,21 +176,26 @@ class LRUCache:
         self.max_size = max_size
         self.max_size_bytes = max_size_bytes
         self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._dependents: Dict[str, Set[str]] = defaultdict(set)  # dependency -> keys
         self._lock = threading.RLock()
         self._total_size_bytes = 0
+        self._eviction_listeners: List[Callable[[str, CacheEntry], None]] = []
+        self.evictions = 0
+    
+    def add_eviction_listener(self, callback: Callable[[str, CacheEntry], None]) -> None:
+        """Register a callback run with (key, entry) for each entry evicted to make room."""
+        self._eviction_listeners.append(callback)
     
     def get(self, key: str) -> Optional[CacheEntry]:
         """Get cache entry by key."""
         with self._lock:
-            if key not in self._cache:
+            entry = self._cache.get(key)
+            if entry is None:
                 return None
             
-            entry = self._cache[key]
-            
             # Check if expired
             if entry.is_expired:
-                del self._cache[key]
-                self._total_size_bytes -= entry.size_bytes
+                self._discard(key)
                 return None
             
             # Move to end (most recently used)
@@ -158,22 +205,24 @@ class LRUCache:
             return entry
     
     def put(self, key: str, entry: CacheEntry) -> bool:
-        """Put cache entry."""
+        """Put cache entry.
+        
+        Returns:
+            False if the entry alone exceeds the size limit and was not stored
+        """
         with self._lock:
             # Remove existing entry if present
-            if key in self._cache:
-                old_entry = self._cache[key]
-                self._total_size_bytes -= old_entry.size_bytes
-                del self._cache[key]
+            self._discard(key)
             
-            # Check if entry would exceed size limits
-            if (entry.size_bytes > self.max_size_bytes or 
-                len(self._cache) >= self.max_size):
-                self._evict_entries()
+            # An entry that can never fit must not flush everything else
+            if entry.size_bytes > self.max_size_bytes:
+                return False
             
             # Add new entry
             self._cache[key] = entry
             self._total_size_bytes += entry.size_bytes
+            for dependency in entry.dependencies:
+                self._dependents[dependency].add(key)
             
             # Evict if necessary
             self._evict_entries()
@@ -183,38 +232,73 @@ class LRUCache:
     def remove(self, key: str) -> bool:
         """Remove cache entry by key."""
         with self._lock:
-            if key not in self._cache:
-                return False
-            
-            entry = self._cache[key]
-            self._total_size_bytes -= entry.size_bytes
-            del self._cache[key]
-            return True
+            return self._discard(key) is not None
+    
+    def remove_by_dependency(self, dependency: str) -> int:
+        """Remove entries that depend on the given dependency."""
+        with self._lock:
+            keys = self._dependents.pop(dependency, set())
+            for key in keys:
+                self._discard(key)
+            return len(keys)
+    
+    def dependents_of(self, dependency: str) -> Set[str]:
+        """Get the keys of entries that depend on the given dependency."""
+        with self._lock:
+            return set(self._dependents.get(dependency, ()))
+    
+    def remove_expired(self) -> int:
+        """Remove every expired entry."""
+        with self._lock:
+            keys = [key for key, entry in self._cache.items() if entry.is_expired]
+            for key in keys:
+                self._discard(key)
+            return len(keys)
     
     def clear(self):
         """Clear all cache entries."""
         with self._lock:
             self._cache.clear()
+            self._dependents.clear()
             self._total_size_bytes = 0
     
+    def _discard(self, key: str) -> Optional[CacheEntry]:
+        """Remove an entry and its dependency index entries."""
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return None
+        
+        self._total_size_bytes -= entry.size_bytes
+        for dependency in entry.dependencies:
+            keys = self._dependents.get(dependency)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._dependents[dependency]
+        return entry
+    
     def _evict_entries(self) -> int:
-        """Evict entries to maintain size limits."""
+        """Evict least recently used entries to maintain size limits."""
         evicted_count = 0
         
-        # Evict by count
-        while len(self._cache) > self.max_size:
-            key, entry = self._cache.popitem(last=False)  # Remove least recently used
-            self._total_size_bytes -= entry.size_bytes
-            evicted_count += 1
-        
-        # Evict by size
-        while self._total_size_bytes > self.max_size_bytes and self._cache:
-            key, entry = self._cache.popitem(last=False)
-            self._total_size_bytes -= entry.size_bytes
+        while self._cache and (len(self._cache) > self.max_size or
+                               self._total_size_bytes > self.max_size_bytes):
+            key = next(iter(self._cache))
+            entry = self._discard(key)
             evicted_count += 1
+            for callback in self._eviction_listeners:
+                try:
+                    callback(key, entry)
+                except Exception as e:
+                    logger.warning(f"Cache eviction listener failed for {key}: {e}")
         
+        self.evictions += evicted_count
         return evicted_count
     
+    def __contains__(self, key: str) -> bool:
+        """Check for a key without touching its recency."""
+        return key in self._cache
+    
     @property
     def size(self) -> int:
         """Get number of entries."""
@@ -232,17 +316,28 @@ class LRUCache:
 
 
 class PersistentCache:
-    """Persistent cache using file system."""
-    
-    def __init__(self, cache_directory: Path, max_size_bytes: int = 100 * 1024 * 1024):
+    """
+    Persistent cache backed by a single indexed SQLite database.
+    
+    Each entry is one row holding its pickled data and metadata, with indexes
+    on recency, expiry and dependencies, so reads, writes and evictions cost
+    the same however many entries the cache holds. Access-time updates from
+    hits are buffered and written in batches, and eviction removes only as
+    many of the least recently used rows as needed to get back under the cap.
+    """
+    
+    def __init__(self, cache_directory: Path, max_size_bytes: int = 100 * 1024 * 1024,
+                 touch_batch_size: int = 64):
         """Initialize persistent cache.
         
         Args:
             cache_directory: Directory for cache files
             max_size_bytes: Maximum total size in bytes
+            touch_batch_size: Number of buffered access-time updates that triggers a write
         """
         self.cache_directory = cache_directory
         self.max_size_bytes = max_size_bytes
+        self.touch_batch_size = touch_batch_size
         self._lock = threading.RLock()
         
         # Create cache directory
@@ -251,94 +346,128 @@ class PersistentCache:
         # Create analytics subdirectory
         self.analytics_cache_dir = self.cache_directory / "analytics"
         self.analytics_cache_dir.mkdir(parents=True, exist_ok=True)
-    
-    def _get_cache_file_path(self, key: str) -> Path:
-        """Get cache file path for key."""
-        # Create safe filename from key
-        safe_key = hashlib.md5(key.encode()).hexdigest()
-        return self.analytics_cache_dir / f"{safe_key}.cache"
-    
-    def _get_metadata_file_path(self, key: str) -> Path:
-        """Get metadata file path for key."""
-        safe_key = hashlib.md5(key.encode()).hexdigest()
-        return self.analytics_cache_dir / f"{safe_key}.meta"
+        self.db_path = self.analytics_cache_dir / "cache.db"
+        
+        # key -> (last_accessed timestamp, accesses not yet written)
+        self._pending_touches: Dict[str, Tuple[float, int]] = {}
+        
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                cache_key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL,
+                access_count INTEGER NOT NULL,
+                ttl_seconds INTEGER,
+                expires_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entry_dependencies (
+                dependency TEXT NOT NULL,
+                cache_key TEXT NOT NULL REFERENCES entries (cache_key) ON DELETE CASCADE,
+                PRIMARY KEY (dependency, cache_key)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_accessed ON entries (last_accessed)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entry_dependencies_key ON entry_dependencies (cache_key)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        
+        self._migrate_legacy_files()
     
     def get(self, key: str) -> Optional[CacheEntry]:
         """Get cache entry by key."""
         with self._lock:
-            cache_file = self._get_cache_file_path(key)
-            meta_file = self._get_metadata_file_path(key)
+            try:
+                row = self._conn.execute(
+                    "SELECT payload, size, created_at, last_accessed, access_count, ttl_seconds, expires_at "
+                    "FROM entries WHERE cache_key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to load cache entry {key}: {e}")
+                return None
             
-            if not cache_file.exists() or not meta_file.exists():
+            if row is None:
+                return None
+            
+            payload, size, created_at, last_accessed, access_count, ttl_seconds, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                self.remove(key)
                 return None
             
             try:
-                # Load metadata
-                with open(meta_file, 'r') as f:
-                    metadata = json.load(f)
-                
-                # Check if expired
-                created_at = datetime.fromisoformat(metadata['created_at'])
-                ttl_seconds = metadata.get('ttl_seconds')
-                
-                if ttl_seconds is not None:
-                    expiry_time = created_at + timedelta(seconds=ttl_seconds)
-                    if datetime.now() > expiry_time:
-                        # Remove expired files
-                        cache_file.unlink(missing_ok=True)
-                        meta_file.unlink(missing_ok=True)
-                        return None
-                
-                # Load data
-                with open(cache_file, 'rb') as f:
-                    data = pickle.load(f)
-                
-                # Create cache entry
-                entry = CacheEntry(
-                    key=key,
-                    data=data,
-                    created_at=created_at,
-                    last_accessed=datetime.fromisoformat(metadata['last_accessed']),
-                    access_count=metadata['access_count'],
-                    ttl_seconds=ttl_seconds,
-                    size_bytes=metadata['size_bytes']
-                )
-                
-                # Update access info
-                entry.touch()
-                self._update_metadata(key, entry)
-                
-                return entry
-                
+                data = pickle.loads(payload)
             except Exception as e:
                 logger.warning(f"Failed to load cache entry {key}: {e}")
-                # Clean up corrupted files
-                cache_file.unlink(missing_ok=True)
-                meta_file.unlink(missing_ok=True)
+                # Drop the unreadable row
+                self.remove(key)
                 return None
+            
+            pending = self._pending_touches.get(key)
+            if pending is not None:
+                last_accessed = pending[0]
+                access_count += pending[1]
+            
+            entry = CacheEntry(
+                key=key,
+                data=data,
+                created_at=datetime.fromtimestamp(created_at),
+                last_accessed=datetime.fromtimestamp(last_accessed),
+                access_count=access_count,
+                ttl_seconds=ttl_seconds,
+                dependencies=self._get_dependencies(key)
+            )
+            entry.size_bytes = size
+            
+            # Update access info; written with the next batch
+            entry.touch()
+            self._pending_touches[key] = (entry.last_accessed.timestamp(), (pending[1] if pending else 0) + 1)
+            if len(self._pending_touches) >= self.touch_batch_size:
+                self.flush()
+            
+            return entry
     
     def put(self, key: str, entry: CacheEntry) -> bool:
         """Put cache entry."""
         with self._lock:
             try:
-                cache_file = self._get_cache_file_path(key)
-                meta_file = self._get_metadata_file_path(key)
+                payload = pickle.dumps(entry.data)
+                created_at = entry.created_at.timestamp()
+                expires_at = created_at + entry.ttl_seconds if entry.ttl_seconds is not None else None
                 
-                # Remove existing entry if present to avoid double counting
-                if cache_file.exists():
-                    cache_file.unlink(missing_ok=True)
-                if meta_file.exists():
-                    meta_file.unlink(missing_ok=True)
+                previous = self._conn.execute(
+                    "SELECT size FROM entries WHERE cache_key = ?", (key,)
+                ).fetchone()
                 
-                # Save data
-                with open(cache_file, 'wb') as f:
-                    pickle.dump(entry.data, f)
+                self._conn.execute("BEGIN")
+                try:
+                    # Replacing the row cascades to its old dependencies
+                    self._conn.execute("DELETE FROM entries WHERE cache_key = ?", (key,))
+                    self._conn.execute(
+                        "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key, payload, len(payload), created_at, entry.last_accessed.timestamp(),
+                         entry.access_count, entry.ttl_seconds, expires_at)
+                    )
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO entry_dependencies VALUES (?, ?)",
+                        [(dependency, key) for dependency in entry.dependencies]
+                    )
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
                 
-                # Save metadata
-                self._update_metadata(key, entry)
+                self._pending_touches.pop(key, None)
+                self._total_bytes += len(payload) - (previous[0] if previous else 0)
                 
-                # Clean up if necessary (do this after adding the new entry)
-                self._cleanup_cache()
+                if self._total_bytes > self.max_size_bytes:
+                    self._evict_locked()
                 
                 return True
                 
@@ -349,120 +478,146 @@ class PersistentCache:
     def remove(self, key: str) -> bool:
         """Remove cache entry by key."""
         with self._lock:
-            cache_file = self._get_cache_file_path(key)
-            meta_file = self._get_metadata_file_path(key)
-            
-            removed = False
-            if cache_file.exists():
-                cache_file.unlink()
-                removed = True
-            
-            if meta_file.exists():
-                meta_file.unlink()
-                removed = True
+            self._pending_touches.pop(key, None)
+            row = self._conn.execute("SELECT size FROM entries WHERE cache_key = ?", (key,)).fetchone()
+            if row is None:
+                return False
             
-            return removed
+            self._conn.execute("DELETE FROM entries WHERE cache_key = ?", (key,))
+            self._total_bytes -= row[0]
+            return True
+    
+    def remove_by_dependency(self, dependency: str) -> int:
+        """Remove entries whose metadata lists the given dependency."""
+        with self._lock:
+            keys = [row[0] for row in self._conn.execute(
+                "SELECT cache_key FROM entry_dependencies WHERE dependency = ?", (dependency,)
+            )]
+            for key in keys:
+                self.remove(key)
+            return len(keys)
+    
+    def remove_expired(self) -> int:
+        """Remove every expired entry.
+        
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        with self._lock:
+            keys = [row[0] for row in self._conn.execute(
+                "SELECT cache_key FROM entries WHERE expires_at <= ?", (now,)
+            )]
+            for key in keys:
+                self.remove(key)
+            return len(keys)
     
     def clear(self):
         """Clear all cache entries."""
         with self._lock:
-            for file_path in self.analytics_cache_dir.glob("*.cache"):
-                file_path.unlink(missing_ok=True)
-            
-            for file_path in self.analytics_cache_dir.glob("*.meta"):
-                file_path.unlink(missing_ok=True)
-    
-    def _update_metadata(self, key: str, entry: CacheEntry):
-        """Update metadata file for cache entry."""
-        meta_file = self._get_metadata_file_path(key)
-        
-        metadata = {
-            'key': key,
-            'created_at': entry.created_at.isoformat(),
-            'last_accessed': entry.last_accessed.isoformat(),
-            'access_count': entry.access_count,
-            'ttl_seconds': entry.ttl_seconds,
-            'size_bytes': entry.size_bytes
-        }
-        
-        with open(meta_file, 'w') as f:
-            json.dump(metadata, f)
+            self._conn.execute("DELETE FROM entries")
+            self._pending_touches.clear()
+            self._total_bytes = 0
     
-    def _cleanup_cache(self):
-        """Clean up cache to maintain size limits."""
-        try:
-            # Get all cache files with their sizes and access times
-            cache_files = []
-            total_size = 0
+    def flush(self) -> None:
+        """Write buffered access-time updates to the database."""
+        with self._lock:
+            if not self._pending_touches:
+                return
             
-            for cache_file in self.analytics_cache_dir.glob("*.cache"):
-                meta_file = cache_file.with_suffix(".meta")
+            self._conn.executemany(
+                "UPDATE entries SET last_accessed = ?, access_count = access_count + ? WHERE cache_key = ?",
+                [(last_accessed, count, key) for key, (last_accessed, count) in self._pending_touches.items()]
+            )
+            self._pending_touches.clear()
+    
+    def close(self) -> None:
+        """Flush buffered updates and close the database."""
+        with self._lock:
+            self.flush()
+            self._conn.close()
+    
+    def _get_dependencies(self, key: str) -> List[str]:
+        """Get the dependencies recorded for an entry."""
+        return [row[0] for row in self._conn.execute(
+            "SELECT dependency FROM entry_dependencies WHERE cache_key = ?", (key,)
+        )]
+    
+    def _evict_locked(self) -> int:
+        """Remove least recently used entries until the cache is back under its size limit."""
+        # Recency must include the buffered hits
+        self.flush()
+        
+        evicted = 0
+        rows = self._conn.execute("SELECT cache_key, size FROM entries ORDER BY last_accessed").fetchmany
+        while self._total_bytes > self.max_size_bytes:
+            batch = rows(16)
+            if not batch:
+                break
+            
+            to_delete = []
+            for key, size in batch:
+                if self._total_bytes <= self.max_size_bytes:
+                    break
+                to_delete.append((key,))
+                self._total_bytes -= size
+            
+            self._conn.executemany("DELETE FROM entries WHERE cache_key = ?", to_delete)
+            evicted += len(to_delete)
+        
+        if evicted:
+            logger.debug(f"Evicted {evicted} persistent cache entries to stay under the size limit")
+        return evicted
+    
+    def _migrate_legacy_files(self) -> None:
+        """Import entries left in per-key .cache/.meta files by older versions, then delete the files."""
+        meta_files = list(self.analytics_cache_dir.glob("*.meta"))
+        if not meta_files:
+            return
+        
+        imported = 0
+        for meta_file in meta_files:
+            cache_file = meta_file.with_suffix(".cache")
+            try:
+                with open(meta_file, 'r') as f:
+                    metadata = json.load(f)
+                with open(cache_file, 'rb') as f:
+                    data = pickle.load(f)
                 
-                if meta_file.exists():
-                    try:
-                        with open(meta_file, 'r') as f:
-                            metadata = json.load(f)
-                        
-                        size = metadata.get('size_bytes', cache_file.stat().st_size)
-                        last_accessed = datetime.fromisoformat(metadata['last_accessed'])
-                        
-                        cache_files.append((cache_file, meta_file, size, last_accessed))
-                        total_size += size
-                        
-                    except Exception:
-                        # Remove corrupted files
-                        cache_file.unlink(missing_ok=True)
-                        meta_file.unlink(missing_ok=True)
-                else:
-                    # Remove orphaned cache files without metadata
-                    cache_file.unlink(missing_ok=True)
+                entry = CacheEntry(
+                    key=metadata['key'],
+                    data=data,
+                    created_at=datetime.fromisoformat(metadata['created_at']),
+                    last_accessed=datetime.fromisoformat(metadata['last_accessed']),
+                    access_count=metadata['access_count'],
+                    ttl_seconds=metadata.get('ttl_seconds'),
+                    dependencies=metadata.get('dependencies', [])
+                )
+                if not entry.is_expired and self.put(entry.key, entry):
+                    imported += 1
+            except Exception as e:
+                logger.debug(f"Skipping unreadable legacy cache file {meta_file.name}: {e}")
             
-            # Remove oldest files if over size limit
-            if total_size > self.max_size_bytes:
-                # Sort by last accessed time (oldest first)
-                cache_files.sort(key=lambda x: x[3])
-                
-                for cache_file, meta_file, size, _ in cache_files:
-                    if total_size <= self.max_size_bytes:
-                        break
-                    
-                    try:
-                        cache_file.unlink(missing_ok=True)
-                        meta_file.unlink(missing_ok=True)
-                        total_size -= size
-                    except Exception:
-                        # Continue cleanup even if individual file removal fails
-                        pass
-                    
-        except Exception as e:
-            logger.warning(f"Cache cleanup failed: {e}")
+            cache_file.unlink(missing_ok=True)
+            meta_file.unlink(missing_ok=True)
+        
+        logger.info(f"Imported {imported} legacy analytics cache entries into {self.db_path.name}")
     
     @property
     def size_bytes(self) -> int:
         """Get total cache size in bytes."""
-        total_size = 0
-        
-        for cache_file in self.analytics_cache_dir.glob("*.cache"):
-            try:
-                total_size += cache_file.stat().st_size
-            except Exception:
-                pass
-        
-        return total_size
+        return self._total_bytes
+    
+    @property
+    def entry_count(self) -> int:
+        """Get number of entries."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
     
     def get_keys(self) -> List[str]:
         """Get all cache keys."""
-        keys = []
-        
-        for meta_file in self.analytics_cache_dir.glob("*.meta"):
-            try:
-                with open(meta_file, 'r') as f:
-                    metadata = json.load(f)
-                keys.append(metadata['key'])
-            except Exception:
-                pass
-        
-        return keys
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT cache_key FROM entries")]
 
 
 class AnalyticsCacheManager:
@@ -515,19 +670,17 @@ class AnalyticsCacheManager:
             Cached data if found, None otherwise
         """
         with self._lock:
-            self.stats.total_requests += 1
-            
             # Try memory cache first
             entry = self.memory_cache.get(cache_key)
             if entry is not None:
-                self.stats.cache_hits += 1
+                self.stats.record_request(cache_key, hit=True)
                 logger.debug(f"Memory cache hit for key: {cache_key}")
                 return entry.data
             
             # Try persistent cache
             entry = self.persistent_cache.get(cache_key)
             if entry is not None:
-                self.stats.cache_hits += 1
+                self.stats.record_request(cache_key, hit=True)
                 logger.debug(f"Persistent cache hit for key: {cache_key}")
                 
                 # Promote to memory cache if frequently accessed
@@ -539,19 +692,20 @@ class AnalyticsCacheManager:
                         last_accessed=entry.last_accessed,
                         access_count=entry.access_count,
                         ttl_seconds=self.default_memory_ttl,
-                        size_bytes=entry.size_bytes
+                        size_bytes=entry.size_bytes,
+                        dependencies=entry.dependencies
                     )
                     self.memory_cache.put(cache_key, memory_entry)
                 
                 return entry.data
             
             # Cache miss
-            self.stats.cache_misses += 1
+            self.stats.record_request(cache_key, hit=False)
             logger.debug(f"Cache miss for key: {cache_key}")
             return None
     
     def cache_analytics(self, cache_key: str, data: Any, ttl: Optional[int] = None, 
-                       persistent: bool = True) -> None:
+                       persistent: bool = True, dependencies: Optional[List[str]] = None) -> None:
         """Cache analytics data.
         
         Args:
@@ -559,6 +713,7 @@ class AnalyticsCacheManager:
             data: Data to cache
             ttl: Time to live in seconds (None for default)
             persistent: Whether to store in persistent cache
+            dependencies: Names of inputs the data depends on (see invalidate_dependency)
         """
         if not cache_key:
             raise CacheKeyError("Cache key cannot be empty")
@@ -577,7 +732,8 @@ class AnalyticsCacheManager:
                 created_at=now,
                 last_accessed=now,
                 access_count=1,
-                ttl_seconds=ttl
+                ttl_seconds=ttl,
+                dependencies=list(dependencies or [])
             )
             
             # Store in memory cache
@@ -591,7 +747,8 @@ class AnalyticsCacheManager:
                     created_at=now,
                     last_accessed=now,
                     access_count=1,
-                    ttl_seconds=ttl
+                    ttl_seconds=ttl,
+                    dependencies=list(dependencies or [])
                 )
                 self.persistent_cache.put(cache_key, persistent_entry)
             
@@ -630,6 +787,23 @@ class AnalyticsCacheManager:
             logger.info(f"Invalidated {invalidated_count} cache entries matching pattern: {pattern}")
             return invalidated_count
     
+    def invalidate_dependency(self, dependency: str) -> int:
+        """Invalidate every cache entry that depends on an input.
+        
+        Args:
+            dependency: Dependency name given to cache_analytics (e.g. "player:Alice")
+            
+        Returns:
+            Number of entries invalidated
+        """
+        with self._lock:
+            invalidated_count = self.memory_cache.remove_by_dependency(dependency)
+            invalidated_count += self.persistent_cache.remove_by_dependency(dependency)
+            
+            if invalidated_count:
+                logger.debug(f"Invalidated {invalidated_count} cache entries depending on {dependency}")
+            return invalidated_count
+    
     def clear_cache(self, memory_only: bool = False) -> None:
         """Clear all cache entries.
         
@@ -652,12 +826,14 @@ class AnalyticsCacheManager:
         """
         with self._lock:
             # Update current statistics
-            self.stats.total_entries = self.memory_cache.size + len(self.persistent_cache.get_keys())
+            persistent_entries = self.persistent_cache.entry_count
+            self.stats.total_entries = self.memory_cache.size + persistent_entries
             self.stats.total_size_bytes = self.memory_cache.size_bytes + self.persistent_cache.size_bytes
             self.stats.memory_cache_entries = self.memory_cache.size
             self.stats.memory_cache_size_bytes = self.memory_cache.size_bytes
-            self.stats.persistent_cache_entries = len(self.persistent_cache.get_keys())
+            self.stats.persistent_cache_entries = persistent_entries
             self.stats.persistent_cache_size_bytes = self.persistent_cache.size_bytes
+            self.stats.cache_evictions = self.memory_cache.evictions
             
             return self.stats
     
@@ -770,14 +946,41 @@ class AnalyticsCacheManager:
             Number of entries cleaned up
         """
         with self._lock:
-            cleaned_count = 0
+            cleaned_count = self.memory_cache.remove_expired()
             
-            # Memory cache cleanup is handled automatically by LRU eviction
-            # Just trigger a cleanup for persistent cache
             try:
-                self.persistent_cache._cleanup_cache()
-                cleaned_count += 1
+                cleaned_count += self.persistent_cache.remove_expired()
             except Exception as e:
                 logger.warning(f"Failed to cleanup persistent cache: {e}")
             
-            return cleaned_count
\ No newline at end of file
+            return cleaned_count
+
+
+_shared_managers: Dict[str, AnalyticsCacheManager] = {}
+_shared_managers_lock = threading.Lock()
+
+
+def get_shared_cache_manager(config: Optional[Config] = None) -> AnalyticsCacheManager:
+    """Get the process-wide cache manager for a cache directory.
+    
+    Engines configured with the same cache directory share one manager, so
+    results computed by one (CLI, web interface, batch jobs) are served warm
+    to the others instead of being held in separate memory tiers.
+    
+    Args:
+        config: Application configuration
+        
+    Returns:
+        Shared analytics cache manager
+    """
+    if config is None:
+        from .config import get_config
+        config = get_config()
+    
+    directory = str(Path(config.cache_directory).resolve())
+    with _shared_managers_lock:
+        manager = _shared_managers.get(directory)
+        if manager is None:
+            manager = AnalyticsCacheManager(config)
+            _shared_managers[directory] = manager
+        return manager
@@ -78,13 +78,19 @@ class AnalyticsFilters:
     teammates: Optional[List[str]] = None
     win_only: Optional[bool] = None
     min_games: int = 1
+    player_puuids: Optional[List[str]] = None  # Players for match-level queries
+    limit: Optional[int] = None  # Keep only the most recent matches
     
     def __post_init__(self):
         """Validate filters."""
         if self.min_games < 0:
             raise DataValidationError("Minimum games cannot be negative")
         
+        if self.limit is not None and self.limit < 0:
+            raise DataValidationError("Limit cannot be negative")
+        
         if self.roles:
+            self.roles = [role.lower() for role in self.roles]
             valid_roles = {"top", "jungle", "middle", "support", "bottom"}
             invalid_roles = set(self.roles) - valid_roles
             if invalid_roles:
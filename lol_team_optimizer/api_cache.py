@@ -0,0 +1,231 @@
+"""
+Persistent SQLite cache for Riot API responses.
+
+Each response is one row, so storing or reading an entry costs the same no
+matter how many entries the cache holds. Expired rows are removed by a
+background sweep, the total payload size is capped, and large payloads
+(match details) are zlib-compressed.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+class ApiResponseCache:
+    """
+    SQLite-backed response cache with TTL expiry and a size cap.
+    
+    A single connection is shared by all threads and guarded by a lock; the
+    database runs in WAL mode so each put is one small append.
+    """
+    
+    def __init__(self, db_path: Path, max_size_bytes: int = 100 * 1024 * 1024,
+                 compress_min_bytes: Optional[int] = 4096, sweep_interval_seconds: float = 300):
+        """
+        Initialize the cache.
+        
+        Args:
+            db_path: SQLite database file
+            max_size_bytes: Cap on the total stored payload size
+            compress_min_bytes: Payloads at least this large are compressed (None disables)
+            sweep_interval_seconds: Interval of the background expiry sweep (0 disables)
+        """
+        self.db_path = Path(db_path)
+        self.max_size_bytes = max_size_bytes
+        self.compress_min_bytes = compress_min_bytes
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.logger = logging.getLogger(__name__)
+        
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                compressed INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses (expires_at)")
+        self._total_bytes = self._stored_bytes_locked()
+        
+        self._stop_sweep = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        if sweep_interval_seconds > 0:
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="api-cache-sweep", daemon=True)
+            self._sweeper.start()
+    
+    @property
+    def total_bytes(self) -> int:
+        """Total stored payload size in bytes."""
+        return self._total_bytes
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+    
+    def get_entry(self, key: str) -> Optional[Tuple[Any, datetime, datetime]]:
+        """
+        Look up an unexpired entry.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Tuple of (data, created_at, expires_at), or None if missing or expired
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, compressed, created_at, expires_at FROM responses WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        payload, compressed, created_at, expires_at = row
+        if expires_at <= time.time():
+            return None
+        
+        try:
+            data = json.loads(zlib.decompress(payload) if compressed else payload)
+        except (zlib.error, ValueError) as e:
+            self.logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            self.delete(key)
+            return None
+        
+        return data, datetime.fromtimestamp(created_at), datetime.fromtimestamp(expires_at)
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get the cached data for a key, or None if missing or expired."""
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+    
+    def put(self, key: str, data: Any, expires_at: datetime, created_at: Optional[datetime] = None) -> None:
+        """
+        Store one entry, replacing any previous value for the key.
+        
+        Args:
+            key: Cache key
+            data: JSON-serializable response data
+            expires_at: Expiry time
+            created_at: Creation time (defaults to now)
+        """
+        payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        compressed = self.compress_min_bytes is not None and len(payload) >= self.compress_min_bytes
+        if compressed:
+            payload = zlib.compress(payload)
+        
+        created = (created_at or datetime.now()).timestamp()
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM responses WHERE cache_key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, int(compressed), len(payload), created, expires_at.timestamp())
+            )
+            self._total_bytes += len(payload) - (previous[0] if previous else 0)
+            
+            if self._total_bytes > self.max_size_bytes:
+                self._evict_locked()
+    
+    def put_many(self, entries: Dict[str, Tuple[Any, datetime, datetime]]) -> None:
+        """
+        Store several entries in one transaction.
+        
+        Args:
+            entries: Mapping of key to (data, created_at, expires_at)
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for key, (data, created_at, expires_at) in entries.items():
+                    self.put(key, data, expires_at, created_at)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                # Puts and evictions inside the transaction already adjusted the total
+                self._total_bytes = self._stored_bytes_locked()
+                raise
+            self._conn.execute("COMMIT")
+    
+    def delete(self, key: str) -> bool:
+        """Remove an entry; returns True if it existed."""
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM responses WHERE cache_key = ?", (key,)).fetchone()
+            if row is None:
+                return False
+            self._conn.execute("DELETE FROM responses WHERE cache_key = ?", (key,))
+            self._total_bytes -= row[0]
+            return True
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._total_bytes = 0
+    
+    def sweep_expired(self) -> int:
+        """
+        Remove expired entries.
+        
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        with self._lock:
+            freed, count = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses WHERE expires_at <= ?", (now,)
+            ).fetchone()
+            if count:
+                self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                self._total_bytes -= freed
+        
+        if count:
+            self.logger.debug(f"Swept {count} expired API cache entries")
+        return count
+    
+    def _stored_bytes_locked(self) -> int:
+        """Total payload size of the rows in the database."""
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    
+    def _evict_locked(self) -> None:
+        """Drop the entries closest to expiry until the cache is back under 90% of its cap."""
+        target = int(self.max_size_bytes * 0.9)
+        rows = self._conn.execute("SELECT cache_key, size FROM responses ORDER BY expires_at")
+        to_delete = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            to_delete.append((key,))
+            self._total_bytes -= size
+        
+        self._conn.executemany("DELETE FROM responses WHERE cache_key = ?", to_delete)
+        self.logger.debug(f"Evicted {len(to_delete)} API cache entries to stay under the size cap")
+    
+    def _sweep_loop(self) -> None:
+        """Background thread body: sweep expired entries until closed."""
+        while not self._stop_sweep.wait(self.sweep_interval_seconds):
+            try:
+                self.sweep_expired()
+            except sqlite3.Error as e:
+                self.logger.warning(f"API cache sweep failed: {e}")
+    
+    def close(self) -> None:
+        """Stop the background sweep and close the database."""
+        self._stop_sweep.set()
+        if self._sweeper is not None and self._sweeper is not threading.current_thread():
+            self._sweeper.join(timeout=1)
+        with self._lock:
+            self._conn.close()
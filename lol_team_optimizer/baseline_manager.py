@@ -16,11 +16,15 @@ from dataclasses import dataclass, field, asdict
 from collections import defaultdict
 import math
 
+import numpy as np
+
 from .models import Match, MatchParticipant
 from .analytics_models import (
     PerformanceMetrics, PerformanceDelta, ConfidenceInterval,
     BaselineCalculationError, InsufficientDataError, DateRange
 )
+from .participant_table import ParticipantTable, ParticipantTotals
+from .baseline_statistics import DAY_MS, BaselineStatistics, PlayerBaselineBuckets
 from .config import Config
 
 
@@ -87,6 +91,7 @@ class PlayerBaseline:
     confidence_interval: ConfidenceInterval
     calculation_date: datetime
     temporal_weight_applied: bool = False
+    statistics: Optional[BaselineStatistics] = None  # Mergeable sufficient statistics of the games
     
     def __post_init__(self):
         """Validate player baseline."""
@@ -214,6 +219,9 @@ class BaselineCache:
         ci_data = data['confidence_interval']
         data['confidence_interval'] = ConfidenceInterval(**ci_data)
         
+        if data.get('statistics'):
+            data['statistics'] = BaselineStatistics.from_dict(data['statistics'])
+        
         return PlayerBaseline(**data)
     
     def get(self, cache_key: str) -> Optional[PlayerBaseline]:
@@ -237,7 +245,9 @@ class BaselineCache:
         keys_to_remove = [key for key in self.memory_cache.keys() if key.startswith(puuid)]
         for key in keys_to_remove:
             del self.memory_cache[key]
-        self._save_cache()
+        
+        if keys_to_remove:
+            self._save_cache()
     
     def cleanup_stale(self) -> int:
         """Remove stale baselines from cache."""
@@ -274,6 +284,13 @@ class BaselineManager:
         self.temporal_decay_days = 60  # Days for temporal weighting
         self.confidence_level = 0.95
         self.recent_emphasis_days = 30  # Days to emphasize for recent performance
+        
+        # Per-player running statistics, built from the participant table on first use
+        self._player_buckets: Dict[str, PlayerBaselineBuckets] = {}
+        self._bucket_table: Optional[ParticipantTable] = None
+        if isinstance(getattr(match_manager, 'participant_table', None), ParticipantTable):
+            match_manager.add_match_listener(self._on_matches_stored)
+            match_manager.add_match_removal_listener(self._on_matches_removed)
     
     def calculate_player_baseline(self, context: BaselineContext) -> PlayerBaseline:
         """
@@ -297,46 +314,60 @@ class BaselineManager:
             return cached_baseline
         
         try:
-            # Get matches for the context
-            matches = self._get_matches_for_context(context)
+            # Merge the player's running statistics when the context allows it
+            buckets = self._get_player_buckets(context.puuid) if not context.team_composition_context else None
+            if buckets is not None:
+                statistics, since_day = self._merge_context_statistics(buckets, context)
+                table = rows = None
+            else:
+                # Select participant rows for the context
+                table, rows = self._select_context_rows(context)
+                statistics = BaselineStatistics.from_rows(table, rows)
             
-            if len(matches) < self.min_games_for_baseline:
+            sample_size = statistics.games
+            if sample_size < self.min_games_for_baseline:
                 raise InsufficientDataError(
                     required_games=self.min_games_for_baseline,
-                    available_games=len(matches),
+                    available_games=sample_size,
                     context=f"baseline calculation for {context.puuid}"
                 )
             
             # Calculate baseline metrics
-            baseline_metrics = self._calculate_baseline_metrics(matches, context)
+            baseline_metrics = self._calculate_baseline_metrics(statistics)
             
             # Apply temporal weighting if requested
             if context.time_window_days:
-                baseline_metrics = self._apply_temporal_weighting(
-                    matches, baseline_metrics, context.time_window_days
-                )
+                if buckets is not None:
+                    baseline_metrics = self._apply_decayed_weighting(
+                        buckets, context, since_day, baseline_metrics
+                    )
+                else:
+                    baseline_metrics = self._apply_temporal_weighting(
+                        table, rows, baseline_metrics, context.time_window_days
+                    )
                 temporal_weight_applied = True
             else:
                 temporal_weight_applied = False
             
             # Calculate confidence interval
-            confidence_interval = self._calculate_confidence_interval(matches, baseline_metrics)
+            confidence_interval = self._calculate_confidence_interval(sample_size, baseline_metrics)
             
             # Create baseline
             baseline = PlayerBaseline(
                 puuid=context.puuid,
                 context=context,
                 baseline_metrics=baseline_metrics,
-                sample_size=len(matches),
+                sample_size=sample_size,
                 confidence_interval=confidence_interval,
                 calculation_date=datetime.now(),
-                temporal_weight_applied=temporal_weight_applied
+                temporal_weight_applied=temporal_weight_applied,
+                statistics=statistics
             )
             
             # Cache the result
             self.cache.put(cache_key, baseline)
             
-            self.logger.info(f"Calculated baseline for {context.puuid} with {len(matches)} games")
+            self.logger.info(f"Calculated baseline for {context.puuid} with {sample_size} games")
             return baseline
             
         except Exception as e:
@@ -507,11 +538,108 @@ class BaselineManager:
         if not new_matches:
             return
         
+        # Fold stored matches into the running statistics; already counted ones are skipped
+        buckets = self._player_buckets.get(puuid)
+        if buckets is not None and self._bucket_table is not None:
+            rows = self._bucket_table.rows_for_matches(match.match_id for match in new_matches)
+            rows = self._bucket_table.select(puuid=puuid, rows=rows)
+            buckets.add_rows(self._bucket_table, rows)
+        
         # Invalidate cached baselines for this player
         self.cache.invalidate(puuid)
         
         self.logger.info(f"Invalidated baselines for {puuid} due to {len(new_matches)} new matches")
     
+    def _get_player_buckets(self, puuid: str) -> Optional[PlayerBaselineBuckets]:
+        """
+        Get a player's running statistics, summarizing their games on first use.
+        
+        Returns None when the match manager has no participant table.
+        """
+        table = getattr(self.match_manager, 'participant_table', None)
+        if not isinstance(table, ParticipantTable):
+            return None
+        
+        # A rebuilt index comes with a new table; start over from it
+        if table is not self._bucket_table:
+            self._player_buckets.clear()
+            self._bucket_table = table
+        
+        buckets = self._player_buckets.get(puuid)
+        if buckets is None:
+            buckets = PlayerBaselineBuckets(puuid)
+            buckets.add_rows(table, table.select(puuid=puuid))
+            self._player_buckets[puuid] = buckets
+        return buckets
+    
+    def _merge_context_statistics(self, buckets: PlayerBaselineBuckets,
+                                  context: BaselineContext) -> Tuple[BaselineStatistics, Optional[int]]:
+        """
+        Merge the buckets that match a context.
+        
+        Returns:
+            Tuple of (merged statistics, first day included or None for all time)
+        """
+        since_day = None
+        if context.time_window_days:
+            cutoff_date = datetime.now() - timedelta(days=context.time_window_days)
+            since_day = int(cutoff_date.timestamp() * 1000) // DAY_MS
+        
+        statistics = BaselineStatistics()
+        for bucket in buckets.select(context.role, context.champion_id, context.queue_types):
+            bucket.merge_into(statistics, since_day)
+        return statistics, since_day
+    
+    def _on_matches_stored(self, matches: List[Match]) -> None:
+        """MatchManager listener: add new games to the players' running statistics."""
+        table = self._bucket_table
+        if table is None or table is not getattr(self.match_manager, 'participant_table', None):
+            return
+        
+        rows = table.rows_for_matches(match.match_id for match in matches)
+        by_player: Dict[str, List[int]] = defaultdict(list)
+        for row, puuid in zip(rows.tolist(), table.puuids(rows)):
+            if puuid in self._player_buckets:
+                by_player[puuid].append(row)
+        
+        for puuid, player_rows in by_player.items():
+            if self._player_buckets[puuid].add_rows(table, np.array(player_rows, dtype=np.int64)):
+                self.cache.invalidate(puuid)
+    
+    def _on_matches_removed(self, match_ids: List[str]) -> None:
+        """MatchManager removal listener: drop statistics and cached baselines that counted a removed match."""
+        removed = set(match_ids)
+        for puuid in [p for p, buckets in self._player_buckets.items() if not buckets.match_ids.isdisjoint(removed)]:
+            del self._player_buckets[puuid]
+            self.cache.invalidate(puuid)
+    
+    def _select_context_rows(self, context: BaselineContext) -> Tuple[ParticipantTable, np.ndarray]:
+        """
+        Select the participant rows that match the baseline context.
+        
+        Uses the match manager's participant table when it has one, so no
+        matches are decoded; otherwise falls back to filtering Match objects.
+        """
+        table = getattr(self.match_manager, 'participant_table', None)
+        if not isinstance(table, ParticipantTable):
+            table = ParticipantTable.from_pairs(self._get_matches_for_context(context))
+            return table, table.rows()
+        
+        start_ms = None
+        if context.time_window_days:
+            cutoff_date = datetime.now() - timedelta(days=context.time_window_days)
+            start_ms = int(cutoff_date.timestamp() * 1000)
+        
+        rows = table.select(
+            puuid=context.puuid,
+            champion_ids=[context.champion_id] if context.champion_id else None,
+            roles=[context.role] if context.role else None,
+            queue_ids=context.queue_types,
+            start_ms=start_ms,
+            teammates=context.team_composition_context
+        )
+        return table, rows
+    
     def _get_matches_for_context(self, context: BaselineContext) -> List[Tuple[Match, MatchParticipant]]:
         """Get matches that match the baseline context."""
         all_matches = self.match_manager.get_matches_for_player(context.puuid)
@@ -548,126 +676,77 @@ class BaselineManager:
         
         return filtered_matches
     
-    def _calculate_baseline_metrics(self, matches: List[Tuple[Match, MatchParticipant]], 
-                                  context: BaselineContext) -> PerformanceMetrics:
-        """Calculate baseline performance metrics from matches."""
-        if not matches:
+    def _calculate_baseline_metrics(self, statistics: BaselineStatistics) -> PerformanceMetrics:
+        """Calculate baseline performance metrics from summarized games."""
+        if statistics.games == 0:
             raise BaselineCalculationError("No matches provided for baseline calculation")
         
-        # Aggregate statistics
-        total_games = len(matches)
-        total_wins = sum(1 for _, participant in matches if participant.win)
-        total_kills = sum(participant.kills for _, participant in matches)
-        total_deaths = sum(participant.deaths for _, participant in matches)
-        total_assists = sum(participant.assists for _, participant in matches)
-        total_cs = sum(participant.cs_total for _, participant in matches)
-        total_vision = sum(participant.vision_score for _, participant in matches)
-        total_damage = sum(participant.total_damage_dealt_to_champions for _, participant in matches)
-        total_gold = sum(participant.gold_earned for _, participant in matches)
-        total_duration = sum(match.game_duration for match, _ in matches)
-        
-        # Calculate averages
-        win_rate = total_wins / total_games
-        avg_kda = (total_kills + total_assists) / max(total_deaths, 1)
-        avg_cs_per_min = total_cs / (total_duration / 60) if total_duration > 0 else 0
-        avg_vision_score = total_vision / total_games
-        avg_damage_per_min = total_damage / (total_duration / 60) if total_duration > 0 else 0
-        avg_gold_per_min = total_gold / (total_duration / 60) if total_duration > 0 else 0
-        avg_game_duration = total_duration / (total_games * 60)  # in minutes
-        
-        return PerformanceMetrics(
-            games_played=total_games,
-            wins=total_wins,
-            losses=total_games - total_wins,
-            win_rate=win_rate,
-            total_kills=total_kills,
-            total_deaths=total_deaths,
-            total_assists=total_assists,
-            avg_kda=avg_kda,
-            total_cs=total_cs,
-            avg_cs_per_min=avg_cs_per_min,
-            total_vision_score=total_vision,
-            avg_vision_score=avg_vision_score,
-            total_damage_to_champions=total_damage,
-            avg_damage_per_min=avg_damage_per_min,
-            total_gold_earned=total_gold,
-            avg_gold_per_min=avg_gold_per_min,
-            total_game_duration=total_duration,
-            avg_game_duration=avg_game_duration
-        )
+        return statistics.totals.to_performance_metrics()
     
-    def _apply_temporal_weighting(self, matches: List[Tuple[Match, MatchParticipant]], 
+    def _apply_temporal_weighting(self, table: ParticipantTable, rows: np.ndarray,
                                 baseline_metrics: PerformanceMetrics, 
                                 time_window_days: int) -> PerformanceMetrics:
         """Apply temporal weighting to emphasize recent performance."""
-        if not matches:
+        if len(rows) == 0:
             return baseline_metrics
         
-        # Calculate weights based on recency
-        now = datetime.now()
-        weighted_stats = defaultdict(float)
-        total_weight = 0.0
-        
-        for match, participant in matches:
-            match_date = match.game_creation_datetime
-            days_ago = (now - match_date).days
-            
-            # Exponential decay weight (more recent = higher weight)
-            weight = math.exp(-days_ago / (time_window_days / 3))
-            total_weight += weight
-            
-            # Apply weights to individual match stats
-            weighted_stats['wins'] += weight if participant.win else 0
-            weighted_stats['kills'] += participant.kills * weight
-            weighted_stats['deaths'] += participant.deaths * weight
-            weighted_stats['assists'] += participant.assists * weight
-            weighted_stats['cs'] += participant.cs_total * weight
-            weighted_stats['vision'] += participant.vision_score * weight
-            weighted_stats['damage'] += participant.total_damage_dealt_to_champions * weight
-            weighted_stats['gold'] += participant.gold_earned * weight
-            weighted_stats['duration'] += match.game_duration * weight
+        # Exponential decay weight (more recent = higher weight)
+        weights = np.exp(-table.days_ago(rows) / (time_window_days / 3))
+        return self._weighted_metrics(table.totals(rows, weights), baseline_metrics)
+    
+    def _apply_decayed_weighting(self, buckets: PlayerBaselineBuckets, context: BaselineContext,
+                                 since_day: int, baseline_metrics: PerformanceMetrics) -> PerformanceMetrics:
+        """Apply temporal weighting from per-day decayed sums of the player's buckets."""
+        today = int(datetime.now().timestamp() * 1000) // DAY_MS
+        weighted = ParticipantTotals()
+        for bucket in buckets.select(context.role, context.champion_id, context.queue_types):
+            bucket.add_decayed_totals(weighted, today, context.time_window_days / 3, since_day)
+        return self._weighted_metrics(weighted, baseline_metrics)
+    
+    def _weighted_metrics(self, weighted: ParticipantTotals,
+                          baseline_metrics: PerformanceMetrics) -> PerformanceMetrics:
+        """Turn time-weighted totals into metrics scaled to the unweighted game count."""
+        total_weight = weighted.weight
         
         if total_weight == 0:
             return baseline_metrics
         
         # Calculate weighted averages
-        games_played = len(matches)
-        win_rate = weighted_stats['wins'] / total_weight
-        avg_kda = (weighted_stats['kills'] + weighted_stats['assists']) / max(weighted_stats['deaths'], total_weight)
-        
-        total_duration_weighted = weighted_stats['duration']
-        avg_cs_per_min = weighted_stats['cs'] / (total_duration_weighted / 60) if total_duration_weighted > 0 else 0
-        avg_vision_score = weighted_stats['vision'] / total_weight
-        avg_damage_per_min = weighted_stats['damage'] / (total_duration_weighted / 60) if total_duration_weighted > 0 else 0
-        avg_gold_per_min = weighted_stats['gold'] / (total_duration_weighted / 60) if total_duration_weighted > 0 else 0
+        games_played = weighted.games
+        win_rate = weighted.wins / total_weight
+        avg_kda = (weighted.kills + weighted.assists) / max(weighted.deaths, total_weight)
+        
+        total_duration_weighted = weighted.duration
+        avg_cs_per_min = weighted.cs / (total_duration_weighted / 60) if total_duration_weighted > 0 else 0
+        avg_vision_score = weighted.vision / total_weight
+        avg_damage_per_min = weighted.damage / (total_duration_weighted / 60) if total_duration_weighted > 0 else 0
+        avg_gold_per_min = weighted.gold / (total_duration_weighted / 60) if total_duration_weighted > 0 else 0
         avg_game_duration = total_duration_weighted / (total_weight * 60)
         
         return PerformanceMetrics(
             games_played=games_played,
-            wins=int(weighted_stats['wins'] / total_weight * games_played),
-            losses=games_played - int(weighted_stats['wins'] / total_weight * games_played),
+            wins=int(weighted.wins / total_weight * games_played),
+            losses=games_played - int(weighted.wins / total_weight * games_played),
             win_rate=win_rate,
-            total_kills=int(weighted_stats['kills'] / total_weight * games_played),
-            total_deaths=int(weighted_stats['deaths'] / total_weight * games_played),
-            total_assists=int(weighted_stats['assists'] / total_weight * games_played),
+            total_kills=int(weighted.kills / total_weight * games_played),
+            total_deaths=int(weighted.deaths / total_weight * games_played),
+            total_assists=int(weighted.assists / total_weight * games_played),
             avg_kda=avg_kda,
-            total_cs=int(weighted_stats['cs'] / total_weight * games_played),
+            total_cs=int(weighted.cs / total_weight * games_played),
             avg_cs_per_min=avg_cs_per_min,
-            total_vision_score=int(weighted_stats['vision'] / total_weight * games_played),
+            total_vision_score=int(weighted.vision / total_weight * games_played),
             avg_vision_score=avg_vision_score,
-            total_damage_to_champions=int(weighted_stats['damage'] / total_weight * games_played),
+            total_damage_to_champions=int(weighted.damage / total_weight * games_played),
             avg_damage_per_min=avg_damage_per_min,
-            total_gold_earned=int(weighted_stats['gold'] / total_weight * games_played),
+            total_gold_earned=int(weighted.gold / total_weight * games_played),
             avg_gold_per_min=avg_gold_per_min,
             total_game_duration=int(total_duration_weighted / total_weight * games_played),
             avg_game_duration=avg_game_duration
         )
     
-    def _calculate_confidence_interval(self, matches: List[Tuple[Match, MatchParticipant]], 
+    def _calculate_confidence_interval(self, sample_size: int,
                                      baseline_metrics: PerformanceMetrics) -> ConfidenceInterval:
         """Calculate confidence interval for baseline metrics."""
-        sample_size = len(matches)
-        
         # For win rate (binomial distribution)
         win_rate = baseline_metrics.win_rate
         
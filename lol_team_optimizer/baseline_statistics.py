@@ -0,0 +1,234 @@
+"""
+Mergeable running statistics for performance baselines.
+
+A baseline aggregates a player's games filtered by role, champion, queue
+and time window. Games are summarized once into buckets keyed by
+(role, champion, queue). Each bucket holds summed stats, Welford moments of
+the per-game metrics and per-day slots for time windows. A context baseline
+is then a merge of the matching buckets, and a new game updates one bucket
+in O(1).
+"""
+
+import math
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .participant_table import ParticipantTable, ParticipantTotals, ROW_METRICS, STAT_COLUMNS
+
+
+DAY_MS = 86_400_000
+
+# ParticipantTotals fields that are summed per game
+_SUMMED_FIELDS = [f.name for f in fields(ParticipantTotals) if f.name not in ('games', 'weight')]
+
+# Table columns read per game, in the order game_values expects them
+_GAME_COLUMNS = ('win',) + STAT_COLUMNS + ('duration',)
+
+
+@dataclass
+class RunningStats:
+    """Count, mean and sum of squared deviations of one metric (Welford)."""
+    
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    
+    def add(self, value: float) -> None:
+        """Add one observation."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    def merge(self, other: 'RunningStats') -> None:
+        """Fold another set of observations into this one (Chan et al.)."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return
+        
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+    
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 with fewer than two observations)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    @property
+    def std_dev(self) -> float:
+        """Sample standard deviation."""
+        return math.sqrt(self.variance)
+
+
+def game_values(win: bool, kills: int, deaths: int, assists: int, cs: int, vision: int,
+                gold: int, damage: int, duration: int) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Split one game's stats into summed totals and per-game metric values.
+    
+    Returns:
+        Tuple of (ParticipantTotals field values, ROW_METRICS values)
+    """
+    totals = {
+        'wins': int(win), 'kills': kills, 'deaths': deaths, 'assists': assists, 'cs': cs,
+        'vision': vision, 'gold': gold, 'damage': damage, 'duration': duration
+    }
+    minutes = duration / 60
+    metrics = {
+        'win_rate': float(win),
+        'avg_kda': (kills + assists) / max(deaths, 1),
+        'avg_cs_per_min': cs / minutes if minutes > 0 else 0.0,
+        'avg_vision_score': float(vision),
+        'avg_damage_per_min': damage / minutes if minutes > 0 else 0.0,
+        'avg_gold_per_min': gold / minutes if minutes > 0 else 0.0
+    }
+    return totals, metrics
+
+
+def add_totals(target: ParticipantTotals, source: ParticipantTotals, weight: float = 1.0) -> None:
+    """Add ``source`` into ``target``, scaling its sums by ``weight``."""
+    target.games += source.games
+    target.weight += source.weight * weight
+    for name in _SUMMED_FIELDS:
+        value = getattr(source, name)
+        setattr(target, name, getattr(target, name) + (value * weight if weight != 1.0 else value))
+
+
+@dataclass
+class BaselineStatistics:
+    """Sufficient statistics of a set of games: summed stats plus metric moments."""
+    
+    totals: ParticipantTotals = field(default_factory=ParticipantTotals)
+    metrics: Dict[str, RunningStats] = field(
+        default_factory=lambda: {metric: RunningStats() for metric in ROW_METRICS}
+    )
+    
+    @property
+    def games(self) -> int:
+        """Number of games summarized."""
+        return self.totals.games
+    
+    def add_game(self, totals: Dict[str, Any], metric_values: Dict[str, float]) -> None:
+        """Add one game, as split by game_values."""
+        self.totals.games += 1
+        self.totals.weight += 1.0
+        for name, value in totals.items():
+            setattr(self.totals, name, getattr(self.totals, name) + value)
+        for metric, value in metric_values.items():
+            self.metrics[metric].add(value)
+    
+    def merge(self, other: 'BaselineStatistics') -> None:
+        """Fold another set of games into this one."""
+        add_totals(self.totals, other.totals)
+        for metric, stats in other.metrics.items():
+            self.metrics.setdefault(metric, RunningStats()).merge(stats)
+    
+    def std_dev(self, metric: str) -> float:
+        """Sample standard deviation of a per-game metric (see ROW_METRICS)."""
+        stats = self.metrics.get(metric)
+        return stats.std_dev if stats else 0.0
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BaselineStatistics':
+        """Rebuild statistics from their asdict form."""
+        return cls(
+            totals=ParticipantTotals(**data.get('totals', {})),
+            metrics={metric: RunningStats(**values) for metric, values in data.get('metrics', {}).items()}
+        )
+    
+    @classmethod
+    def from_rows(cls, table: ParticipantTable, rows: np.ndarray) -> 'BaselineStatistics':
+        """Summarize the given participant rows."""
+        statistics = cls()
+        for row in zip(*(table.column(name, rows).tolist() for name in _GAME_COLUMNS)):
+            statistics.add_game(*game_values(*row))
+        return statistics
+
+
+@dataclass
+class BaselineBucket:
+    """Statistics of a player's games in one (role, champion, queue), overall and per day."""
+    
+    overall: BaselineStatistics = field(default_factory=BaselineStatistics)
+    days: Dict[int, BaselineStatistics] = field(default_factory=dict)  # day number -> statistics
+    
+    def add_game(self, day: int, totals: Dict[str, Any], metric_values: Dict[str, float]) -> None:
+        """Add one game played on the given day (days since the epoch, UTC)."""
+        self.overall.add_game(totals, metric_values)
+        self.days.setdefault(day, BaselineStatistics()).add_game(totals, metric_values)
+    
+    def merge_into(self, target: BaselineStatistics, since_day: Optional[int] = None) -> None:
+        """Merge this bucket's games, optionally only those from ``since_day`` on, into ``target``."""
+        if since_day is None:
+            target.merge(self.overall)
+            return
+        for day, statistics in self.days.items():
+            if day >= since_day:
+                target.merge(statistics)
+    
+    def add_decayed_totals(self, target: ParticipantTotals, today: int,
+                           decay_days: float, since_day: int) -> None:
+        """Add exponentially decayed totals of the games from ``since_day`` on to ``target``."""
+        for day, statistics in self.days.items():
+            if day >= since_day:
+                add_totals(target, statistics.totals, math.exp(-(today - day) / decay_days))
+
+
+class PlayerBaselineBuckets:
+    """A player's games summarized into (role, champion, queue) buckets."""
+    
+    def __init__(self, puuid: str):
+        """
+        Initialize empty buckets.
+        
+        Args:
+            puuid: Player the buckets belong to
+        """
+        self.puuid = puuid
+        self.buckets: Dict[Tuple[str, int, int], BaselineBucket] = {}
+        self.match_ids: Set[str] = set()
+    
+    def add_rows(self, table: ParticipantTable, rows: np.ndarray) -> int:
+        """
+        Add this player's participant rows, skipping matches already counted.
+        
+        Args:
+            table: Participant table holding the rows
+            rows: Row indices, all belonging to this player
+        
+        Returns:
+            Number of games added
+        """
+        if len(rows) == 0:
+            return 0
+        
+        added = 0
+        keys = zip(table.match_ids(rows), table.roles(rows),
+                   table.column('champion', rows).tolist(), table.column('queue', rows).tolist(),
+                   (table.column('timestamp', rows) // DAY_MS).tolist())
+        values = zip(*(table.column(name, rows).tolist() for name in _GAME_COLUMNS))
+        for (match_id, role, champion_id, queue_id, day), row in zip(keys, values):
+            if match_id in self.match_ids:
+                continue
+            self.match_ids.add(match_id)
+            bucket = self.buckets.setdefault((role, champion_id, queue_id), BaselineBucket())
+            bucket.add_game(day, *game_values(*row))
+            added += 1
+        return added
+    
+    def select(self, role: Optional[str] = None, champion_id: Optional[int] = None,
+               queue_ids: Optional[Iterable[int]] = None) -> List[BaselineBucket]:
+        """Get the buckets matching every given filter."""
+        queues = set(queue_ids) if queue_ids else None
+        return [
+            bucket for (bucket_role, bucket_champion, bucket_queue), bucket in self.buckets.items()
+            if (role is None or bucket_role == role)
+            and (champion_id is None or bucket_champion == champion_id)
+            and (queues is None or bucket_queue in queues)
+        ]
@@ -0,0 +1,363 @@
+"""
+Materialized champion x role x day aggregates and champion matchups.
+
+MatchManager keeps one ChampionRoleAggregates table and one
+ChampionMatchupMatrix up to date as matches are stored and removed. Every
+(champion, role, UTC day) cell of the aggregates holds the number of games,
+wins and summed kills, deaths and assists of participants who played that
+champion in that role, so champion-level questions such as "win rate in the
+last 90 days" or "pick rate in a role" are answered by summing a handful of
+cells instead of visiting matches. The matchup matrix holds head-to-head
+games and wins for every two (champion, role) pairs that met on opposite
+teams.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+AGGREGATE_FIELDS = ('games', 'wins', 'kills', 'deaths', 'assists')
+
+DAY_MS = 86_400_000
+
+
+def _intern(values: Iterable, codes: Dict, interned: List) -> np.ndarray:
+    """Map values to their array positions, interning new ones."""
+    result = []
+    for value in values:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(interned)
+            interned.append(value)
+        result.append(code)
+    return np.array(result, dtype=np.int64)
+
+
+def _intern_rows(table, column: str, rows: np.ndarray, codes: Dict, interned: List) -> np.ndarray:
+    """Intern the champion ID or normalized role of each row, mapping every distinct value once."""
+    unique, first, inverse = np.unique(table.column(column, rows), return_index=True, return_inverse=True)
+    keys = table.roles(rows[first]) if column == 'role' else unique.tolist()
+    return _intern(keys, codes, interned)[inverse]
+
+
+@dataclass
+class ChampionRoleTotals:
+    """Summed aggregates over some champions, roles and days."""
+    
+    games: int = 0
+    wins: int = 0
+    kills: int = 0
+    deaths: int = 0
+    assists: int = 0
+    
+    @property
+    def win_rate(self) -> float:
+        """Fraction of games won."""
+        return self.wins / self.games if self.games else 0.0
+    
+    @property
+    def avg_kda(self) -> float:
+        """(kills + assists) / deaths over all games."""
+        return (self.kills + self.assists) / max(self.deaths, 1)
+
+
+class ChampionRoleAggregates:
+    """
+    Dense champion x role x day table of game, win and KDA sums.
+    
+    Champions and roles are interned to array positions as they appear.
+    Day buckets cover the span of the indexed matches and grow in either
+    direction; all-time totals are kept separately, so queries without a
+    time window never touch the day axis. Time windows are resolved to
+    whole UTC days.
+    """
+    
+    def __init__(self):
+        """Initialize an empty table."""
+        self._champion_codes: Dict[int, int] = {}
+        self._champions: List[int] = []
+        self._role_codes: Dict[str, int] = {}
+        self._roles: List[str] = []
+        
+        fields = len(AGGREGATE_FIELDS)
+        self._first_day = 0
+        self._daily = np.zeros((0, 0, 0, fields), dtype=np.int32)  # champion, role, day, field
+        self._all_time = np.zeros((0, 0, fields), dtype=np.int64)  # champion, role, field
+    
+    @property
+    def champion_ids(self) -> List[int]:
+        """Champions that appear in the table, in interning order."""
+        return list(self._champions)
+    
+    @property
+    def roles(self) -> List[str]:
+        """Normalized roles that appear in the table."""
+        return list(self._roles)
+    
+    def add_rows(self, table, rows: np.ndarray, sign: int = 1) -> None:
+        """
+        Add (or, with sign=-1, subtract) participant rows.
+        
+        Args:
+            table: ParticipantTable holding the rows
+            rows: Row indices to aggregate
+            sign: 1 when the rows' matches are stored, -1 when they are removed
+        """
+        if len(rows) == 0:
+            return
+        
+        champions = _intern_rows(table, 'champion', rows, self._champion_codes, self._champions)
+        roles = _intern_rows(table, 'role', rows, self._role_codes, self._roles)
+        self._grow_keys()
+        
+        values = np.stack([
+            np.ones(len(rows), dtype=np.int64),
+            table.column('win', rows),
+            table.column('kills', rows),
+            table.column('deaths', rows),
+            table.column('assists', rows),
+        ], axis=1).astype(np.int64) * sign
+        np.add.at(self._all_time, (champions, roles), values)
+        
+        # Matches without a creation time only count towards the all-time totals
+        timestamps = table.column('timestamp', rows)
+        dated = timestamps > 0
+        if not dated.any():
+            return
+        days = timestamps[dated] // DAY_MS
+        self._grow_days(int(days.min()), int(days.max()))
+        np.add.at(self._daily, (champions[dated], roles[dated], days - self._first_day), values[dated])
+    
+    def counts(self, champion_ids: Sequence[int], role: Optional[str] = None,
+               start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> np.ndarray:
+        """
+        Get the aggregates of several champions at once.
+        
+        Args:
+            champion_ids: Champions to look up; unknown champions get zeros
+            role: Normalized role, or None for every role
+            start_ms: Only days on or after the day of this time
+            end_ms: Only days on or before the day of this time
+        
+        Returns:
+            Array of shape (len(champion_ids), len(AGGREGATE_FIELDS))
+        """
+        result = np.zeros((len(champion_ids), len(AGGREGATE_FIELDS)), dtype=np.int64)
+        codes = np.array([self._champion_codes.get(champion_id, -1) for champion_id in champion_ids], dtype=np.int64)
+        known = codes >= 0
+        if not known.any():
+            return result
+        
+        cells = self._window(role, start_ms, end_ms)
+        if cells is not None:
+            result[known] = cells[codes[known]]
+        return result
+    
+    def totals(self, champion_id: Optional[int] = None, role: Optional[str] = None,
+               start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> ChampionRoleTotals:
+        """
+        Sum the aggregates of one champion, or of every champion.
+        
+        Args:
+            champion_id: Champion to look up, or None for every champion
+            role: Normalized role, or None for every role
+            start_ms: Only days on or after the day of this time
+            end_ms: Only days on or before the day of this time
+        
+        Returns:
+            ChampionRoleTotals
+        """
+        if champion_id is not None:
+            values = self.counts([champion_id], role, start_ms, end_ms)[0]
+        else:
+            cells = self._window(role, start_ms, end_ms)
+            values = cells.sum(axis=0) if cells is not None else np.zeros(len(AGGREGATE_FIELDS), dtype=np.int64)
+        return ChampionRoleTotals(*(int(value) for value in values))
+    
+    def _window(self, role: Optional[str], start_ms: Optional[int],
+                end_ms: Optional[int]) -> Optional[np.ndarray]:
+        """Per-champion sums over a role and time window, shape (champions, fields)."""
+        if role is None:
+            role_index = slice(None)
+        else:
+            role_index = self._role_codes.get(role)
+            if role_index is None:
+                return None
+        
+        if start_ms is None and end_ms is None:
+            cells = self._all_time[:, role_index]
+            return cells.sum(axis=1) if role is None else cells
+        
+        days = self._daily.shape[2]
+        lo = 0 if start_ms is None else max(int(start_ms // DAY_MS) - self._first_day, 0)
+        hi = days if end_ms is None else min(int(end_ms // DAY_MS) - self._first_day + 1, days)
+        if lo >= hi:
+            return np.zeros((len(self._champions), len(AGGREGATE_FIELDS)), dtype=np.int64)
+        
+        cells = self._daily[:, role_index, lo:hi].sum(axis=-2, dtype=np.int64)
+        return cells.sum(axis=1) if role is None else cells
+    
+    def _grow_keys(self) -> None:
+        """Make room for newly interned champions and roles."""
+        champions, roles = len(self._champions), len(self._roles)
+        current_champions, current_roles = self._all_time.shape[:2]
+        if champions <= current_champions and roles <= current_roles:
+            return
+        
+        shape = (max(champions, current_champions * 2), max(roles, current_roles))
+        all_time = np.zeros(shape + self._all_time.shape[2:], dtype=self._all_time.dtype)
+        all_time[:current_champions, :current_roles] = self._all_time
+        self._all_time = all_time
+        
+        daily = np.zeros(shape + self._daily.shape[2:], dtype=self._daily.dtype)
+        daily[:current_champions, :current_roles] = self._daily
+        self._daily = daily
+    
+    def _grow_days(self, first_day: int, last_day: int) -> None:
+        """Extend the day axis to cover [first_day, last_day], with slack in the growing direction."""
+        days = self._daily.shape[2]
+        if days == 0:
+            self._first_day = first_day
+            self._daily = np.zeros(self._daily.shape[:2] + (last_day - first_day + 1,) + self._daily.shape[3:],
+                                   dtype=self._daily.dtype)
+            return
+        
+        current_last = self._first_day + days - 1
+        if first_day >= self._first_day and last_day <= current_last:
+            return
+        
+        new_first, new_last = self._first_day, current_last
+        if first_day < self._first_day:
+            new_first = min(first_day, self._first_day - days)
+        if last_day > current_last:
+            new_last = max(last_day, current_last + days)
+        
+        daily = np.zeros(self._daily.shape[:2] + (new_last - new_first + 1,) + self._daily.shape[3:],
+                         dtype=self._daily.dtype)
+        offset = self._first_day - new_first
+        daily[:, :, offset:offset + days] = self._daily
+        self._daily = daily
+        self._first_day = new_first
+
+
+class ChampionMatchupMatrix:
+    """
+    Dense (champion, role, enemy champion, enemy role) table of games and wins.
+    
+    Every pair of participants on opposite teams of a match adds one game to
+    the cell of each side, and a win to the winner's cell, so the head-to-head
+    record of two champions is a single lookup and a whole enemy draft is one
+    fancy-indexing read. Champions and roles are interned as they appear.
+    """
+    
+    def __init__(self):
+        """Initialize an empty matrix."""
+        self._champion_codes: Dict[int, int] = {}
+        self._champions: List[int] = []
+        self._role_codes: Dict[str, int] = {}
+        self._roles: List[str] = []
+        self._cells = np.zeros((0, 0, 0, 0, 2), dtype=np.int32)  # champion, role, enemy, enemy role, (games, wins)
+    
+    def add_rows(self, table, rows: np.ndarray, sign: int = 1) -> None:
+        """
+        Add (or, with sign=-1, subtract) the matchups between participant rows.
+        
+        Rows are paired within their match, so ``rows`` must hold every
+        participant of the matches being added or removed, grouped by match
+        as ParticipantTable.rows_for_matches returns them.
+        
+        Args:
+            table: ParticipantTable holding the rows
+            rows: Row indices of whole matches, grouped by match
+            sign: 1 when the matches are stored, -1 when they are removed
+        """
+        if len(rows) == 0:
+            return
+        
+        champions = _intern_rows(table, 'champion', rows, self._champion_codes, self._champions)
+        roles = _intern_rows(table, 'role', rows, self._role_codes, self._roles)
+        self._grow()
+        
+        matches = table.column('match', rows)
+        teams = table.column('team', rows)
+        wins = table.column('win', rows)
+        
+        # Pair each row with the rows after it in the same match
+        ours, theirs = [], []
+        for offset in range(1, len(rows)):
+            first = np.arange(len(rows) - offset)
+            second = first + offset
+            same_match = matches[first] == matches[second]
+            if not same_match.any():
+                break
+            opposed = same_match & (teams[first] != teams[second])
+            ours.append(first[opposed])
+            theirs.append(second[opposed])
+        if not ours:
+            return
+        ours = np.concatenate(ours)
+        theirs = np.concatenate(theirs)
+        
+        # Each pair is recorded from both sides
+        left = np.concatenate([ours, theirs])
+        right = np.concatenate([theirs, ours])
+        cells = np.ravel_multi_index((champions[left], roles[left], champions[right], roles[right]),
+                                     self._cells.shape[:4])
+        flat = self._cells.reshape(-1, 2)
+        if len(cells) * 8 >= len(flat):
+            # Bulk loads: one counting pass over the whole matrix beats scattered adds
+            flat[:, 0] += (sign * np.bincount(cells, minlength=len(flat))).astype(np.int32)
+            flat[:, 1] += (sign * np.bincount(cells, weights=wins[left], minlength=len(flat))).astype(np.int32)
+        else:
+            np.add.at(flat, cells, np.stack([np.full(len(cells), sign), wins[left] * sign], axis=1))
+    
+    def counts(self, champion_ids: Sequence[int], role: str,
+               enemies: Sequence[Tuple[int, str]]) -> np.ndarray:
+        """
+        Get the head-to-head records of several champions against several enemies.
+        
+        Args:
+            champion_ids: Our champions; unknown champions get zeros
+            role: Our normalized role
+            enemies: (enemy champion ID, normalized enemy role) pairs
+        
+        Returns:
+            Array of shape (len(champion_ids), len(enemies), 2) with games and wins
+        """
+        result = np.zeros((len(champion_ids), len(enemies), 2), dtype=np.int64)
+        role_code = self._role_codes.get(role)
+        if role_code is None or not len(champion_ids) or not len(enemies):
+            return result
+        
+        codes = np.array([self._champion_codes.get(champion_id, -1) for champion_id in champion_ids], dtype=np.int64)
+        enemy_codes = np.array([self._champion_codes.get(champion_id, -1) for champion_id, _ in enemies],
+                               dtype=np.int64)
+        enemy_roles = np.array([self._role_codes.get(enemy_role, -1) for _, enemy_role in enemies], dtype=np.int64)
+        known = codes >= 0
+        known_enemies = (enemy_codes >= 0) & (enemy_roles >= 0)
+        if not known.any() or not known_enemies.any():
+            return result
+        
+        cells = self._cells[codes[known][:, None], role_code,
+                            enemy_codes[known_enemies][None, :], enemy_roles[known_enemies][None, :]]
+        result[np.ix_(known, known_enemies)] = cells
+        return result
+    
+    def _grow(self) -> None:
+        """Make room for newly interned champions and roles."""
+        champions, roles = len(self._champions), len(self._roles)
+        current_champions, current_roles = self._cells.shape[0], self._cells.shape[1]
+        if champions <= current_champions and roles <= current_roles:
+            return
+        
+        # The matrix is quadratic in champions, so grow in small steps
+        if champions > current_champions:
+            champions = max(champions, current_champions + current_champions // 4)
+        else:
+            champions = current_champions
+        roles = max(roles, current_roles)
+        cells = np.zeros((champions, roles, champions, roles, 2), dtype=self._cells.dtype)
+        cells[:current_champions, :current_roles, :current_champions, :current_roles] = self._cells
+        self._cells = cells
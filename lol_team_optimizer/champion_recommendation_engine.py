@@ -7,11 +7,13 @@ performance data, team composition synergies, and advanced scoring algorithms.
 
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Set, Any
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Set, Any
+from dataclasses import dataclass, fields, replace
 from collections import defaultdict
 import statistics
 
+import numpy as np
+
 from .analytics_models import (
     ChampionRecommendation, TeamContext, ChampionPerformanceMetrics,
     PerformanceProjection, SynergyAnalysis, RecommendationReasoning,
@@ -22,6 +24,7 @@ from .historical_analytics_engine import HistoricalAnalyticsEngine
 from .champion_data import ChampionDataManager
 from .baseline_manager import BaselineManager, BaselineContext
 from .config import Config
+from .participant_table import ParticipantTable, normalize_role
 
 
 @dataclass
@@ -49,6 +52,67 @@ class RecommendationScore:
     sample_size_penalty: float
 
 
+@dataclass
+class CandidateScores:
+    """Component scores of many candidate champions, one array entry per champion."""
+    
+    champion_ids: np.ndarray
+    games_played: np.ndarray
+    individual_performance: np.ndarray
+    ally_synergy: np.ndarray
+    counter_pick: np.ndarray
+    recent_form: np.ndarray
+    meta_relevance: np.ndarray
+    confidence: np.ndarray
+    data_quality: np.ndarray
+    sample_size_penalty: np.ndarray
+    
+    def __len__(self) -> int:
+        """Number of candidates."""
+        return len(self.champion_ids)
+    
+    @property
+    def team_synergy(self) -> np.ndarray:
+        """Team synergy scores: 70% ally synergy, 30% counter-pick advantage."""
+        return np.clip(self.ally_synergy * 0.7 + self.counter_pick * 0.3, 0.0, 1.0)
+    
+    def total_scores(self, weights: Dict[str, float]) -> np.ndarray:
+        """Weighted total score of every candidate."""
+        return (
+            weights['individual_performance'] * self.individual_performance +
+            weights['team_synergy'] * self.team_synergy +
+            weights['recent_form'] * self.recent_form +
+            weights['meta_relevance'] * self.meta_relevance +
+            weights['confidence'] * self.confidence
+        )
+    
+    def subset(self, indices: np.ndarray) -> 'CandidateScores':
+        """Get the scores of the candidates at ``indices`` (an index array or boolean mask)."""
+        return CandidateScores(**{
+            candidate_field.name: getattr(self, candidate_field.name)[indices] for candidate_field in fields(self)
+        })
+    
+    def score_breakdown(self, index: int, weights: Dict[str, float]) -> RecommendationScore:
+        """Get the RecommendationScore of the candidate at ``index``."""
+        return RecommendationScore(
+            champion_id=int(self.champion_ids[index]),
+            total_score=float(self.total_scores(weights)[index]),
+            individual_performance_score=float(self.individual_performance[index]),
+            team_synergy_score=float(self.team_synergy[index]),
+            recent_form_score=float(self.recent_form[index]),
+            meta_relevance_score=float(self.meta_relevance[index]),
+            confidence_score=float(self.confidence[index]),
+            performance_weight=weights['individual_performance'],
+            synergy_weight=weights['team_synergy'],
+            form_weight=weights['recent_form'],
+            meta_weight=weights['meta_relevance'],
+            confidence_weight=weights['confidence'],
+            games_played=int(self.games_played[index]),
+            data_quality_score=float(self.data_quality[index]),
+            sample_size_penalty=float(self.sample_size_penalty[index])
+        )
+
+
 @dataclass
 class TeamSynergyContext:
     """Context for team synergy analysis."""
@@ -105,6 +169,7 @@ class ChampionRecommendationEngine:
         self.recent_form_window_days = 30
         self.meta_analysis_window_days = 90
         self.max_recommendations = 10
+        self.min_matchup_games = 5  # head-to-head games before a matchup counts
         
         # Confidence scoring thresholds
         self.confidence_thresholds = {
@@ -144,39 +209,23 @@ class ChampionRecommendationEngine:
             self.logger.info(f"Generating champion recommendations for {puuid} in {role}")
             
             # Use custom weights or defaults, with role-specific adjustments
-            base_weights = custom_weights or self.default_weights
-            weights = self._apply_role_specific_weight_adjustments(base_weights, role, team_context)
-            max_recs = max_recommendations or self.max_recommendations
+            weights = self.get_scoring_weights(role, team_context, custom_weights)
             
             # Get available champions for the role
-            available_champions = self._get_available_champions(role, team_context)
+            available_champions = self.get_candidate_champions(role, team_context)
             
             if not available_champions:
                 raise AnalyticsError(f"No available champions found for role {role}")
             
-            # Generate recommendations for each available champion
-            recommendations = []
+            # Score every available champion in one pass
+            candidate_scores = self.score_candidates(
+                puuid, role, available_champions, team_context, filters
+            )
             
-            for champion_id in available_champions:
-                try:
-                    recommendation = self._generate_single_recommendation(
-                        puuid=puuid,
-                        champion_id=champion_id,
-                        role=role,
-                        team_context=team_context,
-                        filters=filters,
-                        weights=weights
-                    )
-                    
-                    if recommendation:
-                        recommendations.append(recommendation)
-                        
-                except InsufficientDataError:
-                    self.logger.debug(f"Insufficient data for {champion_id} recommendation")
-                    continue
-                except Exception as e:
-                    self.logger.warning(f"Failed to generate recommendation for champion {champion_id}: {e}")
-                    continue
+            # Build full recommendations only for the best-scoring champions
+            recommendations = self.build_recommendations(
+                puuid, role, candidate_scores, weights, team_context, filters, max_recommendations
+            )
             
             if not recommendations:
                 raise InsufficientDataError(
@@ -185,12 +234,6 @@ class ChampionRecommendationEngine:
                     context=f"champion recommendations for {puuid} in {role}"
                 )
             
-            # Sort by recommendation score (descending)
-            recommendations.sort(key=lambda r: r.recommendation_score, reverse=True)
-            
-            # Limit to max recommendations
-            recommendations = recommendations[:max_recs]
-            
             self.logger.info(f"Generated {len(recommendations)} recommendations for {puuid} in {role}")
             return recommendations
             
@@ -295,6 +338,234 @@ class ChampionRecommendationEngine:
                 raise
             raise AnalyticsError(f"Failed to calculate recommendation score: {e}")
     
+    def score_candidates(
+        self,
+        puuid: str,
+        role: str,
+        champion_ids: List[int],
+        team_context: Optional[TeamContext] = None,
+        filters: Optional[AnalyticsFilters] = None
+    ) -> CandidateScores:
+        """
+        Score many candidate champions at once.
+        
+        The player's games in the role are selected once from the match
+        manager's participant table and every component is computed as an
+        array over the candidates. Champions the player has fewer than
+        min_games_for_recommendation games on are left out, as they are by
+        calculate_recommendation_score.
+        
+        Args:
+            puuid: Player's PUUID
+            role: Target role
+            champion_ids: Candidate champion IDs
+            team_context: Team composition context
+            filters: Optional filters for the player's games (the champion
+                and role filters are replaced by the candidates and role)
+            
+        Returns:
+            CandidateScores for the candidates with enough games, in the
+            order of champion_ids
+        """
+        match_manager = self.analytics_engine.match_manager
+        table = match_manager.participant_table
+        
+        candidates = np.array(list(dict.fromkeys(champion_ids)), dtype=np.int64)
+        rows = self._select_player_rows(table, puuid, role, candidates, filters)
+        
+        # Position of each row's champion in the candidate list
+        order = np.argsort(candidates, kind='stable')
+        row_candidates = order[np.searchsorted(candidates[order], table.column('champion', rows))]
+        games = np.bincount(row_candidates, minlength=len(candidates))
+        
+        kept = games >= self.min_games_for_recommendation
+        rows = rows[kept[row_candidates]]
+        row_candidates = np.cumsum(kept)[row_candidates[kept[row_candidates]]] - 1
+        candidates, games = candidates[kept], games[kept]
+        
+        ally_synergy = self._candidate_ally_synergy_scores(candidates, role, team_context)
+        counter_pick = self._candidate_counter_pick_scores(candidates, role, team_context)
+        confidence, data_quality, sample_penalty = self._candidate_confidence_scores(games)
+        
+        return CandidateScores(
+            champion_ids=candidates,
+            games_played=games,
+            individual_performance=self._candidate_performance_scores(
+                table, rows, row_candidates, candidates, puuid, role
+            ),
+            ally_synergy=ally_synergy,
+            counter_pick=counter_pick,
+            recent_form=self._candidate_form_scores(table, rows, row_candidates, len(candidates)),
+            meta_relevance=self._candidate_meta_scores(candidates, role),
+            confidence=confidence,
+            data_quality=data_quality,
+            sample_size_penalty=sample_penalty
+        )
+    
+    def get_candidate_champions(self, role: str, team_context: Optional[TeamContext] = None) -> List[int]:
+        """
+        Get the champions considered for a role.
+        
+        Args:
+            role: Target role
+            team_context: Team composition context whose bans and champion
+                pool are applied
+            
+        Returns:
+            Champion IDs that can play the role and are available
+        """
+        return self._get_available_champions(role, team_context)
+    
+    def get_scoring_weights(
+        self,
+        role: str,
+        team_context: Optional[TeamContext] = None,
+        custom_weights: Optional[Dict[str, float]] = None
+    ) -> Dict[str, float]:
+        """
+        Get the scoring weights get_champion_recommendations uses for a role.
+        
+        Args:
+            role: Target role
+            team_context: Team composition context
+            custom_weights: Custom scoring weights (defaults to default_weights)
+            
+        Returns:
+            Weights with role-specific adjustments applied
+        """
+        return self._apply_role_specific_weight_adjustments(
+            custom_weights or self.default_weights, role, team_context
+        )
+    
+    def ally_synergy_terms(self, champion_ids: np.ndarray, ally_champion_id: int) -> np.ndarray:
+        """
+        Historical synergy of candidate champions with one ally pick.
+        
+        The terms do not depend on the candidates' role, so they can be
+        computed once over the candidates of several roles and sliced.
+        
+        Args:
+            champion_ids: Candidate champion IDs
+            ally_champion_id: Champion picked by the ally
+            
+        Returns:
+            Synergy (-1.0 to 1.0) of each candidate with the ally
+        """
+        return self._candidate_historical_synergies(
+            champion_ids, self._candidate_win_rates(champion_ids), ally_champion_id
+        )
+    
+    def counter_pick_terms(
+        self,
+        champion_ids: np.ndarray,
+        role: str,
+        enemy_champion_id: int,
+        enemy_role: str
+    ) -> np.ndarray:
+        """
+        Counter advantage of candidate champions against one enemy pick.
+        
+        Args:
+            champion_ids: Candidate champion IDs
+            role: Candidates' role
+            enemy_champion_id: Champion picked by the enemy
+            enemy_role: Role the enemy champion is expected to play
+            
+        Returns:
+            Advantage (-1.0 to 1.0) of each candidate over the enemy
+        """
+        counts = self.analytics_engine.match_manager.get_matchup_counts(
+            list(champion_ids), role, [(enemy_champion_id, enemy_role)]
+        )
+        return self._counter_advantages(counts)[:, 0]
+    
+    def rescore_team_synergy(
+        self,
+        scores: CandidateScores,
+        role: str,
+        ally_terms: Dict[str, np.ndarray],
+        enemy_terms: Dict[str, np.ndarray]
+    ) -> CandidateScores:
+        """
+        Replace the draft-dependent components of scored candidates.
+        
+        Only ally synergy and counter-pick scores depend on the other picks,
+        so a caller following a draft scores its candidates once and adds one
+        term per pick, getting the scores score_candidates would give with
+        those picks in its team context.
+        
+        Args:
+            scores: Candidates from score_candidates
+            role: Candidates' role
+            ally_terms: Ally role -> ally_synergy_terms over scores.champion_ids
+            enemy_terms: Enemy role -> counter_pick_terms over scores.champion_ids
+            
+        Returns:
+            Copy of scores with ally synergy and counter-pick scores for the
+            given picks (neutral without picks)
+        """
+        ally_roles, enemy_roles = list(ally_terms), list(enemy_terms)
+        ally_synergy = np.full(len(scores), 0.5)
+        if ally_roles:
+            ally_synergy = self._combine_ally_synergies(
+                [ally_terms[ally_role] for ally_role in ally_roles], role, ally_roles
+            )
+        counter_pick = np.full(len(scores), 0.5)
+        if enemy_roles:
+            counter_pick = self._combine_counter_advantages(
+                np.column_stack([enemy_terms[enemy_role] for enemy_role in enemy_roles]), role, enemy_roles
+            )
+        return replace(scores, ally_synergy=ally_synergy, counter_pick=counter_pick)
+    
+    def build_recommendations(
+        self,
+        puuid: str,
+        role: str,
+        candidate_scores: CandidateScores,
+        weights: Dict[str, float],
+        team_context: Optional[TeamContext] = None,
+        filters: Optional[AnalyticsFilters] = None,
+        max_recommendations: Optional[int] = None
+    ) -> List[ChampionRecommendation]:
+        """
+        Build full recommendations for the best-scoring candidates.
+        
+        Projections, synergy analysis and reasoning are only generated for
+        the candidates that are returned, best score first.
+        
+        Args:
+            puuid: Player's PUUID
+            role: Target role
+            candidate_scores: Scored candidates
+            weights: Scoring weights, e.g. from get_scoring_weights
+            team_context: Team composition context for the synergy analysis
+            filters: Optional filters for historical data
+            max_recommendations: Maximum number of recommendations
+            
+        Returns:
+            List of ChampionRecommendation objects sorted by score
+        """
+        max_recs = max_recommendations or self.max_recommendations
+        recommendations = []
+        totals = candidate_scores.total_scores(weights)
+        for index in np.argsort(-totals, kind='stable'):
+            if len(recommendations) >= max_recs:
+                break
+            
+            score_breakdown = candidate_scores.score_breakdown(index, weights)
+            try:
+                recommendation = self._build_recommendation(
+                    puuid, role, score_breakdown, team_context, filters
+                )
+            except InsufficientDataError:
+                self.logger.debug(f"Insufficient data for {score_breakdown.champion_id} recommendation")
+                continue
+            
+            if recommendation:
+                recommendations.append(recommendation)
+        
+        return recommendations
+    
     def analyze_champion_synergies(
         self,
         champion_combinations: List[Tuple[int, int]],
@@ -431,13 +702,31 @@ class ChampionRecommendationEngine:
                 filters=filters,
                 weights=weights
             )
-            
-            # Get champion performance data
+        except InsufficientDataError:
+            raise
+        except Exception as e:
+            self.logger.warning(f"Failed to generate recommendation for {champion_id}: {e}")
+            return None
+        
+        return self._build_recommendation(puuid, role, score_breakdown, team_context, filters)
+    
+    def _build_recommendation(
+        self,
+        puuid: str,
+        role: str,
+        score_breakdown: RecommendationScore,
+        team_context: Optional[TeamContext],
+        filters: Optional[AnalyticsFilters]
+    ) -> Optional[ChampionRecommendation]:
+        """Build a full recommendation around an already computed score."""
+        champion_id = score_breakdown.champion_id
+        try:
+            # Get champion performance data (the analytics engine overwrites the filters' champion and role)
             champion_performance = self.analytics_engine.analyze_champion_performance(
                 puuid=puuid,
                 champion_id=champion_id,
                 role=role,
-                filters=filters
+                filters=replace(filters) if filters else None
             )
             
             # Generate performance projection
@@ -478,6 +767,292 @@ class ChampionRecommendationEngine:
         except Exception as e:
             self.logger.warning(f"Failed to generate recommendation for {champion_id}: {e}")
             return None  
+    
+    def _select_player_rows(
+        self,
+        table: ParticipantTable,
+        puuid: str,
+        role: str,
+        champion_ids: np.ndarray,
+        filters: Optional[AnalyticsFilters]
+    ) -> np.ndarray:
+        """
+        Select the player's participant rows on any candidate in the role.
+        
+        Applies the same filters as the analytics engine's player query;
+        a limit keeps the most recent games of each champion.
+        """
+        if not len(champion_ids):
+            return np.empty(0, dtype=np.int64)
+        
+        start_ms = end_ms = None
+        if filters and filters.date_range:
+            start_ms = int(filters.date_range.start_date.timestamp() * 1000)
+            end_ms = int(filters.date_range.end_date.timestamp() * 1000)
+        
+        rows = table.select(
+            puuid=puuid,
+            champion_ids=champion_ids.tolist(),
+            roles=[normalize_role(role)],
+            queue_ids=filters.queue_types if filters else None,
+            start_ms=start_ms,
+            end_ms=end_ms,
+            win=filters.win_only if filters else None,
+            teammates=filters.teammates if filters else None
+        )
+        
+        if filters and filters.limit is not None:
+            # Newest first within each champion, then keep the first `limit`
+            champions = table.column('champion', rows)
+            rows = rows[np.lexsort((-table.column('timestamp', rows), champions))]
+            champions = table.column('champion', rows)
+            rank = np.arange(len(rows)) - np.searchsorted(champions, champions)
+            rows = np.sort(rows[rank < filters.limit])
+        
+        return rows
+    
+    def _candidate_performance_scores(
+        self,
+        table: ParticipantTable,
+        rows: np.ndarray,
+        row_candidates: np.ndarray,
+        champion_ids: np.ndarray,
+        puuid: str,
+        role: str
+    ) -> np.ndarray:
+        """Individual performance scores; see _calculate_individual_performance_score."""
+        n = len(champion_ids)
+        games = np.bincount(row_candidates, minlength=n)
+        wins = np.bincount(row_candidates, weights=table.column('win', rows), minlength=n)
+        kills, deaths, assists = (
+            np.bincount(row_candidates, weights=table.column(name, rows), minlength=n)
+            for name in ('kills', 'deaths', 'assists')
+        )
+        win_rate_score = wins / np.maximum(games, 1)
+        kda_score = np.minimum((kills + assists) / np.maximum(deaths, 1) / 3.0, 1.0)
+        
+        # Baselines are per champion; only champions with enough games get here
+        baseline_scores = np.full(n, 0.5)
+        key_metrics = ['win_rate', 'avg_kda', 'avg_cs_per_min', 'avg_vision_score']
+        grouped = np.argsort(row_candidates, kind='stable')
+        bounds = np.concatenate([[0], np.cumsum(games)])
+        for index, champion_id in enumerate(champion_ids.tolist()):
+            try:
+                performance = table.totals(rows[grouped[bounds[index]:bounds[index + 1]]]).to_performance_metrics()
+                baseline = self.baseline_manager.calculate_player_baseline(
+                    BaselineContext(puuid=puuid, champion_id=champion_id, role=role)
+                )
+                deltas = self.baseline_manager.calculate_performance_delta(performance, baseline)
+            except Exception as e:
+                self.logger.debug(f"No baseline comparison for {puuid}-{champion_id}-{role}: {e}")
+                continue
+            
+            delta_scores = [
+                max(0.0, min(1.0, 0.5 + deltas[metric].delta_percentage / 100.0))
+                for metric in key_metrics if metric in deltas
+            ]
+            if delta_scores:
+                baseline_scores[index] = statistics.mean(delta_scores)
+        
+        return np.clip(0.4 * win_rate_score + 0.3 * kda_score + 0.3 * baseline_scores, 0.0, 1.0)
+    
+    def _candidate_form_scores(
+        self,
+        table: ParticipantTable,
+        rows: np.ndarray,
+        row_candidates: np.ndarray,
+        n: int
+    ) -> np.ndarray:
+        """
+        Recent form scores; see _calculate_recent_form_score.
+        
+        Mirrors the analytics engine's recent form: at least 3 games in the
+        form window, and a trend from the newer and older halves of them
+        once there are 6.
+        """
+        cutoff = datetime.now() - timedelta(days=self.recent_form_window_days)
+        recent = table.column('timestamp', rows) >= int(cutoff.timestamp() * 1000)
+        candidates = row_candidates[recent]
+        timestamps = table.column('timestamp', rows[recent])
+        wins = table.column('win', rows[recent]).astype(np.float64)
+        
+        games = np.bincount(candidates, minlength=n)
+        total_wins = np.bincount(candidates, weights=wins, minlength=n)
+        win_rate = total_wins / np.maximum(games, 1)
+        
+        # Rank games newest first within each candidate
+        order = np.lexsort((-timestamps, candidates))
+        candidates, wins = candidates[order], wins[order]
+        rank = np.arange(len(candidates)) - np.searchsorted(candidates, candidates)
+        half = games // 2
+        newer = rank < half[candidates]
+        newer_wins = np.bincount(candidates[newer], weights=wins[newer], minlength=n)
+        newer_rate = newer_wins / np.maximum(half, 1)
+        older_rate = (total_wins - newer_wins) / np.maximum(games - half, 1)
+        
+        trended = games >= 6
+        improving = trended & (newer_rate > older_rate + 0.1)
+        declining = trended & (older_rate > newer_rate + 0.1)
+        strength = np.minimum(np.abs(newer_rate - older_rate) * 2, 1.0)
+        
+        # form_score = (win_rate - 0.5) * 2, mapped back to [0, 1]
+        scores = win_rate + 0.1 * strength * (improving.astype(np.float64) - declining)
+        return np.where(games >= 3, np.clip(scores, 0.0, 1.0), 0.5)
+    
+    def _candidate_meta_scores(self, champion_ids: np.ndarray, role: str) -> np.ndarray:
+        """Meta relevance scores; see _calculate_meta_relevance_score."""
+        match_manager = self.analytics_engine.match_manager
+        now = datetime.now()
+        champion_ids = champion_ids.tolist()
+        
+        # Recent vs overall win rate in the role
+        recent = match_manager.get_champion_role_counts(
+            champion_ids, role, start_time=now - timedelta(days=self.meta_analysis_window_days), end_time=now
+        )
+        overall = match_manager.get_champion_role_counts(champion_ids, role)
+        recent_rate = recent[:, 1] / np.maximum(recent[:, 0], 1)
+        overall_rate = overall[:, 1] / np.maximum(overall[:, 0], 1)
+        recent_performance = np.where(
+            recent[:, 0] < 3, 0.5,
+            np.where(overall[:, 0] < 10, recent_rate,
+                     np.clip(0.5 + (recent_rate - overall_rate) / 0.5, 0.0, 1.0))
+        )
+        
+        # Pick rate in the role over the last 30 days
+        month_start = now - timedelta(days=30)
+        role_games = match_manager.get_champion_role_totals(None, role, start_time=month_start, end_time=now).games
+        if role_games:
+            picks = match_manager.get_champion_role_counts(champion_ids, role, start_time=month_start, end_time=now)
+            popularity = np.clip(np.minimum(1.0, picks[:, 0] / role_games / 0.1) * 0.5 + 0.25, 0.0, 1.0)
+        else:
+            popularity = np.full(len(champion_ids), 0.5)
+        
+        return np.clip(recent_performance * 0.7 + popularity * 0.3, 0.0, 1.0)
+    
+    def _candidate_ally_synergy_scores(
+        self,
+        champion_ids: np.ndarray,
+        role: str,
+        team_context: Optional[TeamContext]
+    ) -> np.ndarray:
+        """
+        Ally synergy scores; see _calculate_ally_synergy_score.
+        
+        Each ally costs one pass over its own games, whatever the number of
+        candidates.
+        """
+        if not team_context or not team_context.existing_picks:
+            return np.full(len(champion_ids), 0.5)
+        
+        candidate_rates = self._candidate_win_rates(champion_ids)
+        allies = list(team_context.existing_picks.items())
+        historical = [
+            self._candidate_historical_synergies(champion_ids, candidate_rates, assignment.champion_id)
+            for _, assignment in allies
+        ]
+        return self._combine_ally_synergies(historical, role, [existing_role for existing_role, _ in allies])
+    
+    def _candidate_win_rates(self, champion_ids: np.ndarray) -> np.ndarray:
+        """All-time win rates of the candidates across every role."""
+        totals = self.analytics_engine.match_manager.get_champion_role_counts(champion_ids.tolist())
+        return totals[:, 1] / np.maximum(totals[:, 0], 1)
+    
+    def _candidate_historical_synergies(
+        self,
+        champion_ids: np.ndarray,
+        candidate_rates: np.ndarray,
+        ally_id: int
+    ) -> np.ndarray:
+        """
+        Historical synergy (-1.0 to 1.0) of each candidate with one ally champion.
+        
+        Compares the win rate of their games together with the average of the
+        two champions' own win rates; pairs with fewer than 5 games are neutral.
+        """
+        match_manager = self.analytics_engine.match_manager
+        together = match_manager.get_teammate_counts(ally_id, champion_ids.tolist())
+        expected = (candidate_rates + match_manager.get_champion_role_totals(ally_id).win_rate) / 2
+        historical = np.clip((together[:, 1] / np.maximum(together[:, 0], 1) - expected) / 0.5, -1.0, 1.0)
+        return np.where(together[:, 0] < 5, 0.0, historical)
+    
+    def _combine_ally_synergies(
+        self,
+        historical: List[np.ndarray],
+        role: str,
+        ally_roles: List[str]
+    ) -> np.ndarray:
+        """
+        Combine per-ally historical synergies into ally synergy scores (0.0 to 1.0).
+        
+        Args:
+            historical: Historical synergy array of each ally
+            role: Candidates' role
+            ally_roles: Role of each ally, in the same order
+        """
+        pair_scores = [
+            np.clip((synergy + self._role_pair_synergy_adjustment(role, ally_role)) / 2, -1.0, 1.0)
+            for synergy, ally_role in zip(historical, ally_roles)
+        ]
+        return np.clip((np.mean(pair_scores, axis=0) + 1.0) / 2.0, 0.0, 1.0)
+    
+    def _candidate_counter_pick_scores(
+        self,
+        champion_ids: Sequence[int],
+        role: str,
+        team_context: Optional[TeamContext]
+    ) -> np.ndarray:
+        """Counter-pick scores against the enemy draft, one matchup matrix read for all candidates."""
+        if not team_context or not team_context.enemy_composition:
+            return np.full(len(champion_ids), 0.5)  # Neutral score when no enemy info
+        
+        enemies = list(team_context.enemy_composition.items())
+        counts = self.analytics_engine.match_manager.get_matchup_counts(
+            list(champion_ids), role, [(enemy_champion_id, enemy_role) for enemy_role, enemy_champion_id in enemies]
+        )
+        return self._combine_counter_advantages(
+            self._counter_advantages(counts), role, [enemy_role for enemy_role, _ in enemies]
+        )
+    
+    def _combine_counter_advantages(
+        self,
+        advantages: np.ndarray,
+        role: str,
+        enemy_roles: List[str]
+    ) -> np.ndarray:
+        """
+        Combine counter advantages into counter-pick scores (0.0 to 1.0).
+        
+        Args:
+            advantages: Array of shape (candidates, enemies) from _counter_advantages
+            role: Candidates' role
+            enemy_roles: Role of each enemy column
+        """
+        # Weight lane matchups more heavily
+        weights = np.array([2.0 if role == enemy_role else 1.0 for enemy_role in enemy_roles])
+        weighted_avg = advantages @ weights / weights.sum()
+        
+        # Normalize to 0.0-1.0 range
+        return np.clip((weighted_avg + 1.0) / 2.0, 0.0, 1.0)
+    
+    def _candidate_confidence_scores(self, games: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Confidence scores; see _calculate_confidence_score.
+        
+        Returns:
+            Tuple of (confidence_score, data_quality_score, sample_size_penalty) arrays
+        """
+        thresholds = self.confidence_thresholds
+        tiers = [
+            games >= thresholds['high_confidence_games'],
+            games >= thresholds['medium_confidence_games'],
+            games >= thresholds['low_confidence_games']
+        ]
+        sample_size_score = np.select(tiers, [1.0, 0.7, 0.4], default=0.2)
+        sample_size_penalty = np.select(tiers, [0.0, 0.1, 0.2], default=0.3)
+        
+        # The analytics engine's per-metric confidences all equal min(games / 20, 1)
+        data_quality = np.minimum(games / 20.0, 1.0)
+        return sample_size_score * data_quality, data_quality, sample_size_penalty
   
     def _calculate_individual_performance_score(
         self,
@@ -647,34 +1222,7 @@ class ChampionRecommendationEngine:
             Counter-pick score (0.0 to 1.0)
         """
         try:
-            if not team_context.enemy_composition:
-                return 0.5  # Neutral score when no enemy info
-            
-            counter_scores = []
-            
-            # Calculate counter advantage against each enemy champion
-            for enemy_role, enemy_champion_id in team_context.enemy_composition.items():
-                counter_advantage = self._calculate_champion_counter_advantage(
-                    champion_id, enemy_champion_id, role, enemy_role
-                )
-                
-                # Weight lane matchups more heavily
-                weight = 2.0 if role == enemy_role else 1.0
-                counter_scores.append(counter_advantage * weight)
-            
-            if not counter_scores:
-                return 0.5
-            
-            # Weighted average counter score
-            total_weight = sum(2.0 if role == enemy_role else 1.0 
-                             for enemy_role in team_context.enemy_composition.keys())
-            
-            weighted_avg = sum(counter_scores) / total_weight
-            
-            # Normalize to 0.0-1.0 range
-            normalized_counter = (weighted_avg + 1.0) / 2.0
-            
-            return max(0.0, min(1.0, normalized_counter))
+            return float(self._candidate_counter_pick_scores([champion_id], role, team_context)[0])
             
         except Exception as e:
             self.logger.debug(f"Failed to calculate counter-pick score: {e}")
@@ -705,7 +1253,7 @@ class ChampionRecommendationEngine:
                 champion_id, enemy_champion_id, role, enemy_role
             )
             
-            if not matchup_data or matchup_data['games'] < 5:
+            if not matchup_data or matchup_data['games'] < self.min_matchup_games:
                 return 0.0  # Neutral when insufficient data
             
             # Calculate win rate advantage
@@ -721,6 +1269,22 @@ class ChampionRecommendationEngine:
             self.logger.debug(f"Failed to calculate counter advantage: {e}")
             return 0.0
     
+    def _counter_advantages(self, counts: np.ndarray) -> np.ndarray:
+        """
+        Convert head-to-head games and wins into counter advantages.
+        
+        Args:
+            counts: Array of shape (..., 2) with games and wins
+            
+        Returns:
+            Advantages (-1.0 to 1.0) of shape counts.shape[:-1]; matchups
+            with fewer than min_matchup_games games are neutral
+        """
+        games = counts[..., 0]
+        win_rates = counts[..., 1] / np.maximum(games, 1)
+        advantages = np.clip((win_rates - 0.5) / 0.5, -1.0, 1.0)
+        return np.where(games >= self.min_matchup_games, advantages, 0.0)
+    
     def _get_champion_matchup_data(
         self,
         champion_id: int,
@@ -741,18 +1305,15 @@ class ChampionRecommendationEngine:
             Matchup data dictionary or None
         """
         try:
-            # Query matches where these champions faced each other
-            matchup_matches = self.analytics_engine.match_manager.get_champion_matchups(
-                champion_id, enemy_champion_id, role, enemy_role
-            )
+            # Head-to-head record from the matchup matrix
+            total_games, wins = (int(value) for value in self.analytics_engine.match_manager.get_matchup_counts(
+                [champion_id], role, [(enemy_champion_id, enemy_role)]
+            )[0, 0])
             
-            if not matchup_matches:
+            if total_games == 0:
                 return None
             
-            # Calculate matchup statistics
-            total_games = len(matchup_matches)
-            wins = sum(1 for match in matchup_matches if match.get('win', False))
-            win_rate = wins / total_games if total_games > 0 else 0.0
+            win_rate = wins / total_games
             
             return {
                 'games': total_games,
@@ -852,38 +1413,27 @@ class ChampionRecommendationEngine:
             Recent performance score (0.0 to 1.0)
         """
         try:
-            # Create recent time filter (last 30 days)
+            match_manager = self.analytics_engine.match_manager
+            
+            # Recent totals for this champion in the role (meta analysis window)
             recent_end = datetime.now()
             recent_start = recent_end - timedelta(days=self.meta_analysis_window_days)
-            
-            recent_filters = AnalyticsFilters(
-                date_range=DateRange(start_date=recent_start, end_date=recent_end),
-                roles=[role],
-                min_games=3
-            )
-            
-            # Get recent matches for this champion
-            recent_matches = self.analytics_engine.match_manager.get_matches_with_champions(
-                [champion_id], filters=recent_filters
+            recent = match_manager.get_champion_role_totals(
+                champion_id, role, start_time=recent_start, end_time=recent_end
             )
             
-            if len(recent_matches) < 3:
+            if recent.games < 3:
                 return 0.5  # Neutral score for insufficient data
             
-            # Calculate recent win rate
-            recent_wins = sum(1 for match in recent_matches if match.get('win', False))
-            recent_win_rate = recent_wins / len(recent_matches)
+            recent_win_rate = recent.win_rate
             
             # Compare to overall champion win rate
-            all_matches = self.analytics_engine.match_manager.get_matches_with_champions(
-                [champion_id], filters=AnalyticsFilters(roles=[role], min_games=10)
-            )
+            overall = match_manager.get_champion_role_totals(champion_id, role)
             
-            if len(all_matches) < 10:
+            if overall.games < 10:
                 return recent_win_rate  # Use recent win rate as score
             
-            overall_wins = sum(1 for match in all_matches if match.get('win', False))
-            overall_win_rate = overall_wins / len(all_matches)
+            overall_win_rate = overall.win_rate
             
             # Score based on recent vs overall performance
             performance_delta = recent_win_rate - overall_win_rate
@@ -913,30 +1463,25 @@ class ChampionRecommendationEngine:
             Popularity score (0.0 to 1.0)
         """
         try:
-            # Get recent matches for role
+            match_manager = self.analytics_engine.match_manager
+            
+            # Games played in the role over the last 30 days, by anyone
             recent_end = datetime.now()
             recent_start = recent_end - timedelta(days=30)
+            role_games = match_manager.get_champion_role_totals(
+                None, role, start_time=recent_start, end_time=recent_end
+            ).games
             
-            role_filters = AnalyticsFilters(
-                date_range=DateRange(start_date=recent_start, end_date=recent_end),
-                roles=[role]
-            )
-            
-            all_role_matches = self.analytics_engine.match_manager.get_matches_by_role(
-                role, filters=role_filters
-            )
-            
-            if not all_role_matches:
+            if not role_games:
                 return 0.5  # Neutral score
             
             # Count champion picks
-            champion_picks = sum(
-                1 for match in all_role_matches 
-                if match.get('champion_id') == champion_id
-            )
+            champion_picks = match_manager.get_champion_role_totals(
+                champion_id, role, start_time=recent_start, end_time=recent_end
+            ).games
             
             # Calculate pick rate
-            pick_rate = champion_picks / len(all_role_matches)
+            pick_rate = champion_picks / role_games
             
             # Normalize pick rate to score (5% pick rate = 0.5, 10%+ = 1.0)
             popularity_score = min(1.0, pick_rate / 0.1) * 0.5 + 0.25
@@ -1106,39 +1651,51 @@ class ChampionRecommendationEngine:
             Role synergy adjustment (-0.5 to 0.5)
         """
         try:
-            role1 = role_context.get(champion1_id)
-            role2 = role_context.get(champion2_id)
-            
-            if not role1 or not role2:
-                return 0.0
-            
-            # Define role synergy patterns
-            synergy_patterns = {
-                # High synergy combinations
-                ('jungle', 'middle'): 0.3,  # Jungle-mid coordination
-                ('support', 'bottom'): 0.4,  # Bot lane synergy
-                ('top', 'jungle'): 0.2,     # Top-jungle coordination
-                ('jungle', 'support'): 0.2,  # Vision control synergy
-                
-                # Neutral combinations
-                ('top', 'middle'): 0.0,
-                ('top', 'bottom'): 0.0,
-                ('top', 'support'): 0.0,
-                ('middle', 'bottom'): 0.0,
-                ('middle', 'support'): 0.1,
-                ('bottom', 'jungle'): 0.1,
-            }
-            
-            # Check both role orders
-            role_pair = (role1, role2)
-            reverse_pair = (role2, role1)
-            
-            return synergy_patterns.get(role_pair, synergy_patterns.get(reverse_pair, 0.0))
+            return self._role_pair_synergy_adjustment(
+                role_context.get(champion1_id), role_context.get(champion2_id)
+            )
             
         except Exception as e:
             self.logger.debug(f"Failed to calculate role synergy adjustment: {e}")
             return 0.0
     
+    def _role_pair_synergy_adjustment(self, role1: Optional[str], role2: Optional[str]) -> float:
+        """
+        Get the synergy adjustment for two teammates' roles.
+        
+        Args:
+            role1: First champion's role
+            role2: Second champion's role
+            
+        Returns:
+            Role synergy adjustment (-0.5 to 0.5)
+        """
+        if not role1 or not role2:
+            return 0.0
+        
+        # Define role synergy patterns
+        synergy_patterns = {
+            # High synergy combinations
+            ('jungle', 'middle'): 0.3,  # Jungle-mid coordination
+            ('support', 'bottom'): 0.4,  # Bot lane synergy
+            ('top', 'jungle'): 0.2,     # Top-jungle coordination
+            ('jungle', 'support'): 0.2,  # Vision control synergy
+            
+            # Neutral combinations
+            ('top', 'middle'): 0.0,
+            ('top', 'bottom'): 0.0,
+            ('top', 'support'): 0.0,
+            ('middle', 'bottom'): 0.0,
+            ('middle', 'support'): 0.1,
+            ('bottom', 'jungle'): 0.1,
+        }
+        
+        # Check both role orders
+        role_pair = (role1, role2)
+        reverse_pair = (role2, role1)
+        
+        return synergy_patterns.get(role_pair, synergy_patterns.get(reverse_pair, 0.0))
+    
     def _calculate_meta_adjustment(
         self,
         champion_id: int,
@@ -14,6 +14,8 @@ from dataclasses import dataclass, field
 from collections import defaultdict
 from enum import Enum
 
+import numpy as np
+
 from .models import Match, MatchParticipant
 from .analytics_models import (
     AnalyticsFilters, PlayerAnalytics, PerformanceMetrics, PerformanceDelta,
@@ -22,6 +24,7 @@ from .analytics_models import (
 )
 from .baseline_manager import BaselineManager, BaselineContext
 from .statistical_analyzer import StatisticalAnalyzer
+from .participant_table import normalize_role
 from .config import Config
 
 
@@ -219,21 +222,22 @@ class ComparativeAnalyzer:
             
             for puuid in player_puuids:
                 try:
-                    matches = self._get_filtered_matches(puuid, filters)
+                    rows = self._get_filtered_rows(puuid, filters)
                     
-                    if len(matches) < self.min_games_for_comparison:
-                        self.logger.warning(f"Insufficient data for player {puuid}: {len(matches)} games")
+                    if len(rows) < self.min_games_for_comparison:
+                        self.logger.warning(f"Insufficient data for player {puuid}: {len(rows)} games")
                         continue
                     
-                    performance = self._calculate_performance_metrics(matches)
+                    performance = self._calculate_performance_metrics(rows)
                     player_data[puuid] = {
                         'performance': performance,
-                        'matches': matches,
-                        'sample_size': len(matches)
+                        'rows': rows,
+                        'sample_size': len(rows)
                     }
                     
                     # Get player name from first match
-                    player_names[puuid] = matches[0][1].summoner_name if matches else f"Player_{puuid[:8]}"
+                    participant = self._get_first_participant(puuid, rows)
+                    player_names[puuid] = participant.summoner_name if participant else f"Player_{puuid[:8]}"
                     
                 except Exception as e:
                     self.logger.warning(f"Failed to get data for player {puuid}: {e}")
@@ -249,14 +253,14 @@ class ComparativeAnalyzer:
             if filters and filters.date_range:
                 analysis_period = filters.date_range
             else:
-                all_dates = []
-                for data in player_data.values():
-                    all_dates.extend([match.game_creation_datetime for match, _ in data['matches']])
+                timestamps = self.match_manager.participant_table.column(
+                    'timestamp', np.concatenate([data['rows'] for data in player_data.values()])
+                )
                 
-                if all_dates:
+                if len(timestamps):
                     analysis_period = DateRange(
-                        start_date=min(all_dates),
-                        end_date=max(all_dates)
+                        start_date=datetime.fromtimestamp(timestamps.min() / 1000),
+                        end_date=datetime.fromtimestamp(timestamps.max() / 1000)
                     )
                 else:
                     analysis_period = None
@@ -323,10 +327,10 @@ class ComparativeAnalyzer:
             
             for puuid in comparison_pool:
                 try:
-                    matches = self._get_filtered_matches(puuid, filters)
+                    rows = self._get_filtered_rows(puuid, filters)
                     
-                    if len(matches) >= self.min_games_for_comparison:
-                        performance = self._calculate_performance_metrics(matches)
+                    if len(rows) >= self.min_games_for_comparison:
+                        performance = self._calculate_performance_metrics(rows)
                         player_performances[puuid] = performance
                     else:
                         self.logger.warning(f"Insufficient data for player {puuid} in ranking")
@@ -448,10 +452,10 @@ class ComparativeAnalyzer:
             
             for puuid in all_players:
                 try:
-                    matches = self._get_filtered_matches(puuid, filters)
+                    rows = self._get_filtered_rows(puuid, filters)
                     
-                    if len(matches) >= self.min_games_for_comparison:
-                        performance = self._calculate_performance_metrics(matches)
+                    if len(rows) >= self.min_games_for_comparison:
+                        performance = self._calculate_performance_metrics(rows)
                         peer_performances[puuid] = performance
                         
                         if puuid == target_player:
@@ -593,14 +597,15 @@ class ComparativeAnalyzer:
             
             for puuid in role_player_pool:
                 try:
-                    matches = self._get_filtered_matches(puuid, role_filters)
+                    rows = self._get_filtered_rows(puuid, role_filters)
                     
-                    if len(matches) >= self.min_games_for_comparison:
-                        performance = self._calculate_performance_metrics(matches)
+                    if len(rows) >= self.min_games_for_comparison:
+                        performance = self._calculate_performance_metrics(rows)
                         role_performances[puuid] = performance
                         
-                        if puuid == player_puuid:
-                            player_name = matches[0][1].summoner_name if matches else player_name
+                        participant = self._get_first_participant(puuid, rows) if puuid == player_puuid else None
+                        if participant:
+                            player_name = participant.summoner_name
                     else:
                         self.logger.warning(f"Insufficient {role} data for player {puuid}")
                         
@@ -739,18 +744,19 @@ class ComparativeAnalyzer:
             
             for puuid in champion_player_pool:
                 try:
-                    matches = self._get_filtered_matches(puuid, champion_filters)
+                    rows = self._get_filtered_rows(puuid, champion_filters)
                     
-                    if len(matches) >= self.min_games_for_comparison:
-                        performance = self._calculate_performance_metrics(matches)
+                    if len(rows) >= self.min_games_for_comparison:
+                        performance = self._calculate_performance_metrics(rows)
                         champion_performances[puuid] = {
                             'performance': performance,
-                            'games': len(matches)
+                            'games': len(rows)
                         }
                         
-                        if puuid == player_puuid:
-                            player_name = matches[0][1].summoner_name if matches else player_name
-                            champion_name = matches[0][1].champion_name if matches else champion_name
+                        participant = self._get_first_participant(puuid, rows) if puuid == player_puuid else None
+                        if participant:
+                            player_name = participant.summoner_name
+                            champion_name = participant.champion_name
                     else:
                         self.logger.warning(f"Insufficient champion {champion_id} data for player {puuid}")
                         
@@ -887,98 +893,60 @@ class ComparativeAnalyzer:
     
     # Private helper methods
     
-    def _get_filtered_matches(
+    def _get_filtered_rows(
         self,
         puuid: str,
         filters: Optional[AnalyticsFilters]
-    ) -> List[Tuple[Match, MatchParticipant]]:
-        """Get filtered matches for a player."""
-        try:
-            # Get all matches for the player
-            matches = self.match_manager.get_player_matches(puuid)
-            
-            if not matches:
-                return []
-            
-            # Apply filters if provided
-            if filters:
-                filtered_matches = []
-                
-                for match, participant in matches:
-                    # Date range filter
-                    if filters.date_range:
-                        if not filters.date_range.contains(match.game_creation_datetime):
-                            continue
-                    
-                    # Champion filter
-                    if filters.champions and participant.champion_id not in filters.champions:
-                        continue
-                    
-                    # Role filter
-                    if filters.roles and participant.individual_position.lower() not in [r.lower() for r in filters.roles]:
-                        continue
-                    
-                    # Queue type filter
-                    if filters.queue_types and match.queue_id not in filters.queue_types:
-                        continue
-                    
-                    # Win filter
-                    if filters.win_only is not None and participant.win != filters.win_only:
-                        continue
-                    
-                    filtered_matches.append((match, participant))
-                
-                matches = filtered_matches
-            
-            return matches
-            
-        except Exception as e:
-            self.logger.error(f"Failed to get filtered matches for {puuid}: {e}")
-            return []
-    
-    def _calculate_performance_metrics(
-        self,
-        matches: List[Tuple[Match, MatchParticipant]]
-    ) -> PerformanceMetrics:
-        """Calculate performance metrics from matches."""
-        if not matches:
-            return PerformanceMetrics()
+    ) -> np.ndarray:
+        """
+        Select a player's participant rows that pass the filters.
+        
+        Filters are applied as boolean masks over the match manager's
+        participant table, so no matches are decoded.
         
-        total_games = len(matches)
-        wins = sum(1 for _, participant in matches if participant.win)
-        losses = total_games - wins
+        Returns:
+            Array of row indices, newest first when filters.limit is set
+        """
+        table = self.match_manager.participant_table
+        if not filters:
+            return table.select(puuid=puuid)
         
-        # Aggregate statistics
-        total_kills = sum(participant.kills for _, participant in matches)
-        total_deaths = sum(participant.deaths for _, participant in matches)
-        total_assists = sum(participant.assists for _, participant in matches)
-        total_cs = sum(participant.total_minions_killed + participant.neutral_minions_killed 
-                     for _, participant in matches)
-        total_vision_score = sum(participant.vision_score for _, participant in matches)
-        total_damage = sum(participant.total_damage_dealt_to_champions for _, participant in matches)
-        total_gold = sum(participant.gold_earned for _, participant in matches)
-        total_duration = sum(match.game_duration for match, _ in matches)
+        start_ms = end_ms = None
+        if filters.date_range:
+            start_ms = int(filters.date_range.start_date.timestamp() * 1000)
+            end_ms = int(filters.date_range.end_date.timestamp() * 1000)
         
-        return PerformanceMetrics(
-            games_played=total_games,
-            wins=wins,
-            losses=losses,
-            win_rate=wins / total_games if total_games > 0 else 0,
-            total_kills=total_kills,
-            total_deaths=total_deaths,
-            total_assists=total_assists,
-            avg_kda=(total_kills + total_assists) / max(total_deaths, 1),
-            total_cs=total_cs,
-            avg_cs_per_min=total_cs / (total_duration / 60) if total_duration > 0 else 0,
-            total_vision_score=total_vision_score,
-            avg_vision_score=total_vision_score / total_games if total_games > 0 else 0,
-            total_damage_to_champions=total_damage,
-            avg_damage_per_min=total_damage / (total_duration / 60) if total_duration > 0 else 0,
-            total_gold_earned=total_gold,
-            avg_gold_per_min=total_gold / (total_duration / 60) if total_duration > 0 else 0,
-            total_game_duration=total_duration,
-            avg_game_duration=total_duration / (total_games * 60) if total_games > 0 else 0
+        rows = table.select(
+            puuid=puuid,
+            champion_ids=filters.champions,
+            roles=[normalize_role(role) for role in filters.roles] if filters.roles else None,
+            queue_ids=filters.queue_types,
+            start_ms=start_ms,
+            end_ms=end_ms,
+            win=filters.win_only,
+            teammates=filters.teammates
         )
+        
+        if filters.limit:
+            newest_first = np.argsort(-table.column('timestamp', rows), kind='stable')
+            rows = rows[newest_first[:filters.limit]]
+        return rows
+    
+    def _get_first_participant(self, puuid: str, rows: np.ndarray) -> Optional[MatchParticipant]:
+        """Decode the first selected match to read the player's participant entry."""
+        if not len(rows):
+            return None
+        
+        match_id = self.match_manager.participant_table.match_ids(rows[:1])[0]
+        match = self.match_manager.get_match(match_id)
+        return match.get_participant_by_puuid(puuid) if match else None
+    
+    def _calculate_performance_metrics(self, rows: np.ndarray) -> PerformanceMetrics:
+        """Calculate performance metrics from selected participant rows."""
+        if not len(rows):
+            return PerformanceMetrics()
+        
+        return self.match_manager.participant_table.totals(rows).to_performance_metrics()
     
     def _compare_metric_across_players(
         self,
@@ -1016,8 +984,8 @@ class ComparativeAnalyzer:
             for puuid2 in player_puuids[i+1:]:
                 try:
                     # Get raw data for statistical testing
-                    data1 = self._extract_metric_values(player_data[puuid1]['matches'], metric)
-                    data2 = self._extract_metric_values(player_data[puuid2]['matches'], metric)
+                    data1 = self._extract_metric_values(player_data[puuid1]['rows'], metric)
+                    data2 = self._extract_metric_values(player_data[puuid2]['rows'], metric)
                     
                     if len(data1) >= 5 and len(data2) >= 5:
                         test_result = self.statistical_analyzer.perform_significance_testing(
@@ -1057,34 +1025,12 @@ class ComparativeAnalyzer:
         
         return min(100.0, max(0.0, percentile))
     
-    def _extract_metric_values(
-        self,
-        matches: List[Tuple[Match, MatchParticipant]],
-        metric: str
-    ) -> List[float]:
-        """Extract individual metric values from matches for statistical testing."""
-        values = []
-        
-        for match, participant in matches:
-            if metric == "win_rate":
-                values.append(1.0 if participant.win else 0.0)
-            elif metric == "avg_kda":
-                kda = (participant.kills + participant.assists) / max(participant.deaths, 1)
-                values.append(kda)
-            elif metric == "avg_cs_per_min":
-                cs = participant.total_minions_killed + participant.neutral_minions_killed
-                cs_per_min = cs / (match.game_duration / 60) if match.game_duration > 0 else 0
-                values.append(cs_per_min)
-            elif metric == "avg_vision_score":
-                values.append(participant.vision_score)
-            elif metric == "avg_damage_per_min":
-                damage_per_min = participant.total_damage_dealt_to_champions / (match.game_duration / 60) if match.game_duration > 0 else 0
-                values.append(damage_per_min)
-            elif metric == "avg_gold_per_min":
-                gold_per_min = participant.gold_earned / (match.game_duration / 60) if match.game_duration > 0 else 0
-                values.append(gold_per_min)
+    def _extract_metric_values(self, rows: np.ndarray, metric: str) -> List[float]:
+        """Extract individual metric values from participant rows for statistical testing."""
+        if not len(rows):
+            return []
         
-        return values
+        return self.match_manager.participant_table.metric_values(rows, metric).tolist()
     
     def _determine_mastery_level(
         self,
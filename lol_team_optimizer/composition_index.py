@@ -0,0 +1,322 @@
+"""
+Signature index of the team compositions in stored matches.
+
+MatchManager keeps one CompositionIndex up to date as matches are stored
+and removed. Every team side of a match is one entry, and each of its
+2-5-player subsets is posted under two order-independent 64-bit signatures:
+one of its (player, role) pairs (the lineup) and one of its (player, role,
+champion) triples (the composition). Finding the matches of a composition,
+complete or partial, is then a binary search per posting run instead of a
+walk over one player's matches, and teams that share a number of players
+in the same roles are found by probing the signatures of those subsets.
+
+Players and roles are the integer codes of the participant table the rows
+come from, so an index is only valid together with its table.
+"""
+
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Largest team side whose subsets are indexed; larger sides only get their full signature
+MAX_SUBSET_SIDE = 5
+
+# Smallest subset with a partial signature; single players are answered by the participant table
+MIN_SUBSET_SIZE = 2
+
+# Champion field of lineup-level member keys, which ignore champions
+_ANY_CHAMPION = 0xFFFFFF
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """Spread uint64 values over all bits (the splitmix64 finalizer)."""
+    with np.errstate(over='ignore'):
+        z = values + _GOLDEN
+        z = (z ^ (z >> np.uint64(30))) * _MIX1
+        z = (z ^ (z >> np.uint64(27))) * _MIX2
+        return z ^ (z >> np.uint64(31))
+
+
+def member_keys(puuids: np.ndarray, roles: np.ndarray, champions: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Hash team members into member keys.
+    
+    Args:
+        puuids: Participant-table PUUID codes
+        roles: Participant-table role codes
+        champions: Champion IDs, or None for lineup-level keys
+    
+    Returns:
+        uint64 array with one hashed key per member
+    """
+    puuids = np.asarray(puuids).astype(np.uint64)
+    roles = np.asarray(roles).astype(np.uint64)
+    if champions is None:
+        champions = np.full(len(puuids), _ANY_CHAMPION, dtype=np.uint64)
+    champions = np.asarray(champions).astype(np.uint64) & np.uint64(_ANY_CHAMPION)
+    return _mix((puuids << np.uint64(32)) | (roles << np.uint64(24)) | champions)
+
+
+def set_signature(keys: np.ndarray, axis: int = -1) -> np.ndarray:
+    """Order-independent signature of sets of member keys (summed along ``axis``)."""
+    with np.errstate(over='ignore'):
+        return _mix(np.sum(keys, axis=axis, dtype=np.uint64))
+
+
+class CompositionIndex:
+    """
+    Posting lists from team signatures to team sides.
+    
+    Sides are numbered as they are added. Postings are kept in sorted runs
+    of (signature, side) that are merged as they grow, so adding a batch
+    costs a sort of that batch and a probe costs one binary search per run.
+    Removed sides are masked out and dropped once they outnumber live ones.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self._side_match = np.zeros(0, dtype=np.int32)  # participant-table match code
+        self._side_team = np.zeros(0, dtype=np.int16)
+        self._side_size = np.zeros(0, dtype=np.int16)
+        self._side_signature = np.zeros(0, dtype=np.uint64)  # composition signature of the whole side
+        self._side_alive = np.zeros(0, dtype=np.bool_)
+        self._side_count = 0
+        self._dead = 0
+        self._match_sides: Dict[int, Tuple[int, int]] = {}  # match code -> (first side, side count)
+        self._runs: List[Tuple[np.ndarray, np.ndarray]] = []  # sorted (signatures, sides)
+    
+    def __len__(self) -> int:
+        """Number of live team sides."""
+        return self._side_count - self._dead
+    
+    @property
+    def posting_count(self) -> int:
+        """Number of stored postings, including those of removed sides."""
+        return sum(len(signatures) for signatures, _ in self._runs)
+    
+    def add_rows(self, table, rows: np.ndarray) -> None:
+        """
+        Index the team sides of participant rows.
+        
+        Args:
+            table: ParticipantTable holding the rows
+            rows: Row indices of whole matches, grouped by match as
+                ParticipantTable.rows_for_matches returns them
+        """
+        if len(rows) == 0:
+            return
+        
+        # Sides are (match, team) groups of consecutive rows
+        matches = table.column('match', rows)
+        self._remove_match_codes(np.unique(matches).tolist())
+        teams = table.column('team', rows)
+        order = np.lexsort((teams, np.cumsum(np.diff(matches, prepend=matches[0] - 1) != 0)))
+        rows, matches, teams = rows[order], matches[order], teams[order]
+        starts = np.flatnonzero((np.diff(matches, prepend=matches[0] - 1) != 0) |
+                                (np.diff(teams, prepend=teams[0] - 1) != 0))
+        sizes = np.diff(np.append(starts, len(rows)))
+        
+        puuids = table.column('puuid', rows)
+        roles = table.column('role', rows)
+        lineup = member_keys(puuids, roles)
+        composition = member_keys(puuids, roles, table.column('champion', rows))
+        
+        first_side = self._side_count
+        side_ids = np.arange(first_side, first_side + len(starts), dtype=np.int64)
+        self._append_sides(matches[starts], teams[starts], sizes,
+                           self._reduce_sides(composition, starts))
+        
+        side_matches = matches[starts].tolist()
+        for side_match, side_id in zip(side_matches, side_ids.tolist()):
+            first, count = self._match_sides.get(side_match, (side_id, 0))
+            self._match_sides[side_match] = (first, count + 1)
+        
+        signatures, sides = [], []
+        for size in np.unique(sizes).tolist():
+            selected = np.flatnonzero(sizes == size)
+            if size < MIN_SUBSET_SIZE:
+                continue
+            if size > MAX_SUBSET_SIDE:
+                for keys in (lineup, composition):
+                    signatures.append(self._reduce_sides(keys, starts)[selected])
+                    sides.append(side_ids[selected])
+                continue
+            
+            members = starts[selected][:, None] + np.arange(size)
+            for keys in (lineup, composition):
+                side_keys = keys[members]
+                for subset_size in range(MIN_SUBSET_SIZE, size + 1):
+                    for subset in combinations(range(size), subset_size):
+                        signatures.append(set_signature(side_keys[:, list(subset)]))
+                        sides.append(side_ids[selected])
+        
+        if signatures:
+            self._add_run(np.concatenate(signatures), np.concatenate(sides))
+    
+    def remove_rows(self, table, rows: np.ndarray) -> None:
+        """
+        Remove the team sides of participant rows' matches.
+        
+        Args:
+            table: ParticipantTable holding the rows
+            rows: Row indices of the matches being removed
+        """
+        self._remove_match_codes(np.unique(table.column('match', rows)).tolist())
+        if self._dead > len(self):
+            self._drop_dead_sides()
+    
+    def find_sides(self, signatures: np.ndarray) -> np.ndarray:
+        """
+        Get the live sides posted under any of the given signatures.
+        
+        Args:
+            signatures: uint64 signatures to probe
+        
+        Returns:
+            Sorted unique side numbers; hash collisions are possible, so
+            callers verify the sides they use
+        """
+        signatures = np.asarray(signatures, dtype=np.uint64)
+        found = []
+        for run_signatures, run_sides in self._runs:
+            lo = np.searchsorted(run_signatures, signatures, side='left')
+            hi = np.searchsorted(run_signatures, signatures, side='right')
+            for start, end in zip(lo.tolist(), hi.tolist()):
+                if end > start:
+                    found.append(run_sides[start:end])
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        
+        sides = np.unique(np.concatenate(found))
+        return sides[self._side_alive[sides]]
+    
+    def sides_with_members(self, keys: np.ndarray) -> np.ndarray:
+        """Sides holding every member key of ``keys`` (2 to MAX_SUBSET_SIDE keys), unverified."""
+        return self.find_sides(set_signature(keys)[None])
+    
+    def sides_sharing(self, keys: np.ndarray, shared: int) -> np.ndarray:
+        """
+        Sides holding at least ``shared`` of the given member keys, unverified.
+        
+        Args:
+            keys: Member keys of one team
+            shared: Minimum number of keys in common (MIN_SUBSET_SIZE or more)
+        
+        Returns:
+            Sorted unique side numbers
+        """
+        if shared < MIN_SUBSET_SIZE or shared > len(keys) or shared > MAX_SUBSET_SIDE:
+            return np.empty(0, dtype=np.int64)
+        subsets = np.array(list(combinations(range(len(keys)), shared)))
+        return self.find_sides(set_signature(keys[subsets]))
+    
+    def sides(self, side_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the participant-table match codes and team IDs of sides."""
+        return self._side_match[side_ids], self._side_team[side_ids]
+    
+    def distinct_compositions(self, size: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get one side of every distinct full composition of a team size.
+        
+        Args:
+            size: Number of players on the side
+        
+        Returns:
+            Tuple of (representative side numbers, number of live sides with
+            that composition), in order of first appearance
+        """
+        live = np.flatnonzero(self._side_alive[:self._side_count] & (self._side_size[:self._side_count] == size))
+        if not len(live):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        
+        _, first, counts = np.unique(self._side_signature[live], return_index=True, return_counts=True)
+        order = np.argsort(first, kind='stable')
+        return live[first[order]], counts[order]
+    
+    @staticmethod
+    def _reduce_sides(keys: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """Signature of each side's whole member set."""
+        with np.errstate(over='ignore'):
+            return _mix(np.add.reduceat(keys, starts, dtype=np.uint64))
+    
+    def _append_sides(self, matches: np.ndarray, teams: np.ndarray, sizes: np.ndarray,
+                      signatures: np.ndarray) -> None:
+        """Append side metadata, growing the arrays geometrically."""
+        count = len(matches)
+        needed = self._side_count + count
+        if needed > len(self._side_alive):
+            capacity = max(needed, 2 * len(self._side_alive), 1024)
+            for name in ('_side_match', '_side_team', '_side_size', '_side_signature', '_side_alive'):
+                array = getattr(self, name)
+                grown = np.zeros(capacity, dtype=array.dtype)
+                grown[:self._side_count] = array[:self._side_count]
+                setattr(self, name, grown)
+        
+        end = self._side_count + count
+        self._side_match[self._side_count:end] = matches
+        self._side_team[self._side_count:end] = teams
+        self._side_size[self._side_count:end] = sizes
+        self._side_signature[self._side_count:end] = signatures
+        self._side_alive[self._side_count:end] = True
+        self._side_count = end
+    
+    def _remove_match_codes(self, match_codes: List[int]) -> None:
+        """Mark the sides of matches as removed."""
+        for match_code in match_codes:
+            span = self._match_sides.pop(match_code, None)
+            if span is not None:
+                first, count = span
+                self._side_alive[first:first + count] = False
+                self._dead += count
+    
+    def _add_run(self, signatures: np.ndarray, sides: np.ndarray) -> None:
+        """Add a batch of postings."""
+        order = np.argsort(signatures, kind='stable')
+        self._push_run((signatures[order], sides[order]))
+    
+    def _push_run(self, run: Tuple[np.ndarray, np.ndarray]) -> None:
+        """Append a sorted run, merging runs of similar size."""
+        self._runs.append(run)
+        while len(self._runs) > 1 and len(self._runs[-2][0]) <= 2 * len(self._runs[-1][0]):
+            newer = self._runs.pop()
+            older = self._runs.pop()
+            self._runs.append(self._merge_runs(older, newer))
+    
+    @staticmethod
+    def _merge_runs(older: Tuple[np.ndarray, np.ndarray],
+                    newer: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Merge two sorted runs."""
+        signatures = np.concatenate([older[0], newer[0]])
+        sides = np.concatenate([older[1], newer[1]])
+        order = np.argsort(signatures, kind='stable')
+        return signatures[order], sides[order]
+    
+    def _drop_dead_sides(self) -> None:
+        """Renumber the live sides and drop the postings of removed ones."""
+        alive = self._side_alive[:self._side_count]
+        renumber = np.cumsum(alive) - 1
+        
+        runs = []
+        for signatures, sides in self._runs:
+            keep = alive[sides]
+            if keep.any():
+                runs.append((signatures[keep], renumber[sides[keep]]))
+        self._runs = []
+        for run in runs:
+            self._push_run(run)
+        
+        keep = np.flatnonzero(alive)
+        for name in ('_side_match', '_side_team', '_side_size', '_side_signature', '_side_alive'):
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self._side_count = len(keep)
+        self._dead = 0
+        self._match_sides = {
+            match_code: (int(renumber[first]), count) for match_code, (first, count) in self._match_sides.items()
+        }
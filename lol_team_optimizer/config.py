@@ -21,11 +21,16 @@ class Config:
     riot_api_key: str = ""
     riot_api_base_url: str = "https://americas.api.riotgames.com"
     riot_api_rate_limit: int = 120  # requests per 2 minutes
+    riot_api_rate_limit_per_second: int = 20  # requests per second
+    max_concurrent_requests: int = 8  # API requests in flight at once
     
     # Cache Configuration
     cache_duration_hours: int = 1  # API response cache duration
     player_data_cache_hours: int = 24  # Player data cache duration
     max_cache_size_mb: int = 50  # Maximum cache size in MB
+    api_cache_max_mb: int = 100  # Size cap of the persistent API response cache
+    api_cache_compression: bool = True  # Compress large cached responses (match details)
+    api_cache_sweep_interval_seconds: int = 300  # Background sweep of expired API responses
     
     # Performance Calculation Weights
     individual_weight: float = 0.6  # Weight for individual performance
@@ -36,6 +41,14 @@ class Config:
     data_directory: str = "data"
     player_data_file: str = "players.json"
     cache_directory: str = "cache"
+    match_segment_max_mb: int = 64  # Size at which a match store segment is sealed
+    match_compaction_ratio: float = 0.5  # Dead-record fraction that triggers compaction
+    match_store_fsync: bool = False  # fsync every match store append
+    match_cache_size: int = 5000  # Decoded matches kept in memory (LRU)
+    
+    # Analytics Batch Processing
+    analytics_batch_workers: int = 0  # Worker processes for batch player analysis (0 = one per CPU, 1 = threads only)
+    analytics_process_batch_min: int = 16  # Smallest batch analyzed in worker processes
     
     # API Request Configuration
     max_matches_to_analyze: int = 20  # Number of recent matches to analyze
@@ -78,6 +91,20 @@ class Config:
             raise ValueError("Max matches to analyze must be positive")
         if self.request_timeout_seconds <= 0:
             raise ValueError("Request timeout must be positive")
+        if self.riot_api_rate_limit <= 0 or self.riot_api_rate_limit_per_second <= 0:
+            raise ValueError("API rate limits must be positive")
+        if self.max_concurrent_requests <= 0:
+            raise ValueError("Max concurrent requests must be positive")
+        if self.match_segment_max_mb <= 0:
+            raise ValueError("Match segment size must be positive")
+        if self.match_cache_size <= 0:
+            raise ValueError("Match cache size must be positive")
+        if self.api_cache_max_mb <= 0:
+            raise ValueError("API cache size must be positive")
+        if not 0 < self.match_compaction_ratio <= 1:
+            raise ValueError("Match compaction ratio must be between 0 and 1")
+        if self.analytics_batch_workers < 0:
+            raise ValueError("Analytics batch workers must not be negative")
 
 
 def load_config() -> Config:
@@ -85,14 +112,26 @@ def load_config() -> Config:
     return Config(
         riot_api_key=os.getenv("RIOT_API_KEY", ""),
         riot_api_base_url=os.getenv("RIOT_API_BASE_URL", "https://americas.api.riotgames.com"),
+        riot_api_rate_limit=int(os.getenv("RIOT_API_RATE_LIMIT", "120")),
+        riot_api_rate_limit_per_second=int(os.getenv("RIOT_API_RATE_LIMIT_PER_SECOND", "20")),
+        max_concurrent_requests=int(os.getenv("MAX_CONCURRENT_REQUESTS", "8")),
         cache_duration_hours=int(os.getenv("CACHE_DURATION_HOURS", "1")),
         player_data_cache_hours=int(os.getenv("PLAYER_DATA_CACHE_HOURS", "24")),
         max_cache_size_mb=int(os.getenv("MAX_CACHE_SIZE_MB", "50")),
+        api_cache_max_mb=int(os.getenv("API_CACHE_MAX_MB", "100")),
+        api_cache_compression=os.getenv("API_CACHE_COMPRESSION", "true").lower() == "true",
+        api_cache_sweep_interval_seconds=int(os.getenv("API_CACHE_SWEEP_INTERVAL_SECONDS", "300")),
         individual_weight=float(os.getenv("INDIVIDUAL_WEIGHT", "0.6")),
         preference_weight=float(os.getenv("PREFERENCE_WEIGHT", "0.3")),
         synergy_weight=float(os.getenv("SYNERGY_WEIGHT", "0.1")),
         data_directory=os.getenv("DATA_DIRECTORY", "data"),
         cache_directory=os.getenv("CACHE_DIRECTORY", "cache"),
+        match_segment_max_mb=int(os.getenv("MATCH_SEGMENT_MAX_MB", "64")),
+        match_compaction_ratio=float(os.getenv("MATCH_COMPACTION_RATIO", "0.5")),
+        match_store_fsync=os.getenv("MATCH_STORE_FSYNC", "false").lower() == "true",
+        match_cache_size=int(os.getenv("MATCH_CACHE_SIZE", "5000")),
+        analytics_batch_workers=int(os.getenv("ANALYTICS_BATCH_WORKERS", "0")),
+        analytics_process_batch_min=int(os.getenv("ANALYTICS_PROCESS_BATCH_MIN", "16")),
         max_matches_to_analyze=int(os.getenv("MAX_MATCHES_TO_ANALYZE", "20")),
         request_timeout_seconds=int(os.getenv("REQUEST_TIMEOUT_SECONDS", "30")),
         max_retries=int(os.getenv("MAX_RETRIES", "3")),
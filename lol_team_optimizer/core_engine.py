@@ -5,6 +5,8 @@ This module consolidates business logic from CLI, notebook, and setup scripts
 into a unified interface with intelligent defaults and comprehensive error handling.
 """
 
+import copy
+import hashlib
 import logging
 import time
 import json
@@ -23,10 +25,11 @@ from .champion_data import ChampionDataManager
 from .models import Player, TeamAssignment
 from .migration import DataMigrator
 from .match_manager import MatchManager
+from .match_fetch_pipeline import MatchFetchPipeline
 from .historical_analytics_engine import HistoricalAnalyticsEngine
 from .champion_recommendation_engine import ChampionRecommendationEngine
 from .baseline_manager import BaselineManager
-from .analytics_cache_manager import AnalyticsCacheManager
+from .analytics_cache_manager import get_shared_cache_manager
 from .statistical_analyzer import StatisticalAnalyzer
 from .champion_synergy_analyzer import ChampionSynergyAnalyzer
 
@@ -94,9 +97,19 @@ class CoreEngine:
             self.logger.error(f"Failed to initialize optimization components: {e}")
             raise RuntimeError(f"Optimization engine initialization failed: {e}")
         
+        # Fold newly stored matches into the synergy data as they land
+        try:
+            self.synergy_manager.set_tracked_players(self.data_manager.load_player_data())
+            self.match_manager.add_match_listener(self.synergy_manager.on_matches_stored)
+            self.data_manager.add_player_change_listener(
+                lambda name: self.synergy_manager.set_tracked_players(self.data_manager.load_player_data())
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to connect synergy updates to match storage: {e}")
+        
         # Initialize analytics engines
         try:
-            self.analytics_cache_manager = AnalyticsCacheManager(self.config)
+            self.analytics_cache_manager = get_shared_cache_manager(self.config)
             self.baseline_manager = BaselineManager(self.config, self.match_manager)
             self.statistical_analyzer = StatisticalAnalyzer()
             self.champion_synergy_analyzer = ChampionSynergyAnalyzer(
@@ -109,6 +122,11 @@ class CoreEngine:
                 self.config, self.historical_analytics_engine, self.champion_data_manager, self.baseline_manager
             )
             self.analytics_available = True
+            
+            # Cached optimization results depend on the players they were computed for
+            self.data_manager.add_player_change_listener(
+                lambda name: self.analytics_cache_manager.invalidate_dependency(f"player:{name}")
+            )
             self.logger.info("Analytics engines initialized successfully")
         except Exception as e:
             self.logger.warning(f"Failed to initialize analytics engines: {e}")
@@ -121,6 +139,11 @@ class CoreEngine:
             self.champion_recommendation_engine = None
             self.analytics_available = False
     
+    def close(self) -> None:
+        """Release the API client's background sweep thread and connections."""
+        if self.riot_client is not None:
+            self.riot_client.close()
+    
     def _check_and_handle_migration(self) -> None:
         """Check if migration is needed and handle it automatically."""
         try:
@@ -285,6 +308,11 @@ class CoreEngine:
         
         self.logger.info(f"Starting historical match scraping for {len(players_to_scrape)} players")
         
+        pipeline = MatchFetchPipeline(self.riot_client, self.match_manager)
+        batch_size = 20
+        active_players = {}
+        new_match_counts = {}
+        
         for player in players_to_scrape:
             try:
                 self.logger.info(f"Historical scraping for {player.name}")
@@ -306,69 +334,71 @@ class CoreEngine:
                     results['players_processed'] += 1
                     continue
                 
-                # Perform incremental extraction
-                total_new_matches = 0
-                batch_size = 20
+                active_players[player.puuid] = player
+                new_match_counts[player.puuid] = 0
                 
-                while not extraction_info['extraction_complete'] and total_new_matches < max_matches_per_player:
-                    # Get next batch to extract
-                    start_index, count = self.match_manager.get_next_extraction_batch(player.puuid, batch_size)
-                    
-                    if count == 0:
-                        break
-                    
-                    try:
-                        # Fetch match IDs for this batch
-                        batch_match_ids = self.riot_client.get_match_history(
-                            player.puuid, 
-                            count=count, 
-                            start=start_index
-                        )
-                        
-                        if not batch_match_ids:
-                            # No more matches available
-                            self.match_manager.mark_extraction_complete(player.puuid)
-                            break
-                        
-                        # Filter out matches we already have
-                        new_match_ids = [mid for mid in batch_match_ids if not self.match_manager.get_match(mid)]
-                        
-                        # Fetch detailed match data
-                        new_matches = []
-                        for match_id in new_match_ids:
-                            try:
-                                match_detail = self.riot_client.get_match_details(match_id)
-                                if match_detail:
-                                    new_matches.append(match_detail)
-                            except Exception as e:
-                                self.logger.warning(f"Failed to fetch match {match_id}: {e}")
-                                continue
-                        
-                        # Store new matches
-                        if new_matches:
-                            new_count, duplicate_count = self.match_manager.store_matches_batch(new_matches)
-                            total_new_matches += new_count
-                            results['total_new_matches'] += new_count
-                            results['total_duplicates_skipped'] += duplicate_count
-                        
-                        # Update extraction progress
-                        self.match_manager.update_player_extraction_progress(
-                            player.puuid, 
-                            len(batch_match_ids),
-                            None  # We don't know total available yet
-                        )
-                        
-                        # Get updated extraction info
-                        extraction_info = self.match_manager.get_player_extraction_info(player.puuid)
-                        
-                        # Rate limiting
-                        time.sleep(1)
-                        
-                        self.logger.info(f"Extracted batch for {player.name}: {len(batch_match_ids)} IDs, {len(new_matches)} new matches")
-                        
-                    except Exception as e:
-                        self.logger.warning(f"Failed to fetch batch for {player.name} at index {start_index}: {e}")
-                        break
+            except Exception as e:
+                error_msg = f"Error in historical scraping for {player.name}: {e}"
+                self.logger.error(error_msg)
+                results['errors'].append(error_msg)
+        
+        # Extract in rounds: one history page per active player, fetched concurrently,
+        # then the details of every new match in the round through the shared rate limiter
+        finished = []
+        while active_players:
+            batch_requests = {}
+            for puuid, player in list(active_players.items()):
+                start_index, count = self.match_manager.get_next_extraction_batch(puuid, batch_size)
+                if count == 0 or new_match_counts[puuid] >= max_matches_per_player:
+                    finished.append(active_players.pop(puuid))
+                else:
+                    batch_requests[puuid] = (start_index, count)
+            
+            if not batch_requests:
+                break
+            
+            histories = pipeline.fetch_match_histories(batch_requests)
+            
+            round_match_ids = []
+            for puuid in batch_requests:
+                player = active_players[puuid]
+                if puuid not in histories:
+                    self.logger.warning(f"Failed to fetch batch for {player.name} at index {batch_requests[puuid][0]}")
+                    finished.append(active_players.pop(puuid))
+                elif not histories[puuid]:
+                    # No more matches available
+                    self.match_manager.mark_extraction_complete(puuid)
+                    finished.append(active_players.pop(puuid))
+                else:
+                    round_match_ids.extend(histories[puuid])
+            
+            fetch_result = pipeline.fetch_and_store(round_match_ids)
+            results['total_new_matches'] += fetch_result.new_matches
+            results['total_duplicates_skipped'] += fetch_result.duplicates_skipped
+            stored_ids = set(fetch_result.stored_match_ids)
+            
+            for puuid, batch_match_ids in histories.items():
+                if puuid not in active_players or not batch_match_ids:
+                    continue
+                player = active_players[puuid]
+                new_for_player = len(stored_ids.intersection(batch_match_ids))
+                new_match_counts[puuid] += new_for_player
+                
+                # Update extraction progress
+                self.match_manager.update_player_extraction_progress(
+                    puuid, 
+                    len(batch_match_ids),
+                    None  # We don't know total available yet
+                )
+                
+                self.logger.info(f"Extracted batch for {player.name}: {len(batch_match_ids)} IDs, {new_for_player} new matches")
+                
+                if self.match_manager.get_player_extraction_info(puuid)['extraction_complete']:
+                    finished.append(active_players.pop(puuid))
+        
+        for player in finished:
+            try:
+                total_new_matches = new_match_counts[player.puuid]
                 
                 # Update player performance with new data if we got matches
                 if total_new_matches > 0:
@@ -447,6 +477,8 @@ class CoreEngine:
         
         self.logger.info(f"Starting comprehensive match scraping for {len(players_to_scrape)} players")
         
+        pipeline = MatchFetchPipeline(self.riot_client, self.match_manager)
+        
         for player in players_to_scrape:
             try:
                 self.logger.info(f"Scraping comprehensive match history for {player.name}")
@@ -471,10 +503,6 @@ class CoreEngine:
                             break  # No more matches available
                         
                         all_match_ids.extend(batch_match_ids)
-                        
-                        # Rate limiting between batches
-                        if start_index > 0:
-                            time.sleep(1)
                             
                     except Exception as e:
                         self.logger.warning(f"Failed to fetch match batch for {player.name} at index {start_index}: {e}")
@@ -483,32 +511,17 @@ class CoreEngine:
                 self.logger.info(f"Found {len(all_match_ids)} total match IDs for {player.name}")
                 
                 # Filter out matches we already have
-                new_match_ids = [mid for mid in all_match_ids if not self.match_manager.get_match(mid)]
+                new_match_ids = [mid for mid in all_match_ids if not self.match_manager.has_match(mid)]
                 
                 if new_match_ids:
                     self.logger.info(f"Fetching {len(new_match_ids)} new matches for {player.name}")
                     
-                    # Fetch detailed match data with careful rate limiting
-                    new_matches = []
-                    for i, match_id in enumerate(new_match_ids):
-                        try:
-                            match_detail = self.riot_client.get_match_details(match_id)
-                            if match_detail:
-                                new_matches.append(match_detail)
-                            
-                            # Progressive rate limiting (slower for larger batches)
-                            if (i + 1) % 5 == 0:
-                                time.sleep(0.5)
-                            if (i + 1) % 20 == 0:
-                                time.sleep(2)
-                                
-                        except Exception as e:
-                            self.logger.warning(f"Failed to fetch match {match_id} for {player.name}: {e}")
-                            continue
+                    # Fetch detailed match data concurrently and store it in batches
+                    fetch_result = pipeline.fetch_and_store(new_match_ids)
                     
-                    # Store new matches
-                    if new_matches:
-                        new_count, duplicate_count = self.match_manager.store_matches_batch(new_matches)
+                    if fetch_result.fetched:
+                        new_count = fetch_result.new_matches
+                        duplicate_count = fetch_result.duplicates_skipped
                         
                         results['total_new_matches'] += new_count
                         results['total_duplicates_skipped'] += duplicate_count
@@ -578,6 +591,8 @@ class CoreEngine:
             
             # Calculate synergies from stored matches
             self.synergy_manager.calculate_synergies_from_stored_matches(players_with_puuid)
+            if self.analytics_cache_manager:
+                self.analytics_cache_manager.invalidate_dependency("synergy")
             
             # Get updated synergy statistics
             synergy_db = self.synergy_manager.get_synergy_database()
@@ -986,38 +1001,20 @@ class CoreEngine:
                             break  # No more matches available
                         
                         all_match_ids.extend(batch_match_ids)
-                        
-                        # Small delay between batches to respect rate limits
-                        if start_index > 0:
-                            time.sleep(0.5)
                     
                     self.logger.info(f"Found {len(all_match_ids)} total matches for {player.name}")
                     
                     if all_match_ids:
                         # Filter out matches we already have
-                        new_match_ids = [mid for mid in all_match_ids if not self.match_manager.get_match(mid)]
+                        new_match_ids = [mid for mid in all_match_ids if not self.match_manager.has_match(mid)]
                         self.logger.info(f"Need to fetch {len(new_match_ids)} new matches for {player.name}")
                         
-                        # Fetch detailed match data with rate limiting
-                        new_matches = []
-                        for i, match_id in enumerate(new_match_ids):
-                            try:
-                                match_detail = self.riot_client.get_match_details(match_id)
-                                if match_detail:
-                                    new_matches.append(match_detail)
-                                
-                                # Rate limiting: pause every 10 requests
-                                if (i + 1) % 10 == 0:
-                                    time.sleep(1)
-                                    
-                            except Exception as e:
-                                self.logger.warning(f"Failed to fetch match {match_id}: {e}")
-                                continue
+                        # Fetch detailed match data concurrently; stores are batched with deduplication
+                        fetch_result = MatchFetchPipeline(self.riot_client, self.match_manager).fetch_and_store(new_match_ids)
                         
-                        if new_matches:
-                            # Store matches in centralized storage with deduplication
-                            new_count, duplicate_count = self.match_manager.store_matches_batch(new_matches)
-                            self.logger.info(f"Stored {new_count} new matches for {player.name}, skipped {duplicate_count} duplicates")
+                        if fetch_result.fetched:
+                            self.logger.info(f"Stored {fetch_result.new_matches} new matches for {player.name}, "
+                                             f"skipped {fetch_result.duplicates_skipped} duplicates")
                             
                             # Get updated match list (more matches for better analysis)
                             existing_matches = self.match_manager.get_matches_for_player(player.puuid, limit=50)
@@ -1305,11 +1302,32 @@ class CoreEngine:
             # Ensure data completeness with graceful degradation
             self._ensure_player_data_completeness_with_fallback(selected_players)
             
-            # Run optimization with error handling
+            # Reuse the result of an identical earlier request
             start_time = time.time()
+            cache_key = self._optimization_cache_key(selected_players)
+            cached_result = (self.analytics_cache_manager.get_cached_analytics(cache_key)
+                             if cache_key else None)
+            if isinstance(cached_result, OptimizationResult):
+                # Callers own the returned result; the cached entry must not change
+                result = copy.deepcopy(cached_result)
+                optimization_time = time.time() - start_time
+                result.optimization_time = optimization_time
+                self.logger.info(f"Returning cached optimization result for {len(selected_players)} players")
+                success_msg = self._generate_optimization_success_message(
+                    selected_players, optimization_time, result
+                )
+                return True, success_msg + " (cached)", result
+            
+            # Run optimization with error handling
             result = self.optimizer.optimize_team(selected_players)
             optimization_time = time.time() - start_time
             
+            if cache_key:
+                self.analytics_cache_manager.cache_analytics(
+                    cache_key, copy.deepcopy(result),
+                    dependencies=[f"player:{p.name}" for p in selected_players] + ["synergy"]
+                )
+            
             # Update result with timing and system information
             result.optimization_time = optimization_time
             
@@ -1328,6 +1346,52 @@ class CoreEngine:
                 return fallback_result
             return False, f"Optimization failed: {e}", None
     
+    def _optimization_cache_key(self, players: List[Player]) -> Optional[str]:
+        """
+        Build the result cache key for optimizing a set of players.
+        
+        The key fingerprints every input of the optimization: each player's
+        data (everything but its timestamp), the optimizer and configured weights, the search settings
+        and the synergy database version. Any change to them yields a new key,
+        so results are shared safely between processes.
+        
+        Args:
+            players: Players being optimized
+            
+        Returns:
+            Cache key, or None when results cannot be cached
+        """
+        if not self.analytics_cache_manager:
+            return None
+        
+        try:
+            player_fingerprints = []
+            for player in players:
+                player_data = asdict(player)
+                player_data.pop('last_updated', None)  # a timestamp, not an input
+                payload = json.dumps(player_data, sort_keys=True, default=str)
+                player_fingerprints.append(f"{player.name}@{hashlib.sha1(payload.encode()).hexdigest()[:16]}")
+            
+            synergy_db = self.optimizer.synergy_database
+            synergy_version = (synergy_db.last_updated.isoformat()
+                               if synergy_db is not None and synergy_db.last_updated else "none")
+            
+            return self.analytics_cache_manager.generate_cache_key(
+                "optimize_team",
+                players=player_fingerprints,
+                weights=dict(self.optimizer.weights),
+                config_weights={
+                    "individual": self.config.individual_weight,
+                    "preference": self.config.preference_weight,
+                    "synergy": self.config.synergy_weight
+                },
+                search=f"{self.optimizer.search_strategy}:{self.optimizer.search_time_budget_seconds}",
+                synergy_version=synergy_version
+            )
+        except Exception as e:
+            self.logger.debug(f"Optimization result not cacheable: {e}")
+            return None
+    
     def _auto_select_players_with_fallback(self, players: List[Player], max_players: int = 10) -> List[Player]:
         """
         Auto-select players with intelligent fallback when data is limited.
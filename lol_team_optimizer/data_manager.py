@@ -6,15 +6,17 @@ with TTL (Time To Live) functionality.
 """
 
 import json
+import logging
 import os
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from dataclasses import asdict, fields
 from pathlib import Path
 
 from .models import Player, PerformanceData
 from .config import Config
+from .player_score_cache import bump_player_data_version
 
 
 class DataManager:
@@ -23,6 +25,7 @@ class DataManager:
     def __init__(self, config: Config):
         """Initialize the DataManager with configuration."""
         self.config = config
+        self.logger = logging.getLogger(__name__)
         self.data_dir = Path(config.data_directory)
         self.cache_dir = Path(config.cache_directory)
         
@@ -33,6 +36,25 @@ class DataManager:
         self.player_data_file = self.data_dir / config.player_data_file
         self._players_cache: Dict[str, Player] = {}
         self._cache_last_loaded: Optional[datetime] = None
+        self._player_change_listeners: List[Callable[[str], None]] = []
+    
+    def add_player_change_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Register a callback invoked with a player's name after it is updated or deleted.
+        
+        Args:
+            listener: Callable taking the player name
+        """
+        self._player_change_listeners.append(listener)
+    
+    def _notify_player_changed(self, player_name: str) -> None:
+        """Bump the player's data version and notify listeners."""
+        bump_player_data_version(player_name)
+        for listener in self._player_change_listeners:
+            try:
+                listener(player_name)
+            except Exception as e:
+                self.logger.warning(f"Player change listener failed for {player_name}: {e}")
     
     def save_player_data(self, players: List[Player]) -> None:
         """
@@ -216,6 +238,7 @@ class DataManager:
             players.append(updated_player)
         
         self.save_player_data(players)
+        self._notify_player_changed(updated_player.name)
     
     def update_preferences(self, player_name: str, preferences: Dict[str, int]) -> None:
         """
@@ -577,6 +600,7 @@ class DataManager:
         
         if len(players) < original_count:
             self.save_player_data(players)
+            self._notify_player_changed(player_name)
             return True
         
         return False
@@ -0,0 +1,301 @@
+"""
+Draft sessions for live champion select.
+
+During a draft the team context changes after every pick and ban, but only
+the ally synergy and counter-pick components of a candidate's score, and
+whether it can still be picked, depend on it. A DraftSession scores the
+candidates of every role once and afterwards updates just those terms.
+"""
+
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from .analytics_models import (
+    AnalyticsFilters, ChampionRecommendation, PlayerRoleAssignment, TeamContext
+)
+from .champion_recommendation_engine import (
+    CandidateScores, ChampionRecommendationEngine, RecommendationScore
+)
+
+
+DRAFT_ROLES = ["top", "jungle", "middle", "bottom", "support"]
+
+
+class DraftSession:
+    """
+    Champion recommendations for one team across a draft.
+    
+    The candidates of each role with a known player are scored once with
+    ChampionRecommendationEngine.score_candidates. Ally picks add one
+    ally_synergy_terms array shared by all open roles, enemy picks add one
+    counter_pick_terms array per open role, and bans only change
+    availability, so every update costs a few array operations rather than
+    a full recommendation run. Rankings equal those of get_champion_recommendations
+    with the session's team_context for the role.
+    """
+    
+    def __init__(
+        self,
+        engine: ChampionRecommendationEngine,
+        players: Dict[str, str],
+        filters: Optional[AnalyticsFilters] = None,
+        custom_weights: Optional[Dict[str, float]] = None,
+        available_champions: Optional[List[int]] = None
+    ):
+        """
+        Score the candidates of every role.
+        
+        Args:
+            engine: Recommendation engine used for scoring
+            players: Mapping of role to the PUUID of the player drafting it
+            filters: Optional filters for the players' historical data
+            custom_weights: Custom scoring weights (defaults to the engine's)
+            available_champions: Optional champion pool shared by the team
+        
+        Raises:
+            ValueError: If a role is not a draft role
+        """
+        for role in players:
+            self._check_role(role)
+        
+        self.engine = engine
+        self.players = dict(players)
+        self.filters = filters
+        self.base_weights = custom_weights or engine.default_weights
+        self.available_champions = list(available_champions) if available_champions else None
+        
+        self.ally_picks: Dict[str, PlayerRoleAssignment] = {}
+        self.enemy_picks: Dict[str, int] = {}
+        self.bans: Set[int] = set()
+        
+        self._scores: Dict[str, CandidateScores] = {}
+        for role, puuid in self.players.items():
+            candidates = engine.get_candidate_champions(role)
+            if self.available_champions is not None:
+                pool = set(self.available_champions)
+                candidates = [champion_id for champion_id in candidates if champion_id in pool]
+            self._scores[role] = engine.score_candidates(puuid, role, candidates, filters=filters)
+        
+        # Candidates of all roles share one champion axis for ally synergy lookups
+        self._champion_ids = np.unique(np.concatenate(
+            [scores.champion_ids for scores in self._scores.values()] + [np.empty(0, dtype=np.int64)]
+        ))
+        self._positions = {
+            role: np.searchsorted(self._champion_ids, scores.champion_ids)
+            for role, scores in self._scores.items()
+        }
+        self._ally_terms: Dict[str, np.ndarray] = {}  # ally role -> synergy over _champion_ids
+        self._enemy_terms: Dict[str, Dict[str, np.ndarray]] = {role: {} for role in self._scores}
+    
+    @property
+    def open_roles(self) -> List[str]:
+        """Roles with a known player that have not been picked yet."""
+        return [role for role in DRAFT_ROLES if role in self._scores and role not in self.ally_picks]
+    
+    @property
+    def unavailable_champions(self) -> Set[int]:
+        """Champions that are banned or already picked by either team."""
+        picked = {assignment.champion_id for assignment in self.ally_picks.values()}
+        return picked | set(self.enemy_picks.values()) | self.bans
+    
+    def pick(
+        self,
+        role: str,
+        champion_id: int,
+        puuid: Optional[str] = None,
+        player_name: Optional[str] = None,
+        max_recommendations: Optional[int] = None
+    ) -> Dict[str, List[RecommendationScore]]:
+        """
+        Record an ally pick and re-score ally synergy of the open roles.
+        
+        Args:
+            role: Role the champion was picked for
+            champion_id: Picked champion
+            puuid: Picking player's PUUID (defaults to the session's player)
+            player_name: Picking player's name (defaults to the PUUID)
+            max_recommendations: Maximum candidates per role in the result
+        
+        Returns:
+            Updated rankings of the open roles
+        
+        Raises:
+            ValueError: If the role is already picked or the champion is unavailable
+        """
+        self._check_role(role)
+        if role in self.ally_picks:
+            raise ValueError(f"Role {role} has already been picked")
+        self._check_available(champion_id)
+        
+        puuid = puuid or self.players.get(role) or f"{role}_ally"
+        champion_name = self.engine.champion_data_manager.get_champion_name(champion_id)
+        self.ally_picks[role] = PlayerRoleAssignment(
+            puuid=puuid,
+            player_name=player_name or puuid,
+            role=role,
+            champion_id=champion_id,
+            champion_name=champion_name or f"Champion_{champion_id}"
+        )
+        
+        self._ally_terms[role] = self.engine.ally_synergy_terms(self._champion_ids, champion_id)
+        return self.rankings(max_recommendations)
+    
+    def enemy_pick(
+        self,
+        role: str,
+        champion_id: int,
+        max_recommendations: Optional[int] = None
+    ) -> Dict[str, List[RecommendationScore]]:
+        """
+        Record an enemy pick and re-score counter-picks of the open roles.
+        
+        Args:
+            role: Role the enemy champion is expected to play
+            champion_id: Picked champion
+            max_recommendations: Maximum candidates per role in the result
+        
+        Returns:
+            Updated rankings of the open roles
+        
+        Raises:
+            ValueError: If the enemy role is already picked or the champion is unavailable
+        """
+        self._check_role(role)
+        if role in self.enemy_picks:
+            raise ValueError(f"Enemy role {role} has already been picked")
+        self._check_available(champion_id)
+        
+        self.enemy_picks[role] = champion_id
+        for open_role in self.open_roles:
+            self._enemy_terms[open_role][role] = self.engine.counter_pick_terms(
+                self._scores[open_role].champion_ids, open_role, champion_id, role
+            )
+        return self.rankings(max_recommendations)
+    
+    def ban(self, champion_id: int, max_recommendations: Optional[int] = None) -> Dict[str, List[RecommendationScore]]:
+        """
+        Record a ban.
+        
+        Args:
+            champion_id: Banned champion
+            max_recommendations: Maximum candidates per role in the result
+        
+        Returns:
+            Updated rankings of the open roles
+        """
+        self.bans.add(champion_id)
+        return self.rankings(max_recommendations)
+    
+    def team_context(self, role: str) -> TeamContext:
+        """
+        Get the TeamContext equivalent to the session's draft state for a role.
+        
+        Args:
+            role: Role with a known player
+        
+        Returns:
+            TeamContext for the role's player
+        """
+        return TeamContext(
+            existing_picks=dict(self.ally_picks),
+            target_role=role,
+            target_player_puuid=self.players[role],
+            available_champions=self.available_champions,
+            banned_champions=sorted(self.bans) or None,
+            enemy_composition=dict(self.enemy_picks) or None
+        )
+    
+    def candidate_scores(self, role: str) -> CandidateScores:
+        """
+        Get the current scores of a role's candidates that can still be picked.
+        
+        Args:
+            role: Open role
+        
+        Returns:
+            CandidateScores with up-to-date ally synergy and counter-pick scores
+        
+        Raises:
+            ValueError: If the role has no player or has already been picked
+        """
+        if role not in self.open_roles:
+            raise ValueError(f"Role {role} is not open in this draft")
+        
+        positions = self._positions[role]
+        scores = self.engine.rescore_team_synergy(
+            self._scores[role],
+            role,
+            {ally_role: self._ally_terms[ally_role][positions] for ally_role in self.ally_picks},
+            {enemy_role: self._enemy_terms[role][enemy_role] for enemy_role in self.enemy_picks}
+        )
+        
+        unavailable = list(self.unavailable_champions)
+        if unavailable:
+            scores = scores.subset(~np.isin(scores.champion_ids, unavailable))
+        return scores
+    
+    def rankings(self, max_recommendations: Optional[int] = None) -> Dict[str, List[RecommendationScore]]:
+        """
+        Rank the remaining candidates of every open role.
+        
+        Args:
+            max_recommendations: Maximum candidates per role (defaults to the engine's)
+        
+        Returns:
+            Mapping of open role to score breakdowns, best first
+        """
+        return {role: self.ranking(role, max_recommendations) for role in self.open_roles}
+    
+    def ranking(self, role: str, max_recommendations: Optional[int] = None) -> List[RecommendationScore]:
+        """
+        Rank the remaining candidates of one open role.
+        
+        Args:
+            role: Open role
+            max_recommendations: Maximum candidates (defaults to the engine's)
+        
+        Returns:
+            Score breakdowns, best first
+        """
+        scores = self.candidate_scores(role)
+        weights = self._weights(role)
+        max_recs = max_recommendations or self.engine.max_recommendations
+        order = np.argsort(-scores.total_scores(weights), kind='stable')[:max_recs]
+        return [scores.score_breakdown(index, weights) for index in order]
+    
+    def recommendations(self, role: str, max_recommendations: Optional[int] = None) -> List[ChampionRecommendation]:
+        """
+        Build full recommendations, with reasoning and projections, for an open role.
+        
+        Args:
+            role: Open role
+            max_recommendations: Maximum recommendations (defaults to the engine's)
+        
+        Returns:
+            ChampionRecommendation objects sorted by score
+        """
+        return self.engine.build_recommendations(
+            self.players[role],
+            role,
+            self.candidate_scores(role),
+            self._weights(role),
+            self.team_context(role),
+            self.filters,
+            max_recommendations
+        )
+    
+    def _weights(self, role: str) -> Dict[str, float]:
+        """Scoring weights of a role under the current draft state."""
+        return self.engine.get_scoring_weights(role, self.team_context(role), self.base_weights)
+    
+    def _check_available(self, champion_id: int) -> None:
+        """Raise ValueError if a champion has been banned or picked."""
+        if champion_id in self.unavailable_champions:
+            raise ValueError(f"Champion {champion_id} has already been picked or banned")
+    
+    @staticmethod
+    def _check_role(role: str) -> None:
+        """Raise ValueError for roles outside the draft roles."""
+        if role not in DRAFT_ROLES:
+            raise ValueError(f"Role must be one of: {DRAFT_ROLES}")
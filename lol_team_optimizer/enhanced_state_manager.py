@@ -23,6 +23,10 @@ from .web_state_models import (
     CacheStrategy, SessionStatus, CacheStatistics, ShareableResult,
     PersistentStorage, SQLiteStorage, FileStorage
 )
+from .analytics_cache_manager import (
+    AnalyticsCacheManager, CacheEntry as AnalyticsCacheEntry, LRUCache,
+    NamespaceStatistics, cache_namespace
+)
 
 
 class CacheInvalidationManager:
@@ -86,28 +90,59 @@ class CacheInvalidationManager:
         return all_invalidated
 
 
+def key_prefixes(key: str) -> List[str]:
+    """Get the prefixes of a cache key that end on a '_' or ':' boundary, plus the key itself."""
+    prefixes = [key[:i] for i, char in enumerate(key) if char in '_:' and i > 0]
+    prefixes.append(key)
+    return prefixes
+
+
 class AdvancedCacheManager:
-    """Advanced caching system with multiple strategies and persistence."""
+    """
+    Web-facing cache on the analytics LRU tier.
+    
+    Entries live in an analytics_cache_manager.LRUCache, which is the shared
+    memory tier of the analytics engines when one is passed in, so results
+    cached by either side are served to the other. Every key is indexed under
+    its '_'/':' prefixes, making pattern invalidation a lookup rather than a
+    scan of all keys.
+    """
     
     def __init__(self, 
                  max_size_mb: int = 100,
                  default_ttl_seconds: int = 3600,
-                 persistent_storage: Optional[PersistentStorage] = None):
-        """Initialize advanced cache manager."""
+                 persistent_storage: Optional[PersistentStorage] = None,
+                 memory_cache: Optional[LRUCache] = None):
+        """
+        Initialize advanced cache manager.
+        
+        Args:
+            max_size_mb: Size limit of a private memory tier
+            default_ttl_seconds: TTL of entries stored without one
+            persistent_storage: Storage for entries that outlive the process
+            memory_cache: Memory tier to share, e.g. AnalyticsCacheManager.memory_cache
+        """
         self.max_size_bytes = max_size_mb * 1024 * 1024
         self.default_ttl_seconds = default_ttl_seconds
-        self.cache: Dict[str, CacheEntry] = {}
-        self.access_order = OrderedDict()  # For LRU tracking
+        self.memory_cache = memory_cache or LRUCache(max_size=100_000, max_size_bytes=self.max_size_bytes)
+        self.strategies: Dict[str, CacheStrategy] = {}  # keys stored through this manager
         self.persistent_storage = persistent_storage or SQLiteStorage()
         self.invalidation_manager = CacheInvalidationManager()
         self.statistics = CacheStatistics()
+        self.namespace_statistics: Dict[str, NamespaceStatistics] = {}
         self._lock = threading.RLock()
         self.logger = logging.getLogger(__name__)
+        self.memory_cache.add_eviction_listener(self._on_evicted)
         
         # Background cleanup thread
         self._cleanup_thread = threading.Thread(target=self._cleanup_loop, daemon=True)
         self._cleanup_thread.start()
     
+    def _on_evicted(self, key: str, entry: AnalyticsCacheEntry) -> None:
+        """Drop the persisted copy of an entry evicted to make room, so the size limit holds."""
+        if self.strategies.pop(key, None) is not None and self.persistent_storage:
+            self.persistent_storage.delete(f"cache_{key}")
+    
     def _cleanup_loop(self) -> None:
         """Background cleanup loop for expired entries."""
         while True:
@@ -120,41 +155,34 @@ class AdvancedCacheManager:
     def _cleanup_expired_entries(self) -> None:
         """Remove expired cache entries."""
         with self._lock:
-            expired_keys = []
-            for key, entry in self.cache.items():
-                if entry.is_expired:
-                    expired_keys.append(key)
-            
-            for key in expired_keys:
-                self._remove_entry(key)
-                self.statistics.eviction_count += 1
-    
-    def _remove_entry(self, key: str) -> None:
-        """Remove cache entry and update statistics."""
-        if key in self.cache:
-            entry = self.cache[key]
-            del self.cache[key]
-            self.access_order.pop(key, None)
-            self.statistics.total_entries -= 1
-            self.statistics.total_size_bytes -= entry.size_bytes
-    
-    def _evict_lru_entries(self, required_space: int) -> None:
-        """Evict least recently used entries to free space."""
-        freed_space = 0
-        while freed_space < required_space and self.access_order:
-            lru_key = next(iter(self.access_order))
-            entry = self.cache.get(lru_key)
-            if entry:
-                freed_space += entry.size_bytes
-                self._remove_entry(lru_key)
-                self.statistics.eviction_count += 1
-    
-    def _ensure_space(self, required_space: int) -> None:
-        """Ensure sufficient cache space is available."""
-        current_size = self.statistics.total_size_bytes
-        if current_size + required_space > self.max_size_bytes:
-            space_to_free = (current_size + required_space) - self.max_size_bytes
-            self._evict_lru_entries(space_to_free)
+            self.memory_cache.remove_expired()
+    
+    def _store(self, key: str, value: Any, created_at: datetime, ttl_seconds: Optional[int]) -> bool:
+        """Put a value in the memory tier, indexed under its key prefixes."""
+        entry = AnalyticsCacheEntry(
+            key=key,
+            data=value,
+            created_at=created_at,
+            last_accessed=datetime.now(),
+            ttl_seconds=ttl_seconds,
+            dependencies=[f"prefix:{prefix}" for prefix in key_prefixes(key)]
+        )
+        return self.memory_cache.put(key, entry)
+    
+    def _record_request(self, key: str, hit: bool, start_time: float) -> None:
+        """Update hit/miss counts and the access time average."""
+        namespace = self.namespace_statistics.setdefault(cache_namespace(key), NamespaceStatistics())
+        if hit:
+            self.statistics.hit_count += 1
+            namespace.hits += 1
+        else:
+            self.statistics.miss_count += 1
+            namespace.misses += 1
+        
+        access_time = (time.time() - start_time) * 1000
+        self.statistics.average_access_time_ms = (
+            (self.statistics.average_access_time_ms + access_time) / 2
+        )
     
     def put(self, 
             key: str, 
@@ -163,31 +191,13 @@ class AdvancedCacheManager:
             strategy: CacheStrategy = CacheStrategy.TTL,
             dependencies: Optional[List[str]] = None) -> bool:
         """Store value in cache with specified strategy."""
-        start_time = time.time()
-        
         try:
             with self._lock:
-                # Create cache entry
-                entry = CacheEntry(
-                    key=key,
-                    value=value,
-                    created_at=datetime.now(),
-                    last_accessed=datetime.now(),
-                    ttl_seconds=ttl_seconds or self.default_ttl_seconds,
-                    dependencies=dependencies or [],
-                    strategy=strategy
-                )
-                
-                # Ensure sufficient space
-                self._ensure_space(entry.size_bytes)
-                
-                # Store entry
-                self.cache[key] = entry
-                self.access_order[key] = True
-                
-                # Update statistics
-                self.statistics.total_entries += 1
-                self.statistics.total_size_bytes += entry.size_bytes
+                now = datetime.now()
+                ttl_seconds = ttl_seconds or self.default_ttl_seconds
+                if not self._store(key, value, now, ttl_seconds):
+                    return False
+                self.strategies[key] = strategy
                 
                 # Set up dependencies
                 if dependencies:
@@ -196,13 +206,17 @@ class AdvancedCacheManager:
                 
                 # Persist if storage available
                 if self.persistent_storage and strategy != CacheStrategy.MANUAL:
+                    entry = CacheEntry(
+                        key=key,
+                        value=value,
+                        created_at=now,
+                        last_accessed=now,
+                        ttl_seconds=ttl_seconds,
+                        dependencies=dependencies or [],
+                        strategy=strategy
+                    )
                     self.persistent_storage.save(f"cache_{key}", entry)
                 
-                access_time = (time.time() - start_time) * 1000
-                self.statistics.average_access_time_ms = (
-                    (self.statistics.average_access_time_ms + access_time) / 2
-                )
-                
                 return True
                 
         except Exception as e:
@@ -215,32 +229,22 @@ class AdvancedCacheManager:
         
         try:
             with self._lock:
-                entry = self.cache.get(key)
-                
-                if entry is None:
-                    # Try loading from persistent storage
-                    if self.persistent_storage:
-                        stored_entry = self.persistent_storage.load(f"cache_{key}")
-                        if stored_entry and not stored_entry.is_expired:
-                            self.cache[key] = stored_entry
-                            entry = stored_entry
-                
-                if entry is None or entry.is_expired:
-                    self.statistics.miss_count += 1
-                    return None
-                
-                # Update access information
-                entry.touch()
-                self.access_order.move_to_end(key)
-                
-                self.statistics.hit_count += 1
+                entry = self.memory_cache.get(key)
+                if entry is not None:
+                    self._record_request(key, True, start_time)
+                    return entry.data
                 
-                access_time = (time.time() - start_time) * 1000
-                self.statistics.average_access_time_ms = (
-                    (self.statistics.average_access_time_ms + access_time) / 2
-                )
+                # Try loading from persistent storage
+                if self.persistent_storage:
+                    stored_entry = self.persistent_storage.load(f"cache_{key}")
+                    if stored_entry and not stored_entry.is_expired:
+                        self._store(key, stored_entry.value, stored_entry.created_at, stored_entry.ttl_seconds)
+                        self.strategies[key] = stored_entry.strategy
+                        self._record_request(key, True, start_time)
+                        return stored_entry.value
                 
-                return entry.value
+                self._record_request(key, False, start_time)
+                return None
                 
         except Exception as e:
             self.logger.error(f"Failed to retrieve cached value for key {key}: {e}")
@@ -253,16 +257,24 @@ class AdvancedCacheManager:
             invalidated_keys = self.invalidation_manager.invalidate_key(key)
             
             for inv_key in invalidated_keys:
-                self._remove_entry(inv_key)
+                self.memory_cache.remove(inv_key)
+                self.strategies.pop(inv_key, None)
                 if self.persistent_storage:
                     self.persistent_storage.delete(f"cache_{inv_key}")
             
             return invalidated_keys
     
     def invalidate_pattern(self, pattern: str) -> Set[str]:
-        """Invalidate all keys matching pattern."""
+        """
+        Invalidate all keys starting with a prefix, and their dependents.
+        
+        Args:
+            pattern: Key prefix ending on a '_' or ':' boundary, e.g. "player_"
+                     or "user_123"; a trailing separator is optional
+        """
+        prefix = pattern.rstrip('_:') or pattern
         with self._lock:
-            matching_keys = [key for key in self.cache.keys() if pattern in key]
+            matching_keys = self.memory_cache.dependents_of(f"prefix:{prefix}")
             invalidated_keys = set()
             
             for key in matching_keys:
@@ -271,33 +283,51 @@ class AdvancedCacheManager:
             return invalidated_keys
     
     def clear(self) -> None:
-        """Clear all cache entries."""
+        """Clear all entries stored through this manager."""
         with self._lock:
-            self.cache.clear()
-            self.access_order.clear()
+            for key in self.strategies:
+                self.memory_cache.remove(key)
+            self.strategies.clear()
             self.statistics = CacheStatistics()
+            self.namespace_statistics = {}
             
             if self.persistent_storage:
                 cache_keys = self.persistent_storage.list_keys("cache_")
                 for key in cache_keys:
                     self.persistent_storage.delete(key)
     
+    def _live_strategies(self) -> Dict[str, CacheStrategy]:
+        """Strategies of this manager's keys still in the memory tier (evicted keys are dropped)."""
+        self.strategies = {key: strategy for key, strategy in self.strategies.items()
+                           if key in self.memory_cache}
+        return self.strategies
+    
     def get_statistics(self) -> CacheStatistics:
         """Get cache performance statistics."""
-        return self.statistics
+        with self._lock:
+            self.statistics.total_entries = len(self._live_strategies())
+            self.statistics.total_size_bytes = self.memory_cache.size_bytes
+            self.statistics.eviction_count = self.memory_cache.evictions
+            return self.statistics
     
     def get_cache_info(self) -> Dict[str, Any]:
         """Get detailed cache information."""
         with self._lock:
+            statistics = self.get_statistics()
+            strategies = self._live_strategies()
             return {
-                "total_entries": len(self.cache),
-                "total_size_mb": self.statistics.total_size_bytes / (1024 * 1024),
-                "hit_rate": self.statistics.hit_rate,
-                "average_access_time_ms": self.statistics.average_access_time_ms,
+                "total_entries": len(strategies),
+                "total_size_mb": statistics.total_size_bytes / (1024 * 1024),
+                "hit_rate": statistics.hit_rate,
+                "average_access_time_ms": statistics.average_access_time_ms,
                 "entries_by_strategy": {
-                    strategy.value: sum(1 for entry in self.cache.values() 
-                                      if entry.strategy == strategy)
+                    strategy.value: sum(1 for entry_strategy in strategies.values()
+                                        if entry_strategy == strategy)
                     for strategy in CacheStrategy
+                },
+                "namespaces": {
+                    namespace: {"hits": stats.hits, "misses": stats.misses, "hit_rate": stats.hit_rate}
+                    for namespace, stats in self.namespace_statistics.items()
                 }
             }
 
@@ -609,15 +639,25 @@ class EnhancedStateManager:
     def __init__(self,
                  cache_size_mb: int = 100,
                  max_sessions: int = 1000,
-                 persistent_storage: Optional[PersistentStorage] = None):
-        """Initialize enhanced state manager."""
+                 persistent_storage: Optional[PersistentStorage] = None,
+                 analytics_cache: Optional[AnalyticsCacheManager] = None):
+        """
+        Initialize enhanced state manager.
+        
+        Args:
+            cache_size_mb: Size limit of the cache when no analytics cache is shared
+            max_sessions: Maximum number of concurrent sessions
+            persistent_storage: Storage for sessions and cache entries
+            analytics_cache: Analytics cache whose memory tier the web cache shares
+        """
         self.logger = logging.getLogger(__name__)
         
         # Initialize components
         storage = persistent_storage or SQLiteStorage()
         self.cache_manager = AdvancedCacheManager(
             max_size_mb=cache_size_mb,
-            persistent_storage=storage
+            persistent_storage=storage,
+            memory_cache=analytics_cache.memory_cache if analytics_cache else None
         )
         self.session_manager = SessionManager(
             max_sessions=max_sessions,
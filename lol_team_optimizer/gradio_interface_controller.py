@@ -18,6 +18,7 @@ import gradio as gr
 from .core_engine import CoreEngine
 from .models import Player
 from .analytics_models import AnalyticsFilters, DateRange
+from .analytics_cache_manager import AnalyticsCacheManager
 from .enhanced_state_manager import EnhancedStateManager
 from .web_state_models import UserPreferences, OperationState
 
@@ -477,10 +478,12 @@ class GradioInterface:
         else:
             self.core_engine = core_engine
         
-        # Initialize enhanced state manager
+        # Initialize enhanced state manager on the engines' shared cache
+        analytics_cache = getattr(self.core_engine, 'analytics_cache_manager', None)
         self.enhanced_state_manager = EnhancedStateManager(
             cache_size_mb=100,
-            max_sessions=1000
+            max_sessions=1000,
+            analytics_cache=analytics_cache if isinstance(analytics_cache, AnalyticsCacheManager) else None
         )
         
         # Legacy managers for backward compatibility
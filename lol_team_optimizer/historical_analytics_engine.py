@@ -13,6 +13,8 @@ from dataclasses import dataclass, field
 from collections import defaultdict
 import statistics
 
+import numpy as np
+
 from .models import Match, MatchParticipant
 from .analytics_models import (
     AnalyticsFilters, PlayerAnalytics, ChampionPerformanceMetrics,
@@ -27,6 +29,7 @@ from .comparative_analyzer import (
     RoleSpecificRanking, ChampionSpecificRanking
 )
 from .analytics_batch_processor import AnalyticsBatchProcessor
+from .analytics_cache_manager import AnalyticsCacheManager, get_shared_cache_manager
 from .incremental_analytics_updater import IncrementalAnalyticsUpdater
 from .query_optimizer import QueryOptimizer
 from .config import Config
@@ -46,41 +49,6 @@ class ComparativeAnalytics:
     sample_sizes: Dict[str, int] = field(default_factory=dict)  # puuid -> sample_size
 
 
-class AnalyticsCacheManager:
-    """Simple cache manager for analytics operations."""
-    
-    def __init__(self, max_cache_size: int = 1000):
-        """Initialize cache manager."""
-        self.cache: Dict[str, Tuple[Any, datetime]] = {}
-        self.max_cache_size = max_cache_size
-        self.cache_ttl_minutes = 30
-    
-    def get(self, key: str) -> Optional[Any]:
-        """Get cached value if not expired."""
-        if key in self.cache:
-            value, timestamp = self.cache[key]
-            if datetime.now() - timestamp < timedelta(minutes=self.cache_ttl_minutes):
-                return value
-            else:
-                del self.cache[key]
-        return None
-    
-    def put(self, key: str, value: Any) -> None:
-        """Cache a value with timestamp."""
-        # Simple LRU eviction if cache is full
-        if len(self.cache) >= self.max_cache_size:
-            oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k][1])
-            del self.cache[oldest_key]
-        
-        self.cache[key] = (value, datetime.now())
-    
-    def invalidate(self, pattern: str) -> None:
-        """Invalidate cache entries matching pattern."""
-        keys_to_remove = [key for key in self.cache.keys() if pattern in key]
-        for key in keys_to_remove:
-            del self.cache[key]
-
-
 class HistoricalAnalyticsEngine:
     """
     Main analytics engine for processing historical match data.
@@ -99,27 +67,26 @@ class HistoricalAnalyticsEngine:
             config: Configuration object
             match_manager: MatchManager instance for data access
             baseline_manager: BaselineManager for baseline calculations
-            cache_manager: Optional AnalyticsCacheManager instance
+            cache_manager: Optional AnalyticsCacheManager instance (defaults to the shared one)
         """
         self.config = config
         self.match_manager = match_manager
         self.baseline_manager = baseline_manager
         self.statistical_analyzer = StatisticalAnalyzer()
+        self.query_optimizer = QueryOptimizer(config, match_manager)
         self.comparative_analyzer = ComparativeAnalyzer(config, match_manager, baseline_manager)
         
         # Initialize cache manager
         if cache_manager:
             self.cache_manager = cache_manager
         else:
-            from .analytics_cache_manager import AnalyticsCacheManager
-            self.cache_manager = AnalyticsCacheManager(config)
+            self.cache_manager = get_shared_cache_manager(config)
         
         # Initialize optimization components
         self.batch_processor = AnalyticsBatchProcessor(config, self, match_manager)
         self.incremental_updater = IncrementalAnalyticsUpdater(
             config, self, match_manager, self.cache_manager
         )
-        self.query_optimizer = QueryOptimizer(config, match_manager)
         
         self.logger = logging.getLogger(__name__)
         
@@ -149,7 +116,7 @@ class HistoricalAnalyticsEngine:
         """
         try:
             # Generate cache key
-            cache_key = f"player_analytics_{puuid}_{hash(str(filters))}"
+            cache_key = self._player_cache_key("player_analytics", puuid, filters=str(filters))
             cached_result = self.cache_manager.get_cached_analytics(cache_key)
             if cached_result:
                 self.logger.debug(f"Using cached player analytics for {puuid}")
@@ -210,7 +177,7 @@ class HistoricalAnalyticsEngine:
             )
             
             # Cache the result
-            self.cache_manager.cache_analytics(cache_key, analytics)
+            self._cache_player_result(cache_key, puuid, analytics)
             
             self.logger.info(f"Analyzed performance for {puuid} with {len(matches)} matches")
             return analytics
@@ -245,7 +212,9 @@ class HistoricalAnalyticsEngine:
         """
         try:
             # Generate cache key
-            cache_key = f"champion_analytics_{puuid}_{champion_id}_{role}_{hash(str(filters))}"
+            cache_key = self._player_cache_key(
+                "champion_analytics", puuid, champion_id=champion_id, role=role, filters=str(filters)
+            )
             cached_result = self.cache_manager.get_cached_analytics(cache_key)
             if cached_result:
                 self.logger.debug(f"Using cached champion analytics for {puuid}-{champion_id}-{role}")
@@ -308,7 +277,7 @@ class HistoricalAnalyticsEngine:
             )
             
             # Cache the result
-            self.cache_manager.cache_analytics(cache_key, champion_analytics)
+            self._cache_player_result(cache_key, puuid, champion_analytics)
             
             self.logger.info(f"Analyzed champion performance for {puuid}-{champion_id}-{role} with {len(matches)} matches")
             return champion_analytics
@@ -341,7 +310,7 @@ class HistoricalAnalyticsEngine:
         """
         try:
             # Generate cache key
-            cache_key = f"trends_{puuid}_{time_window_days}_{metric}"
+            cache_key = self._player_cache_key("trends", puuid, window=time_window_days, metric=metric)
             cached_result = self.cache_manager.get_cached_analytics(cache_key)
             if cached_result:
                 self.logger.debug(f"Using cached trend analysis for {puuid}")
@@ -374,7 +343,7 @@ class HistoricalAnalyticsEngine:
             )
             
             # Cache the result
-            self.cache_manager.cache_analytics(cache_key, trend_result)
+            self._cache_player_result(cache_key, puuid, trend_result)
             
             self.logger.info(f"Calculated trend analysis for {puuid} over {time_window_days} days")
             return trend_result
@@ -410,7 +379,9 @@ class HistoricalAnalyticsEngine:
                 metrics = ["win_rate", "avg_kda", "avg_cs_per_min", "avg_vision_score", "avg_damage_per_min"]
             
             # Generate cache key
-            cache_key = f"comprehensive_trends_{puuid}_{time_window_days}_{hash(tuple(metrics))}"
+            cache_key = self._player_cache_key(
+                "comprehensive_trends", puuid, window=time_window_days, metrics=metrics
+            )
             cached_result = self.cache_manager.get_cached_analytics(cache_key)
             if cached_result:
                 self.logger.debug(f"Using cached comprehensive trend analysis for {puuid}")
@@ -456,7 +427,7 @@ class HistoricalAnalyticsEngine:
                 raise AnalyticsError("No trends could be calculated for any metric")
             
             # Cache the result
-            self.cache_manager.cache_analytics(cache_key, trend_results)
+            self._cache_player_result(cache_key, puuid, trend_results)
             
             self.logger.info(f"Calculated comprehensive trend analysis for {puuid} across {len(trend_results)} metrics")
             return trend_results
@@ -496,7 +467,10 @@ class HistoricalAnalyticsEngine:
                 metrics = ["win_rate", "avg_kda", "avg_cs_per_min", "avg_vision_score"]
             
             # Generate cache key
-            cache_key = f"champion_trends_{puuid}_{champion_id}_{role}_{time_window_days}_{hash(tuple(metrics))}"
+            cache_key = self._player_cache_key(
+                "champion_trends", puuid, champion_id=champion_id, role=role,
+                window=time_window_days, metrics=metrics
+            )
             cached_result = self.cache_manager.get_cached_analytics(cache_key)
             if cached_result:
                 self.logger.debug(f"Using cached champion trend analysis for {puuid}-{champion_id}-{role}")
@@ -544,7 +518,7 @@ class HistoricalAnalyticsEngine:
                 raise AnalyticsError("No champion trends could be calculated for any metric")
             
             # Cache the result
-            self.cache_manager.cache_analytics(cache_key, trend_results)
+            self._cache_player_result(cache_key, puuid, trend_results)
             
             self.logger.info(f"Calculated champion trend analysis for {puuid}-{champion_id}-{role} across {len(trend_results)} metrics")
             return trend_results
@@ -577,7 +551,9 @@ class HistoricalAnalyticsEngine:
         """
         try:
             # Generate cache key
-            cache_key = f"meta_shifts_{puuid}_{time_window_days}_{shift_detection_window}"
+            cache_key = self._player_cache_key(
+                "meta_shifts", puuid, window=time_window_days, shift_window=shift_detection_window
+            )
             cached_result = self.cache_manager.get_cached_analytics(cache_key)
             if cached_result:
                 self.logger.debug(f"Using cached meta shift analysis for {puuid}")
@@ -622,7 +598,7 @@ class HistoricalAnalyticsEngine:
             }
             
             # Cache the result
-            self.cache_manager.cache_analytics(cache_key, results)
+            self._cache_player_result(cache_key, puuid, results)
             
             self.logger.info(f"Detected meta shifts for {puuid} over {time_window_days} days")
             return results
@@ -658,7 +634,9 @@ class HistoricalAnalyticsEngine:
                 metrics = ["win_rate", "avg_kda", "avg_cs_per_min"]
             
             # Generate cache key
-            cache_key = f"seasonal_patterns_{puuid}_{time_window_days}_{hash(tuple(metrics))}"
+            cache_key = self._player_cache_key(
+                "seasonal_patterns", puuid, window=time_window_days, metrics=metrics
+            )
             cached_result = self.cache_manager.get_cached_analytics(cache_key)
             if cached_result:
                 self.logger.debug(f"Using cached seasonal pattern analysis for {puuid}")
@@ -720,7 +698,7 @@ class HistoricalAnalyticsEngine:
             }
             
             # Cache the result
-            self.cache_manager.cache_analytics(cache_key, results)
+            self._cache_player_result(cache_key, puuid, results)
             
             self.logger.info(f"Identified seasonal patterns for {puuid} across {len(seasonal_results)} metrics")
             return results
@@ -758,7 +736,10 @@ class HistoricalAnalyticsEngine:
                 metrics = ["win_rate", "avg_kda", "avg_cs_per_min"]
             
             # Generate cache key
-            cache_key = f"performance_predictions_{puuid}_{prediction_days}_{historical_window_days}_{hash(tuple(metrics))}"
+            cache_key = self._player_cache_key(
+                "performance_predictions", puuid, prediction_days=prediction_days,
+                window=historical_window_days, metrics=metrics
+            )
             cached_result = self.cache_manager.get_cached_analytics(cache_key)
             if cached_result:
                 self.logger.debug(f"Using cached performance predictions for {puuid}")
@@ -809,7 +790,7 @@ class HistoricalAnalyticsEngine:
             }
             
             # Cache the result
-            self.cache_manager.cache_analytics(cache_key, results)
+            self._cache_player_result(cache_key, puuid, results)
             
             self.logger.info(f"Generated performance predictions for {puuid} across {len(predictions)} metrics")
             return results
@@ -1052,55 +1033,37 @@ class HistoricalAnalyticsEngine:
                 raise
             raise AnalyticsError(f"Failed to generate comparative analysis: {e}")
     
+    def _player_cache_key(self, analysis: str, puuid: str, **params) -> str:
+        """
+        Build the cache key of a per-player analysis.
+        
+        Keys are namespaced by analysis and stable across processes, so the
+        shared cache serves them to every engine.
+        """
+        return self.cache_manager.generate_cache_key(analysis, puuid=puuid, **params)
+    
+    def _cache_player_result(self, cache_key: str, puuid: str, result: Any) -> None:
+        """Cache a per-player analysis, invalidated with the player's ``puuid:`` dependency."""
+        self.cache_manager.cache_analytics(cache_key, result, dependencies=[f"puuid:{puuid}"])
+    
     def _get_filtered_matches(
         self,
         puuid: str,
         filters: Optional[AnalyticsFilters]
     ) -> List[Tuple[Match, MatchParticipant]]:
-        """Get matches for a player with applied filters."""
-        all_matches = self.match_manager.get_matches_for_player(puuid)
-        filtered_matches = []
-        
-        for match in all_matches:
-            participant = match.get_participant_by_puuid(puuid)
-            if not participant:
-                continue
-            
-            # Apply filters
-            if filters:
-                # Date range filter
-                if filters.date_range:
-                    match_date = match.game_creation_datetime
-                    if not filters.date_range.contains(match_date):
-                        continue
-                
-                # Champion filter
-                if filters.champions and participant.champion_id not in filters.champions:
-                    continue
-                
-                # Role filter
-                if filters.roles:
-                    normalized_role = self._normalize_role(participant.individual_position)
-                    if normalized_role not in filters.roles:
-                        continue
-                
-                # Queue type filter
-                if filters.queue_types and match.queue_id not in filters.queue_types:
-                    continue
-                
-                # Win only filter
-                if filters.win_only is not None and participant.win != filters.win_only:
-                    continue
-                
-                # Teammates filter
-                if filters.teammates:
-                    match_puuids = {p.puuid for p in match.participants}
-                    if not any(teammate in match_puuids for teammate in filters.teammates):
-                        continue
-            
-            filtered_matches.append((match, participant))
+        """Get matches for a player with applied filters, via the query optimizer."""
+        return self.query_optimizer.execute_player_query(puuid, filters)
+    
+    def _participant_rows(self, matches: List[Tuple[Match, MatchParticipant]]) -> np.ndarray:
+        """
+        Find the participant table rows of one player's (match, participant) pairs.
         
-        return filtered_matches
+        Returns:
+            Array of row indices; row ``i`` belongs to ``matches[i]``
+        """
+        table = self.match_manager.participant_table
+        rows = table.rows_for_matches(match.match_id for match, _ in matches)
+        return table.select(puuid=matches[0][1].puuid, rows=rows)
     
     def _calculate_performance_metrics(
         self,
@@ -1110,62 +1073,27 @@ class HistoricalAnalyticsEngine:
         if not matches:
             return PerformanceMetrics()
         
-        total_games = len(matches)
-        total_wins = sum(1 for _, participant in matches if participant.win)
-        total_kills = sum(participant.kills for _, participant in matches)
-        total_deaths = sum(participant.deaths for _, participant in matches)
-        total_assists = sum(participant.assists for _, participant in matches)
-        total_cs = sum(participant.cs_total for _, participant in matches)
-        total_vision = sum(participant.vision_score for _, participant in matches)
-        total_damage = sum(participant.total_damage_dealt_to_champions for _, participant in matches)
-        total_gold = sum(participant.gold_earned for _, participant in matches)
-        total_duration = sum(match.game_duration for match, _ in matches)
-        
-        # Calculate derived metrics
-        win_rate = total_wins / total_games
-        avg_kda = (total_kills + total_assists) / max(total_deaths, 1)
-        avg_cs_per_min = total_cs / (total_duration / 60) if total_duration > 0 else 0
-        avg_vision_score = total_vision / total_games
-        avg_damage_per_min = total_damage / (total_duration / 60) if total_duration > 0 else 0
-        avg_gold_per_min = total_gold / (total_duration / 60) if total_duration > 0 else 0
-        avg_game_duration = total_duration / (total_games * 60)
-        
-        return PerformanceMetrics(
-            games_played=total_games,
-            wins=total_wins,
-            losses=total_games - total_wins,
-            win_rate=win_rate,
-            total_kills=total_kills,
-            total_deaths=total_deaths,
-            total_assists=total_assists,
-            avg_kda=avg_kda,
-            total_cs=total_cs,
-            avg_cs_per_min=avg_cs_per_min,
-            total_vision_score=total_vision,
-            avg_vision_score=avg_vision_score,
-            total_damage_to_champions=total_damage,
-            avg_damage_per_min=avg_damage_per_min,
-            total_gold_earned=total_gold,
-            avg_gold_per_min=avg_gold_per_min,
-            total_game_duration=total_duration,
-            avg_game_duration=avg_game_duration
-        )
+        table = self.match_manager.participant_table
+        return table.totals(self._participant_rows(matches)).to_performance_metrics()
     
     def _calculate_role_performance(
         self,
         matches: List[Tuple[Match, MatchParticipant]]
     ) -> Dict[str, PerformanceMetrics]:
         """Calculate performance metrics by role."""
-        role_matches = defaultdict(list)
+        if not matches:
+            return {}
         
-        for match, participant in matches:
-            role = self._normalize_role(participant.individual_position)
-            role_matches[role].append((match, participant))
+        table = self.match_manager.participant_table
+        rows = self._participant_rows(matches)
+        role_codes = table.column('role', rows)
         
         role_performance = {}
-        for role, role_match_list in role_matches.items():
-            if len(role_match_list) >= self.min_games_for_analysis:
-                role_performance[role] = self._calculate_performance_metrics(role_match_list)
+        for code in np.unique(role_codes):
+            role_rows = rows[role_codes == code]
+            if len(role_rows) >= self.min_games_for_analysis:
+                role = table.roles(role_rows[:1])[0]
+                role_performance[role] = table.totals(role_rows).to_performance_metrics()
         
         return role_performance
     
@@ -1175,15 +1103,19 @@ class HistoricalAnalyticsEngine:
         puuid: str
     ) -> Dict[int, ChampionPerformanceMetrics]:
         """Calculate performance metrics by champion."""
-        champion_matches = defaultdict(list)
+        if not matches:
+            return {}
         
-        for match, participant in matches:
-            champion_matches[participant.champion_id].append((match, participant))
+        table = self.match_manager.participant_table
+        rows = self._participant_rows(matches)
+        champions = table.column('champion', rows)
         
         champion_performance = {}
-        for champion_id, champion_match_list in champion_matches.items():
-            if len(champion_match_list) >= self.min_games_for_analysis:
-                performance = self._calculate_performance_metrics(champion_match_list)
+        for champion_id in np.unique(champions).tolist():
+            positions = np.flatnonzero(champions == champion_id)
+            if len(positions) >= self.min_games_for_analysis:
+                champion_match_list = [matches[position] for position in positions]
+                performance = table.totals(rows[positions]).to_performance_metrics()
                 
                 # Get champion name and role from first match
                 first_match, first_participant = champion_match_list[0]
@@ -1812,7 +1744,7 @@ class HistoricalAnalyticsEngine:
                             consistency_confidence * 0.3)
         
         return {metric: overall_confidence for metric in metrics}    
-
+    
     # Optimized Analytics Methods
     
     def batch_analyze_multiple_players(
@@ -1981,99 +1913,3 @@ class HistoricalAnalyticsEngine:
         except Exception as e:
             self.logger.error(f"Failed to cleanup optimization data: {e}")
             return {}
-    
-    def _get_filtered_matches_optimized(
-        self,
-        puuid: str,
-        filters: Optional[AnalyticsFilters]
-    ) -> List[Tuple[Match, MatchParticipant]]:
-        """
-        Get matches for a player with filters applied using optimized queries.
-        
-        Args:
-            puuid: Player's PUUID
-            filters: Optional filters to apply
-            
-        Returns:
-            List of (match, participant) tuples
-        """
-        try:
-            # Use query optimizer for efficient filtering
-            if filters:
-                # Add player filter if not already present
-                if not filters.player_puuids:
-                    filters.player_puuids = [puuid]
-                elif puuid not in filters.player_puuids:
-                    filters.player_puuids.append(puuid)
-                
-                # Execute optimized query
-                matches = self.query_optimizer.execute_optimized_query(filters, "player_matches")
-            else:
-                # Fallback to match manager
-                matches = self.match_manager.get_matches_for_player(puuid)
-            
-            # Convert to (match, participant) tuples
-            filtered_matches = []
-            for match in matches:
-                participant = match.get_participant_by_puuid(puuid)
-                if participant:
-                    filtered_matches.append((match, participant))
-            
-            return filtered_matches
-            
-        except Exception as e:
-            self.logger.warning(f"Query optimization failed, falling back to basic filtering: {e}")
-            # Fallback to original implementation
-            matches = self.match_manager.get_matches_for_player(puuid)
-            
-            filtered_matches = []
-            for match in matches:
-                participant = match.get_participant_by_puuid(puuid)
-                if participant and self._match_passes_filters(match, participant, filters):
-                    filtered_matches.append((match, participant))
-            
-            return filtered_matches
-    
-    def _match_passes_filters(
-        self,
-        match: Match,
-        participant: MatchParticipant,
-        filters: Optional[AnalyticsFilters]
-    ) -> bool:
-        """
-        Check if a match passes the given filters.
-        
-        Args:
-            match: Match to check
-            participant: Participant to check
-            filters: Filters to apply
-            
-        Returns:
-            True if match passes all filters
-        """
-        if not filters:
-            return True
-        
-        # Date filter
-        if filters.date_range:
-            match_date = datetime.fromtimestamp(match.game_creation / 1000)
-            if not filters.date_range.contains(match_date):
-                return False
-        
-        # Champion filter
-        if filters.champions and participant.champion_id not in filters.champions:
-            return False
-        
-        # Role filter
-        if filters.roles and participant.individual_position.lower() not in [r.lower() for r in filters.roles]:
-            return False
-        
-        # Queue filter
-        if filters.queue_types and match.queue_id not in filters.queue_types:
-            return False
-        
-        # Win filter
-        if filters.win_only is not None and participant.win != filters.win_only:
-            return False
-        
-        return True
\ No newline at end of file
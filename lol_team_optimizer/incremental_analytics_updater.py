@@ -504,20 +504,11 @@ class IncrementalAnalyticsUpdater:
             player_puuid: Player's PUUID
         """
         try:
-            # Invalidate player-specific cache entries
-            patterns = [
-                f"*{player_puuid}*",
-                f"player_analytics_{player_puuid}*",
-                f"champion_analytics_{player_puuid}*",
-                f"trends_{player_puuid}*",
-                f"baseline_{player_puuid}*"
-            ]
-            
-            for pattern in patterns:
-                invalidated_count = self.cache_manager.invalidate_cache(pattern)
-                if invalidated_count > 0:
-                    self.logger.debug(f"Invalidated {invalidated_count} cache entries matching {pattern}")
-                    
+            # Player analyses are cached with a puuid dependency (see HistoricalAnalyticsEngine)
+            invalidated_count = self.cache_manager.invalidate_dependency(f"puuid:{player_puuid}")
+            if invalidated_count > 0:
+                self.logger.debug(f"Invalidated {invalidated_count} cache entries for {player_puuid}")
+                
         except Exception as e:
             self.logger.warning(f"Failed to invalidate cache for {player_puuid}: {e}")
     
@@ -0,0 +1,337 @@
+"""
+Memory-mapped snapshots of the analytics match index.
+
+A snapshot holds every posting list of the query optimizer's MatchIndex as
+a sorted array of dense match numbers ("docs"). Each index is stored in CSR
+layout: sorted integer key codes, offsets into a postings array, and the
+postings themselves. The per-match facts the query executor checks are
+stored as columns next to them.
+
+The file is a small JSON header followed by raw, 64-byte aligned arrays.
+Opening a snapshot only maps the file. Lookups binary-search the key
+arrays, so opening a snapshot costs the same however many matches it holds.
+
+Every snapshot records the match store position it reflects. Its owner
+applies the matches written after that position on top of it.
+"""
+
+import json
+import logging
+import os
+import struct
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+_MAGIC = b"LTOMIDX\0"
+_PREAMBLE = struct.Struct("<8sQ")  # magic, header length
+_ALIGNMENT = 64
+
+# Fields making up the key of each stored index, in key tuple order
+INDEX_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'by_player': ('player',),
+    'by_champion': ('champion',),
+    'by_role': ('role',),
+    'by_queue': ('queue',),
+    'by_player_champion': ('player', 'champion'),
+    'by_player_role': ('player', 'role'),
+    'by_champion_role': ('champion', 'role'),
+    'by_player_champion_role': ('player', 'champion', 'role'),
+}
+
+# Bit position of each field inside a composite key code
+_FIELD_SHIFTS = {'player': 28, 'champion': 8, 'role': 0, 'queue': 0}
+_CHAMPION_LIMIT = 1 << 20
+_ROLE_LIMIT = 1 << 8
+
+# (match_id, game_creation, queue_id, ((puuid, champion_id, role, win), ...))
+SnapshotEntry = Tuple[str, int, int, Sequence[Tuple[str, int, str, bool]]]
+
+logger = logging.getLogger(__name__)
+
+
+def _csr_postings(codes: np.ndarray, docs: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Group (key code, doc) pairs into sorted keys, offsets and deduplicated postings."""
+    order = np.lexsort((docs, codes))
+    codes, docs = codes[order], docs[order]
+    keep = np.ones(codes.size, dtype=bool)
+    keep[1:] = (codes[1:] != codes[:-1]) | (docs[1:] != docs[:-1])
+    codes, docs = codes[keep], docs[keep]
+    
+    keys, starts = np.unique(codes, return_index=True)
+    offsets = np.append(starts, codes.size).astype(np.int64)
+    return keys.astype(np.int64), offsets, docs.astype(np.int32)
+
+
+def write_snapshot(path: Path, entries: Iterable[SnapshotEntry], store_position: Dict[str, Any]) -> int:
+    """
+    Write a snapshot of index entries, replacing any previous file atomically.
+    
+    Args:
+        path: Snapshot file
+        entries: Index entries of every live match
+        store_position: Match store position the entries reflect
+    
+    Returns:
+        Number of matches written
+    
+    Raises:
+        ValueError: If a champion ID or the number of roles cannot be encoded
+    """
+    entries = sorted(entries, key=itemgetter(0))
+    n_matches = len(entries)
+    
+    counts = np.fromiter((len(entry[3]) for entry in entries), dtype=np.int64, count=n_matches)
+    participant_offsets = np.zeros(n_matches + 1, dtype=np.int64)
+    np.cumsum(counts, out=participant_offsets[1:])
+    rows = [participant for entry in entries for participant in entry[3]]
+    
+    players, player_codes = np.unique(
+        np.array([row[0].encode('utf-8') for row in rows], dtype=np.bytes_), return_inverse=True
+    )
+    roles, role_codes = np.unique(np.array([row[2] for row in rows], dtype=np.str_), return_inverse=True)
+    champions = np.array([row[1] for row in rows], dtype=np.int64)
+    if champions.size and (champions.min() < 0 or champions.max() >= _CHAMPION_LIMIT):
+        raise ValueError("Champion IDs must be in [0, 2**20) to be stored in an index snapshot")
+    if roles.size > _ROLE_LIMIT:
+        raise ValueError(f"At most {_ROLE_LIMIT} distinct roles can be stored in an index snapshot")
+    
+    creation = np.array([entry[1] for entry in entries], dtype=np.int64)
+    queues = np.array([entry[2] for entry in entries], dtype=np.int64)
+    time_docs = np.argsort(creation, kind='stable').astype(np.int32)
+    
+    arrays: Dict[str, np.ndarray] = {
+        'match_ids': np.array([entry[0].encode('utf-8') for entry in entries], dtype=np.bytes_),
+        'creation': creation,
+        'queue': queues,
+        'time_values': creation[time_docs],
+        'time_docs': time_docs,
+        'participant_offsets': participant_offsets,
+        'participant_player': player_codes.astype(np.int32),
+        'participant_champion': champions.astype(np.int32),
+        'participant_role': role_codes.astype(np.uint8),
+        'participant_win': np.array([bool(row[3]) for row in rows], dtype=np.bool_),
+        'players': players,
+    }
+    
+    row_docs = np.repeat(np.arange(n_matches, dtype=np.int64), counts)
+    field_codes = {
+        'player': player_codes.astype(np.int64),
+        'champion': champions,
+        'role': role_codes.astype(np.int64),
+    }
+    for index_name, fields in INDEX_FIELDS.items():
+        if fields == ('queue',):
+            codes, docs = queues, np.arange(n_matches, dtype=np.int64)
+        else:
+            codes = np.zeros(len(rows), dtype=np.int64)
+            for field in fields:
+                codes |= field_codes[field] << _FIELD_SHIFTS[field]
+            docs = row_docs
+        arrays[f'{index_name}.keys'], arrays[f'{index_name}.offsets'], arrays[f'{index_name}.docs'] = \
+            _csr_postings(codes, docs)
+    
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        layout[name] = [array.dtype.str, list(array.shape), offset]
+        offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+    
+    header = json.dumps({
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'store_position': store_position,
+        'matches': n_matches,
+        'roles': roles.tolist(),
+        'arrays': layout
+    }).encode('utf-8')
+    data_start = -(-(_PREAMBLE.size + len(header)) // _ALIGNMENT) * _ALIGNMENT
+    
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix('.tmp')
+    with open(temp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(_MAGIC, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name][2])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(temp_path, path)
+    return n_matches
+
+
+class IndexSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file.
+    
+    Matches are addressed by doc number, their position in match ID order.
+    """
+    
+    def __init__(self, path: Path, header: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        """
+        Initialize the view; use `load` to open a file.
+        
+        Args:
+            path: Snapshot file
+            header: Decoded snapshot header
+            arrays: Mapped arrays by name
+        """
+        self.path = Path(path)
+        self.store_position: Dict[str, Any] = header['store_position']
+        self.match_count: int = header['matches']
+        self.roles: List[str] = header['roles']
+        self._role_codes = {role: code for code, role in enumerate(self.roles)}
+        self._arrays = arrays
+        self._match_ids = arrays['match_ids']
+        self._players = arrays['players']
+        self._participant_offsets = arrays['participant_offsets']
+    
+    @classmethod
+    def load(cls, path: Path) -> Optional['IndexSnapshot']:
+        """
+        Map a snapshot file.
+        
+        Args:
+            path: Snapshot file
+        
+        Returns:
+            The snapshot, or None when the file is missing, unreadable or
+            written in another format version
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+        
+        try:
+            with open(path, 'rb') as f:
+                magic, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+                if magic != _MAGIC:
+                    raise ValueError("not an index snapshot")
+                header = json.loads(f.read(header_length))
+            if header.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+                logger.info(f"Ignoring index snapshot {path.name} written in format "
+                            f"{header.get('format_version')}")
+                return None
+            
+            data_start = -(-(_PREAMBLE.size + header_length) // _ALIGNMENT) * _ALIGNMENT
+            mapped = np.memmap(path, dtype=np.uint8, mode='r')
+            arrays = {}
+            for name, (dtype, shape, offset) in header['arrays'].items():
+                dtype = np.dtype(dtype)
+                count = int(np.prod(shape))
+                start = data_start + offset
+                arrays[name] = mapped[start:start + count * dtype.itemsize].view(dtype).reshape(shape)
+            return cls(path, header, arrays)
+        
+        except (OSError, ValueError, KeyError, TypeError, struct.error) as e:
+            logger.warning(f"Unreadable index snapshot {path.name}: {e}")
+            return None
+    
+    def _key_code(self, index_name: str, key: Any) -> Optional[int]:
+        """Encode an index key, or None when no stored match has it."""
+        fields = INDEX_FIELDS[index_name]
+        values = key if len(fields) > 1 else (key,)
+        code = 0
+        for field, value in zip(fields, values):
+            if field == 'player':
+                part = self._player_code(value)
+            elif field == 'role':
+                part = self._role_codes.get(value)
+            elif field == 'champion':
+                part = int(value) if 0 <= value < _CHAMPION_LIMIT else None
+            else:
+                part = int(value)
+            if part is None:
+                return None
+            code |= part << _FIELD_SHIFTS[field]
+        return code
+    
+    def _player_code(self, puuid: str) -> Optional[int]:
+        encoded = puuid.encode('utf-8')
+        position = int(np.searchsorted(self._players, encoded))
+        if position < self._players.size and self._players[position] == encoded:
+            return position
+        return None
+    
+    def _posting_range(self, index_name: str, key: Any) -> Tuple[int, int]:
+        code = self._key_code(index_name, key)
+        if code is None:
+            return 0, 0
+        keys = self._arrays[f'{index_name}.keys']
+        position = int(np.searchsorted(keys, code))
+        if position == keys.size or keys[position] != code:
+            return 0, 0
+        offsets = self._arrays[f'{index_name}.offsets']
+        return int(offsets[position]), int(offsets[position + 1])
+    
+    def docs(self, index_name: str, key: Any) -> np.ndarray:
+        """Sorted docs of the matches posted under one key of an index."""
+        start, stop = self._posting_range(index_name, key)
+        return self._arrays[f'{index_name}.docs'][start:stop]
+    
+    def count(self, index_name: str, key: Any) -> int:
+        """Number of matches posted under one key of an index."""
+        start, stop = self._posting_range(index_name, key)
+        return stop - start
+    
+    def key_count(self, index_name: str) -> int:
+        """Number of distinct keys of an index."""
+        return int(self._arrays[f'{index_name}.keys'].size)
+    
+    def time_docs(self, start_ms: int, end_ms: int) -> np.ndarray:
+        """Docs of the matches created within [start_ms, end_ms]."""
+        times = self._arrays['time_values']
+        lo = int(np.searchsorted(times, start_ms, side='left'))
+        hi = int(np.searchsorted(times, end_ms, side='right'))
+        return self._arrays['time_docs'][lo:hi]
+    
+    def doc_of(self, match_id: str) -> Optional[int]:
+        """Doc of a match, or None when the snapshot does not hold it."""
+        encoded = match_id.encode('utf-8')
+        position = int(np.searchsorted(self._match_ids, encoded))
+        if position < self._match_ids.size and self._match_ids[position] == encoded:
+            return position
+        return None
+    
+    def match_ids(self, docs: Optional[np.ndarray] = None) -> List[str]:
+        """Match IDs of some docs (all matches by default)."""
+        values = self._match_ids if docs is None else self._match_ids[docs]
+        return [value.decode('utf-8') for value in values.tolist()]
+    
+    def creation_times(self) -> np.ndarray:
+        """game_creation of every doc."""
+        return self._arrays['creation']
+    
+    def participant_count(self, doc: Optional[int] = None) -> int:
+        """Number of participants of one doc (of all docs by default)."""
+        if doc is None:
+            return int(self._participant_offsets[-1])
+        return int(self._participant_offsets[doc + 1] - self._participant_offsets[doc])
+    
+    def facts(self, doc: int) -> Tuple[int, int, Tuple[Tuple[str, int, str, bool], ...]]:
+        """(game_creation, queue_id, participant facts) of a doc."""
+        start, stop = int(self._participant_offsets[doc]), int(self._participant_offsets[doc + 1])
+        participants = tuple(
+            (self._players[player].decode('utf-8'), champion, self.roles[role], win)
+            for player, champion, role, win in zip(
+                self._arrays['participant_player'][start:stop].tolist(),
+                self._arrays['participant_champion'][start:stop].tolist(),
+                self._arrays['participant_role'][start:stop].tolist(),
+                self._arrays['participant_win'][start:stop].tolist()
+            )
+        )
+        return int(self._arrays['creation'][doc]), int(self._arrays['queue'][doc]), participants
+    
+    def entries(self, skip: Set[str] = frozenset()) -> Iterator[SnapshotEntry]:
+        """Yield the index entry of every doc whose match ID is not in `skip`."""
+        for doc, match_id in enumerate(self.match_ids()):
+            if match_id not in skip:
+                creation, queue_id, participants = self.facts(doc)
+                yield match_id, creation, queue_id, participants
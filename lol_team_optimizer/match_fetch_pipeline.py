@@ -0,0 +1,132 @@
+"""
+Concurrent match fetching pipeline.
+
+This module fetches match histories and match details from the Riot API on
+a bounded pool of worker threads and stores the results in batches through
+the centralized match manager. All workers share the API client's rate
+limiter, so throughput approaches the application rate limit instead of
+being bound by request round trips.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .riot_client import RiotAPIClient
+from .match_manager import MatchManager
+
+
+@dataclass
+class FetchResult:
+    """Outcome of a fetch-and-store run."""
+    requested: int = 0
+    already_stored: int = 0
+    fetched: int = 0
+    new_matches: int = 0
+    duplicates_skipped: int = 0
+    stored_match_ids: List[str] = field(default_factory=list)
+    failed_match_ids: List[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    
+    @property
+    def matches_per_second(self) -> float:
+        """Fetched matches per second of wall time."""
+        return self.fetched / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+class MatchFetchPipeline:
+    """
+    Fetches match data concurrently and stores it in batches.
+    
+    Match details are requested on the API client's worker pool and handed
+    to MatchManager.store_matches_batch every store_batch_size matches, on
+    the calling thread, so the match store itself is never written from
+    several threads.
+    """
+    
+    def __init__(self, riot_client: RiotAPIClient, match_manager: MatchManager,
+                 store_batch_size: int = 100, max_workers: Optional[int] = None):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            riot_client: API client whose rate limiter and in-flight bound are shared
+            match_manager: Match manager that receives fetched matches
+            store_batch_size: Matches buffered before each store_matches_batch call
+            max_workers: Worker threads (defaults to the client's max_concurrent_requests)
+        """
+        if store_batch_size <= 0:
+            raise ValueError("Store batch size must be positive")
+        
+        self.riot_client = riot_client
+        self.match_manager = match_manager
+        self.store_batch_size = store_batch_size
+        self.max_workers = max_workers
+        self.logger = logging.getLogger(__name__)
+    
+    def fetch_match_histories(self, requests_by_puuid: Dict[str, Tuple[int, int]],
+                              queue: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Fetch one page of match history for each player concurrently.
+        
+        Args:
+            requests_by_puuid: Mapping of PUUID to (start, count)
+            queue: Queue ID to filter by (optional)
+        
+        Returns:
+            Dictionary mapping PUUID to match IDs; players whose request failed are omitted
+        """
+        return self.riot_client.get_match_history_batch(requests_by_puuid, queue=queue,
+                                                        max_workers=self.max_workers)
+    
+    def fetch_and_store(self, match_ids: Iterable[str]) -> FetchResult:
+        """
+        Fetch details for matches not yet stored and store them in batches.
+        
+        Args:
+            match_ids: Match identifiers; duplicates and stored matches are skipped
+        
+        Returns:
+            FetchResult describing the run
+        """
+        start_time = time.monotonic()
+        result = FetchResult()
+        
+        unique_ids = list(dict.fromkeys(match_ids))
+        result.requested = len(unique_ids)
+        to_fetch = [match_id for match_id in unique_ids if not self.match_manager.has_match(match_id)]
+        result.already_stored = result.requested - len(to_fetch)
+        
+        buffer: List[Dict[str, Any]] = []
+        for match_id, match_data in self.riot_client.iter_match_details(to_fetch, self.max_workers):
+            if not match_data:
+                result.failed_match_ids.append(match_id)
+                continue
+            
+            result.fetched += 1
+            buffer.append(match_data)
+            if len(buffer) >= self.store_batch_size:
+                self._store(buffer, result)
+                buffer = []
+        
+        if buffer:
+            self._store(buffer, result)
+        
+        result.elapsed_seconds = time.monotonic() - start_time
+        self.logger.info(
+            f"Fetched {result.fetched} of {len(to_fetch)} matches in {result.elapsed_seconds:.1f}s "
+            f"({result.matches_per_second:.1f}/s), stored {result.new_matches} new"
+        )
+        return result
+    
+    def _store(self, matches_data: List[Dict[str, Any]], result: FetchResult) -> None:
+        """Store a buffered batch and record which matches were new."""
+        candidate_ids = [match_data.get('metadata', {}).get('matchId') for match_data in matches_data]
+        new_count, duplicate_count = self.match_manager.store_matches_batch(matches_data)
+        result.new_matches += new_count
+        result.duplicates_skipped += duplicate_count
+        result.stored_match_ids.extend(
+            match_id for match_id in dict.fromkeys(candidate_ids)
+            if match_id and self.match_manager.has_match(match_id)
+        )
@@ -0,0 +1,475 @@
+"""
+Streaming bulk import of raw Riot match dumps.
+
+This module ingests archives of match-v5 JSON written by other tooling:
+JSONL files with one match per line, single-match (or match list) .json
+files, and gzip-compressed versions of either. Records are decoded one at a
+time, match lists element by element as the file is read, and handed to
+MatchManager.store_matches_batch in large batches, so memory is bounded by
+the batch size rather than by the archive. Matches
+already in the store are recognised from their match ID before the record
+is decoded.
+"""
+
+import argparse
+import codecs
+import gzip
+import json
+import logging
+import os
+import re
+import sys
+import time
+import zlib
+from collections import deque
+from itertools import chain
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from .config import load_config
+from .match_manager import MatchManager
+
+
+DUMP_SUFFIXES = ('.jsonl', '.ndjson', '.json')
+DECODE_CHUNK_SIZE = 200  # records per decode task
+READ_BLOCK_SIZE = 1 << 20  # bytes read at a time from .json match lists
+
+# The parts of a match-v5 record read by MatchManager._parse_riot_match_data;
+# everything else is dropped as soon as a record is decoded
+_INFO_FIELDS = ('gameCreation', 'gameDuration', 'gameEndTimestamp', 'gameMode', 'gameType',
+                'mapId', 'queueId', 'gameVersion')
+_PARTICIPANT_FIELDS = ('puuid', 'riotIdGameName', 'riotIdTagline', 'championId', 'championName',
+                       'teamId', 'role', 'lane', 'individualPosition', 'kills', 'deaths', 'assists',
+                       'totalDamageDealtToChampions', 'totalMinionsKilled', 'neutralMinionsKilled',
+                       'visionScore', 'goldEarned', 'win')
+
+# metadata.matchId is the only "matchId" key in a match-v5 record
+_MATCH_ID_PATTERN = re.compile(rb'"matchId"\s*:\s*"([^"]+)"')
+
+
+@dataclass
+class ImportResult:
+    """Outcome of a bulk import run."""
+    files: int = 0
+    bytes_read: int = 0
+    records_read: int = 0
+    new_matches: int = 0
+    duplicates_skipped: int = 0
+    invalid_records: int = 0
+    failed_records: int = 0
+    elapsed_seconds: float = 0.0
+    
+    @property
+    def records_per_second(self) -> float:
+        """Records read per second of wall time."""
+        return self.records_read / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+    
+    @property
+    def megabytes_per_second(self) -> float:
+        """Uncompressed megabytes read per second of wall time."""
+        return self.bytes_read / (1024 * 1024) / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+def iter_dump_files(paths: Iterable[Union[str, Path]]) -> Iterator[Path]:
+    """
+    Expand files and directories into the match dump files they contain.
+    
+    Args:
+        paths: Dump files or directories searched recursively
+    
+    Yields:
+        Dump files in name order within each directory
+    """
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(child for child in path.rglob('*') if child.is_file() and _is_dump_file(child))
+        else:
+            yield path
+
+
+def _is_dump_file(path: Path) -> bool:
+    """Whether a file name looks like a (possibly gzipped) match dump."""
+    name = path.name.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return name.endswith(DUMP_SUFFIXES)
+
+
+def _decode_record(record: Union[bytes, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Decode one record and prune it to the fields the match manager reads.
+    
+    Returns:
+        The pruned match-v5 record, or None unless the record is a match
+    """
+    if isinstance(record, bytes):
+        try:
+            record = json.loads(record)
+        except ValueError:
+            return None
+    if not isinstance(record, dict):
+        return None
+    metadata, info = record.get('metadata'), record.get('info')
+    if not isinstance(metadata, dict) or not metadata.get('matchId') or not isinstance(info, dict):
+        return None
+    participants, teams = info.get('participants', []), info.get('teams', [])
+    if not isinstance(participants, list) or not isinstance(teams, list):
+        return None
+    
+    try:
+        pruned_info = {name: info[name] for name in _INFO_FIELDS if name in info}
+        pruned_info['participants'] = [
+            {name: participant[name] for name in _PARTICIPANT_FIELDS if name in participant}
+            for participant in participants
+        ]
+        pruned_info['teams'] = [{'teamId': team.get('teamId', 0), 'win': team.get('win', False)} for team in teams]
+    except (TypeError, AttributeError):
+        return None
+    return {'metadata': {'matchId': metadata['matchId']}, 'info': pruned_info}
+
+
+def _decode_records(records: List[Union[bytes, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """Decode a chunk of records; runs in worker processes for parallel imports."""
+    return [_decode_record(record) for record in records]
+
+
+def _iter_json_array(blocks: Iterator[bytes]) -> Iterator[Any]:
+    """
+    Decode the elements of a top-level JSON array one at a time.
+    
+    Each element is decoded with JSONDecoder.raw_decode as soon as the blocks
+    read so far contain all of it, so memory holds one element and one block
+    rather than the whole array.
+    
+    Args:
+        blocks: UTF-8 bytes of the document in consecutive blocks
+    
+    Returns:
+        Iterator over the decoded elements
+    
+    Raises:
+        ValueError: If the document is not a well-formed JSON array; elements
+            before the damage have already been yielded
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer, position, eof = '', 0, False
+    
+    def read_more() -> bool:
+        """Append the next block to the unread part of the buffer; False at end of input."""
+        nonlocal buffer, position, eof
+        if eof:
+            return False
+        block = next(blocks, b'')
+        eof = not block
+        buffer = buffer[position:] + text.decode(block, final=eof)
+        position = 0
+        return True
+    
+    def next_char() -> str:
+        """Skip whitespace and return the next character, or '' at end of input."""
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n':
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not read_more():
+                return ''
+    
+    if next_char() != '[':
+        raise ValueError("expected a JSON array")
+    position += 1
+    if next_char() == ']':
+        return
+    
+    while True:
+        if not next_char():
+            raise ValueError("array ends before its closing bracket")
+        # An element running to the end of the buffer may continue in the next block
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+                if end < len(buffer) or eof:
+                    break
+            except ValueError:
+                if eof:
+                    raise
+            read_more()
+        position = end
+        yield element
+        
+        separator = next_char()
+        position += 1
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ValueError("expected ',' or ']' after an array element")
+
+
+def _open_dump(path: Path) -> BinaryIO:
+    """Open a dump file for binary reading, decompressing gzip transparently."""
+    if path.suffix.lower() == '.gz':
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+class MatchImporter:
+    """
+    Imports raw match-v5 dumps into the match store in large batches.
+    
+    Records are decoded in chunks, in worker processes when more than one
+    worker is configured, and pruned to the fields the match manager reads.
+    Chunks are collected in file order and stored on the calling thread
+    through the match manager, so the store sees one put_batch (and one
+    fsync, if enabled) per batch and every registered match listener sees
+    each batch once.
+    """
+    
+    def __init__(self, match_manager: MatchManager, batch_size: int = 5000, workers: int = 1,
+                 progress_callback: Optional[Callable[[ImportResult], None]] = None):
+        """
+        Initialize the importer.
+        
+        Args:
+            match_manager: Match manager that receives the imported matches
+            batch_size: Matches buffered before each store_matches_batch call
+            workers: Decode worker processes (0 = one per CPU, 1 = decode in this process)
+            progress_callback: Called with the running ImportResult after each batch
+        """
+        if batch_size <= 0:
+            raise ValueError("Import batch size must be positive")
+        if workers < 0:
+            raise ValueError("Import workers must not be negative")
+        if match_manager.read_only:
+            raise ValueError("Cannot import into a read-only match manager")
+        
+        self.match_manager = match_manager
+        self.batch_size = batch_size
+        self.workers = workers
+        self.progress_callback = progress_callback
+        self.logger = logging.getLogger(__name__)
+    
+    def import_paths(self, paths: Iterable[Union[str, Path]]) -> ImportResult:
+        """
+        Import every dump file under the given paths.
+        
+        Args:
+            paths: Dump files or directories searched recursively
+        
+        Returns:
+            ImportResult describing the run
+        """
+        run = _ImportRun(start_time=time.monotonic())
+        workers = self.workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        max_pending = workers * 2
+        
+        self.logger.info(f"Importing match dumps in batches of {self.batch_size} with {workers} decode workers")
+        try:
+            for path in iter_dump_files(paths):
+                run.result.files += 1
+                try:
+                    with _open_dump(path) as f:
+                        for record in self._iter_records(path, f, run.result):
+                            run.result.records_read += 1
+                            
+                            # Skip known matches without decoding them
+                            match_id = self._peek_match_id(record)
+                            if match_id is not None:
+                                if match_id in run.queued_ids or self._is_known(run, match_id):
+                                    run.result.duplicates_skipped += 1
+                                    continue
+                                run.queued_ids.add(match_id)
+                            
+                            run.chunk.append(record)
+                            run.chunk_ids.append(match_id)
+                            if len(run.chunk) >= DECODE_CHUNK_SIZE:
+                                self._submit_chunk(run, executor)
+                                while len(run.pending) > max_pending:
+                                    self._collect_chunk(run)
+                except (OSError, EOFError, zlib.error) as e:
+                    # A truncated archive keeps everything read before the damage
+                    self.logger.error(f"Failed to read {path}: {e}")
+                    run.result.invalid_records += 1
+            
+            if run.chunk:
+                self._submit_chunk(run, executor)
+            while run.pending:
+                self._collect_chunk(run)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        
+        if run.batch:
+            self._store(run)
+        
+        result = run.result
+        result.elapsed_seconds = time.monotonic() - run.start_time
+        self.logger.info(
+            f"Imported {result.new_matches} new matches from {result.records_read} records in "
+            f"{result.files} files in {result.elapsed_seconds:.1f}s ({result.records_per_second:.0f}/s, "
+            f"{result.megabytes_per_second:.1f} MB/s), skipped {result.duplicates_skipped} duplicates, "
+            f"{result.invalid_records} invalid and {result.failed_records} failed records"
+        )
+        return result
+    
+    def _iter_records(self, path: Path, f: BinaryIO, result: ImportResult) -> Iterator[Union[bytes, Any]]:
+        """Yield the raw JSON of each match in an open dump file, or the match itself once decoded."""
+        name = path.name.lower()
+        if name.endswith('.json') or name.endswith('.json.gz'):
+            # A whole-file document: one match, or a list of matches decoded as it is read
+            head = f.read(READ_BLOCK_SIZE)
+            result.bytes_read += len(head)
+            if not head.lstrip().startswith(b'['):
+                rest = f.read()
+                result.bytes_read += len(rest)
+                yield head + rest
+                return
+            try:
+                yield from _iter_json_array(chain([head], self._read_blocks(f, result)))
+            except ValueError as e:
+                # Matches before the damage are kept, as for truncated archives
+                self.logger.warning(f"Skipping the rest of {path}: {e}")
+                result.invalid_records += 1
+            return
+        
+        for line in f:
+            result.bytes_read += len(line)
+            if line.strip():
+                yield line
+    
+    @staticmethod
+    def _read_blocks(f: BinaryIO, result: ImportResult) -> Iterator[bytes]:
+        """Read the rest of an open file in blocks, counting the bytes read."""
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+            result.bytes_read += len(block)
+            yield block
+    
+    @staticmethod
+    def _peek_match_id(record: Union[bytes, Any]) -> Optional[str]:
+        """Find a record's match ID without decoding it, if it can be found."""
+        if not isinstance(record, bytes):
+            return None
+        found = _MATCH_ID_PATTERN.search(record)
+        return found.group(1).decode('utf-8', 'replace') if found is not None else None
+    
+    def _is_known(self, run: '_ImportRun', match_id: str) -> bool:
+        """Whether a match is already stored or waiting in the current batch."""
+        return match_id in run.batch_ids or self.match_manager.has_match(match_id)
+    
+    def _submit_chunk(self, run: '_ImportRun', executor: Optional[ProcessPoolExecutor]) -> None:
+        """Send the buffered chunk of records to be decoded."""
+        if executor is None:
+            decoded = _decode_records(run.chunk)
+        else:
+            decoded = executor.submit(_decode_records, run.chunk)
+        run.pending.append((decoded, run.chunk_ids))
+        run.chunk = []
+        run.chunk_ids = []
+    
+    def _collect_chunk(self, run: '_ImportRun') -> None:
+        """Add the oldest decoded chunk to the batch, storing the batch when it is full."""
+        decoded, chunk_ids = run.pending.popleft()
+        if isinstance(decoded, Future):
+            decoded = decoded.result()
+        run.queued_ids.difference_update(chunk_ids)
+        
+        for match_data in decoded:
+            if match_data is None:
+                run.result.invalid_records += 1
+                continue
+            
+            match_id = match_data['metadata']['matchId']
+            if self._is_known(run, match_id):
+                run.result.duplicates_skipped += 1
+                continue
+            
+            run.batch.append(match_data)
+            run.batch_ids.add(match_id)
+            if len(run.batch) >= self.batch_size:
+                self._store(run)
+    
+    def _store(self, run: '_ImportRun') -> None:
+        """Store the buffered batch and report progress."""
+        batch, result = run.batch, run.result
+        invalid: List[Dict[str, Any]] = []
+        new_count, duplicate_count = self.match_manager.store_matches_batch(batch, invalid=invalid)
+        result.new_matches += new_count
+        result.duplicates_skipped += duplicate_count
+        result.invalid_records += len(invalid)
+        # Records neither stored nor skipped were in a batch the store rejected
+        result.failed_records += len(batch) - new_count - duplicate_count - len(invalid)
+        result.elapsed_seconds = time.monotonic() - run.start_time
+        run.batch = []
+        run.batch_ids = set()
+        
+        if self.progress_callback is not None:
+            self.progress_callback(result)
+
+
+@dataclass
+class _ImportRun:
+    """Mutable state of one import_paths call."""
+    start_time: float
+    result: ImportResult = field(default_factory=ImportResult)
+    chunk: List[Union[bytes, Any]] = field(default_factory=list)  # records waiting to be decoded
+    chunk_ids: List[Optional[str]] = field(default_factory=list)
+    pending: Deque[Tuple[Any, List[Optional[str]]]] = field(default_factory=deque)  # chunks being decoded
+    queued_ids: Set[str] = field(default_factory=set)  # peeked IDs of records not yet decoded
+    batch: List[Dict[str, Any]] = field(default_factory=list)  # decoded matches waiting to be stored
+    batch_ids: Set[str] = field(default_factory=set)
+
+
+def print_import_progress(result: ImportResult) -> None:
+    """Print a one-line progress report."""
+    print(f"  {result.records_read:>10,} records  {result.new_matches:>10,} new  "
+          f"{result.duplicates_skipped:>9,} duplicates  {result.records_per_second:>8,.0f}/s  "
+          f"{result.megabytes_per_second:>6.1f} MB/s", flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for offline imports."""
+    parser = argparse.ArgumentParser(
+        description="League of Legends Team Optimizer - Match Dump Importer",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python -m lol_team_optimizer.match_importer dumps/
+  python -m lol_team_optimizer.match_importer matches-2024-01.jsonl.gz --batch-size 20000
+        """
+    )
+    parser.add_argument('paths', nargs='+', help='Dump files (.jsonl, .json, optionally .gz) or directories')
+    parser.add_argument('--batch-size', type=int, default=5000,
+                        help='Matches written per batch (default: 5000)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Decode worker processes (default: 0 = one per CPU)')
+    parser.add_argument('--data-dir', help='Data directory (default: DATA_DIRECTORY or ./data)')
+    args = parser.parse_args(argv)
+    
+    try:
+        config = load_config()
+        if args.data_dir:
+            config = replace(config, data_directory=args.data_dir)
+        
+        importer = MatchImporter(MatchManager(config), batch_size=args.batch_size, workers=args.workers,
+                                 progress_callback=print_import_progress)
+        print(f"Importing match dumps into {config.data_directory}...")
+        result = importer.import_paths(args.paths)
+    except Exception as e:
+        print(f"Error importing matches: {e}", file=sys.stderr)
+        return 1
+    
+    print(f"\nImported {result.new_matches:,} new matches from {result.files} files "
+          f"in {result.elapsed_seconds:.1f}s ({result.records_per_second:,.0f} records/s)")
+    print(f"Skipped {result.duplicates_skipped:,} duplicates and {result.invalid_records:,} invalid records")
+    if result.failed_records:
+        print(f"Failed to store {result.failed_records:,} matches", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
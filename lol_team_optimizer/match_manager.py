@@ -7,15 +7,96 @@ to enable efficient analysis across all players.
 
 import json
 import logging
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Any, Tuple
-from dataclasses import asdict
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Any, Tuple
+
+import numpy as np
 
 from .models import Match, MatchParticipant, ExtractionTracker, PlayerExtractionRange
+from .match_store import MatchStore
+from .participant_table import ParticipantTable, normalize_role
+from .roster_index import RosterIndex
+from .champion_aggregates import ChampionMatchupMatrix, ChampionRoleAggregates, ChampionRoleTotals
+from .composition_index import MAX_SUBSET_SIDE, CompositionIndex, member_keys
 from .config import Config
 
 
+# Version of the per-match summary kept in the match store's offset index.
+# Bump whenever _summarize_match_data changes shape.
+MATCH_SUMMARY_VERSION = 2
+
+
+class MatchCache(MutableMapping):
+    """
+    Dict-like view over every stored match that hydrates matches on demand.
+    
+    Keys are all stored match IDs, but only the most recently used
+    `capacity` Match objects are kept in memory; everything else is decoded
+    from the match store when it is accessed.
+    """
+    
+    def __init__(self, loader: Callable[[str], Optional[Match]], match_ids: Dict[str, Any],
+                 capacity: int = 5000):
+        """
+        Initialize the cache.
+        
+        Args:
+            loader: Decodes a match from storage by ID
+            match_ids: Live mapping whose keys are the stored match IDs
+            capacity: Maximum number of hydrated matches kept in memory
+        """
+        self._loader = loader
+        self._match_ids = match_ids
+        self.capacity = capacity
+        self._hydrated: OrderedDict[str, Match] = OrderedDict()
+    
+    def __getitem__(self, match_id: str) -> Match:
+        match = self._hydrated.get(match_id)
+        if match is not None:
+            self._hydrated.move_to_end(match_id)
+            return match
+        
+        if match_id not in self._match_ids:
+            raise KeyError(match_id)
+        match = self._loader(match_id)
+        if match is None:
+            raise KeyError(match_id)
+        self[match_id] = match
+        return match
+    
+    def __setitem__(self, match_id: str, match: Match) -> None:
+        self._hydrated[match_id] = match
+        self._hydrated.move_to_end(match_id)
+        while len(self._hydrated) > self.capacity:
+            self._hydrated.popitem(last=False)
+    
+    def __delitem__(self, match_id: str) -> None:
+        if self._hydrated.pop(match_id, None) is None and match_id not in self._match_ids:
+            raise KeyError(match_id)
+    
+    def __contains__(self, match_id: object) -> bool:
+        return match_id in self._match_ids
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._match_ids))
+    
+    def __len__(self) -> int:
+        return len(self._match_ids)
+    
+    def clear(self) -> None:
+        """Drop all hydrated matches (stored matches are unaffected)."""
+        self._hydrated.clear()
+    
+    @property
+    def hydrated_count(self) -> int:
+        """Number of Match objects currently held in memory."""
+        return len(self._hydrated)
+
+
 class MatchManager:
     """
     Manages centralized storage and retrieval of match data.
@@ -24,54 +105,72 @@ class MatchManager:
     between matches and players in our database.
     """
     
-    def __init__(self, config: Config):
-        """Initialize the match manager."""
+    def __init__(self, config: Config, read_only: bool = False):
+        """
+        Initialize the match manager.
+        
+        Args:
+            config: Application configuration
+            read_only: Open a read-only view of the match store, as analytics
+                worker processes do; nothing on disk is created or modified
+        """
         self.config = config
+        self.read_only = read_only
         self.logger = logging.getLogger(__name__)
         
         # Storage paths
         self.data_dir = Path(config.data_directory)
-        self.matches_file = self.data_dir / "matches.json"
-        self.match_index_file = self.data_dir / "match_index.json"
+        self.matches_file = self.data_dir / "matches.json"  # Legacy monolithic store
+        self.match_store_dir = self.data_dir / "match_store"
         self.extraction_tracker_file = self.data_dir / "extraction_tracker.json"
         
-        # In-memory caches
-        self._matches_cache: Dict[str, Match] = {}
-        self._match_index: Dict[str, Set[str]] = {}  # puuid -> set of match_ids
+        # In-memory indexes; matches themselves are hydrated lazily
+        self._match_meta: Dict[str, Tuple[int, int]] = {}  # match_id -> (game_creation, queue_id)
+        self._matches_cache = MatchCache(self._load_match, self._match_meta, config.match_cache_size)
+        self._roster_index = RosterIndex()  # puuid -> bitmap of dense match numbers
+        self._champion_index: Dict[int, Set[str]] = {}  # champion_id -> match_ids
+        self._role_index: Dict[str, Set[str]] = {}  # normalized role -> match_ids
+        self._champion_role_index: Dict[Tuple[int, str], Set[str]] = {}  # (champion_id, role) -> match_ids
+        self._queue_index: Dict[int, Set[str]] = {}  # queue_id -> match_ids
+        self._time_index: List[Tuple[int, str]] = []  # sorted (game_creation, match_id)
+        self.participant_table = ParticipantTable()  # one row per (match, participant)
+        self.champion_aggregates = ChampionRoleAggregates()  # champion x role x day sums
+        self.champion_matchups = ChampionMatchupMatrix()  # (champion, role) x (enemy, enemy role) records
+        self.composition_index = CompositionIndex()  # team signatures -> team sides
         self._extraction_tracker: ExtractionTracker = ExtractionTracker()
         self._cache_last_loaded: Optional[datetime] = None
+        self._match_listeners: List[Callable[[List[Match]], None]] = []
+        self._removal_listeners: List[Callable[[List[str]], None]] = []
         
         # Ensure data directory exists
-        self.data_dir.mkdir(exist_ok=True)
+        if not read_only:
+            self.data_dir.mkdir(exist_ok=True)
+        
+        # Append-only segmented match store
+        self._store = MatchStore(
+            self.match_store_dir,
+            segment_max_bytes=config.match_segment_max_mb * 1024 * 1024,
+            compaction_ratio=config.match_compaction_ratio,
+            fsync=config.match_store_fsync,
+            summarize=self._summarize_match_data,
+            summary_version=MATCH_SUMMARY_VERSION,
+            read_only=read_only
+        )
         
         # Load existing data
         self._load_match_data()
     
     def _load_match_data(self) -> None:
-        """Load match data and index from storage."""
+        """Load the match index and extraction tracker from storage."""
         try:
-            # Load matches
-            if self.matches_file.exists():
-                with open(self.matches_file, 'r', encoding='utf-8') as f:
-                    matches_data = json.load(f)
-                
-                self._matches_cache = {}
-                for match_data in matches_data:
-                    match = self._deserialize_match(match_data)
-                    self._matches_cache[match.match_id] = match
-                
-                self.logger.info(f"Loaded {len(self._matches_cache)} matches from storage")
+            # Build indexes from the store's offset index without decoding matches
+            self._reset_indexes()
+            self._index_summaries(self._store.take_summaries().items())
             
-            # Load match index
-            if self.match_index_file.exists():
-                with open(self.match_index_file, 'r', encoding='utf-8') as f:
-                    index_data = json.load(f)
-                
-                self._match_index = {}
-                for puuid, match_ids in index_data.items():
-                    self._match_index[puuid] = set(match_ids)
-                
-                self.logger.info(f"Loaded match index for {len(self._match_index)} players")
+            self._migrate_legacy_matches()
+            
+            self.logger.info(f"Indexed {len(self._match_meta)} matches for "
+                             f"{self._roster_index.player_count} players from storage")
             
             # Load extraction tracker
             if self.extraction_tracker_file.exists():
@@ -86,50 +185,245 @@ class MatchManager:
             
         except Exception as e:
             self.logger.error(f"Failed to load match data: {e}")
-            self._matches_cache = {}
-            self._match_index = {}
+            self._reset_indexes()
+    
+    def _load_match(self, match_id: str) -> Optional[Match]:
+        """Decode a single match from the match store."""
+        match_data = self._store.get(match_id)
+        if match_data is None:
+            return None
+        return self._deserialize_match(match_data)
     
-    def _save_match_data(self) -> None:
-        """Save match data and index to storage."""
+    def _migrate_legacy_matches(self) -> None:
+        """Import a legacy matches.json into the segmented store, once."""
+        if self.read_only or not self.matches_file.exists() or len(self._store) > 0:
+            return
+        
+        with open(self.matches_file, 'r', encoding='utf-8') as f:
+            matches_data = json.load(f)
+        
+        records = []
+        for match_data in matches_data:
+            if match_data.get('match_id'):
+                records.append((match_data['match_id'], match_data, self._summarize_match_data(match_data)))
+        self._store.put_batch(records)
+        self._index_summaries((match_id, summary) for match_id, _, summary in records)
+        
+        self.matches_file.replace(self.matches_file.with_suffix('.json.migrated'))
+        
+        legacy_index_file = self.data_dir / "match_index.json"
+        if legacy_index_file.exists():
+            legacy_index_file.replace(legacy_index_file.with_suffix('.json.migrated'))
+        
+        self.logger.info(f"Migrated {len(matches_data)} matches from {self.matches_file.name} "
+                         f"to the segmented match store")
+    
+    def _save_extraction_tracker(self) -> None:
+        """Save the extraction tracker to storage."""
         try:
-            # Save matches
-            matches_data = []
-            for match in self._matches_cache.values():
-                match_data = self._serialize_match(match)
-                matches_data.append(match_data)
-            
-            # Atomic write for matches
-            temp_file = self.matches_file.with_suffix('.tmp')
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(matches_data, f, indent=2, ensure_ascii=False, default=str)
-            temp_file.replace(self.matches_file)
-            
-            # Save match index
-            index_data = {}
-            for puuid, match_ids in self._match_index.items():
-                index_data[puuid] = list(match_ids)
-            
-            temp_index_file = self.match_index_file.with_suffix('.tmp')
-            with open(temp_index_file, 'w', encoding='utf-8') as f:
-                json.dump(index_data, f, indent=2, ensure_ascii=False)
-            temp_index_file.replace(self.match_index_file)
-            
-            # Save extraction tracker
             tracker_data = self._serialize_extraction_tracker(self._extraction_tracker)
             temp_tracker_file = self.extraction_tracker_file.with_suffix('.tmp')
             with open(temp_tracker_file, 'w', encoding='utf-8') as f:
                 json.dump(tracker_data, f, indent=2, ensure_ascii=False, default=str)
             temp_tracker_file.replace(self.extraction_tracker_file)
             
-            self.logger.info(f"Saved {len(self._matches_cache)} matches, index, and extraction tracker")
-            
         except Exception as e:
-            self.logger.error(f"Failed to save match data: {e}")
+            self.logger.error(f"Failed to save extraction tracker: {e}")
             raise
     
+    @staticmethod
+    def _summarize_match_data(match_data: Dict[str, Any]) -> List[Any]:
+        """
+        Build the compact summary stored in the match store's offset index.
+        
+        Layout: [game_creation, queue_id, game_duration, [participant rows]]
+        where each participant row is [puuid, champion_id, individual_position,
+        team_id, win, kills, deaths, assists, cs, vision, gold, damage].
+        """
+        return [
+            match_data.get('game_creation', 0),
+            match_data.get('queue_id', 0),
+            match_data.get('game_duration', 0),
+            [
+                [
+                    p.get('puuid', ''),
+                    p.get('champion_id', 0),
+                    p.get('individual_position', ''),
+                    p.get('team_id', 0),
+                    bool(p.get('win', False)),
+                    p.get('kills', 0),
+                    p.get('deaths', 0),
+                    p.get('assists', 0),
+                    p.get('total_minions_killed', 0) + p.get('neutral_minions_killed', 0),
+                    p.get('vision_score', 0),
+                    p.get('gold_earned', 0),
+                    p.get('total_damage_dealt_to_champions', 0)
+                ]
+                for p in match_data.get('participants', [])
+            ]
+        ]
+    
+    def _reset_indexes(self) -> None:
+        """Clear every in-memory index and hydrated match."""
+        self._match_meta.clear()
+        self._matches_cache.clear()
+        self._roster_index = RosterIndex()
+        self._champion_index = {}
+        self._role_index = {}
+        self._champion_role_index = {}
+        self._queue_index = {}
+        self._time_index = []
+        self.participant_table = ParticipantTable()
+        self.champion_aggregates = ChampionRoleAggregates()
+        self.champion_matchups = ChampionMatchupMatrix()
+        self.composition_index = CompositionIndex()
+    
+    @staticmethod
+    def _add_to_index(index: Dict[Any, Set[str]], key: Any, match_id: str) -> None:
+        """Add a match ID to a secondary index entry."""
+        match_ids = index.get(key)
+        if match_ids is None:
+            match_ids = index[key] = set()
+        match_ids.add(match_id)
+    
+    @staticmethod
+    def _discard_from_index(index: Dict[Any, Set[str]], key: Any, match_id: str) -> None:
+        """Remove a match ID from a secondary index entry, dropping empty entries."""
+        match_ids = index.get(key)
+        if match_ids is not None:
+            match_ids.discard(match_id)
+            if not match_ids:
+                del index[key]
+    
+    def _index_summaries(self, items: Iterable[Tuple[str, List[Any]]]) -> None:
+        """Add many matches to the in-memory indexes and the participant table."""
+        table_rows = []
+        time_entries = []
+        for match_id, summary in items:
+            game_creation, queue_id, game_duration, participants = summary
+            self._match_meta[match_id] = (game_creation, queue_id)
+            self._add_to_index(self._queue_index, queue_id, match_id)
+            time_entries.append((game_creation, match_id))
+            self._roster_index.add_match(match_id, (participant[0] for participant in participants))
+            for participant in participants:
+                champion_id = participant[1]
+                role = normalize_role(participant[2])
+                self._add_to_index(self._champion_index, champion_id, match_id)
+                self._add_to_index(self._role_index, role, match_id)
+                self._add_to_index(self._champion_role_index, (champion_id, role), match_id)
+            table_rows.append((match_id, game_creation, queue_id, game_duration, participants))
+        
+        # Small batches are inserted in place; large ones are merged by one sort
+        if len(time_entries) > 64:
+            self._time_index.extend(time_entries)
+            self._time_index.sort()
+        else:
+            for entry in time_entries:
+                insort(self._time_index, entry)
+        
+        self.participant_table.append_matches(table_rows)
+        new_rows = self.participant_table.rows_for_matches(row[0] for row in table_rows)
+        self.champion_aggregates.add_rows(self.participant_table, new_rows)
+        self.champion_matchups.add_rows(self.participant_table, new_rows)
+        self.composition_index.add_rows(self.participant_table, new_rows)
+    
+    def _unindex_matches(self, match_ids: Iterable[str]) -> List[str]:
+        """
+        Remove matches from the in-memory indexes and the participant table.
+        
+        Index keys are read back from the participant table, so no match
+        has to be decoded.
+        
+        Returns:
+            IDs of the matches that were indexed and have been removed
+        """
+        table = self.participant_table
+        removed = []
+        for match_id in match_ids:
+            meta = self._match_meta.pop(match_id, None)
+            if meta is None:
+                continue
+            
+            rows = table.rows_for_matches([match_id])
+            champion_ids = table.column('champion', rows).tolist()
+            puuids = table.puuids(rows)
+            self._roster_index.remove_match(match_id)
+            self.champion_aggregates.add_rows(table, rows, sign=-1)
+            self.champion_matchups.add_rows(table, rows, sign=-1)
+            self.composition_index.remove_rows(table, rows)
+            for puuid, champion_id, role in zip(puuids, champion_ids, table.roles(rows)):
+                self._discard_from_index(self._champion_index, champion_id, match_id)
+                self._discard_from_index(self._role_index, role, match_id)
+                self._discard_from_index(self._champion_role_index, (champion_id, role), match_id)
+            self._discard_from_index(self._queue_index, meta[1], match_id)
+            table.remove_match(match_id)
+            self._matches_cache.pop(match_id, None)
+            removed.append(match_id)
+        
+        if removed:
+            removed_ids = set(removed)
+            self._time_index = [entry for entry in self._time_index if entry[1] not in removed_ids]
+        return removed
+    
+    def _match_ids_in_range(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> List[str]:
+        """Get match IDs created within [start_ms, end_ms], oldest first, by bisecting the time index."""
+        lo = 0 if start_ms is None else bisect_left(self._time_index, (start_ms, ''))
+        hi = len(self._time_index) if end_ms is None else bisect_right(self._time_index, (end_ms, '\uffff'))
+        return [match_id for _, match_id in self._time_index[lo:hi]]
+    
+    def _filter_match_ids(self, match_ids: Set[str], filters: Optional[Any]) -> List[str]:
+        """
+        Narrow candidate match IDs by the date range and queue filters.
+        
+        Args:
+            match_ids: Candidate IDs taken from a secondary index
+            filters: Optional AnalyticsFilters-like object
+            
+        Returns:
+            Matching IDs, newest first
+        """
+        date_range = getattr(filters, 'date_range', None) if filters else None
+        queue_types = getattr(filters, 'queue_types', None) if filters else None
+        meta = self._match_meta
+        
+        if date_range:
+            start_ms = int(date_range.start_date.timestamp() * 1000)
+            end_ms = int(date_range.end_date.timestamp() * 1000)
+            lo = bisect_left(self._time_index, (start_ms, ''))
+            hi = bisect_right(self._time_index, (end_ms, '\uffff'))
+            
+            # Walk whichever side is smaller: the time range or the candidates
+            if hi - lo < len(match_ids):
+                match_ids = {m for _, m in self._time_index[lo:hi] if m in match_ids}
+            else:
+                match_ids = {m for m in match_ids if start_ms <= meta[m][0] <= end_ms}
+        
+        if queue_types:
+            match_ids = {m for m in match_ids if meta[m][1] in queue_types}
+        
+        return self._sorted_by_recency(match_ids)
+    
+    def _sorted_by_recency(self, match_ids: Iterable[str], limit: Optional[int] = None) -> List[str]:
+        """Order match IDs newest first using the in-memory metadata."""
+        meta = self._match_meta
+        ordered = sorted((m for m in match_ids if m in meta), key=lambda m: meta[m][0], reverse=True)
+        return ordered[:limit] if limit else ordered
+    
+    def _hydrate(self, match_ids: Iterable[str]) -> List[Match]:
+        """Fetch Match objects for the given IDs, skipping unreadable ones."""
+        matches = []
+        for match_id in match_ids:
+            match = self._matches_cache.get(match_id)
+            if match:
+                matches.append(match)
+        return matches
+    
     def _serialize_match(self, match: Match) -> Dict[str, Any]:
         """Convert Match object to JSON-serializable dictionary."""
-        match_dict = asdict(match)
+        # Shallow copies: every field is a scalar except the participants
+        # list, whose elements are flat dataclasses (asdict deep-copies each value)
+        match_dict = dict(vars(match))
+        match_dict['participants'] = [dict(vars(participant)) for participant in match.participants]
         
         # Convert datetime objects to ISO strings
         if match_dict.get('stored_at'):
@@ -199,6 +493,40 @@ class MatchManager:
         
         return tracker
     
+    def add_match_listener(self, listener: Callable[[List[Match]], None]) -> None:
+        """
+        Register a callback invoked with the newly stored matches after each store.
+        
+        Args:
+            listener: Callable taking the list of new Match objects
+        """
+        self._match_listeners.append(listener)
+    
+    def _notify_matches_stored(self, matches: List[Match]) -> None:
+        """Pass newly stored matches to every listener."""
+        for listener in self._match_listeners:
+            try:
+                listener(matches)
+            except Exception as e:
+                self.logger.warning(f"Match listener failed for {len(matches)} new matches: {e}")
+    
+    def add_match_removal_listener(self, listener: Callable[[List[str]], None]) -> None:
+        """
+        Register a callback invoked with the IDs of matches removed from storage.
+        
+        Args:
+            listener: Callable taking the list of removed match IDs
+        """
+        self._removal_listeners.append(listener)
+    
+    def _notify_matches_removed(self, match_ids: List[str]) -> None:
+        """Pass removed match IDs to every removal listener."""
+        for listener in self._removal_listeners:
+            try:
+                listener(match_ids)
+            except Exception as e:
+                self.logger.warning(f"Match removal listener failed for {len(match_ids)} matches: {e}")
+    
     def store_match(self, match_data: Dict[str, Any]) -> bool:
         """
         Store a match with deduplication.
@@ -209,58 +537,74 @@ class MatchManager:
         Returns:
             True if match was stored (new), False if already existed
         """
-        try:
-            match = self._parse_riot_match_data(match_data)
-            
-            # Check if match already exists
-            if match.match_id in self._matches_cache:
-                self.logger.debug(f"Match {match.match_id} already exists, skipping")
-                return False
-            
-            # Store the match
-            self._matches_cache[match.match_id] = match
-            
-            # Update index for all participants
-            for participant in match.participants:
-                if participant.puuid not in self._match_index:
-                    self._match_index[participant.puuid] = set()
-                self._match_index[participant.puuid].add(match.match_id)
-            
-            # Save to disk immediately for single match storage
-            self._save_match_data()
-            
-            self.logger.info(f"Stored new match {match.match_id}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Failed to store match: {e}")
-            return False
+        new_count, _ = self.store_matches_batch([match_data])
+        return new_count == 1
     
-    def store_matches_batch(self, matches_data: List[Dict[str, Any]]) -> Tuple[int, int]:
+    def store_matches_batch(
+        self,
+        matches_data: List[Dict[str, Any]],
+        invalid: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[int, int]:
         """
         Store multiple matches with deduplication.
         
+        New matches are appended to the match store in a single write, so
+        the cost of a batch depends only on its own size.
+        
         Args:
             matches_data: List of raw match data from Riot API
+            invalid: Optional list that receives the records that could not
+                be parsed; these count neither as stored nor as duplicates
             
         Returns:
-            Tuple of (new_matches_stored, duplicates_skipped)
+            Tuple of (new_matches_stored, duplicates_skipped); when the store
+            rejects the batch no match is counted as new
         """
-        new_count = 0
+        new_matches: List[Match] = []
+        seen: Set[str] = set()
         duplicate_count = 0
+        invalid_count = 0
         
         for match_data in matches_data:
-            if self.store_match(match_data):
-                new_count += 1
-            else:
+            try:
+                match = self._parse_riot_match_data(match_data)
+            except Exception as e:
+                self.logger.error(f"Failed to parse match: {e}")
+                invalid_count += 1
+                if invalid is not None:
+                    invalid.append(match_data)
+                continue
+            
+            # Check if match already exists
+            if match.match_id in self._match_meta or match.match_id in seen:
+                self.logger.debug(f"Match {match.match_id} already exists, skipping")
                 duplicate_count += 1
+                continue
+            
+            seen.add(match.match_id)
+            new_matches.append(match)
         
-        # Save to disk after batch operation
-        if new_count > 0:
-            self._save_match_data()
+        if new_matches:
+            records = []
+            for match in new_matches:
+                match_data = self._serialize_match(match)
+                records.append((match.match_id, match_data, self._summarize_match_data(match_data)))
+            
+            try:
+                self._store.put_batch(records)
+            except Exception as e:
+                self.logger.error(f"Failed to store matches: {e}")
+                return 0, duplicate_count
+            
+            self._index_summaries((match_id, summary) for match_id, _, summary in records)
+            for match in new_matches:
+                self._matches_cache[match.match_id] = match
+            
+            self._notify_matches_stored(new_matches)
         
-        self.logger.info(f"Batch stored {new_count} new matches, skipped {duplicate_count} duplicates")
-        return new_count, duplicate_count
+        self.logger.info(f"Batch stored {len(new_matches)} new matches, skipped {duplicate_count} duplicates "
+                         f"and {invalid_count} invalid records")
+        return len(new_matches), duplicate_count
     
     def _parse_riot_match_data(self, match_data: Dict[str, Any]) -> Match:
         """Parse raw Riot API match data into our Match model."""
@@ -318,6 +662,10 @@ class MatchManager:
         """Get a specific match by ID."""
         return self._matches_cache.get(match_id)
     
+    def has_match(self, match_id: str) -> bool:
+        """Check whether a match is stored, without decoding it."""
+        return match_id in self._match_meta
+    
     def get_matches_for_player(self, puuid: str, limit: Optional[int] = None) -> List[Match]:
         """
         Get all matches for a specific player.
@@ -329,21 +677,36 @@ class MatchManager:
         Returns:
             List of Match objects sorted by game creation time (newest first)
         """
-        match_ids = self._match_index.get(puuid, set())
-        matches = []
+        match_ids = self._roster_index.match_ids(puuid)
         
-        for match_id in match_ids:
-            match = self._matches_cache.get(match_id)
-            if match:
-                matches.append(match)
-        
-        # Sort by game creation time (newest first)
-        matches.sort(key=lambda m: m.game_creation, reverse=True)
+        # Sort by game creation time (newest first) before decoding anything
+        return self._hydrate(self._sorted_by_recency(match_ids, limit))
+    
+    def get_player_matches(self, puuid: str, limit: Optional[int] = None) -> List[Tuple[Match, MatchParticipant]]:
+        """
+        Get a player's matches paired with their participant entry.
         
-        if limit:
-            matches = matches[:limit]
+        Args:
+            puuid: Player's PUUID
+            limit: Maximum number of matches to return (most recent first)
+            
+        Returns:
+            List of (Match, MatchParticipant) tuples, newest first
+        """
+        pairs = []
+        for match in self.get_matches_for_player(puuid, limit):
+            participant = match.get_participant_by_puuid(puuid)
+            if participant:
+                pairs.append((match, participant))
+        return pairs
+    
+    def get_all_matches(self) -> List[Match]:
+        """
+        Get every stored match, newest first.
         
-        return matches
+        This decodes the whole store; prefer the indexed query methods.
+        """
+        return self._hydrate(self._sorted_by_recency(self._match_meta))
     
     def get_matches_with_multiple_players(self, puuids: Set[str], limit: Optional[int] = None) -> List[Match]:
         """
@@ -356,29 +719,159 @@ class MatchManager:
         Returns:
             List of matches containing 2+ of the specified players
         """
-        match_candidates = set()
+        # Sort by game creation time (newest first)
+        return self._hydrate(self._sorted_by_recency(self.get_roster_masks(list(puuids)), limit))
+    
+    def get_match_rosters(self, puuids: Set[str], min_players: int = 2) -> Dict[str, Set[str]]:
+        """
+        Find which of the given players appear in each match, using only the index.
         
-        # Find all matches that contain any of the specified players
-        for puuid in puuids:
-            match_ids = self._match_index.get(puuid, set())
-            match_candidates.update(match_ids)
+        Args:
+            puuids: Set of PUUIDs to look for
+            min_players: Minimum number of the players a match must contain
+            
+        Returns:
+            Mapping of match ID to the PUUIDs from the set that played in it
+        """
+        roster = list(puuids)
+        return {
+            match_id: {roster[position] for position in self._mask_positions(mask)}
+            for match_id, mask in self.get_roster_masks(roster, min_players).items()
+        }
+    
+    def get_roster_masks(self, puuids: Sequence[str], min_players: int = 2) -> Dict[str, int]:
+        """
+        Find the matches containing several of the given players, as roster bitmasks.
         
-        # Filter to matches with multiple specified players
-        multi_player_matches = []
-        for match_id in match_candidates:
-            match = self._matches_cache.get(match_id)
-            if match:
-                known_players = match.get_known_players(puuids)
-                if len(known_players) >= 2:
-                    multi_player_matches.append(match)
+        Args:
+            puuids: Roster of PUUIDs; bit i of a mask stands for puuids[i]
+            min_players: Minimum number of the players a match must contain
+            
+        Returns:
+            Mapping of match ID to the bitmask of roster members who played in it
+        """
+        match_ids, words = self._roster_index.roster_masks(puuids, min_players)
+        if words.shape[1] == 1:
+            return dict(zip(match_ids, words[:, 0].tolist()))
+        return {
+            match_id: sum(word << (64 * index) for index, word in enumerate(row))
+            for match_id, row in zip(match_ids, words.tolist())
+        }
+    
+    def get_composition_teams(self, members: Sequence[Tuple[str, str, Optional[int]]]) -> List[Tuple[str, int]]:
+        """
+        Find the teams that fielded all the given players in the given roles.
         
-        # Sort by game creation time (newest first)
-        multi_player_matches.sort(key=lambda m: m.game_creation, reverse=True)
+        Two to five players are probed in the composition index and the hits
+        are checked against the participant table; a single player is
+        selected from the table directly.
+        
+        Args:
+            members: (puuid, role, champion_id) of each player; a champion
+                of None matches any champion
+            
+        Returns:
+            (match_id, team_id) of every such team, in the order the matches were stored
+        """
+        table = self.participant_table
+        codes = []
+        for puuid, role, champion_id in members:
+            puuid_code, role_code = table.puuid_code(puuid), table.role_code(role)
+            if puuid_code is None or role_code is None:
+                return []
+            codes.append((puuid_code, role_code, champion_id))
+        if not codes or len(codes) > MAX_SUBSET_SIDE:
+            return []
+        
+        if len(codes) == 1:
+            puuid, role, champion_id = members[0]
+            rows = table.select(puuid=puuid, champion_ids=None if champion_id is None else [champion_id],
+                                roles=[normalize_role(role)])
+            return list(dict.fromkeys(zip(table.match_ids(rows), table.column('team', rows).tolist())))
+        
+        puuid_codes, role_codes, champion_ids = zip(*codes)
+        keys = member_keys(puuid_codes, role_codes, None if None in champion_ids else champion_ids)
+        match_codes, teams = self.composition_index.sides(self.composition_index.sides_with_members(keys))
+        match_ids = [table.match_id_for_code(code) for code in match_codes.tolist()]
+        
+        # Signatures can collide, so confirm every member on the teams found
+        rows = table.rows_for_matches(dict.fromkeys(match_ids))
+        row_sides = (table.column('match', rows).astype(np.int64) << 16) | table.column('team', rows)
+        wanted = (match_codes.astype(np.int64) << 16) | teams
+        found = np.ones(len(wanted), dtype=bool)
+        for puuid_code, role_code, champion_id in codes:
+            hit = (table.column('puuid', rows) == puuid_code) & (table.column('role', rows) == role_code)
+            if champion_id is not None:
+                hit &= table.column('champion', rows) == champion_id
+            found &= np.isin(wanted, row_sides[hit])
+        return [(match_ids[index], int(teams[index])) for index in np.flatnonzero(found)]
+    
+    def get_teams_sharing_players(self, members: Sequence[Tuple[str, str]], min_shared: int) -> List[Tuple[str, int]]:
+        """
+        Find teams that had at least ``min_shared`` of the given players in the same roles.
+        
+        Candidates come from probing the composition index with every
+        ``min_shared``-player subset, so callers should compare the teams
+        themselves; a hash collision can add a team sharing fewer players.
+        
+        Args:
+            members: (puuid, role) of the players of one team
+            min_shared: Minimum number of those players (2 to 5)
+            
+        Returns:
+            (match_id, team_id) of the candidate teams, in the order the matches were stored
+        """
+        table = self.participant_table
+        codes = [(table.puuid_code(puuid), table.role_code(role)) for puuid, role in members]
+        codes = [code for code in codes if None not in code]
+        if not codes:
+            return []
         
-        if limit:
-            multi_player_matches = multi_player_matches[:limit]
+        puuid_codes, role_codes = zip(*codes)
+        side_ids = self.composition_index.sides_sharing(member_keys(puuid_codes, role_codes), min_shared)
+        match_codes, teams = self.composition_index.sides(side_ids)
+        return [
+            (table.match_id_for_code(code), team)
+            for code, team in zip(match_codes.tolist(), teams.tolist())
+        ]
+    
+    def get_distinct_compositions(self, team_size: int = 5) -> List[Tuple[str, int, int]]:
+        """
+        Get one team for every distinct (player, role, champion) composition.
         
-        return multi_player_matches
+        Args:
+            team_size: Number of players on the team
+            
+        Returns:
+            (match_id, team_id, number of teams with that composition) per
+            distinct composition, in order of first appearance
+        """
+        side_ids, counts = self.composition_index.distinct_compositions(team_size)
+        match_codes, teams = self.composition_index.sides(side_ids)
+        return [
+            (self.participant_table.match_id_for_code(code), team, count)
+            for code, team, count in zip(match_codes.tolist(), teams.tolist(), counts.tolist())
+        ]
+    
+    @staticmethod
+    def _mask_positions(mask: int) -> Iterator[int]:
+        """Yield the positions of the set bits of a roster mask."""
+        while mask:
+            low_bit = mask & -mask
+            yield low_bit.bit_length() - 1
+            mask ^= low_bit
+    
+    def get_matches_by_ids(self, match_ids: Iterable[str]) -> List[Match]:
+        """
+        Get several matches by ID, newest first, skipping unknown IDs.
+        
+        Args:
+            match_ids: Match IDs to load
+            
+        Returns:
+            List of matches
+        """
+        return self._hydrate(self._sorted_by_recency(match_ids))
     
     def get_recent_matches(self, days: int = 30, limit: Optional[int] = None) -> List[Match]:
         """
@@ -394,38 +887,26 @@ class MatchManager:
         cutoff_time = datetime.now() - timedelta(days=days)
         cutoff_timestamp = int(cutoff_time.timestamp() * 1000)
         
-        recent_matches = []
-        for match in self._matches_cache.values():
-            if match.game_creation >= cutoff_timestamp:
-                recent_matches.append(match)
-        
-        # Sort by game creation time (newest first)
-        recent_matches.sort(key=lambda m: m.game_creation, reverse=True)
-        
-        if limit:
-            recent_matches = recent_matches[:limit]
-        
-        return recent_matches
+        # The time index is sorted oldest first
+        recent_ids = self._match_ids_in_range(start_ms=cutoff_timestamp)
+        recent_ids.reverse()
+        return self._hydrate(recent_ids[:limit] if limit else recent_ids)
     
     def get_match_statistics(self) -> Dict[str, Any]:
         """Get statistics about stored matches."""
-        total_matches = len(self._matches_cache)
-        total_players_indexed = len(self._match_index)
+        total_matches = len(self._match_meta)
+        total_players_indexed = self._roster_index.player_count
         
         # Calculate date range
-        if self._matches_cache:
-            timestamps = [m.game_creation for m in self._matches_cache.values()]
-            oldest_match = datetime.fromtimestamp(min(timestamps) / 1000)
-            newest_match = datetime.fromtimestamp(max(timestamps) / 1000)
+        if self._time_index:
+            oldest_match = datetime.fromtimestamp(self._time_index[0][0] / 1000)
+            newest_match = datetime.fromtimestamp(self._time_index[-1][0] / 1000)
         else:
             oldest_match = None
             newest_match = None
         
         # Queue distribution
-        queue_distribution = {}
-        for match in self._matches_cache.values():
-            queue_id = match.queue_id
-            queue_distribution[queue_id] = queue_distribution.get(queue_id, 0) + 1
+        queue_distribution = {queue_id: len(match_ids) for queue_id, match_ids in self._queue_index.items()}
         
         return {
             'total_matches': total_matches,
@@ -433,7 +914,8 @@ class MatchManager:
             'oldest_match': oldest_match.isoformat() if oldest_match else None,
             'newest_match': newest_match.isoformat() if newest_match else None,
             'queue_distribution': queue_distribution,
-            'storage_file_size_mb': self.matches_file.stat().st_size / (1024 * 1024) if self.matches_file.exists() else 0
+            'storage_file_size_mb': self._store.total_bytes / (1024 * 1024),
+            'hydrated_matches': self._matches_cache.hydrated_count
         }
     
     def cleanup_old_matches(self, days: int = 90) -> int:
@@ -449,43 +931,56 @@ class MatchManager:
         cutoff_time = datetime.now() - timedelta(days=days)
         cutoff_timestamp = int(cutoff_time.timestamp() * 1000)
         
-        matches_to_remove = []
-        for match_id, match in self._matches_cache.items():
-            if match.game_creation < cutoff_timestamp:
-                matches_to_remove.append(match_id)
+        matches_to_remove = self._match_ids_in_range(end_ms=cutoff_timestamp - 1)
         
-        # Remove matches and update index
-        removed_count = 0
-        for match_id in matches_to_remove:
-            match = self._matches_cache.pop(match_id, None)
-            if match:
-                # Remove from index
-                for participant in match.participants:
-                    if participant.puuid in self._match_index:
-                        self._match_index[participant.puuid].discard(match_id)
-                        # Remove empty entries
-                        if not self._match_index[participant.puuid]:
-                            del self._match_index[participant.puuid]
-                removed_count += 1
+        # Remove matches from the indexes, then tombstone them in the store
+        removed = self._unindex_matches(matches_to_remove)
         
-        if removed_count > 0:
-            self._save_match_data()
-            self.logger.info(f"Cleaned up {removed_count} old matches")
+        if removed:
+            self._store.delete_batch(removed)
+            self._store.maybe_compact()
+            self._notify_matches_removed(removed)
+            self.logger.info(f"Cleaned up {len(removed)} old matches")
         
-        return removed_count
+        return len(removed)
+    
+    def compact_storage(self) -> None:
+        """Rewrite the match store to reclaim space held by removed matches."""
+        self._store.compact()
+    
+    def store_position(self) -> Dict[str, Any]:
+        """
+        Identify the current state of the match store.
+        
+        Data derived from stored matches (such as a persisted analytics
+        index) records this position to know which matches it covers.
+        
+        Returns:
+            JSON-serializable position accepted by `store_changes_since`
+        """
+        return self._store.position()
+        
+    def store_changes_since(self, position: Dict[str, Any]) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        List the matches stored and removed after a store position.
+        
+        Args:
+            position: Value previously returned by `store_position`
+        
+        Returns:
+            (stored match IDs, removed match IDs), or None when the position
+            no longer describes this store and derived data must be rebuilt
+        """
+        return self._store.changes_since(position)
     
     def rebuild_index(self) -> None:
         """Rebuild the match index from stored matches."""
-        self._match_index = {}
+        self._reset_indexes()
         
-        for match in self._matches_cache.values():
-            for participant in match.participants:
-                if participant.puuid not in self._match_index:
-                    self._match_index[participant.puuid] = set()
-                self._match_index[participant.puuid].add(match.match_id)
+        self._index_summaries((match_id, self._summarize_match_data(match_data))
+                              for match_id, match_data in self._store.iter_records())
         
-        self._save_match_data()
-        self.logger.info(f"Rebuilt match index for {len(self._match_index)} players")
+        self.logger.info(f"Rebuilt match index for {self._roster_index.player_count} players")
     
     def get_player_extraction_info(self, puuid: str) -> Dict[str, Any]:
         """
@@ -541,7 +1036,7 @@ class MatchManager:
         """
         self._extraction_tracker.update_player_extraction(puuid, matches_fetched, total_available)
         # Save immediately to persist progress
-        self._save_match_data()
+        self._save_extraction_tracker()
     
     def get_next_extraction_batch(self, puuid: str, batch_size: int = 20) -> Tuple[int, int]:
         """
@@ -566,7 +1061,7 @@ class MatchManager:
         """
         if puuid in self._extraction_tracker.player_ranges:
             del self._extraction_tracker.player_ranges[puuid]
-        self._save_match_data()
+        self._save_extraction_tracker()
         self.logger.info(f"Reset extraction progress for player {puuid}")
     
     def mark_extraction_complete(self, puuid: str) -> None:
@@ -578,7 +1073,7 @@ class MatchManager:
         """
         player_range = self._extraction_tracker.get_player_range(puuid)
         player_range.extraction_complete = True
-        self._save_match_data()
+        self._save_extraction_tracker()
         self.logger.info(f"Marked extraction complete for player {puuid}")
     
     def get_matches_with_champions(
@@ -590,65 +1085,84 @@ class MatchManager:
         """
         Get matches containing specific champions.
         
+        Candidates come from the champion (or champion+role) index, so the
+        cost depends on the number of matching games, not the store size.
+        
         Args:
             champion_ids: List of champion IDs to search for
             same_team: If True, all champions must be on the same team
-            filters: Optional filters to apply
+            filters: Optional filters (date range, queue types, and, when
+                same_team is False, the champion's role)
             
         Returns:
-            List of match data dictionaries
+            List of match data dictionaries, newest first
         """
         try:
-            matching_matches = []
+            champion_ids = list(champion_ids)
+            if not champion_ids:
+                return []
             
-            for match in self._matches_cache.values():
-                # Apply date filter if provided
-                if filters and hasattr(filters, 'date_range') and filters.date_range:
-                    match_date = datetime.fromtimestamp(match.game_creation / 1000)
-                    if not filters.date_range.contains(match_date):
-                        continue
-                
-                # Check if match contains the required champions
-                if same_team:
-                    # Check if all champions are on the same team
-                    team_champions = {100: [], 200: []}
-                    for participant in match.participants:
-                        team_champions[participant.team_id].append(participant.champion_id)
-                    
-                    # Check if any team has all required champions
-                    found_team = None
-                    for team_id, team_champs in team_champions.items():
-                        if all(champ_id in team_champs for champ_id in champion_ids):
-                            found_team = team_id
-                            break
-                    
-                    if found_team:
+            roles = None
+            if not same_team and filters and getattr(filters, 'roles', None):
+                roles = [normalize_role(role) for role in filters.roles]
+            
+            # Candidate matches from the secondary indexes
+            if same_team:
+                candidates = set.intersection(
+                    *(self._champion_index.get(champion_id, set()) for champion_id in set(champion_ids)))
+            elif roles:
+                candidates = set().union(*(self._champion_role_index.get((champion_id, role), ())
+                                           for champion_id in champion_ids for role in roles))
+            else:
+                candidates = set().union(*(self._champion_index.get(champion_id, ()) for champion_id in champion_ids))
+            
+            match_ids = self._filter_match_ids(candidates, filters)
+            
+            table = self.participant_table
+            rows = table.select(champion_ids=champion_ids, roles=roles,
+                                rows=table.rows_for_matches(match_ids))
+            row_match_ids = table.match_ids(rows)
+            row_champions = table.column('champion', rows).tolist()
+            row_teams = table.column('team', rows).tolist()
+            row_wins = table.column('win', rows).tolist()
+            row_timestamps = table.column('timestamp', rows).tolist()
+            row_durations = table.column('duration', rows).tolist()
+            row_roles = table.roles(rows)
+            
+            matching_matches = []
+            if same_team:
+                # Champions seen per (match, team), in row order
+                required = set(champion_ids)
+                team_champions: Dict[Tuple[str, int], Set[int]] = {}
+                found = set()
+                for i, match_id in enumerate(row_match_ids):
+                    key = (match_id, row_teams[i])
+                    team_champions.setdefault(key, set()).add(row_champions[i])
+                    if match_id not in found and team_champions[key] >= required:
+                        found.add(match_id)
                         # Return match data with win status for the team
-                        match_data = {
-                            'match_id': match.match_id,
-                            'win': match.winning_team == found_team,
-                            'game_creation': match.game_creation,
-                            'game_duration': match.game_duration,
+                        matching_matches.append({
+                            'match_id': match_id,
+                            'win': row_wins[i],
+                            'game_creation': row_timestamps[i],
+                            'game_duration': row_durations[i],
                             'champions': champion_ids
-                        }
-                        matching_matches.append(match_data)
-                else:
-                    # Check if match contains any of the required champions
-                    match_champions = [p.champion_id for p in match.participants]
-                    if any(champ_id in match_champions for champ_id in champion_ids):
-                        # Find the participant with the champion
-                        for participant in match.participants:
-                            if participant.champion_id in champion_ids:
-                                match_data = {
-                                    'match_id': match.match_id,
-                                    'champion_id': participant.champion_id,
-                                    'win': participant.win,
-                                    'game_creation': match.game_creation,
-                                    'game_duration': match.game_duration,
-                                    'role': participant.individual_position.lower()
-                                }
-                                matching_matches.append(match_data)
-                                break
+                        })
+            else:
+                # One entry per match, for the first participant on a requested champion
+                found = set()
+                for i, match_id in enumerate(row_match_ids):
+                    if match_id in found:
+                        continue
+                    found.add(match_id)
+                    matching_matches.append({
+                        'match_id': match_id,
+                        'champion_id': row_champions[i],
+                        'win': row_wins[i],
+                        'game_creation': row_timestamps[i],
+                        'game_duration': row_durations[i],
+                        'role': row_roles[i]
+                    })
             
             return matching_matches
             
@@ -656,47 +1170,165 @@ class MatchManager:
             self.logger.error(f"Failed to get matches with champions: {e}")
             return []
     
+    def get_champion_role_totals(
+        self,
+        champion_id: Optional[int] = None,
+        role: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> ChampionRoleTotals:
+        """
+        Get game, win and KDA totals from the champion x role x day aggregates.
+        
+        The cost depends on the length of the time window, not on the number
+        of stored matches. Windows are resolved to whole UTC days.
+        
+        Args:
+            champion_id: Champion to total, or None for every champion
+            role: Role (Riot position or normalized role), or None for every role
+            start_time: Only matches on or after this day
+            end_time: Only matches on or before this day
+        
+        Returns:
+            ChampionRoleTotals
+        """
+        return self.champion_aggregates.totals(
+            champion_id,
+            normalize_role(role) if role else None,
+            start_ms=int(start_time.timestamp() * 1000) if start_time else None,
+            end_ms=int(end_time.timestamp() * 1000) if end_time else None
+        )
+    
+    def get_champion_role_counts(
+        self,
+        champion_ids: Sequence[int],
+        role: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> np.ndarray:
+        """
+        Get the aggregates of several champions at once.
+        
+        Args:
+            champion_ids: Champions to look up
+            role: Role (Riot position or normalized role), or None for every role
+            start_time: Only matches on or after this day
+            end_time: Only matches on or before this day
+        
+        Returns:
+            Array of shape (len(champion_ids), 5) with games, wins, kills,
+            deaths and assists (see champion_aggregates.AGGREGATE_FIELDS)
+        """
+        return self.champion_aggregates.counts(
+            champion_ids,
+            normalize_role(role) if role else None,
+            start_ms=int(start_time.timestamp() * 1000) if start_time else None,
+            end_ms=int(end_time.timestamp() * 1000) if end_time else None
+        )
+    
+    def get_teammate_counts(self, champion_id: int, teammate_ids: Sequence[int]) -> np.ndarray:
+        """
+        Count the games other champions played on the same team as a champion.
+        
+        Only the matches of ``champion_id`` are visited, so all candidate
+        teammates cost one pass over that champion's games.
+        
+        Args:
+            champion_id: Champion whose teams are searched
+            teammate_ids: Champions to count as teammates
+            
+        Returns:
+            Array of shape (len(teammate_ids), 2) with the games played
+            together and the games those teams won
+        """
+        result = np.zeros((len(teammate_ids), 2), dtype=np.int64)
+        match_ids = self._champion_index.get(champion_id)
+        if not match_ids or not len(teammate_ids):
+            return result
+        
+        table = self.participant_table
+        rows = table.rows_for_matches(match_ids)
+        champions = table.column('champion', rows)
+        sides = (table.column('match', rows).astype(np.int64) << 16) + table.column('team', rows)
+        together = np.isin(sides, sides[champions == champion_id]) & (champions != champion_id)
+        
+        # Map teammate rows to positions in teammate_ids
+        teammate_ids = np.asarray(teammate_ids)
+        order = np.argsort(teammate_ids, kind='stable')
+        positions = np.searchsorted(teammate_ids[order], champions[together])
+        positions = np.minimum(positions, len(order) - 1)
+        known = teammate_ids[order][positions] == champions[together]
+        indices = order[positions[known]]
+        result[:, 0] = np.bincount(indices, minlength=len(teammate_ids))
+        result[:, 1] = np.bincount(indices, weights=table.column('win', rows[together][known]),
+                                   minlength=len(teammate_ids))
+        return result
+    
     def get_matches_by_role(self, role: str, filters: Optional[Any] = None) -> List[Dict[str, Any]]:
         """
         Get matches for a specific role.
         
         Args:
-            role: Role to filter by
-            filters: Optional filters to apply
+            role: Role to filter by (Riot position or normalized role)
+            filters: Optional filters (date range, queue types)
             
         Returns:
-            List of match data dictionaries
+            List of match data dictionaries, one per participant in the role
         """
         try:
-            role_matches = []
+            role = normalize_role(role)
+            match_ids = self._filter_match_ids(self._role_index.get(role, set()), filters)
             
-            for match in self._matches_cache.values():
-                # Apply date filter if provided
-                if filters and hasattr(filters, 'date_range') and filters.date_range:
-                    match_date = datetime.fromtimestamp(match.game_creation / 1000)
-                    if not filters.date_range.contains(match_date):
-                        continue
-                
-                # Find participants in the specified role
-                for participant in match.participants:
-                    participant_role = participant.individual_position.lower()
-                    if participant_role == role.lower():
-                        match_data = {
-                            'match_id': match.match_id,
-                            'champion_id': participant.champion_id,
-                            'puuid': participant.puuid,
-                            'win': participant.win,
-                            'game_creation': match.game_creation,
-                            'role': participant_role
-                        }
-                        role_matches.append(match_data)
-            
-            return role_matches
+            table = self.participant_table
+            rows = table.select(roles=[role], rows=table.rows_for_matches(match_ids))
+            
+            return [
+                {
+                    'match_id': match_id,
+                    'champion_id': champion_id,
+                    'puuid': puuid,
+                    'win': win,
+                    'game_creation': game_creation,
+                    'role': role
+                }
+                for match_id, champion_id, puuid, win, game_creation in zip(
+                    table.match_ids(rows),
+                    table.column('champion', rows).tolist(),
+                    table.puuids(rows),
+                    table.column('win', rows).tolist(),
+                    table.column('timestamp', rows).tolist()
+                )
+            ]
             
         except Exception as e:
             self.logger.error(f"Failed to get matches by role: {e}")
             return []
     
+    def get_matchup_counts(
+        self,
+        champion_ids: Sequence[int],
+        role: str,
+        enemies: Sequence[Tuple[int, str]]
+    ) -> np.ndarray:
+        """
+        Get head-to-head games and wins from the champion matchup matrix.
+        
+        Args:
+            champion_ids: Our champion IDs
+            role: Our champions' role
+            enemies: (enemy champion ID, enemy role) pairs
+            
+        Returns:
+            Array of shape (len(champion_ids), len(enemies), 2) holding the
+            games each of our champions played against each enemy and the
+            games it won
+        """
+        return self.champion_matchups.counts(
+            champion_ids,
+            normalize_role(role),
+            [(enemy_champion_id, normalize_role(enemy_role)) for enemy_champion_id, enemy_role in enemies]
+        )
+    
     def get_champion_matchups(
         self,
         champion_id: int,
@@ -714,41 +1346,53 @@ class MatchManager:
             enemy_role: Enemy champion's role
             
         Returns:
-            List of matchup data dictionaries
+            List of matchup data dictionaries, newest first
         """
         try:
-            matchup_data = []
+            role = normalize_role(role)
+            enemy_role = normalize_role(enemy_role)
+            
+            # Only matches that have both champion+role pairs
+            candidates = (self._champion_role_index.get((champion_id, role), set()) &
+                          self._champion_role_index.get((enemy_champion_id, enemy_role), set()))
+            match_ids = self._sorted_by_recency(candidates)
+            
+            table = self.participant_table
+            candidate_rows = table.rows_for_matches(match_ids)
+            our_selected = table.select(champion_ids=[champion_id], roles=[role], rows=candidate_rows)
+            enemy_selected = table.select(champion_ids=[enemy_champion_id], roles=[enemy_role],
+                                          rows=candidate_rows)
+            our_rows = dict(zip(table.match_ids(our_selected), our_selected.tolist()))
+            enemy_rows = dict(zip(table.match_ids(enemy_selected), enemy_selected.tolist()))
             
-            for match in self._matches_cache.values():
-                our_participant = None
-                enemy_participant = None
+            matchup_data = []
+            for match_id in match_ids:
+                our_row = our_rows.get(match_id)
+                enemy_row = enemy_rows.get(match_id)
+                if our_row is None or enemy_row is None:
+                    continue
                 
-                # Find both participants in the match
-                for participant in match.participants:
-                    if (participant.champion_id == champion_id and 
-                        participant.individual_position.lower() == role.lower()):
-                        our_participant = participant
-                    elif (participant.champion_id == enemy_champion_id and 
-                          participant.individual_position.lower() == enemy_role.lower()):
-                        enemy_participant = participant
+                pair = np.array([our_row, enemy_row])
+                teams = table.column('team', pair).tolist()
                 
-                # If both participants found and on opposite teams
-                if (our_participant and enemy_participant and 
-                    our_participant.team_id != enemy_participant.team_id):
-                    
-                    matchup_data.append({
-                        'match_id': match.match_id,
-                        'our_champion': champion_id,
-                        'enemy_champion': enemy_champion_id,
-                        'win': our_participant.win,
-                        'our_kda': (our_participant.kills + our_participant.assists) / max(our_participant.deaths, 1),
-                        'enemy_kda': (enemy_participant.kills + enemy_participant.assists) / max(enemy_participant.deaths, 1),
-                        'game_creation': match.game_creation,
-                        'game_duration': match.game_duration
-                    })
+                # Both participants must be on opposite teams
+                if teams[0] == teams[1]:
+                    continue
+                
+                kda = table.metric_values(pair, 'avg_kda').tolist()
+                matchup_data.append({
+                    'match_id': match_id,
+                    'our_champion': champion_id,
+                    'enemy_champion': enemy_champion_id,
+                    'win': bool(table.column('win', pair)[0]),
+                    'our_kda': kda[0],
+                    'enemy_kda': kda[1],
+                    'game_creation': int(table.column('timestamp', pair)[0]),
+                    'game_duration': int(table.column('duration', pair)[0])
+                })
             
             return matchup_data
             
         except Exception as e:
             self.logger.error(f"Failed to get champion matchups: {e}")
-            return []
\ No newline at end of file
+            return []
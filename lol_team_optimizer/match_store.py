@@ -0,0 +1,714 @@
+"""
+Append-only segmented storage for match records.
+
+Matches are written as single-line records to append-only segment files.
+The active segment doubles as the write-ahead log: a record is durable as
+soon as its line has been flushed. Sealed segments are listed in a manifest
+that is only ever replaced atomically, and compaction rewrites the live
+records into fresh segments once enough of the store consists of deleted or
+superseded records.
+
+Record format (one per line, UTF-8)::
+
+    P\\t<match_id>\\t<json payload>\\n    put
+    D\\t<match_id>\\n                   delete (tombstone)
+
+Keeping the match ID outside the JSON payload lets the store replay a
+segment without decoding any payloads.
+
+Every segment has an offset index next to it (``seg-NNNNNN.idx``), a JSON
+lines journal of ``[op, match_id, offset, length, summary]`` entries that is
+appended together with the segment. Opening the store replays these indexes
+instead of the segments themselves, and records are read back on demand
+from memory-mapped segment files. The summary is an opaque, compact value
+produced by the caller's ``summarize`` callback so that in-memory indexes
+can be rebuilt without decoding any match.
+
+`position` names a point in the log; `changes_since` reads the offset
+indexes from such a point so that derived data saved at a position (such as
+the analytics match index) can catch up without rescanning the store.
+"""
+
+import json
+import logging
+import mmap
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+MANIFEST_VERSION = 1
+
+_PUT = b"P"
+_DELETE = b"D"
+_SEP = b"\t"
+
+# Offset index operations
+_OP_PUT = "P"
+_OP_DELETE = "D"
+_OP_CORRUPT = "X"
+
+
+class MatchStoreError(Exception):
+    """Raised when the match store cannot be read or written."""
+    pass
+
+
+@dataclass
+class RecordLocation:
+    """Position of a live record inside a segment file."""
+    
+    segment: str
+    offset: int
+    length: int
+
+
+class MatchStore:
+    """
+    Log-structured, append-only store for serialized matches.
+    
+    Inserts cost a single append to the active segment (and its offset
+    index) regardless of how many matches are already stored. Deletes append
+    a tombstone. Space held by dead records is reclaimed by `compact`, which
+    `maybe_compact` runs automatically once the dead fraction passes
+    `compaction_ratio`.
+    
+    A store opened read-only (e.g. by analytics worker processes) never
+    writes, repairs or deletes files, so it can be opened alongside the
+    process that owns the store.
+    """
+    
+    def __init__(self, store_dir: Path, segment_max_bytes: int = 64 * 1024 * 1024,
+                 compaction_ratio: float = 0.5, fsync: bool = False,
+                 summarize: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 summary_version: int = 0, read_only: bool = False):
+        """
+        Initialize the match store.
+        
+        Args:
+            store_dir: Directory holding the manifest and segment files
+            segment_max_bytes: Size at which the active segment is sealed
+            compaction_ratio: Fraction of dead bytes that triggers compaction
+            fsync: Whether to fsync segment appends (slower, survives power loss)
+            summarize: Builds the index summary for a decoded record
+            summary_version: Version of `summarize`; indexes written with a
+                different version are rebuilt from their segments
+            read_only: Open without modifying any file; writes raise MatchStoreError
+        """
+        self.store_dir = Path(store_dir)
+        self.manifest_file = self.store_dir / "MANIFEST.json"
+        self.segment_max_bytes = segment_max_bytes
+        self.compaction_ratio = compaction_ratio
+        self.fsync = fsync
+        self.summarize = summarize
+        self.summary_version = summary_version
+        self.read_only = read_only
+        self.logger = logging.getLogger(__name__)
+        
+        self._lock = threading.RLock()
+        self._sealed: List[str] = []
+        self._active: str = ""
+        self._next_segment_id = 1
+        self._locations: Dict[str, RecordLocation] = {}
+        self._segment_sizes: Dict[str, int] = {}
+        self._dead_bytes = 0
+        self._summaries: Dict[str, Any] = {}
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._store_id: Optional[str] = None
+        
+        if not read_only:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+        self._open()
+    
+    # ------------------------------------------------------------------
+    # Manifest and recovery
+    # ------------------------------------------------------------------
+    
+    def _open(self) -> None:
+        """Load the manifest and replay every segment it lists."""
+        with self._lock:
+            if self.manifest_file.exists():
+                try:
+                    with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                        manifest = json.load(f)
+                except (OSError, ValueError) as e:
+                    raise MatchStoreError(f"Unreadable match store manifest: {e}") from e
+                
+                self._sealed = list(manifest.get('sealed', []))
+                self._active = manifest.get('active') or self._segment_name(manifest.get('next_segment_id', 1))
+                self._next_segment_id = manifest.get('next_segment_id', 1)
+                self._store_id = manifest.get('store_id')
+                if self._store_id is None and not self.read_only:
+                    # Manifests written before stores had an identity
+                    self._store_id = uuid.uuid4().hex
+                    self._write_manifest()
+            elif self.read_only:
+                self._active = self._segment_name(self._next_segment_id)
+            else:
+                self._store_id = uuid.uuid4().hex
+                self._active = self._allocate_segment_name()
+                self._write_manifest()
+            
+            if not self.read_only:
+                self._remove_orphan_segments()
+            
+            for segment in self._sealed:
+                self._replay_segment(segment, repair_tail=False)
+            self._replay_segment(self._active, repair_tail=not self.read_only)
+    
+    def _segment_name(self, segment_id: int) -> str:
+        return f"seg-{segment_id:06d}.log"
+    
+    def _allocate_segment_name(self) -> str:
+        name = self._segment_name(self._next_segment_id)
+        self._next_segment_id += 1
+        return name
+    
+    def _segment_path(self, segment: str) -> Path:
+        return self.store_dir / segment
+    
+    def _index_path(self, segment: str) -> Path:
+        return (self.store_dir / segment).with_suffix('.idx')
+    
+    def _write_manifest(self) -> None:
+        """Atomically replace the manifest."""
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'store_id': self._store_id,
+            'sealed': self._sealed,
+            'active': self._active,
+            'next_segment_id': self._next_segment_id
+        }
+        temp_file = self.manifest_file.with_suffix('.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        temp_file.replace(self.manifest_file)
+    
+    def _remove_orphan_segments(self) -> None:
+        """Delete segment files left behind by an interrupted compaction."""
+        known = set(self._sealed)
+        known.add(self._active)
+        for path in list(self.store_dir.glob("seg-*.log")) + list(self.store_dir.glob("seg-*.idx")):
+            if path.with_suffix('.log').name not in known:
+                self.logger.warning(f"Removing orphaned match segment file {path.name}")
+                path.unlink(missing_ok=True)
+    
+    def _replay_segment(self, segment: str, repair_tail: bool) -> None:
+        """
+        Rebuild record locations for one segment.
+        
+        The offset index is replayed first; only bytes of the segment that
+        the index does not cover yet (after a crash, or for segments written
+        before the index existed) are scanned and decoded.
+        
+        Args:
+            segment: Segment file name
+            repair_tail: Truncate a torn final record (only safe for the active segment)
+        """
+        path = self._segment_path(segment)
+        if not path.exists():
+            if segment != self._active:
+                self.logger.error(f"Match segment {segment} listed in manifest is missing")
+            if not self.read_only:
+                self._index_path(segment).unlink(missing_ok=True)
+            self._segment_sizes[segment] = 0
+            return
+        
+        size = path.stat().st_size
+        covered = self._replay_index(segment, size)
+        if covered < size:
+            covered = self._scan_segment(segment, covered, repair_tail)
+        self._segment_sizes[segment] = covered
+    
+    def _replay_index(self, segment: str, segment_size: int) -> int:
+        """
+        Apply the offset index of a segment.
+        
+        Returns:
+            Number of segment bytes covered by valid index entries
+        """
+        index_path = self._index_path(segment)
+        if not index_path.exists():
+            return 0
+        
+        expected = 0
+        good_bytes = 0
+        with open(index_path, 'rb') as f:
+            header_line = f.readline()
+            try:
+                header = json.loads(header_line) if header_line.endswith(b"\n") else {}
+            except ValueError:
+                header = {}
+            if header.get('summary_version') != self.summary_version:
+                if not self.read_only:
+                    index_path.unlink()
+                return 0
+            good_bytes = len(header_line)
+            
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        break
+                    entry = json.loads(line)
+                    op, match_id, offset, length = entry[:4]
+                    summary = entry[4] if op == _OP_PUT and len(entry) > 4 else None
+                except (ValueError, IndexError, TypeError):
+                    break
+                if offset != expected or offset + length > segment_size:
+                    break
+                self._apply(op, match_id, segment, offset, length, summary, keep_summary=True)
+                expected += length
+                good_bytes += len(line)
+        
+        if good_bytes < index_path.stat().st_size and not self.read_only:
+            with open(index_path, 'r+b') as f:
+                f.truncate(good_bytes)
+        return expected
+    
+    def _scan_segment(self, segment: str, start: int, repair_tail: bool) -> int:
+        """
+        Decode segment records from `start` and append them to the offset index.
+        
+        Returns:
+            End offset of the last valid record
+        """
+        path = self._segment_path(segment)
+        offset = start
+        entries: List[list] = []
+        with open(path, 'rb') as f:
+            f.seek(start)
+            for line in f:
+                length = len(line)
+                if self.read_only and not line.endswith(b"\n"):
+                    break  # a record the writer is still appending
+                parsed = self._parse_line(line) if line.endswith(b"\n") else None
+                if parsed is None:
+                    if repair_tail:
+                        self.logger.warning(f"Truncating torn tail of {segment} at byte {offset}")
+                        with open(path, 'r+b') as out:
+                            out.truncate(offset)
+                        break
+                    self.logger.warning(f"Skipping corrupt record at {segment}:{offset}")
+                    parsed = (_OP_CORRUPT, None, None)
+                
+                op, match_id, summary = parsed
+                self._apply(op, match_id, segment, offset, length, summary, keep_summary=True)
+                entries.append([op, match_id, offset, length, summary])
+                offset += length
+        
+        self._append_index(segment, entries)
+        return offset
+    
+    def _parse_line(self, line: bytes) -> Optional[Tuple[str, str, Any]]:
+        """Parse a record line into (op, match_id, summary), or None if corrupt."""
+        parts = line.rstrip(b"\n").split(_SEP, 2)
+        if len(parts) < 2 or not parts[1]:
+            return None
+        match_id = parts[1].decode('utf-8')
+        
+        if parts[0] == _DELETE and len(parts) == 2:
+            return _OP_DELETE, match_id, None
+        if parts[0] != _PUT or len(parts) != 3:
+            return None
+        
+        summary = None
+        if self.summarize is not None:
+            try:
+                summary = self.summarize(json.loads(parts[2]))
+            except Exception as e:
+                self.logger.warning(f"Unreadable match record {match_id}: {e}")
+                return None
+        return _OP_PUT, match_id, summary
+    
+    def _apply(self, op: str, match_id: Optional[str], segment: str, offset: int,
+               length: int, summary: Any = None, keep_summary: bool = False) -> None:
+        """Apply one record to the location map."""
+        if op == _OP_CORRUPT:
+            self._dead_bytes += length
+            return
+        
+        previous = self._locations.pop(match_id, None)
+        if previous is not None:
+            self._dead_bytes += previous.length
+        self._summaries.pop(match_id, None)
+        
+        if op == _OP_PUT:
+            self._locations[match_id] = RecordLocation(segment, offset, length)
+            if keep_summary and summary is not None:
+                self._summaries[match_id] = summary
+        else:
+            self._dead_bytes += length
+    
+    def _append_index(self, segment: str, entries: List[list]) -> None:
+        """Append entries to a segment's offset index, creating it if needed."""
+        if self.read_only:
+            return
+        index_path = self._index_path(segment)
+        lines = []
+        if not index_path.exists():
+            lines.append(json.dumps({'summary_version': self.summary_version}))
+        lines.extend(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) for entry in entries)
+        if not lines:
+            return
+        with open(index_path, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+    
+    def take_summaries(self) -> Dict[str, Any]:
+        """
+        Return the summaries of live records gathered while opening the store.
+        
+        The store does not keep summaries itself; they are handed over once
+        so the caller can build its own indexes.
+        """
+        with self._lock:
+            summaries, self._summaries = self._summaries, {}
+            return summaries
+    
+    def position(self) -> Dict[str, Any]:
+        """
+        Identify the current end of the log.
+        
+        Returns:
+            JSON-serializable position accepted by `changes_since`
+        """
+        with self._lock:
+            index_path = self._index_path(self._active)
+            return {
+                'store_id': self._store_id,
+                'sealed': list(self._sealed),
+                'active': self._active,
+                'offset': self._segment_sizes.get(self._active, 0),
+                'index_offset': index_path.stat().st_size if index_path.exists() else 0
+            }
+    
+    def changes_since(self, position: Dict[str, Any]) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        List the records written after a position, from the offset indexes.
+        
+        Only index entries appended after the position are read, so the cost
+        follows the number of changes rather than the size of the store.
+        
+        Args:
+            position: Value previously returned by `position`
+            
+        Returns:
+            (IDs whose last record is a put, IDs whose last record is a
+            delete), or None when the position does not belong to this log
+            any more (another store, or a compaction rewrote the segments)
+        """
+        with self._lock:
+            try:
+                sealed = list(position['sealed'])
+                active = position['active']
+                offset = int(position['offset'])
+                index_offset = int(position['index_offset'])
+            except (KeyError, TypeError, ValueError):
+                return None
+            
+            segments = self._sealed + [self._active]
+            if (position.get('store_id') != self._store_id or segments[:len(sealed)] != sealed
+                    or len(segments) <= len(sealed) or segments[len(sealed)] != active):
+                return None
+            
+            last_op: Dict[str, str] = {}
+            for segment in segments[len(sealed):]:
+                start, start_byte = (offset, index_offset) if segment == active else (0, 0)
+                size = self._segment_sizes.get(segment, 0)
+                if size == start:
+                    continue
+                entries = self._read_index_entries(segment, start_byte, size)
+                if entries is None or not entries or entries[0][2] != start:
+                    return None
+                for op, match_id, _ in entries:
+                    if op != _OP_CORRUPT:
+                        last_op.pop(match_id, None)
+                        last_op[match_id] = op
+            
+            puts = [match_id for match_id, op in last_op.items() if op == _OP_PUT]
+            deletes = [match_id for match_id, op in last_op.items() if op == _OP_DELETE]
+            return puts, deletes
+    
+    def _read_index_entries(self, segment: str, start_byte: int,
+                            segment_size: int) -> Optional[List[Tuple[str, Optional[str], int]]]:
+        """Read (op, match_id, offset) offset index entries from a byte position of the index."""
+        index_path = self._index_path(segment)
+        if not index_path.exists() or index_path.stat().st_size < start_byte:
+            return None
+        
+        entries = []
+        with open(index_path, 'rb') as f:
+            f.seek(start_byte)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    return None
+                if isinstance(entry, dict):
+                    continue  # header
+                if entry[2] >= segment_size:
+                    break
+                entries.append((entry[0], entry[1], entry[2]))
+        return entries
+    
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    
+    def _encode_put(self, match_id: str, payload: Dict[str, Any]) -> bytes:
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=str)
+        return _PUT + _SEP + match_id.encode('utf-8') + _SEP + body.encode('utf-8') + b"\n"
+    
+    def _append_lines(self, records: List[Tuple[str, str, bytes, Any]]) -> None:
+        """Append encoded (op, match_id, line, summary) records to the active segment."""
+        if not records:
+            return
+        self._check_writable()
+        
+        path = self._segment_path(self._active)
+        offset = self._segment_sizes.get(self._active, 0)
+        with open(path, 'ab') as f:
+            f.write(b"".join(line for _, _, line, _ in records))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        
+        entries = []
+        for op, match_id, line, summary in records:
+            self._apply(op, match_id, self._active, offset, len(line))
+            entries.append([op, match_id, offset, len(line), summary])
+            offset += len(line)
+        self._append_index(self._active, entries)
+        
+        self._segment_sizes[self._active] = offset
+        if offset >= self.segment_max_bytes:
+            self._roll_segment()
+    
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise MatchStoreError(f"Match store {self.store_dir} is open read-only")
+    
+    def _roll_segment(self) -> None:
+        """Seal the active segment and start a new one."""
+        self._sealed.append(self._active)
+        self._active = self._allocate_segment_name()
+        self._segment_sizes[self._active] = 0
+        self._write_manifest()
+    
+    def put(self, match_id: str, payload: Dict[str, Any], summary: Any = None) -> None:
+        """Append a single record."""
+        self.put_batch([(match_id, payload, summary)])
+    
+    def put_batch(self, items: List[Tuple[str, Dict[str, Any], Any]]) -> None:
+        """
+        Append several records with one write and one flush.
+        
+        Args:
+            items: (match_id, payload, summary) tuples; when summary is None
+                and a `summarize` callback is configured it is computed here
+        """
+        with self._lock:
+            records = []
+            for match_id, payload, summary in items:
+                if summary is None and self.summarize is not None:
+                    summary = self.summarize(payload)
+                records.append((_OP_PUT, match_id, self._encode_put(match_id, payload), summary))
+            self._append_lines(records)
+    
+    def delete_batch(self, match_ids: List[str]) -> int:
+        """
+        Append tombstones for the given records.
+        
+        Returns:
+            Number of records that were live and are now deleted
+        """
+        with self._lock:
+            live = [match_id for match_id in match_ids if match_id in self._locations]
+            self._append_lines([(_OP_DELETE, match_id, _DELETE + _SEP + match_id.encode('utf-8') + b"\n", None)
+                                for match_id in live])
+            return len(live)
+    
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    
+    def __contains__(self, match_id: str) -> bool:
+        return match_id in self._locations
+    
+    def __len__(self) -> int:
+        return len(self._locations)
+    
+    def ids(self) -> List[str]:
+        """IDs of all live records."""
+        with self._lock:
+            return list(self._locations)
+    
+    def _read(self, location: RecordLocation) -> bytes:
+        """Read a record through a memory map of its segment."""
+        end = location.offset + location.length
+        mapped = self._maps.get(location.segment)
+        if mapped is None or len(mapped) < end:
+            # Segments only grow, so a stale map of the active segment is remapped
+            if mapped is not None:
+                mapped.close()
+            with open(self._segment_path(location.segment), 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[location.segment] = mapped
+        return mapped[location.offset:end]
+    
+    def _decode(self, line: bytes) -> Dict[str, Any]:
+        return json.loads(line.rstrip(b"\n").split(_SEP, 2)[2])
+    
+    def get(self, match_id: str) -> Optional[Dict[str, Any]]:
+        """Read and decode a single record."""
+        with self._lock:
+            location = self._locations.get(match_id)
+            if location is None:
+                return None
+            line = self._read(location)
+        return self._decode(line)
+    
+    def iter_records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield every live record in segment order."""
+        with self._lock:
+            order = {segment: i for i, segment in enumerate(self._sealed + [self._active])}
+            locations = sorted(self._locations.items(),
+                               key=lambda item: (order.get(item[1].segment, 0), item[1].offset))
+        
+        for match_id, _ in locations:
+            payload = self.get(match_id)
+            if payload is not None:
+                yield match_id, payload
+    
+    def close(self) -> None:
+        """Release memory maps held by the store."""
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps = {}
+    
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+    
+    @property
+    def total_bytes(self) -> int:
+        """Bytes used by all segment files."""
+        return sum(self._segment_sizes.values())
+    
+    @property
+    def dead_bytes(self) -> int:
+        """Bytes held by deleted or superseded records."""
+        return self._dead_bytes
+    
+    def maybe_compact(self) -> bool:
+        """Compact if the dead fraction exceeds `compaction_ratio`."""
+        with self._lock:
+            total = self.total_bytes
+            if self.read_only or total == 0 or self._dead_bytes / total < self.compaction_ratio:
+                return False
+            self.compact()
+            return True
+    
+    def _read_index_summaries(self, segment: str) -> Dict[int, Any]:
+        """Map record offsets of a segment to their stored summaries."""
+        summaries: Dict[int, Any] = {}
+        index_path = self._index_path(segment)
+        if not index_path.exists():
+            return summaries
+        with open(index_path, 'rb') as f:
+            f.readline()
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if entry[0] == _OP_PUT:
+                    summaries[entry[2]] = entry[4]
+        return summaries
+    
+    def compact(self) -> None:
+        """
+        Rewrite all live records into fresh segments.
+        
+        New segments and their indexes are fully written and synced before
+        the manifest is swapped, so a crash at any point leaves either the
+        old or the new generation intact; leftovers are removed on the next
+        open.
+        """
+        self._check_writable()
+        with self._lock:
+            old_segments = self._sealed + [self._active]
+            new_segments: List[str] = []
+            new_locations: Dict[str, RecordLocation] = {}
+            new_sizes: Dict[str, int] = {}
+            
+            out = None
+            out_name = ""
+            out_size = 0
+            out_entries: List[list] = []
+            try:
+                for segment in old_segments:
+                    entries = sorted(
+                        (loc.offset, loc.length, match_id)
+                        for match_id, loc in self._locations.items() if loc.segment == segment
+                    )
+                    if not entries:
+                        continue
+                    summaries = self._read_index_summaries(segment)
+                    with open(self._segment_path(segment), 'rb') as src:
+                        for offset, length, match_id in entries:
+                            if out is None or out_size >= self.segment_max_bytes:
+                                if out is not None:
+                                    self._finish_segment(out, out_name, out_entries)
+                                    new_sizes[out_name] = out_size
+                                out_name = self._allocate_segment_name()
+                                new_segments.append(out_name)
+                                out = open(self._segment_path(out_name), 'wb')
+                                out_size = 0
+                                out_entries = []
+                            src.seek(offset)
+                            out.write(src.read(length))
+                            out_entries.append([_OP_PUT, match_id, out_size, length, summaries.get(offset)])
+                            new_locations[match_id] = RecordLocation(out_name, out_size, length)
+                            out_size += length
+                if out is not None:
+                    self._finish_segment(out, out_name, out_entries)
+                    new_sizes[out_name] = out_size
+                    out = None
+            except Exception:
+                if out is not None:
+                    out.close()
+                for name in new_segments:
+                    self._segment_path(name).unlink(missing_ok=True)
+                    self._index_path(name).unlink(missing_ok=True)
+                raise
+            
+            self._sealed = new_segments
+            self._active = self._allocate_segment_name()
+            new_sizes[self._active] = 0
+            self._write_manifest()
+            
+            self.close()
+            self._locations = new_locations
+            self._segment_sizes = new_sizes
+            self._dead_bytes = 0
+            for segment in old_segments:
+                self._segment_path(segment).unlink(missing_ok=True)
+                self._index_path(segment).unlink(missing_ok=True)
+            
+            self.logger.info(f"Compacted match store into {len(new_segments)} segments "
+                             f"({len(new_locations)} live records)")
+    
+    def _finish_segment(self, handle, segment: str, entries: List[list]) -> None:
+        handle.flush()
+        os.fsync(handle.fileno())
+        handle.close()
+        self._index_path(segment).unlink(missing_ok=True)
+        self._append_index(segment, entries)
@@ -14,6 +14,8 @@ from dataclasses import dataclass
 from .models import Player, TeamAssignment, PerformanceData, ChampionRecommendation
 from .performance_calculator import PerformanceCalculator
 from .champion_data import ChampionDataManager
+from .team_selection import evaluate_all_teams, select_top_teams
+from .player_score_cache import PlayerScoreCache
 
 
 @dataclass
@@ -64,14 +66,26 @@ class OptimizationEngine:
             "team_synergy": 0.15
         }
         
+        # Latency budget for the team search on large rosters; the best teams found so far are used when it runs out
+        self.search_time_budget_seconds = 2.0
+        
+        # "branch_and_bound" prunes the team search; "exhaustive" scores every combination
+        # in vectorized chunks over a process pool of search_workers (None = one per CPU)
+        self.search_strategy = "branch_and_bound"
+        self.search_workers: Optional[int] = None
+        
+        # Per-player role scores, reused across combinations and optimization calls
+        self.score_cache = PlayerScoreCache(self.roles)
+        
         self.logger.info("Optimization engine initialized")
     
-    def optimize_team(self, available_players: List[Player]) -> OptimizationResult:
+    def optimize_team(self, available_players: List[Player], top_k: int = 10) -> OptimizationResult:
         """
         Find optimal role assignments for available players.
         
         Args:
             available_players: List of players to assign roles to
+            top_k: Number of ranked team assignments to return
             
         Returns:
             OptimizationResult with ranked team assignments
@@ -105,15 +119,10 @@ class OptimizationEngine:
                 team_combinations = [available_players]
                 self.logger.info(f"Optimizing team with {len(available_players)} players")
             else:
-                # Generate combinations of 5 players from available pool
-                from itertools import combinations
-                team_combinations = list(combinations(available_players, 5))
-                self.logger.info(f"Evaluating {len(team_combinations)} possible team combinations")
-                
-                # Limit combinations to prevent excessive computation
-                if len(team_combinations) > 100:
-                    self.logger.warning(f"Too many combinations ({len(team_combinations)}), limiting to first 100")
-                    team_combinations = team_combinations[:100]
+                # Search the whole pool for the best five-player teams
+                synergy = self._build_synergy_tensor(available_players)
+                team_combinations = self._select_team_combinations(available_players, top_k, synergy)
+                self.logger.info(f"Selected {len(team_combinations)} best team combinations for evaluation")
             
             all_assignments = []
             failed_combinations = 0
@@ -145,7 +154,7 @@ class OptimizationEngine:
             self.logger.info(f"Optimization completed in {optimization_time:.2f} seconds, found {len(all_assignments)} valid assignments")
             
             return OptimizationResult(
-                assignments=all_assignments[:10],  # Return top 10 solutions
+                assignments=all_assignments[:top_k],
                 best_assignment=all_assignments[0],
                 optimization_time=optimization_time
             )
@@ -154,6 +163,67 @@ class OptimizationEngine:
             self.logger.error(f"Optimization failed: {e}", exc_info=True)
             raise ValueError(f"Team optimization failed: {e}") from e
     
+    def _select_team_combinations(self, players: List[Player], k: int,
+                                  synergy: Optional[np.ndarray] = None) -> List[List[Player]]:
+        """
+        Find the k best five-player teams in a pool of more than five players.
+        
+        Teams are ranked by the same objective _optimize_single_team reports
+        (best role assignment plus synergy) from precomputed score arrays, so
+        recommendations and explanations are only generated for the teams
+        returned here.
+        
+        Args:
+            players: Player pool
+            k: Number of teams to select
+            synergy: The pool's tensor from _build_synergy_tensor, which does not
+                depend on the weights; built here if not given
+            
+        Returns:
+            Player lists of the selected teams, best first
+        """
+        n_players = len(players)
+        scores = -self._build_cost_matrix(players)[:n_players, :len(self.roles)]
+        if synergy is None:
+            synergy = self._build_synergy_tensor(players)
+        
+        if self.search_strategy == "exhaustive":
+            candidates = evaluate_all_teams(scores, synergy, k, self.search_workers)
+            completed = True
+        else:
+            candidates, completed = select_top_teams(scores, synergy, k, self.search_time_budget_seconds)
+        if not completed:
+            self.logger.warning(f"Team search for {n_players} players hit its time budget; results may not be optimal")
+        
+        return [[players[i] for i in candidate.player_indices] for candidate in candidates]
+    
+    def _build_synergy_tensor(self, players: List[Player]) -> np.ndarray:
+        """
+        Build the pairwise synergy of every two players in every two distinct roles.
+        
+        Args:
+            players: List of players
+            
+        Returns:
+            Array where synergy[i, r1, j, r2] is the synergy of player i in role r1 with player j in role r2
+        """
+        n_players = len(players)
+        n_roles = len(self.roles)
+        synergy = np.zeros((n_players, n_roles, n_players, n_roles))
+        
+        for i in range(n_players):
+            for j in range(i + 1, n_players):
+                for r1, role1 in enumerate(self.roles):
+                    for r2, role2 in enumerate(self.roles):
+                        if r1 == r2:
+                            continue
+                        score = self.performance_calculator.calculate_synergy_score(
+                            players[i], role1, players[j], role2, self.synergy_database
+                        )
+                        synergy[i, r1, j, r2] = synergy[j, r2, i, r1] = score
+        
+        return synergy
+    
     def _optimize_single_team(self, players: List[Player]) -> TeamAssignment:
         """
         Optimize role assignments for available players (2-5 players).
@@ -235,25 +305,15 @@ class OptimizationEngine:
         matrix_size = max(n_players, n_roles)
         cost_matrix = np.full((matrix_size, matrix_size), 1000.0)  # High cost for dummy assignments
         
-        # Fill in actual player costs
-        for i, player in enumerate(players):
-            for j, role in enumerate(self.roles):
-                # Calculate individual performance score
-                performance_score = self.performance_calculator.calculate_individual_score(
-                    player, role
-                )
-                
-                # Get role preference score (1-5, normalize to 0-1)
-                preference_score = player.role_preferences.get(role, 3) / 5.0
-                
-                # Combine scores with weights
-                total_score = (
-                    self.weights["individual_performance"] * performance_score +
-                    self.weights["role_preference"] * preference_score
-                )
-                
-                # Use negative score as cost (since we minimize cost)
-                cost_matrix[i, j] = -total_score
+        # Fill in actual player costs from the cached score tensor
+        individual_scores, preference_scores = self.score_cache.get_scores(players, self.performance_calculator)
+        total_scores = (
+            self.weights["individual_performance"] * individual_scores +
+            self.weights["role_preference"] * preference_scores
+        )
+        
+        # Use negative score as cost (since we minimize cost)
+        cost_matrix[:n_players, :n_roles] = -total_scores
         
         return cost_matrix
     
@@ -651,14 +711,17 @@ class OptimizationEngine:
         if len(available_players) < 5:
             return alternatives
         
+        # The weighted strategies share one synergy tensor for the pool
+        synergy = self._build_synergy_tensor(available_players) if len(available_players) > 5 else None
+        
         # Strategy 1: Preference-weighted optimization
-        alternatives.extend(self._optimize_with_preference_weight(available_players, 0.8))
+        alternatives.extend(self._optimize_with_preference_weight(available_players, 0.8, synergy))
         
         # Strategy 2: Performance-weighted optimization  
-        alternatives.extend(self._optimize_with_performance_weight(available_players, 0.9))
+        alternatives.extend(self._optimize_with_performance_weight(available_players, 0.9, synergy))
         
         # Strategy 3: Synergy-focused optimization
-        alternatives.extend(self._optimize_with_synergy_focus(available_players))
+        alternatives.extend(self._optimize_with_synergy_focus(available_players, synergy))
         
         # Strategy 4: Role-balanced optimization (ensure no player is too far from preferred role)
         alternatives.extend(self._optimize_role_balanced(available_players))
@@ -670,7 +733,8 @@ class OptimizationEngine:
         unique_alternatives.sort(key=lambda x: x.total_score, reverse=True)
         return unique_alternatives[:5]
     
-    def _optimize_with_preference_weight(self, players: List[Player], weight: float) -> List[TeamAssignment]:
+    def _optimize_with_preference_weight(self, players: List[Player], weight: float,
+                                         synergy: Optional[np.ndarray] = None) -> List[TeamAssignment]:
         """Optimize with higher preference weighting."""
         original_weights = self.weights.copy()
         self.weights["role_preference"] = weight
@@ -682,9 +746,8 @@ class OptimizationEngine:
                 result = self._optimize_single_team(players)
                 return [result] if result and result.is_complete() else []
             else:
-                from itertools import combinations
                 best_assignments = []
-                for team in list(combinations(players, 5))[:10]:  # Limit combinations
+                for team in self._select_team_combinations(players, 3, synergy):
                     assignment = self._optimize_single_team(list(team))
                     if assignment and assignment.is_complete():
                         best_assignments.append(assignment)
@@ -692,7 +755,8 @@ class OptimizationEngine:
         finally:
             self.weights = original_weights
     
-    def _optimize_with_performance_weight(self, players: List[Player], weight: float) -> List[TeamAssignment]:
+    def _optimize_with_performance_weight(self, players: List[Player], weight: float,
+                                          synergy: Optional[np.ndarray] = None) -> List[TeamAssignment]:
         """Optimize with higher performance weighting."""
         original_weights = self.weights.copy()
         self.weights["individual_performance"] = weight
@@ -704,9 +768,8 @@ class OptimizationEngine:
                 result = self._optimize_single_team(players)
                 return [result] if result and result.is_complete() else []
             else:
-                from itertools import combinations
                 best_assignments = []
-                for team in list(combinations(players, 5))[:10]:
+                for team in self._select_team_combinations(players, 3, synergy):
                     assignment = self._optimize_single_team(list(team))
                     if assignment and assignment.is_complete():
                         best_assignments.append(assignment)
@@ -714,7 +777,8 @@ class OptimizationEngine:
         finally:
             self.weights = original_weights
     
-    def _optimize_with_synergy_focus(self, players: List[Player]) -> List[TeamAssignment]:
+    def _optimize_with_synergy_focus(self, players: List[Player],
+                                     synergy: Optional[np.ndarray] = None) -> List[TeamAssignment]:
         """Optimize with focus on team synergy."""
         original_weights = self.weights.copy()
         self.weights["team_synergy"] = 0.5
@@ -726,9 +790,8 @@ class OptimizationEngine:
                 result = self._optimize_single_team(players)
                 return [result] if result and result.is_complete() else []
             else:
-                from itertools import combinations
                 best_assignments = []
-                for team in list(combinations(players, 5))[:10]:
+                for team in self._select_team_combinations(players, 3, synergy):
                     assignment = self._optimize_single_team(list(team))
                     if assignment and assignment.is_complete():
                         best_assignments.append(assignment)
@@ -0,0 +1,593 @@
+"""
+Columnar participant table for vectorized match analytics.
+
+The table holds one row per (match, participant) with integer-coded
+identifiers and the per-game stats the analytics engines aggregate over.
+Columns are NumPy arrays, so filters are boolean masks and aggregates are
+single reductions instead of loops over Match objects.
+
+MatchManager keeps one table up to date as matches are stored and removed.
+Callers that already hold (Match, MatchParticipant) pairs can build a
+standalone table with ``ParticipantTable.from_pairs``.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .analytics_models import PerformanceMetrics
+
+
+# Column name -> dtype. Stats are summed as int64 so int32 storage is safe.
+COLUMNS: Dict[str, Any] = {
+    'match': np.int32,
+    'puuid': np.int32,
+    'champion': np.int32,
+    'role': np.int16,
+    'queue': np.int32,
+    'timestamp': np.int64,  # game_creation in milliseconds
+    'duration': np.int32,  # game_duration in seconds
+    'team': np.int16,
+    'win': np.bool_,
+    'kills': np.int32,
+    'deaths': np.int32,
+    'assists': np.int32,
+    'cs': np.int32,
+    'vision': np.int32,
+    'gold': np.int32,
+    'damage': np.int32,
+    'alive': np.bool_,
+}
+
+# Stat columns filled from per-participant summaries, in summary order
+STAT_COLUMNS = ('kills', 'deaths', 'assists', 'cs', 'vision', 'gold', 'damage')
+
+# Metrics that can be evaluated per row by ParticipantTable.metric_values
+ROW_METRICS = (
+    'win_rate', 'avg_kda', 'avg_cs_per_min', 'avg_vision_score',
+    'avg_damage_per_min', 'avg_gold_per_min'
+)
+
+_ROLE_MAPPING = {
+    'top': 'top',
+    'jungle': 'jungle',
+    'middle': 'middle',
+    'mid': 'middle',
+    'bottom': 'bottom',
+    'bot': 'bottom',
+    'adc': 'bottom',
+    'support': 'support',
+    'utility': 'support'
+}
+
+_MIN_CAPACITY = 1024
+
+# Numeric fields of a participant row: champion_id, team_id, win, then stats
+_NUMERIC_FIELDS = itemgetter(1, 3, 4, 5, 6, 7, 8, 9, 10, 11)
+
+
+def normalize_role(position: str) -> str:
+    """Normalize a Riot position string to one of our standard roles."""
+    position = (position or '').lower()
+    return _ROLE_MAPPING.get(position, position)
+
+
+@dataclass
+class ParticipantTotals:
+    """Summed stats over a selection of participant rows."""
+    
+    games: int = 0
+    weight: float = 0.0  # Sum of row weights; equals games when unweighted
+    wins: float = 0
+    kills: float = 0
+    deaths: float = 0
+    assists: float = 0
+    cs: float = 0
+    vision: float = 0
+    gold: float = 0
+    damage: float = 0
+    duration: float = 0  # seconds
+    
+    def to_performance_metrics(self) -> PerformanceMetrics:
+        """Convert unweighted totals into PerformanceMetrics."""
+        if self.games == 0:
+            return PerformanceMetrics()
+        
+        minutes = self.duration / 60
+        return PerformanceMetrics(
+            games_played=self.games,
+            wins=self.wins,
+            losses=self.games - self.wins,
+            win_rate=self.wins / self.games,
+            total_kills=self.kills,
+            total_deaths=self.deaths,
+            total_assists=self.assists,
+            avg_kda=(self.kills + self.assists) / max(self.deaths, 1),
+            total_cs=self.cs,
+            avg_cs_per_min=self.cs / minutes if self.duration > 0 else 0,
+            total_vision_score=self.vision,
+            avg_vision_score=self.vision / self.games,
+            total_damage_to_champions=self.damage,
+            avg_damage_per_min=self.damage / minutes if self.duration > 0 else 0,
+            total_gold_earned=self.gold,
+            avg_gold_per_min=self.gold / minutes if self.duration > 0 else 0,
+            total_game_duration=self.duration,
+            avg_game_duration=self.duration / (self.games * 60)
+        )
+
+
+class ParticipantTable:
+    """
+    NumPy-backed table with one row per (match, participant).
+    
+    Rows are appended per match and removed by clearing their ``alive``
+    flag; dead rows are dropped once they outnumber live ones, so row
+    indices are only valid until the next call that modifies the table.
+    """
+    
+    def __init__(self, capacity: int = _MIN_CAPACITY):
+        """
+        Initialize an empty table.
+        
+        Args:
+            capacity: Number of rows to preallocate
+        """
+        self._capacity = max(capacity, 1)
+        self._size = 0
+        self._dead = 0
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.zeros(self._capacity, dtype=dtype) for name, dtype in COLUMNS.items()
+        }
+        
+        # String interners; codes are stable for the lifetime of the table
+        self._puuid_codes: Dict[str, int] = {}
+        self._puuids: List[str] = []
+        self._match_codes: Dict[str, int] = {}
+        self._match_ids: List[str] = []
+        self._role_codes: Dict[str, int] = {}
+        self._roles: List[str] = []
+        
+        # match code -> (first row, row count) for live matches
+        self._match_rows: Dict[int, Tuple[int, int]] = {}
+    
+    @classmethod
+    def from_pairs(cls, pairs: Sequence[Tuple[Any, Any]]) -> 'ParticipantTable':
+        """
+        Build a standalone table from (Match, MatchParticipant) pairs.
+        
+        Only the timestamp, duration, win and stat columns are filled, and
+        row ``i`` corresponds to ``pairs[i]``.
+        
+        Args:
+            pairs: Sequence of (match, participant) tuples
+        
+        Returns:
+            ParticipantTable with one row per pair
+        """
+        table = cls(capacity=len(pairs))
+        if not pairs:
+            return table
+        
+        values = np.array([
+            (
+                match.game_duration,
+                participant.win,
+                participant.kills,
+                participant.deaths,
+                participant.assists,
+                participant.total_minions_killed + participant.neutral_minions_killed,
+                participant.vision_score,
+                participant.gold_earned,
+                participant.total_damage_dealt_to_champions
+            )
+            for match, participant in pairs
+        ], dtype=np.int64)
+        
+        count = len(pairs)
+        columns = table._columns
+        columns['duration'][:count] = values[:, 0]
+        columns['win'][:count] = values[:, 1] != 0
+        for offset, name in enumerate(STAT_COLUMNS, start=2):
+            columns[name][:count] = values[:, offset]
+        columns['timestamp'][:count] = [
+            round(match.game_creation_datetime.timestamp() * 1000) for match, _ in pairs
+        ]
+        columns['match'][:count] = -1
+        columns['puuid'][:count] = -1
+        columns['alive'][:count] = True
+        table._size = count
+        return table
+    
+    def __len__(self) -> int:
+        """Number of live rows."""
+        return self._size - self._dead
+    
+    @property
+    def match_count(self) -> int:
+        """Number of matches with rows in the table."""
+        return len(self._match_rows)
+    
+    def __contains__(self, match_id: object) -> bool:
+        code = self._match_codes.get(match_id)
+        return code is not None and code in self._match_rows
+    
+    def append_match(
+        self,
+        match_id: str,
+        game_creation: int,
+        queue_id: int,
+        game_duration: int,
+        participants: Sequence[Sequence[Any]]
+    ) -> None:
+        """
+        Add (or replace) the rows for one match.
+        
+        Args:
+            match_id: Match identifier
+            game_creation: Match start time in milliseconds
+            queue_id: Queue identifier
+            game_duration: Game length in seconds
+            participants: Per-participant rows laid out as
+                [puuid, champion_id, position, team_id, win,
+                 kills, deaths, assists, cs, vision, gold, damage]
+        """
+        self.append_matches([(match_id, game_creation, queue_id, game_duration, participants)])
+    
+    def append_matches(
+        self,
+        matches: Iterable[Tuple[str, int, int, int, Sequence[Sequence[Any]]]]
+    ) -> None:
+        """
+        Add (or replace) the rows for many matches with one write per column.
+        
+        Args:
+            matches: (match_id, game_creation, queue_id, game_duration,
+                participants) tuples as accepted by append_match; match IDs
+                must be unique within the batch
+        """
+        match_column: List[int] = []
+        match_values: List[Tuple[int, int, int]] = []
+        puuid_column: List[int] = []
+        role_column: List[int] = []
+        values: List[Sequence[Any]] = []
+        new_rows: Dict[int, Tuple[int, int]] = {}
+        
+        puuid_codes = self._puuid_codes
+        position_codes: Dict[str, int] = {}  # raw position -> normalized role code
+        start = self._size
+        for match_id, game_creation, queue_id, game_duration, participants in matches:
+            self.remove_match(match_id)
+            count = len(participants)
+            if count == 0:
+                continue
+            
+            match_code = self._intern(match_id, self._match_codes, self._match_ids)
+            new_rows[match_code] = (start + len(match_column), count)
+            match_column.extend([match_code] * count)
+            match_values.extend([(queue_id, game_creation, game_duration)] * count)
+            for participant in participants:
+                puuid = participant[0]
+                code = puuid_codes.get(puuid)
+                if code is None:
+                    code = self._intern(puuid, puuid_codes, self._puuids)
+                puuid_column.append(code)
+                
+                position = participant[2]
+                code = position_codes.get(position)
+                if code is None:
+                    code = self._intern(normalize_role(position), self._role_codes, self._roles)
+                    position_codes[position] = code
+                role_column.append(code)
+                
+                values.append(participant)
+        
+        count = len(match_column)
+        if count == 0:
+            return
+        
+        # remove_match may have compacted the table; re-anchor the new rows
+        shift = self._size - start
+        if shift:
+            new_rows = {code: (row + shift, n) for code, (row, n) in new_rows.items()}
+        
+        self._reserve(count)
+        start = self._size
+        end = start + count
+        columns = self._columns
+        
+        per_match = np.array(match_values, dtype=np.int64)
+        stats = np.array(list(map(_NUMERIC_FIELDS, values)), dtype=np.int64)
+        columns['match'][start:end] = match_column
+        columns['queue'][start:end] = per_match[:, 0]
+        columns['timestamp'][start:end] = per_match[:, 1]
+        columns['duration'][start:end] = per_match[:, 2]
+        columns['puuid'][start:end] = puuid_column
+        columns['role'][start:end] = role_column
+        columns['champion'][start:end] = stats[:, 0]
+        columns['team'][start:end] = stats[:, 1]
+        columns['win'][start:end] = stats[:, 2] != 0
+        for offset, name in enumerate(STAT_COLUMNS, start=3):
+            columns[name][start:end] = stats[:, offset]
+        columns['alive'][start:end] = True
+        
+        self._match_rows.update(new_rows)
+        self._size = end
+    
+    def remove_match(self, match_id: str) -> bool:
+        """
+        Remove the rows for one match.
+        
+        Args:
+            match_id: Match identifier
+        
+        Returns:
+            True if the match had rows in the table
+        """
+        code = self._match_codes.get(match_id)
+        if code is None or code not in self._match_rows:
+            return False
+        
+        start, count = self._match_rows.pop(code)
+        self._columns['alive'][start:start + count] = False
+        self._dead += count
+        
+        if self._dead > _MIN_CAPACITY and self._dead > self._size - self._dead:
+            self._drop_dead_rows()
+        return True
+    
+    def select(
+        self,
+        puuid: Optional[str] = None,
+        champion_ids: Optional[Iterable[int]] = None,
+        roles: Optional[Iterable[str]] = None,
+        queue_ids: Optional[Iterable[int]] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        win: Optional[bool] = None,
+        teammates: Optional[Iterable[str]] = None,
+        rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Select live rows matching every given filter.
+        
+        Args:
+            puuid: Only rows for this player
+            champion_ids: Only rows on these champions
+            roles: Only rows in these normalized roles
+            queue_ids: Only rows from these queues
+            start_ms: Only matches created at or after this time
+            end_ms: Only matches created at or before this time
+            win: Only wins (True) or losses (False)
+            teammates: Only matches that include any of these players
+            rows: Only consider these candidate rows instead of the whole table
+        
+        Returns:
+            Array of row indices, in table order (or candidate order)
+        """
+        n = self._size
+        columns = self._columns
+        if rows is None:
+            def values(name: str) -> np.ndarray:
+                return columns[name][:n]
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            
+            def values(name: str) -> np.ndarray:
+                return columns[name][rows]
+        mask = values('alive').copy()
+        
+        if puuid is not None:
+            code = self._puuid_codes.get(puuid)
+            if code is None:
+                return np.empty(0, dtype=np.int64)
+            mask &= values('puuid') == code
+        
+        if champion_ids:
+            mask &= np.isin(values('champion'), list(champion_ids))
+        
+        if roles:
+            codes = [self._role_codes[r] for r in roles if r in self._role_codes]
+            mask &= np.isin(values('role'), codes)
+        
+        if queue_ids:
+            mask &= np.isin(values('queue'), list(queue_ids))
+        
+        if start_ms is not None:
+            mask &= values('timestamp') >= start_ms
+        
+        if end_ms is not None:
+            mask &= values('timestamp') <= end_ms
+        
+        if win is not None:
+            mask &= values('win') == win
+        
+        if teammates:
+            codes = [self._puuid_codes[p] for p in teammates if p in self._puuid_codes]
+            teammate_rows = columns['alive'][:n] & np.isin(columns['puuid'][:n], codes)
+            mask &= np.isin(values('match'), np.unique(columns['match'][:n][teammate_rows]))
+        
+        return np.flatnonzero(mask) if rows is None else rows[mask]
+    
+    def rows(self) -> np.ndarray:
+        """Indices of every live row."""
+        return np.flatnonzero(self._columns['alive'][:self._size])
+    
+    def rows_for_matches(self, match_ids: Iterable[str]) -> np.ndarray:
+        """
+        Get the rows of the given matches.
+        
+        Args:
+            match_ids: Match identifiers; unknown IDs are skipped
+        
+        Returns:
+            Array of row indices, grouped by match in the given order
+        """
+        ranges = []
+        for match_id in match_ids:
+            code = self._match_codes.get(match_id)
+            span = self._match_rows.get(code) if code is not None else None
+            if span is not None:
+                ranges.append(np.arange(span[0], span[0] + span[1]))
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(ranges)
+    
+    def column(self, name: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Get the values of a column.
+        
+        Args:
+            name: Column name (see COLUMNS)
+            rows: Row indices to take; all live rows when omitted
+        
+        Returns:
+            Array of column values
+        """
+        if rows is None:
+            rows = self.rows()
+        return self._columns[name][rows]
+    
+    def match_ids(self, rows: np.ndarray) -> List[str]:
+        """Get the match ID of each row."""
+        return [self._match_ids[code] for code in self._columns['match'][rows]]
+    
+    def puuids(self, rows: np.ndarray) -> List[str]:
+        """Get the player PUUID of each row."""
+        return [self._puuids[code] for code in self._columns['puuid'][rows]]
+    
+    def roles(self, rows: np.ndarray) -> List[str]:
+        """Get the normalized role of each row."""
+        return [self._roles[code] for code in self._columns['role'][rows]]
+    
+    def puuid_code(self, puuid: str) -> Optional[int]:
+        """Get the integer code of a PUUID, or None if no row has had it."""
+        return self._puuid_codes.get(puuid)
+    
+    def role_code(self, role: str) -> Optional[int]:
+        """Get the integer code of a role (normalized first), or None if no row has had it."""
+        return self._role_codes.get(normalize_role(role))
+    
+    def match_id_for_code(self, code: int) -> str:
+        """Get the match ID of an integer match code."""
+        return self._match_ids[code]
+    
+    def totals(self, rows: Optional[np.ndarray] = None,
+               weights: Optional[np.ndarray] = None) -> ParticipantTotals:
+        """
+        Sum stats over the selected rows.
+        
+        Args:
+            rows: Row indices to aggregate; all live rows when omitted
+            weights: Optional per-row weights aligned with ``rows``
+        
+        Returns:
+            ParticipantTotals; weighted sums are floats
+        """
+        if rows is None:
+            rows = self.rows()
+        columns = self._columns
+        
+        if weights is None:
+            sums = {
+                name: int(columns[name][rows].sum(dtype=np.int64))
+                for name in STAT_COLUMNS + ('duration',)
+            }
+            return ParticipantTotals(
+                games=len(rows),
+                weight=float(len(rows)),
+                wins=int(np.count_nonzero(columns['win'][rows])),
+                **sums
+            )
+        
+        weights = np.asarray(weights, dtype=np.float64)
+        sums = {
+            name: float(np.dot(columns[name][rows], weights))
+            for name in STAT_COLUMNS + ('duration',)
+        }
+        return ParticipantTotals(
+            games=len(rows),
+            weight=float(weights.sum()),
+            wins=float(np.dot(columns['win'][rows], weights)),
+            **sums
+        )
+    
+    def metric_values(self, rows: Optional[np.ndarray], metric: str) -> np.ndarray:
+        """
+        Evaluate a per-game metric for each selected row.
+        
+        Args:
+            rows: Row indices; all live rows when None
+            metric: One of ROW_METRICS
+        
+        Returns:
+            Float array aligned with ``rows`` (empty for unknown metrics)
+        """
+        if rows is None:
+            rows = self.rows()
+        columns = self._columns
+        
+        if metric == 'win_rate':
+            return columns['win'][rows].astype(np.float64)
+        if metric == 'avg_kda':
+            deaths = np.maximum(columns['deaths'][rows], 1)
+            return (columns['kills'][rows] + columns['assists'][rows]) / deaths
+        if metric == 'avg_vision_score':
+            return columns['vision'][rows].astype(np.float64)
+        
+        per_minute = {
+            'avg_cs_per_min': 'cs',
+            'avg_damage_per_min': 'damage',
+            'avg_gold_per_min': 'gold'
+        }
+        if metric in per_minute:
+            values = columns[per_minute[metric]][rows].astype(np.float64)
+            minutes = columns['duration'][rows] / 60
+            return np.divide(values, minutes, out=np.zeros_like(values), where=minutes > 0)
+        
+        return np.empty(0, dtype=np.float64)
+    
+    def days_ago(self, rows: np.ndarray, now: Optional[datetime] = None) -> np.ndarray:
+        """Whole days elapsed since each selected row's match was created."""
+        now_ms = (now or datetime.now()).timestamp() * 1000
+        return np.floor_divide(now_ms - self._columns['timestamp'][rows], 86_400_000)
+    
+    def _intern(self, value: str, codes: Dict[str, int], values: List[str]) -> int:
+        """Map a string to its integer code, assigning a new code if needed."""
+        code = codes.get(value)
+        if code is None:
+            code = len(values)
+            codes[value] = code
+            values.append(value)
+        return code
+    
+    def _reserve(self, extra: int) -> None:
+        """Grow the column arrays to hold `extra` more rows."""
+        needed = self._size + extra
+        if needed <= self._capacity:
+            return
+        
+        capacity = max(needed, self._capacity * 2)
+        for name, array in self._columns.items():
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            self._columns[name] = grown
+        self._capacity = capacity
+    
+    def _drop_dead_rows(self) -> None:
+        """Compact the columns so only live rows remain."""
+        keep = np.flatnonzero(self._columns['alive'][:self._size])
+        for name, array in self._columns.items():
+            array[:len(keep)] = array[keep]
+        self._size = len(keep)
+        self._dead = 0
+        
+        self._match_rows = {}
+        match_codes = self._columns['match'][:self._size]
+        if self._size:
+            starts = np.flatnonzero(np.diff(match_codes, prepend=match_codes[0] - 1))
+            counts = np.diff(np.append(starts, self._size))
+            for start, count in zip(starts.tolist(), counts.tolist()):
+                self._match_rows[int(match_codes[start])] = (start, count)
@@ -0,0 +1,125 @@
+"""
+Per-player role score cache for the optimization engine.
+
+Individual performance scores depend only on a player's own data, yet the
+optimizer needs them for every combination that player appears in. This
+module keeps each player's scores for all roles, keyed by a player data
+version that DataManager.update_player bumps whenever a player changes.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .models import Player
+from .performance_calculator import PerformanceCalculator
+
+
+_player_versions: Dict[str, int] = {}
+_versions_lock = threading.Lock()
+
+
+def player_data_version(player_name: str) -> int:
+    """Current data version of a player (0 until first updated)."""
+    return _player_versions.get(player_name, 0)
+
+
+def bump_player_data_version(player_name: str) -> int:
+    """
+    Mark a player's data as changed, invalidating cached scores.
+    
+    Args:
+        player_name: Name of the changed player
+    
+    Returns:
+        The new data version
+    """
+    with _versions_lock:
+        version = _player_versions.get(player_name, 0) + 1
+        _player_versions[player_name] = version
+        return version
+
+
+class PlayerScoreCache:
+    """
+    Caches raw individual scores and role preferences per player.
+    
+    An entry is reused only while the player's data version is unchanged and
+    the lookup passes the same Player object, so separately constructed
+    players that share a name never see each other's scores.
+    """
+    
+    def __init__(self, roles: List[str], max_players: int = 1024):
+        """
+        Initialize the cache.
+        
+        Args:
+            roles: Role order of the score columns
+            max_players: Players kept before the least recently used is dropped
+        """
+        self.roles = roles
+        self.max_players = max_players
+        self._entries: "OrderedDict[str, Tuple[int, weakref.ref, np.ndarray, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._calculator: Optional[PerformanceCalculator] = None
+        self.hits = 0
+        self.misses = 0
+    
+    def get_scores(self, players: List[Player],
+                   performance_calculator: PerformanceCalculator) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the score tensor for a list of players.
+        
+        Args:
+            players: Players in row order
+            performance_calculator: Calculator used to score uncached players;
+                switching calculators drops every cached score
+        
+        Returns:
+            Tuple of (individual scores, normalized role preferences), each an
+            array of shape (len(players), len(roles))
+        """
+        n_roles = len(self.roles)
+        individual = np.empty((len(players), n_roles))
+        preferences = np.empty((len(players), n_roles))
+        
+        with self._lock:
+            if performance_calculator is not self._calculator:
+                self._entries.clear()
+                self._calculator = performance_calculator
+        
+        for i, player in enumerate(players):
+            version = player_data_version(player.name)
+            with self._lock:
+                entry = self._entries.get(player.name)
+                if entry is not None and entry[0] == version and entry[1]() is player:
+                    self._entries.move_to_end(player.name)
+                    self.hits += 1
+                    individual[i], preferences[i] = entry[2], entry[3]
+                    continue
+                self.misses += 1
+            
+            row = np.array([performance_calculator.calculate_individual_score(player, role)
+                            for role in self.roles], dtype=float)
+            preference_row = np.array([player.role_preferences.get(role, 3) / 5.0
+                                       for role in self.roles], dtype=float)
+            individual[i], preferences[i] = row, preference_row
+            
+            with self._lock:
+                self._entries[player.name] = (version, weakref.ref(player), row, preference_row)
+                self._entries.move_to_end(player.name)
+                while len(self._entries) > self.max_players:
+                    self._entries.popitem(last=False)
+        
+        return individual, preferences
+    
+    def invalidate(self, player_name: Optional[str] = None) -> None:
+        """Drop one player's cached scores, or all of them when no name is given."""
+        with self._lock:
+            if player_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(player_name, None)
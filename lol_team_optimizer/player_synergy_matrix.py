@@ -14,6 +14,8 @@ from dataclasses import dataclass, field
 from collections import defaultdict, Counter
 import itertools
 
+import numpy as np
+
 from .analytics_models import (
     AnalyticsFilters, DateRange, PerformanceMetrics, PerformanceDelta,
     SignificanceTest, ConfidenceInterval, InsufficientDataError,
@@ -611,59 +613,37 @@ class PlayerSynergyMatrix:
         )
         
         total_games = len(matches)
-        wins = 0
-        
-        # Aggregate performance metrics
-        total_combined_kda = 0.0
-        total_combined_cs = 0.0
-        total_combined_vision = 0.0
-        total_combined_damage = 0.0
-        total_duration = 0.0
-        recent_games = 0
         
+        # Both players' first row in each shared match, aligned by match
+        table = self.match_manager.participant_table
+        rows = table.rows_for_matches(match.match_id for match in matches)
+        p1_rows = table.select(puuid=player1_puuid, rows=rows)
+        p2_rows = table.select(puuid=player2_puuid, rows=rows)
+        p1_matches, p1_first = np.unique(table.column('match', p1_rows), return_index=True)
+        p2_matches, p2_first = np.unique(table.column('match', p2_rows), return_index=True)
+        _, p1_index, p2_index = np.intersect1d(p1_matches, p2_matches, assume_unique=True, return_indices=True)
+        p1_rows = p1_rows[p1_first[p1_index]]
+        p2_rows = p2_rows[p2_first[p2_index]]
+        
+        # Both players won (same team)
+        wins = int(np.count_nonzero(table.column('win', p1_rows) & table.column('win', p2_rows)))
+        
+        # Combined performance metrics, summed over shared games
+        def combined(metric: str) -> np.ndarray:
+            return table.metric_values(p1_rows, metric) + table.metric_values(p2_rows, metric)
+        
+        total_combined_kda = float(combined('avg_kda').sum()) / 2
+        total_combined_cs = float(combined('avg_cs_per_min').sum()) / 2
+        total_combined_vision = float(combined('avg_vision_score').sum())
+        total_combined_damage = float(combined('avg_damage_per_min').sum()) / 2
+        total_duration = float(table.column('duration', p1_rows).sum()) / 60  # Convert to minutes
+        
+        timestamps = table.column('timestamp', p1_rows)
         recent_cutoff = datetime.now() - timedelta(days=self.recent_cutoff_days)
+        recent_games = int(np.count_nonzero(timestamps >= recent_cutoff.timestamp() * 1000))
         
-        for match in matches:
-            p1_participant = match.get_participant_by_puuid(player1_puuid)
-            p2_participant = match.get_participant_by_puuid(player2_puuid)
-            
-            if not p1_participant or not p2_participant:
-                continue
-            
-            # Check if both players won (same team)
-            if p1_participant.win and p2_participant.win:
-                wins += 1
-            
-            # Calculate combined performance metrics
-            p1_kda = p1_participant.kda
-            p2_kda = p2_participant.kda
-            combined_kda = (p1_kda + p2_kda) / 2
-            
-            p1_cs_per_min = p1_participant.cs_total / (match.game_duration / 60) if match.game_duration > 0 else 0
-            p2_cs_per_min = p2_participant.cs_total / (match.game_duration / 60) if match.game_duration > 0 else 0
-            combined_cs_per_min = (p1_cs_per_min + p2_cs_per_min) / 2
-            
-            combined_vision = p1_participant.vision_score + p2_participant.vision_score
-            
-            p1_damage_per_min = p1_participant.total_damage_dealt_to_champions / (match.game_duration / 60) if match.game_duration > 0 else 0
-            p2_damage_per_min = p2_participant.total_damage_dealt_to_champions / (match.game_duration / 60) if match.game_duration > 0 else 0
-            combined_damage_per_min = (p1_damage_per_min + p2_damage_per_min) / 2
-            
-            # Accumulate totals
-            total_combined_kda += combined_kda
-            total_combined_cs += combined_cs_per_min
-            total_combined_vision += combined_vision
-            total_combined_damage += combined_damage_per_min
-            total_duration += match.game_duration / 60  # Convert to minutes
-            
-            # Check if recent game
-            if match.game_creation_datetime >= recent_cutoff:
-                recent_games += 1
-            
-            # Update last played together
-            if (synergy.last_played_together is None or 
-                match.game_creation_datetime > synergy.last_played_together):
-                synergy.last_played_together = match.game_creation_datetime
+        if len(timestamps):
+            synergy.last_played_together = datetime.fromtimestamp(int(timestamps.max()) / 1000)
         
         # Calculate averages
         synergy.total_games_together = total_games
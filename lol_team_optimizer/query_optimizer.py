@@ -7,16 +7,22 @@ including query planning, indexing strategies, and result caching.
 
 import logging
 import time
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Any, Tuple, Callable
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Any, Tuple, Callable
 from dataclasses import dataclass, field
 from collections import defaultdict
 from functools import wraps
+from pathlib import Path
 import threading
 
+import numpy as np
+
 from .analytics_models import AnalyticsFilters, DateRange, AnalyticsError
 from .models import Match, MatchParticipant
+from .participant_table import ParticipantTable, normalize_role
 from .config import Config
+from .index_snapshot import INDEX_FIELDS, IndexSnapshot, write_snapshot
 
 
 logger = logging.getLogger(__name__)
@@ -32,10 +38,12 @@ class QueryPlan:
     """Represents an optimized query execution plan."""
     
     query_id: str
-    filters: AnalyticsFilters
-    estimated_cost: float
+    filters: Optional[AnalyticsFilters]
+    estimated_cost: float = 0.0
+    estimated_rows: int = 0
     execution_steps: List[str] = field(default_factory=list)
     use_indexes: List[str] = field(default_factory=list)
+    access_paths: List['AccessPath'] = field(default_factory=list)
     cache_strategy: str = "memory"
     parallel_execution: bool = False
     
@@ -80,30 +88,122 @@ class QueryStatistics:
         return (self.cache_hits / total_requests) * 100.0
 
 
+@dataclass
+class AccessPath:
+    """One index lookup of a query plan: the union of an index's postings for some keys."""
+    
+    index_name: str
+    keys: List[Any]
+    estimated_rows: int
+
+
+# (puuid, champion_id, normalized role, win) of one participant, as kept by MatchIndex
+ParticipantFacts = Tuple[str, int, str, bool]
+
+# A path whose postings outnumber the current candidates by this factor is not
+# intersected; checking the remaining candidates against match facts is cheaper
+RESIDUAL_FACTOR = 8
+
+# Queries expected to touch fewer rows than this are not worth caching
+CACHE_MIN_ROWS = 50
+
+# File, next to the match store, holding the persisted MatchIndex
+INDEX_SNAPSHOT_FILE = "match_index.snapshot"
+
+# The snapshot is rewritten once the matches changed since it was written
+# exceed this many, or this fraction of the matches it holds
+SNAPSHOT_MIN_CHANGES = 1000
+SNAPSHOT_CHANGE_RATIO = 0.25
+
+_NO_MATCHES: frozenset = frozenset()
+
+
 class MatchIndex:
-    """In-memory index for efficient match querying."""
+    """
+    Index for efficient match querying.
+    
+    Every index maps a key to the set of IDs of the matches containing it, so
+    the size of a posting set is a cardinality statistic for the query
+    planner. Each match also keeps its creation time, queue and per-participant
+    facts, so filters can be checked without decoding the match.
     
-    def __init__(self):
-        """Initialize match index."""
+    The index may sit on top of a memory-mapped IndexSnapshot. Matches added
+    after the snapshot are held in the in-memory dictionaries. Snapshot
+    matches that were removed or replaced since are masked by ID.
+    """
+    
+    # Posting indexes by name, as referenced by AccessPath.index_name
+    INDEX_NAMES = tuple(INDEX_FIELDS)
+    
+    def __init__(self, snapshot: Optional[IndexSnapshot] = None):
+        """Initialize match index.
+        
+        Args:
+            snapshot: Persisted index to start from
+        """
         self.logger = logging.getLogger(__name__)
         self._lock = threading.RLock()
+        self.last_updated = datetime.now()
+        self.rebase(snapshot)
+    
+    def rebase(self, snapshot: Optional[IndexSnapshot]):
+        """Start over from a snapshot, dropping every in-memory change.
+        
+        Args:
+            snapshot: Persisted index to serve matches from, or None for an empty index
+        """
+        with self._lock:
+            self._reset(snapshot)
+            self._count_matches()
+    
+    def _reset(self, snapshot: Optional[IndexSnapshot]):
+        """Replace all index state; the lock must be held."""
+        self.snapshot = snapshot
+        self._snapshot_removed: Set[str] = set()  # snapshot matches removed or replaced since
         
         # Primary indexes
-        self.by_player: Dict[str, Set[str]] = defaultdict(set)  # puuid -> match_ids
-        self.by_champion: Dict[int, Set[str]] = defaultdict(set)  # champion_id -> match_ids
-        self.by_role: Dict[str, Set[str]] = defaultdict(set)  # role -> match_ids
-        self.by_queue: Dict[int, Set[str]] = defaultdict(set)  # queue_id -> match_ids
-        self.by_date: Dict[str, Set[str]] = defaultdict(set)  # date_key -> match_ids
+        self.by_player: Dict[str, Set[str]] = {}  # puuid -> match_ids
+        self.by_champion: Dict[int, Set[str]] = {}  # champion_id -> match_ids
+        self.by_role: Dict[str, Set[str]] = {}  # normalized role -> match_ids
+        self.by_queue: Dict[int, Set[str]] = {}  # queue_id -> match_ids
         
         # Composite indexes
-        self.by_player_champion: Dict[Tuple[str, int], Set[str]] = defaultdict(set)
-        self.by_player_role: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
-        self.by_champion_role: Dict[Tuple[int, str], Set[str]] = defaultdict(set)
-        self.by_player_champion_role: Dict[Tuple[str, int, str], Set[str]] = defaultdict(set)
+        self.by_player_champion: Dict[Tuple[str, int], Set[str]] = {}
+        self.by_player_role: Dict[Tuple[str, str], Set[str]] = {}
+        self.by_champion_role: Dict[Tuple[int, str], Set[str]] = {}
+        self.by_player_champion_role: Dict[Tuple[str, int, str], Set[str]] = {}
+        
+        # match_id -> (game_creation, queue_id, participant facts) of matches not in the snapshot
+        self.match_facts: Dict[str, Tuple[int, int, Tuple[ParticipantFacts, ...]]] = {}
+        self._time_index: List[Tuple[int, str]] = []  # sorted (game_creation, match_id)
         
         # Statistics
-        self.total_matches_indexed = 0
-        self.last_updated = datetime.now()
+        self.total_matches_indexed = snapshot.match_count if snapshot else 0
+    
+    @staticmethod
+    def participant_facts(participant: MatchParticipant) -> ParticipantFacts:
+        """Get the indexed facts of a participant."""
+        return (participant.puuid, participant.champion_id,
+                normalize_role(participant.individual_position), bool(participant.win))
+    
+    def _index_keys(self, match_id: str) -> Iterator[Tuple[Dict[Any, Set[str]], Any]]:
+        """Yield every (index, key) pair an in-memory match is posted under."""
+        _, queue_id, participants = self.match_facts[match_id]
+        yield self.by_queue, queue_id
+        for puuid, champion_id, role, _ in participants:
+            yield self.by_player, puuid
+            yield self.by_champion, champion_id
+            yield self.by_role, role
+            yield self.by_player_champion, (puuid, champion_id)
+            yield self.by_player_role, (puuid, role)
+            yield self.by_champion_role, (champion_id, role)
+            yield self.by_player_champion_role, (puuid, champion_id, role)
+    
+    @classmethod
+    def match_entry(cls, match: Match) -> Tuple[str, int, int, List[ParticipantFacts]]:
+        """Get the index entry of a decoded match, as accepted by add_entries."""
+        return (match.match_id, match.game_creation, match.queue_id,
+                [cls.participant_facts(participant) for participant in match.participants])
     
     def add_match(self, match: Match):
         """Add a match to the index.
@@ -111,36 +211,36 @@ class MatchIndex:
         Args:
             match: Match to index
         """
+        self.add_entries([self.match_entry(match)])
+    
+    def add_entries(self, entries: Iterable[Tuple[str, int, int, Iterable[ParticipantFacts]]]):
+        """Add (or replace) many matches given as already extracted facts.
+        
+        Args:
+            entries: (match_id, game_creation, queue_id, participant facts) tuples
+        """
         with self._lock:
-            match_id = match.match_id
-            
-            # Date index (by day)
-            match_date = datetime.fromtimestamp(match.game_creation / 1000)
-            date_key = match_date.strftime("%Y-%m-%d")
-            self.by_date[date_key].add(match_id)
-            
-            # Queue index
-            self.by_queue[match.queue_id].add(match_id)
-            
-            # Participant-based indexes
-            for participant in match.participants:
-                puuid = participant.puuid
-                champion_id = participant.champion_id
-                role = participant.individual_position.lower()
+            time_entries = []
+            for match_id, game_creation, queue_id, participants in entries:
+                self._remove_locked(match_id)
                 
-                # Primary indexes
-                self.by_player[puuid].add(match_id)
-                self.by_champion[champion_id].add(match_id)
-                self.by_role[role].add(match_id)
-                
-                # Composite indexes
-                self.by_player_champion[(puuid, champion_id)].add(match_id)
-                self.by_player_role[(puuid, role)].add(match_id)
-                self.by_champion_role[(champion_id, role)].add(match_id)
-                self.by_player_champion_role[(puuid, champion_id, role)].add(match_id)
+                self.match_facts[match_id] = (game_creation, queue_id, tuple(participants))
+                for index, key in self._index_keys(match_id):
+                    match_ids = index.get(key)
+                    if match_ids is None:
+                        match_ids = index[key] = set()
+                    match_ids.add(match_id)
+                time_entries.append((game_creation, match_id))
+            
+            # Small batches are inserted in place; large ones are merged by one sort
+            if len(time_entries) > 64:
+                self._time_index.extend(time_entries)
+                self._time_index.sort()
+            else:
+                for entry in time_entries:
+                    insort(self._time_index, entry)
             
-            self.total_matches_indexed += 1
-            self.last_updated = datetime.now()
+            self._count_matches()
     
     def remove_match(self, match: Match):
         """Remove a match from the index.
@@ -148,40 +248,202 @@ class MatchIndex:
         Args:
             match: Match to remove
         """
+        self.remove_match_ids([match.match_id])
+    
+    def remove_match_ids(self, match_ids: Iterable[str]) -> int:
+        """Remove matches by ID using their indexed facts.
+        
+        Args:
+            match_ids: IDs of the matches to remove; unknown IDs are skipped
+            
+        Returns:
+            Number of matches removed
+        """
+        with self._lock:
+            removed = sum(1 for match_id in match_ids if self._remove_locked(match_id))
+            if removed:
+                self._count_matches()
+            return removed
+    
+    def _count_matches(self) -> None:
+        """Refresh the match count after a change; the lock must be held."""
+        snapshot_matches = self.snapshot.match_count - len(self._snapshot_removed) if self.snapshot else 0
+        self.total_matches_indexed = snapshot_matches + len(self.match_facts)
+        self.last_updated = datetime.now()
+    
+    def _in_snapshot(self, match_id: str) -> bool:
+        """Whether a match is served by the snapshot (and not masked)."""
+        return (self.snapshot is not None and match_id not in self._snapshot_removed
+                and self.snapshot.doc_of(match_id) is not None)
+    
+    def _remove_locked(self, match_id: str) -> bool:
+        """Remove one match from every index; the lock must be held."""
+        if match_id not in self.match_facts:
+            if not self._in_snapshot(match_id):
+                return False
+            self._snapshot_removed.add(match_id)
+            return True
+        
+        for index, key in self._index_keys(match_id):
+            match_ids = index.get(key)
+            if match_ids is not None:
+                match_ids.discard(match_id)
+                if not match_ids:
+                    del index[key]
+        
+        entry = (self.match_facts.pop(match_id)[0], match_id)
+        position = bisect_left(self._time_index, entry)
+        if position < len(self._time_index) and self._time_index[position] == entry:
+            del self._time_index[position]
+        return True
+    
+    def __contains__(self, match_id: object) -> bool:
         with self._lock:
-            match_id = match.match_id
+            return match_id in self.match_facts or self._in_snapshot(match_id)
+    
+    def facts(self, match_id: str) -> Optional[Tuple[int, int, Tuple[ParticipantFacts, ...]]]:
+        """Get the (game_creation, queue_id, participant facts) of an indexed match."""
+        with self._lock:
+            facts = self.match_facts.get(match_id)
+            if facts is None and self.snapshot is not None and match_id not in self._snapshot_removed:
+                doc = self.snapshot.doc_of(match_id)
+                if doc is not None:
+                    facts = self.snapshot.facts(doc)
+            return facts
+    
+    def match_ids(self) -> Set[str]:
+        """Get the IDs of every indexed match."""
+        with self._lock:
+            match_ids = set(self.match_facts)
+            if self.snapshot is not None:
+                match_ids.update(match_id for match_id in self.snapshot.match_ids()
+                                 if match_id not in self._snapshot_removed)
+            return match_ids
+    
+    def entries(self) -> Iterator[Tuple[str, int, int, Tuple[ParticipantFacts, ...]]]:
+        """Yield the index entry of every indexed match; the caller must hold the lock."""
+        if self.snapshot is not None:
+            yield from self.snapshot.entries(skip=self._snapshot_removed | self.match_facts.keys())
+        for match_id, (game_creation, queue_id, participants) in self.match_facts.items():
+            yield match_id, game_creation, queue_id, participants
+    
+    @property
+    def pending_changes(self) -> int:
+        """Number of matches added or removed since the snapshot."""
+        return len(self.match_facts) + len(self._snapshot_removed)
+    
+    def postings(self, index_name: str, key: Any) -> Set[str]:
+        """Get the IDs of the matches posted under one key of an index."""
+        return self.lookup(AccessPath(index_name, [key], 0))
+    
+    def cardinality(self, index_name: str, keys: Iterable[Any]) -> int:
+        """Upper bound of the number of matches posted under any of the keys.
+        
+        Args:
+            index_name: Name of a posting index, or 'by_time' for (start_ms, end_ms) ranges
+            keys: Keys to look up
             
-            # Date index
-            match_date = datetime.fromtimestamp(match.game_creation / 1000)
-            date_key = match_date.strftime("%Y-%m-%d")
-            self.by_date[date_key].discard(match_id)
+        Returns:
+            Sum of the posting set sizes
+        """
+        with self._lock:
+            total = 0
+            for key in keys:
+                if index_name == 'by_time':
+                    total += len(self._time_range(*key))
+                    if self.snapshot is not None:
+                        total += self.snapshot.time_docs(*key).size
+                else:
+                    total += len(getattr(self, index_name).get(key, _NO_MATCHES))
+                    if self.snapshot is not None:
+                        total += self.snapshot.count(index_name, key)
+            return total
+    
+    def lookup(self, path: AccessPath) -> Set[str]:
+        """Get the IDs of the matches selected by an access path.
+        
+        Args:
+            path: Access path to evaluate
             
-            # Queue index
-            self.by_queue[match.queue_id].discard(match_id)
+        Returns:
+            Union of the path's postings (a fresh set)
+        """
+        with self._lock:
+            if path.index_name == 'by_time':
+                match_ids = {match_id for key in path.keys for _, match_id in self._time_range(*key)}
+                docs = [self.snapshot.time_docs(*key) for key in path.keys] if self.snapshot else []
+            else:
+                index = getattr(self, path.index_name)
+                if len(path.keys) == 1:
+                    match_ids = set(index.get(path.keys[0], _NO_MATCHES))
+                else:
+                    match_ids = set().union(*(index.get(key, _NO_MATCHES) for key in path.keys))
+                docs = [self.snapshot.docs(path.index_name, key) for key in path.keys] if self.snapshot else []
             
-            # Participant-based indexes
-            for participant in match.participants:
-                puuid = participant.puuid
-                champion_id = participant.champion_id
-                role = participant.individual_position.lower()
-                
-                # Primary indexes
-                self.by_player[puuid].discard(match_id)
-                self.by_champion[champion_id].discard(match_id)
-                self.by_role[role].discard(match_id)
-                
-                # Composite indexes
-                self.by_player_champion[(puuid, champion_id)].discard(match_id)
-                self.by_player_role[(puuid, role)].discard(match_id)
-                self.by_champion_role[(champion_id, role)].discard(match_id)
-                self.by_player_champion_role[(puuid, champion_id, role)].discard(match_id)
+            docs = [array for array in docs if array.size]
+            if docs:
+                snapshot_ids = set(self.snapshot.match_ids(docs[0] if len(docs) == 1 else
+                                                           np.unique(np.concatenate(docs))))
+                match_ids |= snapshot_ids - self._snapshot_removed
+            return match_ids
+    
+    def _time_range(self, start_ms: int, end_ms: int) -> List[Tuple[int, str]]:
+        """In-memory time index entries created within [start_ms, end_ms]."""
+        lo = bisect_left(self._time_index, (start_ms, ''))
+        hi = bisect_right(self._time_index, (end_ms, '\uffff'))
+        return self._time_index[lo:hi]
+    
+    def access_paths(self, filters: Optional[AnalyticsFilters],
+                     puuids: Optional[Sequence[str]] = None) -> List[AccessPath]:
+        """List the index lookups that can narrow a query, with their estimated sizes.
+        
+        When players are given, their champion and role filters use the
+        composite indexes, which constrain the player's own participant.
+        
+        Args:
+            filters: Query filters
+            puuids: Players whose participation is being queried
             
-            self.total_matches_indexed -= 1
-            self.last_updated = datetime.now()
+        Returns:
+            Access paths in no particular order
+        """
+        champions = list(filters.champions) if filters and filters.champions else []
+        roles = sorted({normalize_role(role) for role in filters.roles}) if filters and filters.roles else []
+        
+        candidates: List[Tuple[str, List[Any]]] = []
+        if puuids:
+            if champions and roles:
+                candidates.append(('by_player_champion_role',
+                                   [(p, c, r) for p in puuids for c in champions for r in roles]))
+            elif champions:
+                candidates.append(('by_player_champion', [(p, c) for p in puuids for c in champions]))
+            elif roles:
+                candidates.append(('by_player_role', [(p, r) for p in puuids for r in roles]))
+            else:
+                candidates.append(('by_player', list(puuids)))
+        elif champions and roles:
+            candidates.append(('by_champion_role', [(c, r) for c in champions for r in roles]))
+        elif champions:
+            candidates.append(('by_champion', champions))
+        elif roles:
+            candidates.append(('by_role', roles))
+        
+        if filters and filters.queue_types:
+            candidates.append(('by_queue', list(filters.queue_types)))
+        if filters and filters.teammates:
+            candidates.append(('by_player', list(filters.teammates)))
+        if filters and filters.date_range:
+            candidates.append(('by_time', [_date_range_ms(filters.date_range)]))
+        
+        return [AccessPath(name, keys, self.cardinality(name, keys)) for name, keys in candidates]
     
     def find_matches(self, filters: AnalyticsFilters) -> Set[str]:
         """Find match IDs matching the given filters.
         
+        Access paths are intersected smallest first. Champion, role and win
+        filters are only applied at match level here; QueryOptimizer checks
+        them against the queried players' participants.
+        
         Args:
             filters: Filters to apply
             
@@ -189,58 +451,17 @@ class MatchIndex:
             Set of matching match IDs
         """
         with self._lock:
-            # Start with all matches if no specific filters
-            candidate_matches: Optional[Set[str]] = None
-            
-            # Apply player filter (most selective usually)
-            if filters.player_puuids:
-                player_matches = set()
-                for puuid in filters.player_puuids:
-                    player_matches.update(self.by_player.get(puuid, set()))
-                candidate_matches = self._intersect_candidates(candidate_matches, player_matches)
-            
-            # Apply champion filter
-            if filters.champions:
-                champion_matches = set()
-                for champion_id in filters.champions:
-                    champion_matches.update(self.by_champion.get(champion_id, set()))
-                candidate_matches = self._intersect_candidates(candidate_matches, champion_matches)
-            
-            # Apply role filter
-            if filters.roles:
-                role_matches = set()
-                for role in filters.roles:
-                    role_matches.update(self.by_role.get(role.lower(), set()))
-                candidate_matches = self._intersect_candidates(candidate_matches, role_matches)
-            
-            # Apply queue filter
-            if filters.queue_types:
-                queue_matches = set()
-                for queue_id in filters.queue_types:
-                    queue_matches.update(self.by_queue.get(queue_id, set()))
-                candidate_matches = self._intersect_candidates(candidate_matches, queue_matches)
-            
-            # Apply date filter (requires match object access)
-            if filters.date_range and candidate_matches is not None:
-                # This is less efficient and should be done last
-                # In a real database, this would use a date index
-                pass  # Will be handled by the query optimizer
-            
-            return candidate_matches or set()
-    
-    def _intersect_candidates(self, current: Optional[Set[str]], new: Set[str]) -> Set[str]:
-        """Intersect candidate sets efficiently.
-        
-        Args:
-            current: Current candidate set (None means all matches)
-            new: New candidate set to intersect
+            paths = sorted(self.access_paths(filters, getattr(filters, 'player_puuids', None)),
+                           key=lambda path: path.estimated_rows)
+            if not paths:
+                return self.match_ids()
             
-        Returns:
-            Intersection of the sets
-        """
-        if current is None:
-            return new
-        return current.intersection(new)
+            candidates = self.lookup(paths[0])
+            for path in paths[1:]:
+                if not candidates:
+                    break
+                candidates &= self.lookup(path)
+            return candidates
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get index statistics.
@@ -249,19 +470,54 @@ class MatchIndex:
             Dictionary containing index statistics
         """
         with self._lock:
+            participants = sum(len(facts[2]) for facts in self.match_facts.values())
+            creation_times = np.array([facts[0] for facts in self.match_facts.values()], dtype=np.int64)
+            if self.snapshot is not None:
+                removed_docs = [doc for doc in map(self.snapshot.doc_of, self._snapshot_removed) if doc is not None]
+                participants += self.snapshot.participant_count() - sum(
+                    self.snapshot.participant_count(doc) for doc in removed_docs
+                )
+                creation_times = np.concatenate([
+                    np.delete(self.snapshot.creation_times(), removed_docs), creation_times
+                ])
+            
             return {
                 'total_matches_indexed': self.total_matches_indexed,
-                'unique_players': len(self.by_player),
-                'unique_champions': len(self.by_champion),
-                'unique_roles': len(self.by_role),
-                'unique_queues': len(self.by_queue),
-                'date_range_days': len(self.by_date),
-                'last_updated': self.last_updated.isoformat()
+                'indexed_participants': participants,
+                'unique_players': self._key_count('by_player'),
+                'unique_champions': self._key_count('by_champion'),
+                'unique_roles': self._key_count('by_role'),
+                'unique_queues': self._key_count('by_queue'),
+                'date_range_days': int(np.unique(creation_times // 86_400_000).size),
+                'last_updated': self.last_updated.isoformat(),
+                'snapshot_matches': self.snapshot.match_count if self.snapshot else 0,
+                'pending_changes': self.pending_changes
             }
+    
+    def _key_count(self, index_name: str) -> int:
+        """Distinct keys of an index across the snapshot and the in-memory matches."""
+        index = getattr(self, index_name)
+        if self.snapshot is None:
+            return len(index)
+        return self.snapshot.key_count(index_name) + sum(
+            1 for key in index if not self.snapshot.count(index_name, key)
+        )
+
+
+def _date_range_ms(date_range: DateRange) -> Tuple[int, int]:
+    """Convert a date range to inclusive game_creation bounds in milliseconds."""
+    return int(date_range.start_date.timestamp() * 1000), int(date_range.end_date.timestamp() * 1000)
 
 
 class QueryOptimizer:
-    """Optimizes database queries for match data."""
+    """
+    Plans and executes match queries against a MatchIndex.
+    
+    Plans order the index lookups of a query by their cardinality statistics
+    and intersect them smallest first; candidates are then checked against
+    the indexed match facts, and only the matches in the result are decoded,
+    so query latency tracks the result size rather than the history size.
+    """
     
     def __init__(self, config: Config, match_manager):
         """Initialize query optimizer.
@@ -274,6 +530,13 @@ class QueryOptimizer:
         self.match_manager = match_manager
         self.logger = logging.getLogger(__name__)
         
+        # Persist the index next to the match store when there is one to follow
+        table = getattr(match_manager, 'participant_table', None)
+        self._follows_store = isinstance(table, ParticipantTable)
+        self.snapshot_file: Optional[Path] = (
+            Path(match_manager.data_dir) / INDEX_SNAPSHOT_FILE if self._follows_store else None
+        )
+        
         # Initialize index
         self.index = MatchIndex()
         self._build_initial_index()
@@ -288,97 +551,332 @@ class QueryOptimizer:
         self.query_cache: Dict[str, Tuple[Any, datetime]] = {}
         self.cache_ttl_seconds = 300  # 5 minutes
         self._cache_lock = threading.RLock()
+        
+        # Keep the index in step with the match store
+        if self._follows_store:
+            match_manager.add_match_listener(self.add_matches_to_index)
+            match_manager.add_match_removal_listener(self.remove_matches_from_index)
     
     def _build_initial_index(self):
-        """Build initial index from existing matches."""
+        """Load the persisted index, or build it from existing matches."""
         try:
-            # Get all matches from match manager
-            all_matches = []
-            
-            # This is a simplified approach - in practice, you'd want to
-            # iterate through matches more efficiently
-            stats = self.match_manager.get_match_statistics()
-            if stats['total_matches'] > 0:
-                # Get recent matches to build initial index
-                recent_matches = self.match_manager.get_recent_matches(days=365, limit=10000)
-                
-                for match in recent_matches:
-                    self.index.add_match(match)
-                
-                self.logger.info(f"Built initial index with {len(recent_matches)} matches")
+            if self._follows_store:
+                if not self._load_index_snapshot():
+                    # Index straight from the participant table without decoding any match
+                    self.index.add_entries(self._table_entries(self.match_manager.participant_table))
+                    self.save_index()
+            else:
+                stats = self.match_manager.get_match_statistics()
+                if stats['total_matches'] > 0:
+                    for match in self.match_manager.get_all_matches():
+                        self.index.add_match(match)
+            
+            self.logger.info(f"Built initial index with {self.index.total_matches_indexed} matches")
             
         except Exception as e:
             self.logger.error(f"Failed to build initial index: {e}")
     
-    def optimize_query(self, filters: AnalyticsFilters, query_type: str = "general") -> QueryPlan:
+    def _load_index_snapshot(self) -> bool:
+        """
+        Start from the persisted index and apply the store changes made since it was written.
+        
+        Only the changed matches are read, so loading does not scale with the
+        number of stored matches.
+        
+        Returns:
+            False when there is no usable snapshot and the index must be built
+        """
+        snapshot = IndexSnapshot.load(self.snapshot_file)
+        if snapshot is None:
+            return False
+        
+        changes = self.match_manager.store_changes_since(snapshot.store_position)
+        if changes is None:
+            self.logger.info("Match index snapshot is out of date with the match store; rebuilding")
+            return False
+        
+        stored, removed = changes
+        self.index = MatchIndex(snapshot)
+        self.index.remove_match_ids(removed)
+        table = self.match_manager.participant_table
+        self.index.add_entries(self._table_entries(table, table.rows_for_matches(stored)))
+        
+        self.logger.info(f"Loaded match index snapshot of {snapshot.match_count} matches "
+                         f"({len(stored)} stored and {len(removed)} removed since)")
+        self._maybe_save_index()
+        return True
+    
+    def save_index(self) -> bool:
+        """
+        Write the index to its snapshot file, tagged with the current match store position.
+        
+        Returns:
+            True if a snapshot was written
+        """
+        if self.snapshot_file is None or getattr(self.match_manager, 'read_only', False):
+            return False
+        
+        with self.index._lock:
+            try:
+                position = self.match_manager.store_position()
+                count = write_snapshot(self.snapshot_file, self.index.entries(), position)
+            except OSError as e:
+                self.logger.warning(f"Could not save match index snapshot: {e}")
+                return False
+            except ValueError as e:
+                # The data cannot be encoded, so later saves would fail the same way
+                self.logger.warning(f"Match index cannot be persisted and stays in memory: {e}")
+                self.snapshot_file = None
+                return False
+            
+            snapshot = IndexSnapshot.load(self.snapshot_file)
+            if snapshot is not None:
+                self.index.rebase(snapshot)
+        
+        self.logger.debug(f"Saved match index snapshot of {count} matches")
+        return True
+    
+    def _maybe_save_index(self) -> None:
+        """Rewrite the snapshot once enough matches have changed since it was written."""
+        snapshot = self.index.snapshot
+        threshold = max(SNAPSHOT_MIN_CHANGES, SNAPSHOT_CHANGE_RATIO * (snapshot.match_count if snapshot else 0))
+        if self.index.pending_changes >= threshold:
+            self.save_index()
+    
+    @staticmethod
+    def _table_entries(table: ParticipantTable,
+                       rows: Optional[np.ndarray] = None) -> List[Tuple[str, int, int, List[ParticipantFacts]]]:
+        """Group live rows of a participant table (all by default) into index entries."""
+        if rows is None:
+            rows = table.rows()
+        entries: Dict[str, Tuple[str, int, int, List[ParticipantFacts]]] = {}
+        for match_id, creation, queue_id, puuid, champion_id, role, win in zip(
+            table.match_ids(rows), table.column('timestamp', rows).tolist(),
+            table.column('queue', rows).tolist(), table.puuids(rows),
+            table.column('champion', rows).tolist(), table.roles(rows),
+            table.column('win', rows).tolist()
+        ):
+            entry = entries.get(match_id)
+            if entry is None:
+                entry = entries[match_id] = (match_id, creation, queue_id, [])
+            entry[3].append((puuid, champion_id, role, win))
+        return list(entries.values())
+    
+    def optimize_query(self, filters: Optional[AnalyticsFilters], query_type: str = "general",
+                       puuids: Optional[Sequence[str]] = None) -> QueryPlan:
         """Create an optimized query plan.
         
         Args:
             filters: Query filters
             query_type: Type of query for optimization
+            puuids: Players whose participation is queried (defaults to filters.player_puuids)
             
         Returns:
-            Optimized query plan
+            Query plan whose access paths are ordered most selective first
         """
+        if puuids is None and filters is not None:
+            puuids = filters.player_puuids
+        
         plan = QueryPlan(
-            query_id=f"{query_type}_{hash(str(filters))}",
+            query_id=f"{query_type}_{hash((str(filters), tuple(puuids or ())))}",
             filters=filters
         )
         
-        # Estimate selectivity of different filters
-        selectivity_scores = self._calculate_filter_selectivity(filters)
-        
-        # Order filters by selectivity (most selective first)
-        ordered_filters = sorted(selectivity_scores.items(), key=lambda x: x[1])
-        
-        # Build execution plan
-        for filter_type, selectivity in ordered_filters:
-            if selectivity > 0:
-                if filter_type == "player":
-                    plan.add_step("Apply player filter", cost=1.0)
-                    plan.use_indexes.append("by_player")
-                elif filter_type == "champion":
-                    plan.add_step("Apply champion filter", cost=2.0)
-                    plan.use_indexes.append("by_champion")
-                elif filter_type == "role":
-                    plan.add_step("Apply role filter", cost=2.0)
-                    plan.use_indexes.append("by_role")
-                elif filter_type == "queue":
-                    plan.add_step("Apply queue filter", cost=1.5)
-                    plan.use_indexes.append("by_queue")
-                elif filter_type == "date":
-                    plan.add_step("Apply date filter", cost=3.0)
-                    plan.use_indexes.append("by_date")
-        
-        # Determine cache strategy
-        if plan.estimated_cost > 10.0:
-            plan.cache_strategy = "persistent"
-        elif plan.estimated_cost > 5.0:
-            plan.cache_strategy = "memory"
-        else:
-            plan.cache_strategy = "none"
+        paths = sorted(self.index.access_paths(filters, puuids), key=lambda path: path.estimated_rows)
+        if not paths:
+            plan.add_step("Scan all indexed matches", cost=self.index.total_matches_indexed)
         
-        # Determine if parallel execution would help
-        if plan.estimated_cost > 20.0:
-            plan.parallel_execution = True
+        rows: Optional[int] = None
+        for path in paths:
+            if rows is not None and path.estimated_rows > RESIDUAL_FACTOR * rows:
+                break
+            plan.add_step(f"Intersect {path.index_name} ({len(path.keys)} keys, ~{path.estimated_rows} rows)",
+                          cost=path.estimated_rows)
+            plan.access_paths.append(path)
+            plan.use_indexes.append(path.index_name)
+            rows = path.estimated_rows if rows is None else min(rows, path.estimated_rows)
+        
+        plan.estimated_rows = self.index.total_matches_indexed if rows is None else rows
+        plan.add_step("Check match facts and decode results", cost=plan.estimated_rows)
+        plan.cache_strategy = "memory" if plan.estimated_rows >= CACHE_MIN_ROWS else "none"
         
         return plan
     
+    def execute_plan(self, plan: QueryPlan, puuids: Optional[Sequence[str]] = None) -> List[Tuple[str, List[str]]]:
+        """Run a plan against the index without decoding any match.
+        
+        Args:
+            plan: Plan from optimize_query
+            puuids: Players whose participation is queried
+            
+        Returns:
+            (match_id, qualifying puuids) pairs, newest first; the puuid list
+            is empty for queries without players
+        """
+        filters = plan.filters
+        with self.index._lock:
+            candidates: Optional[Set[str]] = None
+            for path in plan.access_paths:
+                postings = self.index.lookup(path)
+                candidates = postings if candidates is None else candidates & postings
+                if not candidates:
+                    return []
+            
+            in_memory = self.index.match_facts
+            results = []
+            for match_id in (self.index.match_ids() if candidates is None else candidates):
+                match_facts = in_memory.get(match_id) or self.index.facts(match_id)
+                if match_facts is None:
+                    continue
+                players = self._qualifying_players(match_facts, filters, puuids)
+                if players is not None:
+                    results.append((match_facts[0], match_id, players))
+        
+        results.sort(reverse=True)
+        return [(match_id, players) for _, match_id, players in results]
+    
+    @staticmethod
+    def _qualifying_players(match_facts: Tuple[int, int, Tuple[ParticipantFacts, ...]],
+                            filters: Optional[AnalyticsFilters],
+                            puuids: Optional[Sequence[str]]) -> Optional[List[str]]:
+        """
+        Check a match's indexed facts against the filters.
+        
+        Returns:
+            None when the match fails; otherwise the queried players whose
+            participant passes (an empty list for queries without players)
+        """
+        game_creation, queue_id, participants = match_facts
+        champions = roles = None
+        win_only = None
+        if filters:
+            if filters.date_range:
+                start_ms, end_ms = _date_range_ms(filters.date_range)
+                if not start_ms <= game_creation <= end_ms:
+                    return None
+            if filters.queue_types and queue_id not in filters.queue_types:
+                return None
+            if filters.teammates and not any(p[0] in filters.teammates for p in participants):
+                return None
+            champions = filters.champions
+            roles = {normalize_role(role) for role in filters.roles} if filters.roles else None
+            win_only = filters.win_only
+        
+        qualifying = []
+        for puuid, champion_id, role, win in participants:
+            if puuids and puuid not in puuids:
+                continue
+            if champions and champion_id not in champions:
+                continue
+            if roles and role not in roles:
+                continue
+            if win_only is not None and win != win_only:
+                continue
+            if not puuids:
+                return []
+            qualifying.append(puuid)
+        return qualifying or None
+    
+    def execute_player_query(self, puuid: str, filters: Optional[AnalyticsFilters] = None,
+                             query_type: str = "player_matches") -> List[Tuple[Match, MatchParticipant]]:
+        """Get a player's filtered matches paired with their participant entry.
+        
+        Players the index has never seen are served by a scan of the match
+        manager, so the result is correct even before the index is built.
+        
+        Args:
+            puuid: Player's PUUID
+            filters: Optional filters to apply (player_puuids is ignored)
+            query_type: Type of query, for statistics
+            
+        Returns:
+            List of (match, participant) tuples, newest first
+        """
+        start_time = time.time()
+        try:
+            if self.index.cardinality('by_player', [puuid]):
+                plan = self.optimize_query(filters, query_type, puuids=[puuid])
+                match_ids = [match_id for match_id, _ in self.execute_plan(plan, [puuid])]
+                if filters and filters.limit:
+                    match_ids = match_ids[:filters.limit]
+                
+                pairs = []
+                for match in self._hydrate(match_ids):
+                    participant = match.get_participant_by_puuid(puuid)
+                    if participant:
+                        pairs.append((match, participant))
+            else:
+                pairs = self._scan_player_matches(puuid, filters)
+            
+            self._update_query_stats(query_type, time.time() - start_time, len(pairs), cache_hit=False)
+            return pairs
+            
+        except Exception as e:
+            self.logger.error(f"Player query failed for {puuid}: {e}")
+            raise QueryOptimizationError(f"Player query failed: {e}")
+    
+    def _scan_player_matches(self, puuid: str,
+                             filters: Optional[AnalyticsFilters]) -> List[Tuple[Match, MatchParticipant]]:
+        """Filter every match of a player one by one."""
+        pairs = []
+        for match in self.match_manager.get_matches_for_player(puuid):
+            participant = match.get_participant_by_puuid(puuid)
+            if participant and self._participant_passes_filters(match, participant, filters):
+                pairs.append((match, participant))
+                if filters and filters.limit and len(pairs) >= filters.limit:
+                    break
+        return pairs
+    
+    @staticmethod
+    def _participant_passes_filters(match: Match, participant: MatchParticipant,
+                                    filters: Optional[AnalyticsFilters]) -> bool:
+        """Check a decoded match and participant against the filters."""
+        if not filters:
+            return True
+        
+        if filters.date_range and not filters.date_range.contains(match.game_creation_datetime):
+            return False
+        if filters.champions and participant.champion_id not in filters.champions:
+            return False
+        if filters.roles and normalize_role(participant.individual_position) not in {
+            normalize_role(role) for role in filters.roles
+        }:
+            return False
+        if filters.queue_types and match.queue_id not in filters.queue_types:
+            return False
+        if filters.win_only is not None and participant.win != filters.win_only:
+            return False
+        if filters.teammates:
+            match_puuids = {p.puuid for p in match.participants}
+            if not any(teammate in match_puuids for teammate in filters.teammates):
+                return False
+        return True
+    
+    def _hydrate(self, match_ids: Iterable[str]) -> List[Match]:
+        """Decode the matches of a result, skipping any no longer stored."""
+        matches = []
+        for match_id in match_ids:
+            match = self.match_manager.get_match(match_id)
+            if match:
+                matches.append(match)
+        return matches
+    
     def execute_optimized_query(self, filters: AnalyticsFilters, 
                               query_type: str = "general") -> List[Match]:
         """Execute an optimized query.
         
         Args:
-            filters: Query filters
+            filters: Query filters; with player_puuids, champion, role and win
+                filters apply to those players' participants
             query_type: Type of query
             
         Returns:
-            List of matching matches
+            List of matching matches, newest first
         """
         start_time = time.time()
         
-        # Generate cache key
-        cache_key = f"{query_type}_{hash(str(filters))}"
+        # Results depend only on the filters, so query types share cached results
+        cache_key = f"matches_{hash(str(filters))}"
         
         # Check cache first
         cached_result = self._get_cached_result(cache_key)
@@ -387,30 +885,18 @@ class QueryOptimizer:
             self._update_query_stats(query_type, execution_time, len(cached_result), cache_hit=True)
             return cached_result
         
-        # Create and execute query plan
-        plan = self.optimize_query(filters, query_type)
-        
         try:
-            # Use index to find candidate matches
-            candidate_match_ids = self.index.find_matches(filters)
-            
-            # Get actual match objects
-            matches = []
-            for match_id in candidate_match_ids:
-                match = self.match_manager.get_match(match_id)
-                if match and self._match_passes_filters(match, filters):
-                    matches.append(match)
-            
-            # Sort matches by game creation time (newest first)
-            matches.sort(key=lambda m: m.game_creation, reverse=True)
+            plan = self.optimize_query(filters, query_type)
+            match_ids = [match_id for match_id, _ in self.execute_plan(plan, filters.player_puuids)]
             
-            # Apply limit if specified
-            if filters.limit and len(matches) > filters.limit:
-                matches = matches[:filters.limit]
+            # Apply limit before decoding anything
+            if filters.limit:
+                match_ids = match_ids[:filters.limit]
+            matches = self._hydrate(match_ids)
             
             # Cache result if appropriate
             if plan.cache_strategy != "none":
-                self._cache_result(cache_key, matches, plan.cache_strategy == "persistent")
+                self._cache_result(cache_key, matches)
             
             execution_time = time.time() - start_time
             self._update_query_stats(query_type, execution_time, len(matches), cache_hit=False)
@@ -422,88 +908,6 @@ class QueryOptimizer:
             self.logger.error(f"Query execution failed: {e}")
             raise QueryOptimizationError(f"Query execution failed: {e}")
     
-    def _calculate_filter_selectivity(self, filters: AnalyticsFilters) -> Dict[str, float]:
-        """Calculate selectivity scores for filters.
-        
-        Args:
-            filters: Query filters
-            
-        Returns:
-            Dictionary mapping filter types to selectivity scores
-        """
-        selectivity = {}
-        
-        # Player filter selectivity
-        if filters.player_puuids:
-            # More players = less selective
-            selectivity["player"] = 1.0 / len(filters.player_puuids)
-        else:
-            selectivity["player"] = 0.0
-        
-        # Champion filter selectivity
-        if filters.champions:
-            # Fewer champions = more selective
-            selectivity["champion"] = 1.0 / len(filters.champions)
-        else:
-            selectivity["champion"] = 0.0
-        
-        # Role filter selectivity
-        if filters.roles:
-            # Roles are fairly selective (5 main roles)
-            selectivity["role"] = 1.0 / max(len(filters.roles), 1)
-        else:
-            selectivity["role"] = 0.0
-        
-        # Queue filter selectivity
-        if filters.queue_types:
-            # Queue types are moderately selective
-            selectivity["queue"] = 1.0 / max(len(filters.queue_types), 1)
-        else:
-            selectivity["queue"] = 0.0
-        
-        # Date filter selectivity
-        if filters.date_range:
-            # Date ranges can be very selective
-            days_span = (filters.date_range.end_date - filters.date_range.start_date).days
-            selectivity["date"] = 1.0 / max(days_span, 1)
-        else:
-            selectivity["date"] = 0.0
-        
-        return selectivity
-    
-    def _match_passes_filters(self, match: Match, filters: AnalyticsFilters) -> bool:
-        """Check if a match passes all filters.
-        
-        Args:
-            match: Match to check
-            filters: Filters to apply
-            
-        Returns:
-            True if match passes all filters
-        """
-        # Date filter
-        if filters.date_range:
-            match_date = datetime.fromtimestamp(match.game_creation / 1000)
-            if not filters.date_range.contains(match_date):
-                return False
-        
-        # Queue filter
-        if filters.queue_types and match.queue_id not in filters.queue_types:
-            return False
-        
-        # Win filter
-        if filters.win_only is not None:
-            # This requires checking specific participants
-            if filters.player_puuids:
-                for puuid in filters.player_puuids:
-                    participant = match.get_participant_by_puuid(puuid)
-                    if participant and participant.win != filters.win_only:
-                        return False
-        
-        # Minimum games filter is handled at a higher level
-        
-        return True
-    
     def _get_cached_result(self, cache_key: str) -> Optional[List[Match]]:
         """Get cached query result.
         
@@ -526,17 +930,14 @@ class QueryOptimizer:
         
         return None
     
-    def _cache_result(self, cache_key: str, result: List[Match], persistent: bool = False):
+    def _cache_result(self, cache_key: str, result: List[Match]):
         """Cache query result.
         
         Args:
             cache_key: Cache key
             result: Result to cache
-            persistent: Whether to use persistent cache
         """
         with self._cache_lock:
-            # For now, just use memory cache
-            # In a full implementation, persistent would use disk cache
             self.query_cache[cache_key] = (result, datetime.now())
             
             # Limit cache size
@@ -587,14 +988,23 @@ class QueryOptimizer:
     
     def clear_cache(self):
         """Clear query cache."""
+        self._drop_cached_results()
+        self.logger.info("Query cache cleared")
+    
+    def _drop_cached_results(self):
+        """Forget cached results after the index changes."""
         with self._cache_lock:
             self.query_cache.clear()
-            self.logger.info("Query cache cleared")
     
     def rebuild_index(self):
         """Rebuild the match index."""
         self.index = MatchIndex()
-        self._build_initial_index()
+        if self._follows_store:
+            self.index.add_entries(self._table_entries(self.match_manager.participant_table))
+            self.save_index()
+        else:
+            self._build_initial_index()
+        self.clear_cache()
         self.logger.info("Match index rebuilt")
     
     def add_match_to_index(self, match: Match):
@@ -603,7 +1013,17 @@ class QueryOptimizer:
         Args:
             match: Match to add
         """
-        self.index.add_match(match)
+        self.add_matches_to_index([match])
+    
+    def add_matches_to_index(self, matches: List[Match]):
+        """Index newly stored matches; registered as a MatchManager listener.
+        
+        Args:
+            matches: Matches to add (or replace)
+        """
+        self.index.add_entries([MatchIndex.match_entry(match) for match in matches])
+        self._drop_cached_results()
+        self._maybe_save_index()
     
     def remove_match_from_index(self, match: Match):
         """Remove a match from the index.
@@ -611,7 +1031,17 @@ class QueryOptimizer:
         Args:
             match: Match to remove
         """
-        self.index.remove_match(match)
+        self.remove_matches_from_index([match.match_id])
+    
+    def remove_matches_from_index(self, match_ids: List[str]):
+        """Drop removed matches from the index; registered as a MatchManager removal listener.
+        
+        Args:
+            match_ids: IDs of the matches to remove
+        """
+        if self.index.remove_match_ids(match_ids):
+            self._drop_cached_results()
+            self._maybe_save_index()
 
 
 def query_performance_monitor(func: Callable) -> Callable:
@@ -0,0 +1,232 @@
+"""
+Vectorized resampling for bootstrap intervals and permutation tests.
+
+Resample indices are drawn as whole matrices and the statistics of every
+resample are computed in one NumPy pass instead of one Python iteration per
+resample. Draws are split into chunks of at most `max_chunk_elements` indices
+to bound memory. Independent series of equal length (e.g. every metric of a
+player, or one metric across players with the same number of games) are
+resampled together as a single 3-D draw.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy import stats
+
+
+BOOTSTRAP_METHODS = ("percentile", "bca")
+ALTERNATIVES = ("two-sided", "less", "greater")
+
+# Upper bound on resample indices drawn at once (~32 MB of int64)
+DEFAULT_MAX_CHUNK_ELEMENTS = 4_000_000
+
+
+def _chunk_rows(total: int, row_elements: int, max_chunk_elements: int) -> List[Tuple[int, int]]:
+    """Split `total` resamples into (start, stop) ranges of bounded size."""
+    rows = max(1, max_chunk_elements // max(1, row_elements))
+    return [(start, min(start + rows, total)) for start in range(0, total, rows)]
+
+
+def bootstrap_means(data: np.ndarray, n_resamples: int, rng: np.random.Generator,
+                    max_chunk_elements: int = DEFAULT_MAX_CHUNK_ELEMENTS) -> np.ndarray:
+    """
+    Means of bootstrap resamples of one or more equal-length series.
+    
+    Args:
+        data: (n,) series or (s, n) stack of series
+        n_resamples: Number of resamples per series
+        rng: Random generator
+        max_chunk_elements: Maximum number of indices drawn at once
+    
+    Returns:
+        (n_resamples,) or (s, n_resamples) resample means
+    """
+    stacked = np.atleast_2d(np.asarray(data, dtype=float))
+    n_series, n = stacked.shape
+    means = np.empty((n_series, n_resamples))
+    
+    for start, stop in _chunk_rows(n_resamples, n_series * n, max_chunk_elements):
+        indices = rng.integers(0, n, size=(n_series, stop - start, n))
+        means[:, start:stop] = np.take_along_axis(
+            stacked[:, None, :], indices, axis=2
+        ).mean(axis=2)
+    
+    return means[0] if np.ndim(data) == 1 else means
+
+
+def _row_quantiles(sorted_rows: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Linearly interpolated quantile q[i] of each sorted row i."""
+    position = q * (sorted_rows.shape[1] - 1)
+    below = np.floor(position).astype(int)
+    above = np.minimum(below + 1, sorted_rows.shape[1] - 1)
+    rows = np.arange(sorted_rows.shape[0])
+    weight = position - below
+    return sorted_rows[rows, below] * (1 - weight) + sorted_rows[rows, above] * weight
+
+
+def _bca_levels(stacked: np.ndarray, boot: np.ndarray, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bias-corrected and accelerated percentile levels of the mean.
+    
+    The acceleration comes from jackknife means, which for the mean have the
+    closed form (sum - x_i) / (n - 1), so no leave-one-out loop is needed.
+    """
+    n_resamples = boot.shape[1]
+    theta = stacked.mean(axis=1)
+    
+    # Bias correction from the share of resamples below the estimate
+    below = (boot < theta[:, None]).mean(axis=1)
+    below = np.clip(below, 1 / (n_resamples + 1), n_resamples / (n_resamples + 1))
+    z0 = stats.norm.ppf(below)
+    
+    n = stacked.shape[1]
+    jackknife = (stacked.sum(axis=1, keepdims=True) - stacked) / max(n - 1, 1)
+    deviations = jackknife.mean(axis=1, keepdims=True) - jackknife
+    spread = (deviations ** 2).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acceleration = np.where(spread > 0, (deviations ** 3).sum(axis=1) / (6 * spread ** 1.5), 0.0)
+    
+    def level(z_alpha: float) -> np.ndarray:
+        shifted = z0 + z_alpha
+        return stats.norm.cdf(z0 + shifted / (1 - acceleration * shifted))
+    
+    return level(stats.norm.ppf(alpha / 2)), level(stats.norm.ppf(1 - alpha / 2))
+
+
+def bootstrap_intervals(series: Sequence[Sequence[float]], confidence_level: float = 0.95,
+                        method: str = "percentile", n_resamples: int = 1000,
+                        rng: np.random.Generator = None,
+                        max_chunk_elements: int = DEFAULT_MAX_CHUNK_ELEMENTS) -> List[Tuple[float, float]]:
+    """
+    Bootstrap confidence intervals of the mean for many independent series.
+    
+    Series are grouped by length and each group is resampled in one draw.
+    
+    Args:
+        series: Non-empty series of values
+        confidence_level: Confidence level (0 < confidence_level < 1)
+        method: "percentile" or "bca" (bias-corrected and accelerated)
+        n_resamples: Number of resamples per series
+        rng: Random generator (a fresh unseeded one by default)
+        max_chunk_elements: Maximum number of indices drawn at once
+    
+    Returns:
+        (lower, upper) bounds for each series, in input order
+    """
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"Unknown bootstrap method {method!r}; expected one of {BOOTSTRAP_METHODS}")
+    if rng is None:
+        rng = np.random.default_rng()
+    
+    arrays = [np.asarray(values, dtype=float) for values in series]
+    if any(array.ndim != 1 or array.size == 0 for array in arrays):
+        raise ValueError("Every series must be a non-empty sequence of numbers")
+    
+    by_length: Dict[int, List[int]] = {}
+    for position, array in enumerate(arrays):
+        by_length.setdefault(array.size, []).append(position)
+    
+    alpha = 1 - confidence_level
+    intervals: List[Tuple[float, float]] = [(0.0, 0.0)] * len(arrays)
+    for positions in by_length.values():
+        stacked = np.stack([arrays[position] for position in positions])
+        boot = np.sort(bootstrap_means(stacked, n_resamples, rng, max_chunk_elements), axis=1)
+        
+        if method == "bca":
+            lower_q, upper_q = _bca_levels(stacked, boot, alpha)
+        else:
+            lower_q = np.full(len(positions), alpha / 2)
+            upper_q = np.full(len(positions), 1 - alpha / 2)
+        
+        lower = _row_quantiles(boot, lower_q)
+        upper = _row_quantiles(boot, upper_q)
+        for row, position in enumerate(positions):
+            intervals[position] = (float(lower[row]), float(upper[row]))
+    
+    return intervals
+
+
+def _p_value(permuted: np.ndarray, observed: float, alternative: str) -> float:
+    """Permutation p-value with the observed arrangement counted as one permutation."""
+    # Tolerance keeps ties with the observed statistic from being lost to rounding
+    tolerance = 1e-12 * max(1.0, abs(observed))
+    if alternative == "greater":
+        extreme = np.count_nonzero(permuted >= observed - tolerance)
+    elif alternative == "less":
+        extreme = np.count_nonzero(permuted <= observed + tolerance)
+    else:
+        extreme = np.count_nonzero(np.abs(permuted) >= abs(observed) - tolerance)
+    return (extreme + 1) / (permuted.size + 1)
+
+
+def permutation_test(sample1: Sequence[float], sample2: Sequence[float], n_permutations: int = 10000,
+                     alternative: str = "two-sided", rng: np.random.Generator = None,
+                     max_chunk_elements: int = DEFAULT_MAX_CHUNK_ELEMENTS) -> Tuple[float, float]:
+    """
+    Two-sample permutation test of the difference in means.
+    
+    Group labels are shuffled for a whole chunk of permutations at once.
+    
+    Args:
+        sample1: First sample
+        sample2: Second sample
+        n_permutations: Number of random relabelings
+        alternative: "two-sided", "less" or "greater" (mean of sample1 vs sample2)
+        rng: Random generator (a fresh unseeded one by default)
+        max_chunk_elements: Maximum number of values permuted at once
+    
+    Returns:
+        (mean(sample1) - mean(sample2), p-value)
+    """
+    if alternative not in ALTERNATIVES:
+        raise ValueError(f"Alternative must be one of: {list(ALTERNATIVES)}")
+    if rng is None:
+        rng = np.random.default_rng()
+    
+    first = np.asarray(sample1, dtype=float)
+    second = np.asarray(sample2, dtype=float)
+    pooled = np.concatenate([first, second])
+    n1, total = first.size, pooled.sum()
+    observed = first.mean() - second.mean()
+    
+    permuted = np.empty(n_permutations)
+    for start, stop in _chunk_rows(n_permutations, pooled.size, max_chunk_elements):
+        shuffled = rng.permuted(np.broadcast_to(pooled, (stop - start, pooled.size)), axis=1)
+        first_sums = shuffled[:, :n1].sum(axis=1)
+        permuted[start:stop] = first_sums / n1 - (total - first_sums) / second.size
+    
+    return float(observed), _p_value(permuted, observed, alternative)
+
+
+def sign_flip_test(sample: Sequence[float], expected_value: float = 0.0, n_permutations: int = 10000,
+                   alternative: str = "two-sided", rng: np.random.Generator = None,
+                   max_chunk_elements: int = DEFAULT_MAX_CHUNK_ELEMENTS) -> Tuple[float, float]:
+    """
+    One-sample permutation test of the mean by random sign flips of the deviations.
+    
+    Args:
+        sample: Sample values
+        expected_value: Mean under the null hypothesis
+        n_permutations: Number of random sign assignments
+        alternative: "two-sided", "less" or "greater" (sample mean vs expected_value)
+        rng: Random generator (a fresh unseeded one by default)
+        max_chunk_elements: Maximum number of signs drawn at once
+    
+    Returns:
+        (mean deviation from expected_value, p-value)
+    """
+    if alternative not in ALTERNATIVES:
+        raise ValueError(f"Alternative must be one of: {list(ALTERNATIVES)}")
+    if rng is None:
+        rng = np.random.default_rng()
+    
+    deviations = np.asarray(sample, dtype=float) - expected_value
+    observed = deviations.mean()
+    
+    permuted = np.empty(n_permutations)
+    for start, stop in _chunk_rows(n_permutations, deviations.size, max_chunk_elements):
+        signs = rng.integers(0, 2, size=(stop - start, deviations.size)) * 2 - 1
+        permuted[start:stop] = (signs * deviations).mean(axis=1)
+    
+    return float(observed), _p_value(permuted, observed, alternative)
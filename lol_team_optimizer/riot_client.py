@@ -9,13 +9,18 @@ import json
 import logging
 import time
 import hashlib
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 from dataclasses import dataclass
 
 from .config import Config
+from .api_cache import ApiResponseCache
 
 
 @dataclass
@@ -64,6 +69,100 @@ class RateLimiter:
         return self.time_window - (now - oldest_request)
 
 
+class MultiWindowRateLimiter:
+    """
+    Thread-safe rate limiter that enforces several request windows at once.
+    
+    Riot applies a short burst limit (per second) and a longer sustained limit
+    (per two minutes) to every application key. One instance is shared by all
+    worker threads, so concurrent fetches together stay within both windows.
+    """
+    
+    def __init__(self, limits: List[Tuple[int, float]]):
+        """
+        Initialize the limiter.
+        
+        Args:
+            limits: (max_requests, time_window_seconds) pairs, all enforced together
+        """
+        if not limits:
+            raise ValueError("At least one rate limit window is required")
+        self.limits = sorted(limits, key=lambda limit: limit[1])
+        self._windows = [deque() for _ in self.limits]
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    @property
+    def max_requests(self) -> int:
+        """Request budget of the longest window."""
+        return self.limits[-1][0]
+    
+    @property
+    def time_window(self) -> float:
+        """Length of the longest window in seconds."""
+        return self.limits[-1][1]
+    
+    def _wait_locked(self, now: float) -> float:
+        """Seconds until every window has room and any penalty has passed, pruning expired timestamps."""
+        wait = self._blocked_until - now
+        for (max_requests, time_window), window in zip(self.limits, self._windows):
+            while window and now - window[0] >= time_window:
+                window.popleft()
+            if len(window) >= max_requests:
+                wait = max(wait, time_window - (now - window[0]))
+        return wait
+    
+    def block_until(self, deadline: float):
+        """
+        Hold back every request until a deadline.
+        
+        A 429 response penalizes the whole application key, so the pause
+        applies to all threads waiting in acquire(), not only the one that
+        received it. An earlier deadline never shortens a pending one.
+        
+        Args:
+            deadline: time.monotonic() value before which no request is made
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, deadline)
+    
+    def can_make_request(self) -> bool:
+        """Check if a request can be made without exceeding any window."""
+        with self._lock:
+            return self._wait_locked(time.monotonic()) <= 0
+    
+    def record_request(self):
+        """Record a request in every window."""
+        with self._lock:
+            now = time.monotonic()
+            for window in self._windows:
+                window.append(now)
+    
+    def wait_time(self) -> float:
+        """Calculate how long to wait before the next request is allowed."""
+        with self._lock:
+            return max(self._wait_locked(time.monotonic()), 0.0)
+    
+    def acquire(self) -> float:
+        """
+        Block until a request slot is free in every window, then claim it.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._wait_locked(now)
+                if wait <= 0:
+                    for window in self._windows:
+                        window.append(now)
+                    return waited
+            time.sleep(wait)
+            waited += wait
+
+
 class RiotAPIClient:
     """
     Client for interacting with the Riot Games API.
@@ -81,12 +180,24 @@ class RiotAPIClient:
         """
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.rate_limiter = RateLimiter(
-            max_requests=config.riot_api_rate_limit,
-            time_window=120  # 2 minutes
-        )
-        self.cache: Dict[str, CacheEntry] = {}
+        self.rate_limiter = MultiWindowRateLimiter([
+            (config.riot_api_rate_limit_per_second, 1),
+            (config.riot_api_rate_limit, 120)  # 2 minutes
+        ])
+        # Recently used responses stay in memory in front of the persistent cache
+        self.cache: Dict[str, CacheEntry] = OrderedDict()
+        self.memory_cache_size = 256
+        self._cache_lock = threading.RLock()
+        
+        # Bound the number of requests in flight across all worker threads
+        self.max_concurrent_requests = config.max_concurrent_requests
+        self._in_flight = threading.BoundedSemaphore(self.max_concurrent_requests)
+        
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_concurrent_requests,
+                              pool_maxsize=self.max_concurrent_requests)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'X-Riot-Token': config.riot_api_key,
             'Accept': 'application/json'
@@ -96,44 +207,41 @@ class RiotAPIClient:
         self.cache_dir = Path(config.cache_directory)
         self.cache_dir.mkdir(exist_ok=True)
         
-        # Load persistent cache
-        self._load_cache()
+        # Open the persistent response cache, importing a legacy JSON cache once
+        self.response_cache = ApiResponseCache(
+            self.cache_dir / "api_cache.db",
+            max_size_bytes=config.api_cache_max_mb * 1024 * 1024,
+            compress_min_bytes=4096 if config.api_cache_compression else None,
+            sweep_interval_seconds=config.api_cache_sweep_interval_seconds
+        )
+        self._migrate_legacy_cache()
     
-    def _load_cache(self):
-        """Load cache from disk."""
+    def _migrate_legacy_cache(self):
+        """Import unexpired entries from a legacy api_cache.json, then set the file aside."""
         cache_file = self.cache_dir / "api_cache.json"
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r') as f:
-                    cache_data = json.load(f)
-                
-                for key, entry_data in cache_data.items():
-                    expires_at = datetime.fromisoformat(entry_data['expires_at'])
-                    if expires_at > datetime.now():
-                        self.cache[key] = CacheEntry(
-                            data=entry_data['data'],
-                            timestamp=datetime.fromisoformat(entry_data['timestamp']),
-                            expires_at=expires_at
-                        )
-            except (json.JSONDecodeError, KeyError, ValueError):
-                # If cache is corrupted, start fresh
-                pass
-    
-    def _save_cache(self):
-        """Save cache to disk."""
-        cache_file = self.cache_dir / "api_cache.json"
-        cache_data = {}
+        if not cache_file.exists():
+            return
         
-        for key, entry in self.cache.items():
-            if entry.expires_at > datetime.now():
-                cache_data[key] = {
-                    'data': entry.data,
-                    'timestamp': entry.timestamp.isoformat(),
-                    'expires_at': entry.expires_at.isoformat()
-                }
+        try:
+            with open(cache_file, 'r') as f:
+                cache_data = json.load(f)
+            
+            entries = {}
+            for key, entry_data in cache_data.items():
+                expires_at = datetime.fromisoformat(entry_data['expires_at'])
+                if expires_at > datetime.now():
+                    entries[key] = (
+                        entry_data['data'],
+                        datetime.fromisoformat(entry_data['timestamp']),
+                        expires_at
+                    )
+            self.response_cache.put_many(entries)
+            self.logger.info(f"Imported {len(entries)} entries from legacy API cache")
+        except (json.JSONDecodeError, KeyError, ValueError, AttributeError):
+            # If cache is corrupted, start fresh
+            pass
         
-        with open(cache_file, 'w') as f:
-            json.dump(cache_data, f, indent=2)
+        cache_file.rename(cache_file.with_name("api_cache.json.migrated"))
     
     def _get_cache_key(self, endpoint: str, params: Dict[str, Any]) -> str:
         """Generate a cache key for an API request."""
@@ -144,24 +252,39 @@ class RiotAPIClient:
     
     def _get_from_cache(self, cache_key: str) -> Optional[Any]:
         """Retrieve data from cache if available and not expired."""
-        if cache_key in self.cache:
-            entry = self.cache[cache_key]
-            if entry.expires_at > datetime.now():
-                return entry.data
-            else:
-                # Remove expired entry
-                del self.cache[cache_key]
-        return None
+        with self._cache_lock:
+            if cache_key in self.cache:
+                entry = self.cache[cache_key]
+                if entry.expires_at > datetime.now():
+                    self.cache.move_to_end(cache_key)
+                    return entry.data
+                else:
+                    # Remove expired entry
+                    del self.cache[cache_key]
+                    return None
+        
+        stored = self.response_cache.get_entry(cache_key)
+        if stored is None:
+            return None
+        
+        data, timestamp, expires_at = stored
+        self._remember(cache_key, CacheEntry(data=data, timestamp=timestamp, expires_at=expires_at))
+        return data
     
     def _store_in_cache(self, cache_key: str, data: Any):
         """Store data in cache with expiration."""
-        expires_at = datetime.now() + timedelta(hours=self.config.cache_duration_hours)
-        self.cache[cache_key] = CacheEntry(
-            data=data,
-            timestamp=datetime.now(),
-            expires_at=expires_at
-        )
-        self._save_cache()
+        now = datetime.now()
+        expires_at = now + timedelta(hours=self.config.cache_duration_hours)
+        self._remember(cache_key, CacheEntry(data=data, timestamp=now, expires_at=expires_at))
+        self.response_cache.put(cache_key, data, expires_at, now)
+    
+    def _remember(self, cache_key: str, entry: CacheEntry):
+        """Keep an entry in the in-memory layer, evicting the least recently used."""
+        with self._cache_lock:
+            self.cache[cache_key] = entry
+            self.cache.move_to_end(cache_key)
+            while len(self.cache) > self.memory_cache_size:
+                self.cache.popitem(last=False)
     
     def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -189,19 +312,15 @@ class RiotAPIClient:
         url = f"{self.config.riot_api_base_url}{endpoint}"
         
         for attempt in range(self.config.max_retries):
-            # Wait for rate limit if necessary
-            if not self.rate_limiter.can_make_request():
-                wait_time = self.rate_limiter.wait_time()
-                if wait_time > 0:
-                    time.sleep(wait_time)
-            
             try:
-                self.rate_limiter.record_request()
-                response = self.session.get(
-                    url,
-                    params=params,
-                    timeout=self.config.request_timeout_seconds
-                )
+                # Wait for a slot in the shared rate limit windows, then for a free connection
+                self.rate_limiter.acquire()
+                with self._in_flight:
+                    response = self.session.get(
+                        url,
+                        params=params,
+                        timeout=self.config.request_timeout_seconds
+                    )
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -211,14 +330,14 @@ class RiotAPIClient:
                     # Not found - don't retry, raise immediately
                     raise requests.RequestException(f"Resource not found: {url}")
                 elif response.status_code == 429:  # Rate limited
-                    # Extract retry-after header if available
+                    # Extract retry-after header if available, else back off exponentially
                     retry_after = response.headers.get('Retry-After')
                     if retry_after:
-                        time.sleep(int(retry_after))
+                        penalty = float(retry_after)
                     else:
-                        # Exponential backoff
-                        backoff_time = (self.config.retry_backoff_factor ** attempt)
-                        time.sleep(backoff_time)
+                        penalty = self.config.retry_backoff_factor ** attempt
+                    # The penalty covers the whole key, so every worker waits it out in acquire()
+                    self.rate_limiter.block_until(time.monotonic() + penalty)
                     continue  # Continue to next iteration
                 else:
                     # For other status codes, raise for status which will be caught and retried
@@ -356,20 +475,16 @@ class RiotAPIClient:
             filtered_matches = []
             summoners_rift_queues = {420, 440, 400, 430}  # Ranked Solo/Duo, Ranked Flex, Normal Draft, Normal Blind
             
+            # Fetch details concurrently; matches that can't be fetched are skipped
+            match_details = self.get_match_details_batch(match_ids)
             for match_id in match_ids:
-                try:
-                    match_details = self.get_match_details(match_id)
-                    queue_id = match_details.get('info', {}).get('queueId')
-                    if queue_id in summoners_rift_queues:
-                        filtered_matches.append(match_id)
-                    
-                    # Stop when we have enough Summoner's Rift matches
-                    if len(filtered_matches) >= count:
-                        break
-                        
-                except Exception as e:
-                    # Skip matches that can't be fetched
-                    continue
+                details = match_details.get(match_id)
+                if details and details.get('info', {}).get('queueId') in summoners_rift_queues:
+                    filtered_matches.append(match_id)
+                
+                # Stop when we have enough Summoner's Rift matches
+                if len(filtered_matches) >= count:
+                    break
             
             return filtered_matches
         
@@ -388,6 +503,77 @@ class RiotAPIClient:
         endpoint = f"/lol/match/v5/matches/{match_id}"
         return self._make_request(endpoint)
     
+    def get_match_details_batch(self, match_ids: Iterable[str],
+                                max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch detailed match data for many matches concurrently.
+        
+        Requests share the client's rate limiter and in-flight bound, so the
+        batch runs as fast as the rate limit allows.
+        
+        Args:
+            match_ids: Match identifiers
+            max_workers: Worker threads (defaults to max_concurrent_requests)
+            
+        Returns:
+            Dictionary mapping match ID to match data; failed matches are omitted
+        """
+        return {match_id: data for match_id, data in self.iter_match_details(match_ids, max_workers)
+                if data}
+    
+    def iter_match_details(self, match_ids: Iterable[str],
+                           max_workers: Optional[int] = None) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Fetch match details concurrently, yielding each one as it completes.
+        
+        Args:
+            match_ids: Match identifiers (duplicates are fetched once)
+            max_workers: Worker threads (defaults to max_concurrent_requests)
+            
+        Yields:
+            (match_id, match_data) in completion order; match_data is None if the fetch failed
+        """
+        return self._iter_concurrently(self.get_match_details, list(dict.fromkeys(match_ids)), max_workers)
+    
+    def get_match_history_batch(self, requests_by_puuid: Dict[str, Tuple[int, int]],
+                                queue: Optional[int] = None,
+                                max_workers: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Fetch match history pages for several players concurrently.
+        
+        Args:
+            requests_by_puuid: Mapping of PUUID to (start, count)
+            queue: Queue ID to filter by (optional)
+            max_workers: Worker threads (defaults to max_concurrent_requests)
+            
+        Returns:
+            Dictionary mapping PUUID to match IDs; failed players are omitted
+        """
+        def fetch(puuid: str) -> List[str]:
+            start, count = requests_by_puuid[puuid]
+            return self.get_match_history(puuid, count=count, queue=queue, start=start)
+        
+        return {puuid: match_ids for puuid, match_ids in
+                self._iter_concurrently(fetch, list(requests_by_puuid), max_workers)
+                if match_ids is not None}
+    
+    def _iter_concurrently(self, fetch: Callable[[str], Any], keys: List[str],
+                           max_workers: Optional[int] = None) -> Iterator[Tuple[str, Any]]:
+        """Run fetch(key) for every key on a thread pool, yielding (key, result) as each completes."""
+        if not keys:
+            return
+        
+        workers = min(max_workers or self.max_concurrent_requests, len(keys))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(fetch, key): key for key in keys}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    yield key, future.result()
+                except Exception as e:
+                    self.logger.warning(f"Failed to fetch {key}: {e}")
+                    yield key, None
+    
     def get_ranked_stats(self, summoner_id: str, region: str = "na1") -> List[Dict[str, Any]]:
         """
         Fetch ranked statistics for a summoner.
@@ -622,7 +808,14 @@ class RiotAPIClient:
     
     def clear_cache(self):
         """Clear all cached data."""
-        self.cache.clear()
+        with self._cache_lock:
+            self.cache.clear()
+        self.response_cache.clear()
         cache_file = self.cache_dir / "api_cache.json"
         if cache_file.exists():
-            cache_file.unlink()
\ No newline at end of file
+            cache_file.unlink()
+    
+    def close(self):
+        """Stop the response cache's background sweep and release the cache and HTTP connections."""
+        self.response_cache.close()
+        self.session.close()
@@ -0,0 +1,203 @@
+"""
+Per-player match bitmaps for roster lookups.
+
+Match IDs are interned to dense integers ("match numbers") in the order
+matches are indexed. Each player keeps the sorted array of the numbers of
+their matches, which is the sparse form of a compressed bitmap. Most
+players are only ever seen once, so the sparse form is also the compact
+one.
+
+A roster query merges the arrays of the roster's players, so it costs
+O(their postings) however many matches are indexed. Every match in the
+merge has a mask of which roster members played in it and a count of how
+many did. "Matches with at least k of these players" is a threshold on the
+counts, and the masks are returned as they are, so no match has to be
+decoded to know who played in it.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+_MASK_BITS = 64
+_NO_CODES = np.empty(0, dtype=np.int32)
+
+
+class RosterIndex:
+    """
+    Dense match numbering with one sorted match-number array per player.
+    
+    New match numbers are appended to a per-player list and folded into
+    the player's array the next time it is read, so indexing a match costs a
+    few list appends. Removed matches are only flagged dead; their numbers
+    are dropped from the player arrays, and the remaining matches
+    renumbered, once dead numbers outnumber live ones.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self._match_codes: Dict[str, int] = {}  # live match ID -> match number
+        self._match_ids: List[str] = []  # match number -> match ID
+        self._rosters: List[Optional[Tuple[str, ...]]] = []  # match number -> indexed PUUIDs
+        self._live = np.zeros(1024, dtype=bool)
+        self._dead = 0
+        
+        # puuid -> [sorted match numbers, match numbers appended since, live matches]
+        self._postings: Dict[str, list] = {}
+    
+    def __len__(self) -> int:
+        """Number of indexed matches."""
+        return len(self._match_codes)
+    
+    def __contains__(self, match_id: object) -> bool:
+        return match_id in self._match_codes
+    
+    @property
+    def player_count(self) -> int:
+        """Number of players with at least one indexed match."""
+        return len(self._postings)
+    
+    def add_match(self, match_id: str, puuids: Iterable[str]) -> None:
+        """
+        Index (or re-index) the players of one match.
+        
+        Args:
+            match_id: Match identifier
+            puuids: PUUIDs of the match's participants
+        """
+        puuids = tuple(dict.fromkeys(puuids))
+        if match_id in self._match_codes:
+            self.remove_match(match_id)
+        
+        code = len(self._match_ids)
+        self._match_ids.append(match_id)
+        self._rosters.append(puuids)
+        self._match_codes[match_id] = code
+        if code >= self._live.size:
+            grown = np.zeros(self._live.size * 2, dtype=bool)
+            grown[:self._live.size] = self._live
+            self._live = grown
+        self._live[code] = True
+        
+        postings = self._postings
+        for puuid in puuids:
+            entry = postings.get(puuid)
+            if entry is None:
+                postings[puuid] = [_NO_CODES, [code], 1]
+            else:
+                entry[1].append(code)
+                entry[2] += 1
+    
+    def remove_match(self, match_id: str) -> bool:
+        """
+        Remove a match, dropping players it leaves without matches.
+        
+        Args:
+            match_id: Match identifier
+        
+        Returns:
+            True if the match was indexed
+        """
+        code = self._match_codes.pop(match_id, None)
+        if code is None:
+            return False
+        
+        self._live[code] = False
+        self._dead += 1
+        puuids, self._rosters[code] = self._rosters[code], None
+        for puuid in puuids:
+            entry = self._postings.get(puuid)
+            if entry is not None:
+                entry[2] -= 1
+                if entry[2] <= 0:
+                    del self._postings[puuid]
+        
+        if self._dead > 1024 and self._dead > len(self._match_codes):
+            self._renumber()
+        return True
+    
+    def _codes(self, puuid: str) -> np.ndarray:
+        """Match numbers posted for a player, including dead ones."""
+        entry = self._postings.get(puuid)
+        if entry is None:
+            return _NO_CODES
+        if entry[1]:
+            entry[0] = np.concatenate([entry[0], np.array(entry[1], dtype=np.int32)])
+            entry[1] = []
+        return entry[0]
+    
+    def match_ids(self, puuid: str) -> List[str]:
+        """
+        Get the IDs of a player's matches.
+        
+        Args:
+            puuid: Player's PUUID
+        
+        Returns:
+            Match IDs in indexing order
+        """
+        codes = self._codes(puuid)
+        match_ids = self._match_ids
+        return [match_ids[code] for code in codes[self._live[codes]].tolist()]
+    
+    def roster_masks(self, puuids: Sequence[str], min_players: int = 1) -> Tuple[List[str], np.ndarray]:
+        """
+        Find the matches containing at least `min_players` of the given players.
+        
+        Args:
+            puuids: Roster; a player's position is its bit in the masks
+            min_players: Minimum number of roster members a match must contain
+        
+        Returns:
+            (match IDs, masks) where masks has shape (matches, ceil(len(puuids) / 64))
+            and bit i % 64 of word i // 64 is set when puuids[i] played in the match
+        """
+        words = max(1, -(-len(puuids) // _MASK_BITS))
+        
+        code_arrays = []
+        position_arrays = []
+        seen = set()
+        for position, puuid in enumerate(puuids):
+            codes = self._codes(puuid)
+            if not codes.size or puuid in seen:
+                continue
+            seen.add(puuid)
+            code_arrays.append(codes)
+            position_arrays.append(np.full(codes.size, position, dtype=np.int64))
+        if not code_arrays:
+            return [], np.zeros((0, words), dtype=np.uint64)
+        
+        # Merge the postings; each (match, player) pair appears once
+        codes, inverse, counts = np.unique(np.concatenate(code_arrays), return_inverse=True, return_counts=True)
+        positions = np.concatenate(position_arrays)
+        hit = (counts >= max(min_players, 1)) & self._live[codes]
+        
+        keep = hit[inverse]
+        columns = (np.cumsum(hit) - 1)[inverse[keep]]
+        positions = positions[keep]
+        masks = np.zeros((int(hit.sum()), words), dtype=np.uint64)
+        np.bitwise_or.at(
+            masks,
+            (columns, positions // _MASK_BITS),
+            np.left_shift(np.uint64(1), (positions % _MASK_BITS).astype(np.uint64))
+        )
+        
+        match_ids = self._match_ids
+        return [match_ids[code] for code in codes[hit].tolist()], masks
+    
+    def _renumber(self) -> None:
+        """Drop dead match numbers and renumber the live matches densely."""
+        live = self._live[:len(self._match_ids)]
+        remap = np.cumsum(live, dtype=np.int64) - 1
+        
+        self._match_ids = [match_id for match_id, alive in zip(self._match_ids, live.tolist()) if alive]
+        self._rosters = [roster for roster in self._rosters if roster is not None]
+        self._match_codes = {match_id: code for code, match_id in enumerate(self._match_ids)}
+        self._live = np.zeros(max(1024, len(self._match_ids) * 2), dtype=bool)
+        self._live[:len(self._match_ids)] = True
+        self._dead = 0
+        
+        for puuid, entry in self._postings.items():
+            codes = self._codes(puuid)
+            entry[0] = remap[codes[live[codes]]].astype(np.int32)
@@ -24,6 +24,7 @@ from .analytics_models import (
     StatisticalAnalysisError, DataValidationError, ConfidenceInterval, 
     SignificanceTest, TrendAnalysis
 )
+from .resampling import bootstrap_intervals, permutation_test, sign_flip_test
 
 
 class ConfidenceIntervalMethod(Enum):
@@ -31,6 +32,7 @@ class ConfidenceIntervalMethod(Enum):
     NORMAL = "normal"
     T_DISTRIBUTION = "t_distribution"
     BOOTSTRAP = "bootstrap"
+    BCA = "bca"  # Bias-corrected and accelerated bootstrap
     WILSON = "wilson"  # For proportions
     CLOPPER_PEARSON = "clopper_pearson"  # For proportions
 
@@ -191,6 +193,10 @@ class StatisticalAnalyzer:
                 # Bootstrap method
                 return self._bootstrap_confidence_interval(data_array, confidence_level)
                 
+            elif method == ConfidenceIntervalMethod.BCA:
+                # Bias-corrected and accelerated bootstrap
+                return self._bootstrap_confidence_interval(data_array, confidence_level, bootstrap_method="bca")
+                
             elif method == ConfidenceIntervalMethod.WILSON:
                 # Wilson score interval (for proportions)
                 if not all(0 <= x <= 1 for x in data_array):
@@ -224,7 +230,8 @@ class StatisticalAnalyzer:
         sample1: List[float],
         sample2: Optional[List[float]] = None,
         test_type: str = "auto",
-        alternative: str = "two-sided"
+        alternative: str = "two-sided",
+        n_permutations: int = 10000
     ) -> SignificanceTest:
         """
         Perform statistical significance testing.
@@ -232,8 +239,10 @@ class StatisticalAnalyzer:
         Args:
             sample1: First sample data
             sample2: Second sample data (optional for one-sample tests)
-            test_type: Type of test ("auto", "t_test", "mann_whitney", "chi_square", "ks_test")
+            test_type: Type of test ("auto", "t_test", "mann_whitney", "chi_square", "ks_test",
+                "permutation")
             alternative: Alternative hypothesis ("two-sided", "less", "greater")
+            n_permutations: Number of random relabelings for the permutation test
             
         Returns:
             SignificanceTest object
@@ -263,6 +272,17 @@ class StatisticalAnalyzer:
                         p_value=p_value,
                         degrees_of_freedom=len(sample1_array) - 1
                     )
+                elif test_type == "permutation":
+                    # Sign-flip permutation test of the mean against zero
+                    statistic, p_value = sign_flip_test(
+                        sample1_array, 0.0, n_permutations, alternative,
+                        rng=np.random.default_rng(self.random_state)
+                    )
+                    return SignificanceTest(
+                        test_type="one_sample_permutation",
+                        statistic=statistic,
+                        p_value=p_value
+                    )
                 else:
                     raise StatisticalAnalysisError(f"Test type {test_type} not supported for one sample")
             
@@ -312,6 +332,23 @@ class StatisticalAnalyzer:
                         p_value=p_value
                     )
                 
+                elif test_type == "permutation":
+                    # Permutation test of the difference in means
+                    statistic, p_value = permutation_test(
+                        sample1_array, sample2_array, n_permutations, alternative,
+                        rng=np.random.default_rng(self.random_state)
+                    )
+                    has_spread = len(sample1_array) + len(sample2_array) > 2 and (
+                        np.ptp(sample1_array) > 0 or np.ptp(sample2_array) > 0
+                    )
+                    
+                    return SignificanceTest(
+                        test_type="permutation",
+                        statistic=statistic,
+                        p_value=p_value,
+                        effect_size=self._calculate_cohens_d(sample1_array, sample2_array) if has_spread else None
+                    )
+                
                 elif test_type == "chi_square":
                     # Chi-square test (requires contingency table)
                     return self._perform_chi_square_test(sample1_array, sample2_array)
@@ -327,7 +364,8 @@ class StatisticalAnalyzer:
         sample: List[float],
         expected_value: float,
         test_type: str = "t_test",
-        alternative: str = "two-sided"
+        alternative: str = "two-sided",
+        n_permutations: int = 10000
     ) -> SignificanceTest:
         """
         Perform one-sample statistical test against expected value.
@@ -335,8 +373,9 @@ class StatisticalAnalyzer:
         Args:
             sample: Sample data
             expected_value: Expected value to test against
-            test_type: Type of test ("t_test", "wilcoxon")
+            test_type: Type of test ("t_test", "wilcoxon", "permutation")
             alternative: Alternative hypothesis ("two-sided", "less", "greater")
+            n_permutations: Number of random sign flips for the permutation test
             
         Returns:
             SignificanceTest object
@@ -375,6 +414,18 @@ class StatisticalAnalyzer:
                     p_value=p_value
                 )
             
+            elif test_type == "permutation":
+                # Sign-flip permutation test of the mean
+                statistic, p_value = sign_flip_test(
+                    sample_array, expected_value, n_permutations, alternative,
+                    rng=np.random.default_rng(self.random_state)
+                )
+                return SignificanceTest(
+                    test_type="one_sample_permutation",
+                    statistic=statistic,
+                    p_value=p_value
+                )
+            
             else:
                 raise StatisticalAnalysisError(f"Unknown test type: {test_type}")
                 
@@ -636,30 +687,21 @@ class StatisticalAnalyzer:
         self,
         data: np.ndarray,
         confidence_level: float,
-        n_bootstrap: int = 1000
+        n_bootstrap: int = 1000,
+        bootstrap_method: str = "percentile"
     ) -> ConfidenceInterval:
         """Calculate confidence interval using bootstrap method."""
-        # Set random state for reproducible results
-        rng = np.random.RandomState(self.random_state)
-        bootstrap_means = []
-        n = len(data)
-        
-        for _ in range(n_bootstrap):
-            bootstrap_sample = rng.choice(data, size=n, replace=True)
-            bootstrap_means.append(np.mean(bootstrap_sample))
-        
-        alpha = 1 - confidence_level
-        lower_percentile = (alpha / 2) * 100
-        upper_percentile = (1 - alpha / 2) * 100
-        
-        lower_bound = np.percentile(bootstrap_means, lower_percentile)
-        upper_bound = np.percentile(bootstrap_means, upper_percentile)
+        # Seeded generator for reproducible results
+        rng = np.random.default_rng(self.random_state)
+        (lower_bound, upper_bound), = bootstrap_intervals(
+            [data], confidence_level, method=bootstrap_method, n_resamples=n_bootstrap, rng=rng
+        )
         
         return ConfidenceInterval(
             lower_bound=lower_bound,
             upper_bound=upper_bound,
             confidence_level=confidence_level,
-            sample_size=n
+            sample_size=len(data)
         )
     
     def _wilson_confidence_interval(
@@ -95,6 +95,8 @@ class StreamlinedCLI:
                 print(f"\nAn unexpected error occurred: {e}")
                 print("The application will continue, but please report this issue.")
                 input("\nPress Enter to continue...")
+        
+        self.engine.close()
     
     def _display_system_status(self) -> None:
         """Display current system status."""
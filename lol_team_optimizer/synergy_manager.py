@@ -8,12 +8,16 @@ based on match history and performance metrics.
 import logging
 import json
 import os
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 
-from .models import Player, SynergyDatabase, PlayerSynergyData
+from .models import Match, Player, SynergyDatabase, PlayerSynergyData
 from .riot_client import RiotAPIClient
+from .synergy_store import SynergyStore, pair_key_string, synergy_from_dict
 
 
 class SynergyManager:
@@ -43,16 +47,119 @@ class SynergyManager:
         # Ensure cache directory exists
         os.makedirs(cache_directory, exist_ok=True)
         self.synergy_cache_file = os.path.join(cache_directory, "synergy_data.json")
+        self.synergy_store = SynergyStore(Path(cache_directory) / "synergy.db")
+        
+        self._lock = threading.RLock()
+        self._applied: Set[Tuple[str, str]] = set()  # (match_id, pair key) results already counted
+        self._pending_applied: List[Tuple[str, str]] = []
+        self._dirty_pairs: Set[Tuple[str, str]] = set()
+        self._legacy_pairs: Set[str] = set()  # imported pairs with no record of their matches
+        self._tracked_players: Dict[str, str] = {}  # puuid -> player name
         
         # Load existing synergy data
         self._load_synergy_data()
         
         self.logger.info("Synergy manager initialized")
     
+    def set_tracked_players(self, players: List[Player]) -> None:
+        """
+        Set the players whose pairings are recorded as matches are stored.
+        
+        Args:
+            players: Players to track; those without a PUUID are ignored
+        """
+        with self._lock:
+            self._tracked_players = {p.puuid: p.name for p in players if p.puuid}
+    
+    def on_matches_stored(self, matches: List[Match]) -> None:
+        """
+        MatchManager listener: fold newly stored matches into the synergy data.
+        
+        Args:
+            matches: Matches that were just stored
+        """
+        with self._lock:
+            puuid_to_name = dict(self._tracked_players)
+        
+        if len(puuid_to_name) >= 2 and matches:
+            self.apply_matches(matches, puuid_to_name)
+    
+    def apply_matches(self, matches: List[Match], puuid_to_name: Dict[str, str]) -> int:
+        """
+        Add matches to the synergy aggregates of the tracked players in them.
+        
+        Each (match, pair) result is counted at most once, so applying the
+        same match again changes nothing. Only the pairs that changed are
+        written back.
+        
+        Args:
+            matches: Matches to apply
+            puuid_to_name: PUUID to player name of the tracked players
+            
+        Returns:
+            Number of pair results added
+        """
+        puuids = set(puuid_to_name)
+        added = 0
+        
+        with self._lock:
+            for match in matches:
+                known_participants = match.get_known_players(puuids)
+                if len(known_participants) < 2:
+                    continue
+                
+                # Determine if this is a recent game (within 30 days)
+                is_recent = (datetime.now() - match.game_creation_datetime).days <= 30
+                
+                # Calculate synergies for all pairs in this match
+                for i, participant1 in enumerate(known_participants):
+                    for participant2 in known_participants[i+1:]:
+                        player1_name = puuid_to_name.get(participant1.puuid)
+                        player2_name = puuid_to_name.get(participant2.puuid)
+                        
+                        if not player1_name or not player2_name:
+                            continue
+                        
+                        synergy_key = tuple(sorted([player1_name, player2_name]))
+                        applied_key = (match.match_id, pair_key_string(synergy_key))
+                        if applied_key in self._applied:
+                            continue
+                        
+                        synergy = self._synergy_for_update(synergy_key)
+                        
+                        # Calculate combined performance metrics
+                        game_data = {
+                            'combined_kda': (participant1.kda + participant2.kda) / 2,
+                            'combined_vision': participant1.vision_score + participant2.vision_score,
+                            'game_duration': match.game_duration,
+                            'is_recent': is_recent
+                        }
+                        
+                        synergy.add_game_result(
+                            won=participant1.win and participant2.win,
+                            player1_role=participant1.individual_position or participant1.lane,
+                            player2_role=participant2.individual_position or participant2.lane,
+                            player1_champion=participant1.champion_id,
+                            player2_champion=participant2.champion_id,
+                            game_data=game_data
+                        )
+                        
+                        self._mark_applied(applied_key, synergy_key)
+                        added += 1
+            
+            if added:
+                self.synergy_db.last_updated = datetime.now()
+                self._save_synergy_data()
+        
+        return added
+    
     def calculate_synergies_from_stored_matches(self, players: List[Player]) -> None:
         """
         Calculate player synergies from centralized match storage.
         
+        Only matches with a pair result not yet applied are loaded, so a
+        refresh after a scrape costs time in proportion to the new matches.
+        
         Args:
             players: List of players to calculate synergies for
         """
@@ -66,179 +173,107 @@ class SynergyManager:
             self.logger.warning("Need at least 2 players with PUUIDs to calculate synergies")
             return
         
-        # Get matches with multiple team members
-        team_matches = self.match_manager.get_matches_with_multiple_players(puuids)
-        self.logger.info(f"Found {len(team_matches)} matches with multiple team members")
-        
-        # Create PUUID to player name mapping
+        self.set_tracked_players(players)
         puuid_to_name = {p.puuid: p.name for p in players if p.puuid}
         
-        # Process each match
-        synergy_updates = {}
-        
-        for match in team_matches:
-            known_participants = match.get_known_players(puuids)
-            
-            if len(known_participants) < 2:
-                continue
-            
-            # Calculate synergies for all pairs in this match
-            for i, participant1 in enumerate(known_participants):
-                for participant2 in known_participants[i+1:]:
-                    player1_name = puuid_to_name.get(participant1.puuid)
-                    player2_name = puuid_to_name.get(participant2.puuid)
-                    
-                    if not player1_name or not player2_name:
-                        continue
-                    
-                    # Get or create synergy data
-                    synergy = self.synergy_db.get_synergy(player1_name, player2_name)
-                    
-                    # Calculate combined performance metrics
-                    combined_kda = (participant1.kda + participant2.kda) / 2
-                    combined_vision = participant1.vision_score + participant2.vision_score
-                    game_duration = match.game_duration
-                    
-                    # Check if both players won
-                    both_won = participant1.win and participant2.win
-                    
-                    # Determine if this is a recent game (within 30 days)
-                    is_recent = (datetime.now() - match.game_creation_datetime).days <= 30
-                    
-                    # Update synergy data
-                    game_data = {
-                        'combined_kda': combined_kda,
-                        'combined_vision': combined_vision,
-                        'game_duration': game_duration,
-                        'is_recent': is_recent
-                    }
-                    
-                    synergy.add_game_result(
-                        won=both_won,
-                        player1_role=participant1.individual_position or participant1.lane,
-                        player2_role=participant2.individual_position or participant2.lane,
-                        player1_champion=participant1.champion_id,
-                        player2_champion=participant2.champion_id,
-                        game_data=game_data
-                    )
-                    
-                    # Track for saving
-                    synergy_key = synergy.synergy_key
-                    synergy_updates[synergy_key] = synergy
-        
-        # Update synergy database
-        for synergy_key, synergy in synergy_updates.items():
-            self.synergy_db.synergies[synergy_key] = synergy
+        # Find matches with multiple team members from the index, without loading them
+        rosters = self.match_manager.get_match_rosters(puuids)
+        self.logger.info(f"Found {len(rosters)} matches with multiple team members")
         
-        # Update last updated timestamp
-        self.synergy_db.last_updated = datetime.now()
+        with self._lock:
+            pending_ids = [
+                match_id for match_id, members in rosters.items()
+                if any((match_id, pair_key_string(tuple(sorted(pair)))) not in self._applied
+                       for pair in combinations((puuid_to_name[p] for p in members), 2))
+            ]
         
-        # Save updated synergy data
-        self._save_synergy_data()
+        added = self.apply_matches(self.match_manager.get_matches_by_ids(pending_ids), puuid_to_name)
         
-        self.logger.info(f"Updated synergies for {len(synergy_updates)} player pairs from {len(team_matches)} matches")
+        self.logger.info(f"Applied {added} new pair results from {len(pending_ids)} of {len(rosters)} matches")
+    
+    def _synergy_for_update(self, synergy_key: Tuple[str, str]) -> PlayerSynergyData:
+        """Get a pair's aggregates for an update, restarting pairs imported from the legacy file."""
+        key_str = pair_key_string(synergy_key)
+        if key_str in self._legacy_pairs:
+            # The legacy file does not record which matches it counted, so the
+            # pair is rebuilt from the applied matches instead of double counting
+            self._legacy_pairs.discard(key_str)
+            self.synergy_db.synergies[synergy_key] = PlayerSynergyData(
+                player1_name=synergy_key[0], player2_name=synergy_key[1]
+            )
+        return self.synergy_db.get_synergy(*synergy_key)
+    
+    def _mark_applied(self, applied_key: Tuple[str, str], synergy_key: Tuple[str, str]) -> None:
+        """Record a counted (match, pair) result and mark the pair for saving."""
+        self._applied.add(applied_key)
+        self._pending_applied.append(applied_key)
+        self._dirty_pairs.add(synergy_key)
     
     def _load_synergy_data(self):
-        """Load synergy data from cache file."""
+        """Load synergy data from the synergy store, importing a legacy JSON file once."""
         try:
+            self.synergy_db.synergies.update(self.synergy_store.load_pairs())
+            self._applied = self.synergy_store.load_applied()
+            self._legacy_pairs = set(json.loads(self.synergy_store.get_meta('legacy_pairs') or '[]'))
+            
+            last_updated = self.synergy_store.get_meta('last_updated')
+            if last_updated:
+                self.synergy_db.last_updated = datetime.fromisoformat(last_updated)
+            
             if os.path.exists(self.synergy_cache_file):
-                with open(self.synergy_cache_file, 'r') as f:
-                    data = json.load(f)
-                
-                # Reconstruct synergy database
-                self.synergy_db = SynergyDatabase()
-                
-                for key_str, synergy_data in data.get('synergies', {}).items():
-                    # Parse key
-                    player1, player2 = key_str.split('|')
-                    key = (player1, player2)
-                    
-                    # Reconstruct PlayerSynergyData
-                    synergy = PlayerSynergyData(
-                        player1_name=player1,
-                        player2_name=player2,
-                        games_together=synergy_data.get('games_together', 0),
-                        wins_together=synergy_data.get('wins_together', 0),
-                        losses_together=synergy_data.get('losses_together', 0),
-                        avg_combined_kda=synergy_data.get('avg_combined_kda', 0.0),
-                        avg_game_duration=synergy_data.get('avg_game_duration', 0.0),
-                        avg_vision_score_combined=synergy_data.get('avg_vision_score_combined', 0.0),
-                        recent_games_together=synergy_data.get('recent_games_together', 0)
-                    )
-                    
-                    # Reconstruct role combinations
-                    for role_key_str, role_data in synergy_data.get('role_combinations', {}).items():
-                        role1, role2 = role_key_str.split('|')
-                        role_key = (role1, role2)
-                        synergy.role_combinations[role_key] = role_data
-                    
-                    # Reconstruct champion combinations
-                    for champ_key_str, champ_data in synergy_data.get('champion_combinations', {}).items():
-                        champ1, champ2 = map(int, champ_key_str.split('|'))
-                        champ_key = (champ1, champ2)
-                        synergy.champion_combinations[champ_key] = champ_data
-                    
-                    # Parse datetime fields
-                    if synergy_data.get('last_played_together'):
-                        synergy.last_played_together = datetime.fromisoformat(
-                            synergy_data['last_played_together']
-                        )
-                    
-                    self.synergy_db.synergies[key] = synergy
-                
-                # Parse last updated
-                if data.get('last_updated'):
-                    self.synergy_db.last_updated = datetime.fromisoformat(data['last_updated'])
-                
-                self.logger.info(f"Loaded synergy data for {len(self.synergy_db.synergies)} player pairs")
+                self._migrate_legacy_synergy_file()
+            
+            self.logger.info(f"Loaded synergy data for {len(self.synergy_db.synergies)} player pairs")
             
         except Exception as e:
             self.logger.warning(f"Failed to load synergy data: {e}")
-            self.synergy_db = SynergyDatabase()
+            self.synergy_db.synergies.clear()
+            self._applied = set()
+    
+    def _migrate_legacy_synergy_file(self):
+        """Import synergy_data.json into the synergy store and set the file aside."""
+        with open(self.synergy_cache_file, 'r') as f:
+            data = json.load(f)
+        
+        imported = 0
+        for key_str, synergy_data in data.get('synergies', {}).items():
+            synergy = synergy_from_dict(key_str, synergy_data)
+            if synergy.synergy_key in self.synergy_db.synergies:
+                continue
+            self.synergy_db.synergies[synergy.synergy_key] = synergy
+            self._dirty_pairs.add(synergy.synergy_key)
+            self._legacy_pairs.add(pair_key_string(synergy.synergy_key))
+            imported += 1
+        
+        if data.get('last_updated') and not self.synergy_db.last_updated:
+            self.synergy_db.last_updated = datetime.fromisoformat(data['last_updated'])
+        
+        self._save_synergy_data()
+        os.replace(self.synergy_cache_file, self.synergy_cache_file + ".migrated")
+        self.logger.info(f"Imported {imported} synergy pairs from legacy {self.synergy_cache_file}")
     
     def _save_synergy_data(self):
-        """Save synergy data to cache file."""
-        try:
-            data = {
-                'synergies': {},
-                'last_updated': self.synergy_db.last_updated.isoformat() if self.synergy_db.last_updated else None
-            }
-            
-            for key, synergy in self.synergy_db.synergies.items():
-                key_str = f"{key[0]}|{key[1]}"
-                
-                synergy_data = {
-                    'games_together': synergy.games_together,
-                    'wins_together': synergy.wins_together,
-                    'losses_together': synergy.losses_together,
-                    'avg_combined_kda': synergy.avg_combined_kda,
-                    'avg_game_duration': synergy.avg_game_duration,
-                    'avg_vision_score_combined': synergy.avg_vision_score_combined,
-                    'recent_games_together': synergy.recent_games_together,
-                    'last_played_together': synergy.last_played_together.isoformat() if synergy.last_played_together else None,
-                    'role_combinations': {},
-                    'champion_combinations': {}
-                }
-                
-                # Serialize role combinations
-                for role_key, role_data in synergy.role_combinations.items():
-                    role_key_str = f"{role_key[0]}|{role_key[1]}"
-                    synergy_data['role_combinations'][role_key_str] = role_data
-                
-                # Serialize champion combinations
-                for champ_key, champ_data in synergy.champion_combinations.items():
-                    champ_key_str = f"{champ_key[0]}|{champ_key[1]}"
-                    synergy_data['champion_combinations'][champ_key_str] = champ_data
-                
-                data['synergies'][key_str] = synergy_data
+        """Save the changed synergy pairs and newly applied match results."""
+        with self._lock:
+            if not self._dirty_pairs and not self._pending_applied:
+                return
             
-            with open(self.synergy_cache_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            pairs = {key: self.synergy_db.synergies[key] for key in self._dirty_pairs
+                     if key in self.synergy_db.synergies}
+            meta = {
+                'last_updated': self.synergy_db.last_updated.isoformat() if self.synergy_db.last_updated else None,
+                'legacy_pairs': json.dumps(sorted(self._legacy_pairs))
+            }
             
-            self.logger.info(f"Saved synergy data for {len(self.synergy_db.synergies)} player pairs")
+            try:
+                self.synergy_store.save(pairs, self._pending_applied, meta)
+            except Exception as e:
+                self.logger.error(f"Failed to save synergy data: {e}")
+                return
             
-        except Exception as e:
-            self.logger.error(f"Failed to save synergy data: {e}")
+            self._dirty_pairs.clear()
+            self._pending_applied = []
+            self.logger.debug(f"Saved synergy data for {len(pairs)} changed player pairs")
     
     def update_synergy_data_for_players(self, players: List[Player], 
                                       match_count: int = 20, 
@@ -481,6 +516,7 @@ class SynergyManager:
         
         if processed_matches > 0:
             # Save updated synergy data
+            self.synergy_db.last_updated = datetime.now()
             self._save_synergy_data()
             self.logger.info("Synergy data saved successfully")
             return True
@@ -583,6 +619,7 @@ class SynergyManager:
             tracked_players: List of players we're tracking in this match
         """
         try:
+            match_id = match_details.get('metadata', {}).get('matchId', '')
             participants = match_details.get('info', {}).get('participants', [])
             game_creation = match_details.get('info', {}).get('gameCreation', 0)
             game_duration = match_details.get('info', {}).get('gameDuration', 0)
@@ -640,8 +677,26 @@ class SynergyManager:
                     'game_duration': game_duration
                 }
                 
-                # Add to synergy database
-                self.synergy_db.add_match_data(match_data)
+                synergy_keys = [tuple(sorted([first['player_name'], second['player_name']]))
+                                for first, second in combinations(team_participants, 2)]
+                applied_keys = [(match_id, pair_key_string(key)) for key in synergy_keys]
+                
+                with self._lock:
+                    # Skip teams already counted when the match is seen again
+                    if match_id and any(key in self._applied for key in applied_keys):
+                        continue
+                    
+                    for synergy_key in synergy_keys:
+                        self._synergy_for_update(synergy_key)
+                    
+                    # Add to synergy database
+                    self.synergy_db.add_match_data(match_data)
+                    
+                    for applied_key, synergy_key in zip(applied_keys, synergy_keys):
+                        if match_id:
+                            self._mark_applied(applied_key, synergy_key)
+                        else:
+                            self._dirty_pairs.add(synergy_key)
         
         except Exception as e:
             self.logger.warning(f"Failed to process match for synergy: {e}")
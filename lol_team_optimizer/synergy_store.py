@@ -0,0 +1,174 @@
+"""
+Persistent per-pair store for player synergy aggregates.
+
+Each player pair is one SQLite row holding its serialized aggregates, so an
+update rewrites only the pairs it touched. The store also records which
+(match, pair) results have been applied, which makes replaying a match a
+no-op.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from .models import PlayerSynergyData
+
+
+def pair_key_string(key: Tuple[str, str]) -> str:
+    """Serialized form of a synergy key, as used by the legacy JSON file."""
+    return f"{key[0]}|{key[1]}"
+
+
+def synergy_to_dict(synergy: PlayerSynergyData) -> Dict[str, Any]:
+    """Serialize one pair's aggregates to JSON-compatible data."""
+    return {
+        'games_together': synergy.games_together,
+        'wins_together': synergy.wins_together,
+        'losses_together': synergy.losses_together,
+        'avg_combined_kda': synergy.avg_combined_kda,
+        'avg_game_duration': synergy.avg_game_duration,
+        'avg_vision_score_combined': synergy.avg_vision_score_combined,
+        'recent_games_together': synergy.recent_games_together,
+        'last_played_together': synergy.last_played_together.isoformat() if synergy.last_played_together else None,
+        'role_combinations': {
+            f"{role_key[0]}|{role_key[1]}": role_data
+            for role_key, role_data in synergy.role_combinations.items()
+        },
+        'champion_combinations': {
+            f"{champ_key[0]}|{champ_key[1]}": champ_data
+            for champ_key, champ_data in synergy.champion_combinations.items()
+        }
+    }
+
+
+def synergy_from_dict(key_str: str, synergy_data: Dict[str, Any]) -> PlayerSynergyData:
+    """Rebuild one pair's aggregates from data written by synergy_to_dict."""
+    player1, player2 = key_str.split('|')
+    synergy = PlayerSynergyData(
+        player1_name=player1,
+        player2_name=player2,
+        games_together=synergy_data.get('games_together', 0),
+        wins_together=synergy_data.get('wins_together', 0),
+        losses_together=synergy_data.get('losses_together', 0),
+        avg_combined_kda=synergy_data.get('avg_combined_kda', 0.0),
+        avg_game_duration=synergy_data.get('avg_game_duration', 0.0),
+        avg_vision_score_combined=synergy_data.get('avg_vision_score_combined', 0.0),
+        recent_games_together=synergy_data.get('recent_games_together', 0)
+    )
+    
+    for role_key_str, role_data in synergy_data.get('role_combinations', {}).items():
+        role1, role2 = role_key_str.split('|')
+        synergy.role_combinations[(role1, role2)] = role_data
+    
+    for champ_key_str, champ_data in synergy_data.get('champion_combinations', {}).items():
+        champ1, champ2 = map(int, champ_key_str.split('|'))
+        synergy.champion_combinations[(champ1, champ2)] = champ_data
+    
+    if synergy_data.get('last_played_together'):
+        synergy.last_played_together = datetime.fromisoformat(synergy_data['last_played_together'])
+    
+    return synergy
+
+
+class SynergyStore:
+    """
+    SQLite-backed synergy aggregates with an applied-match ledger.
+    
+    A single connection is shared by all threads and guarded by a lock; each
+    save is one transaction covering the changed pairs and their new ledger
+    entries.
+    """
+    
+    def __init__(self, db_path: Path):
+        """
+        Initialize the store.
+        
+        Args:
+            db_path: SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.logger = logging.getLogger(__name__)
+        
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pairs (
+                pair_key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS applied_matches (
+                match_id TEXT NOT NULL,
+                pair_key TEXT NOT NULL,
+                PRIMARY KEY (match_id, pair_key)
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+    
+    def load_pairs(self) -> Dict[Tuple[str, str], PlayerSynergyData]:
+        """Load every stored pair, skipping rows that cannot be read."""
+        synergies = {}
+        with self._lock:
+            rows = self._conn.execute("SELECT pair_key, payload FROM pairs").fetchall()
+        
+        for key_str, payload in rows:
+            try:
+                synergy = synergy_from_dict(key_str, json.loads(payload))
+            except (ValueError, TypeError) as e:
+                self.logger.warning(f"Skipping unreadable synergy pair {key_str}: {e}")
+                continue
+            synergies[synergy.synergy_key] = synergy
+        return synergies
+    
+    def load_applied(self) -> Set[Tuple[str, str]]:
+        """Load the ledger of applied (match_id, pair_key) results."""
+        with self._lock:
+            return set(self._conn.execute("SELECT match_id, pair_key FROM applied_matches"))
+    
+    def get_meta(self, name: str) -> Optional[str]:
+        """Read a metadata value."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+    
+    def save(self, pairs: Dict[Tuple[str, str], PlayerSynergyData],
+             applied: Iterable[Tuple[str, str]] = (),
+             meta: Optional[Dict[str, Optional[str]]] = None) -> None:
+        """
+        Persist changed pairs and ledger entries in one transaction.
+        
+        Args:
+            pairs: Changed pairs keyed by synergy key
+            applied: New (match_id, pair_key) ledger entries
+            meta: Metadata values to set
+        """
+        pair_rows = [(pair_key_string(key), json.dumps(synergy_to_dict(synergy), separators=(',', ':')))
+                     for key, synergy in pairs.items()]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO pairs VALUES (?, ?)", pair_rows)
+                self._conn.executemany("INSERT OR IGNORE INTO applied_matches VALUES (?, ?)", list(applied))
+                if meta:
+                    self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", list(meta.items()))
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
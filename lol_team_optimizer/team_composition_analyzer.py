@@ -13,6 +13,7 @@ from typing import Dict, List, Optional, Tuple, Set, Any
 from dataclasses import dataclass, field
 from collections import defaultdict
 import itertools
+import math
 
 from .models import Match, MatchParticipant
 from .analytics_models import (
@@ -22,6 +23,7 @@ from .analytics_models import (
     StatisticalAnalysisError, DataValidationError
 )
 from .baseline_manager import BaselineManager
+from .composition_index import CompositionIndex
 from .statistical_analyzer import StatisticalAnalyzer
 from .config import Config
 
@@ -253,8 +255,8 @@ class TeamCompositionAnalyzer:
             similarity_threshold = self.similarity_threshold
         
         try:
-            # Get all unique compositions from historical data
-            all_compositions = self._get_all_historical_compositions()
+            # Get candidate compositions from historical data
+            all_compositions = self._get_similarity_candidates(composition, similarity_threshold)
             
             similar_compositions = []
             
@@ -528,19 +530,22 @@ class TeamCompositionAnalyzer:
         """Find historical matches that match the given composition."""
         matching_matches = []
         
-        # Get all matches for players in the composition
-        all_player_matches = {}
-        for role, assignment in composition.players.items():
-            player_matches = self.match_manager.get_matches_for_player(assignment.puuid)
-            all_player_matches[assignment.puuid] = player_matches
-        
-        # Find matches where all players played together with specified champions/roles
-        if not all_player_matches:
+        if not composition.players:
             return matching_matches
         
-        # Get matches from the first player as a starting point
-        first_player_puuid = list(composition.players.values())[0].puuid
-        candidate_matches = all_player_matches[first_player_puuid]
+        if self._has_composition_index():
+            # Only teams that fielded the whole composition are loaded
+            teams = self.match_manager.get_composition_teams([
+                (assignment.puuid, assignment.role, assignment.champion_id)
+                for assignment in composition.players.values()
+            ])
+            candidate_matches = self.match_manager.get_matches_by_ids(
+                dict.fromkeys(match_id for match_id, _ in teams)
+            )
+        else:
+            # Get matches from the first player as a starting point
+            first_player_puuid = list(composition.players.values())[0].puuid
+            candidate_matches = self.match_manager.get_matches_for_player(first_player_puuid)
         
         for match in candidate_matches:
             # Check if this match contains all players in the composition
@@ -789,14 +794,15 @@ class TeamCompositionAnalyzer:
     
     def _get_all_historical_compositions(self) -> List[TeamComposition]:
         """Get all unique team compositions from historical data."""
+        if self._has_composition_index():
+            # Load one team per distinct composition instead of every match
+            teams = [(match_id, team_id) for match_id, team_id, _ in self.match_manager.get_distinct_compositions()]
+            return self._compositions_for_teams(teams)
+        
         compositions = []
         composition_ids_seen = set()
         
-        # This is a simplified implementation
-        # In practice, you'd want to efficiently extract compositions from match data
-        all_matches = self.match_manager.get_all_matches()
-        
-        for match in all_matches:
+        for match in self.match_manager.get_all_matches():
             if len(match.participants) != 10:  # Skip non-standard matches
                 continue
             
@@ -805,31 +811,90 @@ class TeamCompositionAnalyzer:
             team2_participants = [p for p in match.participants if p.team_id == 200]
             
             for team_participants in [team1_participants, team2_participants]:
-                if len(team_participants) != 5:
-                    continue
+                composition = self._composition_from_team(team_participants)
                 
-                # Create composition from team
-                players = {}
-                for participant in team_participants:
-                    role = self._normalize_role(participant.individual_position)
-                    if role and role not in players:  # Avoid duplicate roles
-                        players[role] = PlayerRoleAssignment(
-                            puuid=participant.puuid,
-                            player_name=participant.summoner_name or "Unknown",
-                            role=role,
-                            champion_id=participant.champion_id,
-                            champion_name=participant.champion_name or f"Champion_{participant.champion_id}"
-                        )
-                
-                if len(players) == 5:  # Complete team
-                    composition = TeamComposition(players=players)
-                    
-                    if composition.composition_id not in composition_ids_seen:
-                        compositions.append(composition)
-                        composition_ids_seen.add(composition.composition_id)
+                if composition and composition.composition_id not in composition_ids_seen:
+                    compositions.append(composition)
+                    composition_ids_seen.add(composition.composition_id)
         
         return compositions
     
+    def _get_similarity_candidates(self, composition: TeamComposition,
+                                   similarity_threshold: float) -> List[TeamComposition]:
+        """
+        Get the historical compositions that could reach a similarity threshold.
+        
+        With m players in the same roles, at most all five champions and m
+        player-champion pairs can also match, so the similarity is at most
+        (0.4 * m + 0.35 * 5 + 0.25 * m) / 5. When that requires two or more
+        shared players, only teams found by probing the composition index
+        with those player subsets are compared.
+        
+        Args:
+            composition: Target composition
+            similarity_threshold: Minimum similarity score
+            
+        Returns:
+            Candidate compositions (all historical compositions without an index)
+        """
+        min_shared = math.ceil(round((similarity_threshold * 5 - 0.35 * 5) / 0.65, 9))
+        if not self._has_composition_index() or min_shared < 2:
+            return self._get_all_historical_compositions()
+        
+        teams = self.match_manager.get_teams_sharing_players(
+            [(assignment.puuid, assignment.role) for assignment in composition.players.values()],
+            min_shared
+        )
+        return self._compositions_for_teams(teams)
+    
+    def _compositions_for_teams(self, teams: List[Tuple[str, int]]) -> List[TeamComposition]:
+        """Build the unique complete compositions of (match_id, team_id) teams."""
+        team_ids = defaultdict(set)
+        for match_id, team_id in teams:
+            team_ids[match_id].add(team_id)
+        
+        matches = {
+            match.match_id: match
+            for match in self.match_manager.get_matches_by_ids(team_ids)
+        }
+        
+        compositions = {}
+        for match_id, team_id in teams:
+            match = matches.get(match_id)
+            if match is None or len(match.participants) != 10:  # Skip non-standard matches
+                continue
+            
+            composition = self._composition_from_team([p for p in match.participants if p.team_id == team_id])
+            if composition:
+                compositions.setdefault(composition.composition_id, composition)
+        
+        return list(compositions.values())
+    
+    def _composition_from_team(self, team_participants: List[MatchParticipant]) -> Optional[TeamComposition]:
+        """Create a composition from one team's participants, or None if the team is incomplete."""
+        if len(team_participants) != 5:
+            return None
+        
+        players = {}
+        for participant in team_participants:
+            role = self._normalize_role(participant.individual_position)
+            if role and role not in players:  # Avoid duplicate roles
+                players[role] = PlayerRoleAssignment(
+                    puuid=participant.puuid,
+                    player_name=participant.summoner_name or "Unknown",
+                    role=role,
+                    champion_id=participant.champion_id,
+                    champion_name=participant.champion_name or f"Champion_{participant.champion_id}"
+                )
+        
+        if len(players) != 5:  # Incomplete team
+            return None
+        return TeamComposition(players=players)
+    
+    def _has_composition_index(self) -> bool:
+        """Whether the match manager maintains a composition signature index."""
+        return isinstance(getattr(self.match_manager, 'composition_index', None), CompositionIndex)
+    
     def _calculate_composition_similarity(self, comp1: TeamComposition, comp2: TeamComposition) -> float:
         """Calculate similarity score between two compositions."""
         # Check cache first
@@ -1242,7 +1307,8 @@ class TeamCompositionAnalyzer:
             'bot': 'bottom',
             'adc': 'bottom',
             'support': 'support',
-            'supp': 'support'
+            'supp': 'support',
+            'utility': 'support'
         }
         
         return role_mapping.get(position_lower, position_lower)
@@ -0,0 +1,278 @@
+"""
+Exact top-K team selection for large rosters.
+
+This module finds the best five-player teams in a roster without
+enumerating every combination. Teams are scored the way the optimization
+engine scores them: the best role assignment by individual score plus the
+pairwise synergy of that assignment. A branch-and-bound search over player
+sets prunes any branch whose upper bound cannot beat the current K-th best
+team, so the result is the global top-K rather than a truncated sample.
+An exhaustive mode scores every combination instead, in vectorized chunks
+spread over a process pool.
+"""
+
+import heapq
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import combinations, islice, permutations, repeat
+from math import comb
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+TEAM_SIZE = 5
+
+# Every way to hand five roles to five players: ROLE_PERMUTATIONS[k][i] is the role of player i
+ROLE_PERMUTATIONS = np.array(list(permutations(range(TEAM_SIZE))), dtype=np.int64)
+
+# Index pairs of the ten player pairs in a team
+_PAIRS = np.array(list(combinations(range(TEAM_SIZE), 2)), dtype=np.int64)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TeamCandidate:
+    """A selected team: roster indices, the role index of each, and its score."""
+    player_indices: Tuple[int, ...]
+    role_indices: Tuple[int, ...]
+    individual_score: float
+    synergy_score: float
+    
+    @property
+    def total_score(self) -> float:
+        """Individual plus synergy score."""
+        return self.individual_score + self.synergy_score
+
+
+def evaluate_teams(scores: np.ndarray, synergy: np.ndarray,
+                   teams: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Score a batch of five-player teams.
+    
+    Each team gets the role assignment that maximizes the summed individual
+    score; synergy is then added for that assignment.
+    
+    Args:
+        scores: (n_players, 5) individual score of each player in each role
+        synergy: (n_players, 5, n_players, 5) synergy of two players in two roles
+        teams: (m, 5) roster indices of each team
+    
+    Returns:
+        Tuple of (individual scores (m,), synergy scores (m,), role indices (m, 5))
+    """
+    team_scores = scores[teams]  # (m, player slot, role)
+    per_permutation = team_scores[:, np.arange(TEAM_SIZE), ROLE_PERMUTATIONS].sum(axis=2)  # (m, 120)
+    best = per_permutation.argmax(axis=1)
+    individual = per_permutation[np.arange(len(teams)), best]
+    roles = ROLE_PERMUTATIONS[best]
+    
+    first, second = _PAIRS[:, 0], _PAIRS[:, 1]
+    pair_synergy = synergy[teams[:, first], roles[:, first], teams[:, second], roles[:, second]]
+    return individual, pair_synergy.sum(axis=1), roles
+
+
+def select_top_teams(scores: np.ndarray, synergy: np.ndarray, k: int = 10,
+                     time_budget_seconds: Optional[float] = None) -> Tuple[List[TeamCandidate], bool]:
+    """
+    Find the K highest-scoring five-player teams in a roster.
+    
+    Args:
+        scores: (n_players, 5) individual score of each player in each role
+        synergy: (n_players, 5, n_players, 5) pairwise synergy; entries for two
+            players in the same role are ignored
+        k: Number of teams to return
+        time_budget_seconds: Optional limit; when exceeded the best teams found
+            so far are returned
+    
+    Returns:
+        Tuple of (teams sorted best first, whether the search completed)
+    """
+    n_players = scores.shape[0]
+    if n_players < TEAM_SIZE:
+        raise ValueError(f"At least {TEAM_SIZE} players required, got {n_players}")
+    
+    deadline = time.monotonic() + time_budget_seconds if time_budget_seconds else None
+    
+    # Search high scorers first so strong teams are found early and tighten the bound
+    order = np.argsort(-scores.max(axis=1), kind='stable')
+    scores = scores[order]
+    synergy = synergy[np.ix_(order, np.arange(TEAM_SIZE), order, np.arange(TEAM_SIZE))]
+    
+    # Optimistic bounds: best role per player, best role pair per player pair
+    best_score = scores.max(axis=1)
+    distinct_roles = ~np.eye(TEAM_SIZE, dtype=bool)
+    best_synergy = np.where(distinct_roles[None, :, None, :], synergy, -np.inf).max(axis=(1, 3))
+    np.fill_diagonal(best_synergy, 0.0)
+    
+    heap: List[Tuple[float, Tuple[int, ...], Tuple[int, ...], float, float]] = []
+    completed = True
+    
+    def threshold() -> float:
+        return heap[0][0] if len(heap) >= k else -np.inf
+    
+    def offer(teams: np.ndarray) -> None:
+        individual, team_synergy, roles = evaluate_teams(scores, synergy, teams)
+        totals = individual + team_synergy
+        for i in np.flatnonzero(totals > threshold()):
+            entry = (float(totals[i]), tuple(int(p) for p in teams[i]), tuple(int(r) for r in roles[i]),
+                     float(individual[i]), float(team_synergy[i]))
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[0] > heap[0][0]:
+                heapq.heapreplace(heap, entry)
+    
+    def search(chosen: List[int], start: int, chosen_bound: float) -> bool:
+        """Depth-first over player sets in index order; returns False when out of time."""
+        if deadline is not None and time.monotonic() > deadline:
+            return False
+        
+        remaining = TEAM_SIZE - len(chosen)
+        candidates = np.arange(start, n_players)
+        if len(candidates) < remaining:
+            return True
+        
+        # Upper bound of each candidate's contribution to a team containing `chosen`
+        marginal = best_score[candidates].copy()
+        if chosen:
+            marginal += best_synergy[np.ix_(chosen, candidates)].sum(axis=0)
+        
+        if remaining == 2:
+            # Bound every final pair at once and score the survivors in one batch
+            pair_bounds = (chosen_bound + marginal[:, None] + marginal[None, :] +
+                           best_synergy[np.ix_(candidates, candidates)])
+            first, second = np.nonzero(np.triu(pair_bounds > threshold(), k=1))
+            if len(first):
+                teams = np.empty((len(first), TEAM_SIZE), dtype=np.int64)
+                teams[:, :-2] = chosen
+                teams[:, -2] = candidates[first]
+                teams[:, -1] = candidates[second]
+                offer(teams)
+            return True
+        
+        # Each pair among the players still to be added shares its synergy between
+        # both ends, so half of a candidate's best remaining-1 partners bounds its share
+        partners = best_synergy[np.ix_(candidates, candidates)]
+        np.fill_diagonal(partners, -np.inf)
+        top_partners = np.partition(partners, len(candidates) - (remaining - 1), axis=1)
+        share = marginal + top_partners[:, len(candidates) - (remaining - 1):].sum(axis=1) / 2
+        
+        # Bound for taking candidate p: its share plus the best remaining-1 shares after it
+        n_choices = len(candidates) - remaining + 1
+        later = np.where(np.arange(len(candidates))[None, :] > np.arange(n_choices)[:, None],
+                         share[None, :], -np.inf)
+        top_later = np.partition(later, len(candidates) - (remaining - 1), axis=1)
+        bounds = chosen_bound + share[:n_choices] + top_later[:, len(candidates) - (remaining - 1):].sum(axis=1)
+        
+        for position in np.argsort(-bounds[:n_choices], kind='stable'):
+            if bounds[position] <= threshold():
+                break
+            
+            candidate = int(candidates[position])
+            if not search(chosen + [candidate], candidate + 1, chosen_bound + marginal[position]):
+                return False
+        
+        return True
+    
+    if not search([], 0, 0.0):
+        completed = False
+        logger.warning(f"Team search stopped at the {time_budget_seconds}s budget; returning best teams found")
+    
+    ranked = sorted(heap, key=lambda entry: entry[0], reverse=True)
+    teams = []
+    for _, players, roles, individual, team_synergy in ranked:
+        # Map back to roster indices, listed in roster order like evaluate_all_teams
+        members = sorted((int(order[p]), role) for p, role in zip(players, roles))
+        teams.append(TeamCandidate(
+            player_indices=tuple(p for p, _ in members),
+            role_indices=tuple(role for _, role in members),
+            individual_score=individual,
+            synergy_score=team_synergy
+        ))
+    return teams, completed
+
+
+# Score arrays of the exhaustive search, set once per worker process
+_worker_scores: Optional[np.ndarray] = None
+_worker_synergy: Optional[np.ndarray] = None
+
+
+def _init_worker(scores: np.ndarray, synergy: np.ndarray) -> None:
+    """Process pool initializer: keep the score arrays for every chunk."""
+    global _worker_scores, _worker_synergy
+    _worker_scores, _worker_synergy = scores, synergy
+
+
+def _worker_chunk_top_teams(teams: np.ndarray, k: int) -> List[TeamCandidate]:
+    """Process pool task: best teams of one chunk."""
+    return _chunk_top_teams(_worker_scores, _worker_synergy, teams, k)
+
+
+def _chunk_top_teams(scores: np.ndarray, synergy: np.ndarray,
+                     teams: np.ndarray, k: int) -> List[TeamCandidate]:
+    """Score one chunk of teams and keep its k best."""
+    individual, team_synergy, roles = evaluate_teams(scores, synergy, teams)
+    totals = individual + team_synergy
+    best = np.argpartition(-totals, k - 1)[:k] if len(totals) > k else np.arange(len(totals))
+    return [
+        TeamCandidate(
+            player_indices=tuple(int(p) for p in teams[i]),
+            role_indices=tuple(int(r) for r in roles[i]),
+            individual_score=float(individual[i]),
+            synergy_score=float(team_synergy[i])
+        )
+        for i in best
+    ]
+
+
+def _combination_chunks(n_players: int, chunk_size: int) -> Iterator[np.ndarray]:
+    """Yield every five-player combination as (m, 5) index arrays of at most chunk_size rows."""
+    all_teams = combinations(range(n_players), TEAM_SIZE)
+    while True:
+        chunk = list(islice(all_teams, chunk_size))
+        if not chunk:
+            return
+        yield np.array(chunk, dtype=np.int64)
+
+
+def evaluate_all_teams(scores: np.ndarray, synergy: np.ndarray, k: int = 10,
+                       max_workers: Optional[int] = None,
+                       chunk_size: int = 20000) -> List[TeamCandidate]:
+    """
+    Find the K highest-scoring five-player teams by scoring every combination.
+    
+    Combinations are scored in vectorized chunks; when there is more than one
+    chunk they are spread over a process pool and each worker returns only
+    its chunk's K best.
+    
+    Args:
+        scores: (n_players, 5) individual score of each player in each role
+        synergy: (n_players, 5, n_players, 5) pairwise synergy
+        k: Number of teams to return
+        max_workers: Worker processes (defaults to the CPU count; 1 runs serially)
+        chunk_size: Combinations scored per task
+    
+    Returns:
+        Teams sorted best first
+    """
+    n_players = scores.shape[0]
+    if n_players < TEAM_SIZE:
+        raise ValueError(f"At least {TEAM_SIZE} players required, got {n_players}")
+    
+    workers = max_workers or os.cpu_count() or 1
+    chunks = _combination_chunks(n_players, chunk_size)
+    
+    if workers <= 1 or comb(n_players, TEAM_SIZE) <= chunk_size:
+        partial = [team for chunk in chunks for team in _chunk_top_teams(scores, synergy, chunk, k)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(scores, synergy)) as executor:
+            partial = [team for chunk_teams in executor.map(_worker_chunk_top_teams, chunks, repeat(k))
+                       for team in chunk_teams]
+    
+    return heapq.nlargest(k, partial, key=lambda team: team.total_score)
+
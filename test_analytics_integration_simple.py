@@ -32,7 +32,7 @@ def test_core_engine_analytics_integration():
              patch('lol_team_optimizer.core_engine.SynergyManager'), \
              patch('lol_team_optimizer.core_engine.OptimizationEngine'), \
              patch('lol_team_optimizer.core_engine.DataMigrator'), \
-             patch('lol_team_optimizer.core_engine.AnalyticsCacheManager'), \
+             patch('lol_team_optimizer.core_engine.get_shared_cache_manager'), \
              patch('lol_team_optimizer.core_engine.BaselineManager'), \
              patch('lol_team_optimizer.core_engine.StatisticalAnalyzer'), \
              patch('lol_team_optimizer.core_engine.ChampionSynergyAnalyzer'), \
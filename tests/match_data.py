@@ -0,0 +1,66 @@
+"""
+Raw match-v5 records for tests that store matches through MatchManager.
+
+Tests describe only the participants they care about; team, position and
+win fields follow from each participant's place in the list.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+POSITIONS = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+ROLES = ["top", "jungle", "middle", "bottom", "support"]
+
+
+def epoch_ms(moment: datetime) -> int:
+    """Convert a datetime to Riot's epoch-millisecond timestamps."""
+    return int(moment.timestamp() * 1000)
+
+
+def raw_match(
+    match_id: str,
+    game_creation: int,
+    participants: List[Dict[str, Any]],
+    blue_wins: bool = True,
+    **info: Any
+) -> Dict[str, Any]:
+    """
+    Create a match-v5 record.
+    
+    Args:
+        match_id: Match identifier
+        game_creation: Creation time in epoch milliseconds
+        participants: Fields of each participant, blue side (team 100) first;
+            teamId, individualPosition and win default from the list position
+        blue_wins: Whether team 100 won
+        **info: Further info fields, overriding the defaults (queueId 420,
+            30-minute games)
+    
+    Returns:
+        Match data in Riot API format
+    """
+    participants = [
+        {
+            "teamId": 100 if i < 5 else 200,
+            "individualPosition": POSITIONS[i % 5],
+            "win": (i < 5) == blue_wins,
+            **fields
+        }
+        for i, fields in enumerate(participants)
+    ]
+    return {
+        "metadata": {
+            "dataVersion": "2",
+            "matchId": match_id,
+            "participants": [participant.get("puuid", "") for participant in participants]
+        },
+        "info": {
+            "gameCreation": game_creation,
+            "gameDuration": 1800,
+            "gameEndTimestamp": game_creation + 1800000,
+            "queueId": 420,
+            "participants": participants,
+            "teams": [{"teamId": 100, "win": blue_wins}, {"teamId": 200, "win": not blue_wins}],
+            **info
+        }
+    }
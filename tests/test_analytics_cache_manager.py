@@ -5,6 +5,8 @@ This module contains comprehensive tests for the multi-level caching system
 used to optimize analytics operations performance.
 """
 
+import json
+import pickle
 import pytest
 import tempfile
 import time
@@ -21,7 +23,8 @@ from lol_team_optimizer.analytics_cache_manager import (
     PersistentCache,
     CacheError,
     CacheKeyError,
-    CacheSerializationError
+    CacheSerializationError,
+    get_shared_cache_manager
 )
 from lol_team_optimizer.config import Config
 from lol_team_optimizer.analytics_models import (
@@ -411,6 +414,64 @@ class TestPersistentCache:
             # Cache should clean up old entries (allow some overhead for metadata)
             total_size = cache.size_bytes
             assert total_size <= 1200  # Allow some overhead for metadata and file system
+    
+    def test_persistent_cache_evicts_least_recently_used(self):
+        """Test that eviction follows recency, including buffered hits."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = PersistentCache(Path(temp_dir), max_size_bytes=1000)
+        
+            for i in range(2):
+                cache.put(f"key_{i}", CacheEntry(f"key_{i}", "x" * 400, datetime.now(), datetime.now()))
+            cache.get("key_0")  # key_1 is now the least recently used
+            cache.put("key_2", CacheEntry("key_2", "x" * 400, datetime.now(), datetime.now()))
+        
+            assert set(cache.get_keys()) == {"key_0", "key_2"}
+            assert cache.entry_count == 2
+    
+    def test_persistent_cache_batches_access_updates(self):
+        """Test that hits are buffered per key and written in batches."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = PersistentCache(Path(temp_dir), max_size_bytes=1024 * 1024, touch_batch_size=2)
+            for key in ("a", "b"):
+                cache.put(key, CacheEntry(key, "data", datetime.now(), datetime.now()))
+            
+            cache.get("a")
+            assert cache.get("a").access_count == 2
+            assert list(cache._pending_touches) == ["a"]
+            
+            cache.get("b")  # second buffered key triggers a write
+            assert not cache._pending_touches
+            assert PersistentCache(Path(temp_dir)).get("a").access_count == 3
+    
+    def test_persistent_cache_remove_by_dependency(self):
+        """Test dependency invalidation through the dependency index."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = PersistentCache(Path(temp_dir), max_size_bytes=1024 * 1024)
+            now = datetime.now()
+            cache.put("a", CacheEntry("a", 1, now, now, dependencies=["puuid:p1"]))
+            cache.put("b", CacheEntry("b", 2, now, now, dependencies=["puuid:p1", "puuid:p2"]))
+            cache.put("c", CacheEntry("c", 3, now, now, dependencies=["puuid:p2"]))
+        
+            assert cache.remove_by_dependency("puuid:p1") == 2
+            assert cache.get_keys() == ["c"]
+            assert cache.get("c").dependencies == ["puuid:p2"]
+    
+    def test_persistent_cache_imports_legacy_files(self):
+        """Test that per-key .cache/.meta files are imported and removed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            analytics_dir = Path(temp_dir) / "analytics"
+            analytics_dir.mkdir()
+            now = datetime.now().isoformat()
+            (analytics_dir / "legacy.cache").write_bytes(pickle.dumps({"legacy": "data"}))
+            (analytics_dir / "legacy.meta").write_text(json.dumps({
+                'key': "legacy_key", 'created_at': now, 'last_accessed': now,
+                'access_count': 3, 'ttl_seconds': None, 'size_bytes': 10, 'dependencies': []
+            }))
+        
+            cache = PersistentCache(Path(temp_dir), max_size_bytes=1024 * 1024)
+        
+            assert cache.get("legacy_key").data == {"legacy": "data"}
+            assert not list(analytics_dir.glob("*.meta"))
 
 
 class TestAnalyticsCacheManager:
@@ -490,6 +551,25 @@ class TestAnalyticsCacheManager:
         memory_entry = self.cache_manager.memory_cache.get("promotion_key")
         assert memory_entry is not None
     
+    def test_cache_manager_dependency_invalidation(self):
+        """Test invalidating entries by the inputs they depend on."""
+        self.cache_manager.cache_analytics("team_ab", {"team": "ab"}, dependencies=["player:A", "player:B"])
+        self.cache_manager.cache_analytics("team_bc", {"team": "bc"}, dependencies=["player:B", "player:C"])
+        self.cache_manager.cache_analytics("team_cd", {"team": "cd"}, dependencies=["player:C", "player:D"],
+                                           persistent=False)
+        
+        # Memory and persistent copies of team_ab are both removed
+        assert self.cache_manager.invalidate_dependency("player:A") == 2
+        assert self.cache_manager.get_cached_analytics("team_ab") is None
+        assert self.cache_manager.get_cached_analytics("team_bc") == {"team": "bc"}
+        
+        # Persistent entries written by another manager are found through their metadata
+        other_manager = AnalyticsCacheManager(self.config)
+        assert other_manager.invalidate_dependency("player:B") == 1
+        assert self.cache_manager.persistent_cache.get("team_bc") is None
+        assert self.cache_manager.invalidate_dependency("player:D") == 1
+        assert self.cache_manager.invalidate_dependency("player:E") == 0
+    
     def test_cache_manager_key_generation(self):
         """Test cache key generation."""
         # Test basic key generation
@@ -695,6 +775,69 @@ class TestAnalyticsCacheManager:
         assert cleaned >= 0
 
 
+class TestUnifiedCache:
+    """Test dependency indexing, namespace statistics and cache sharing."""
+    
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config(cache_directory=self.temp_dir, max_cache_size_mb=1)
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def create_entry(self, key, data="data", dependencies=None):
+        now = datetime.now()
+        return CacheEntry(key, data, now, now, dependencies=list(dependencies or []))
+    
+    def test_dependency_index_follows_eviction(self):
+        """Test that dependency invalidation sees only live entries."""
+        cache = LRUCache(max_size=2, max_size_bytes=1024 * 1024)
+        cache.put("a", self.create_entry("a", dependencies=["player:Alice"]))
+        cache.put("b", self.create_entry("b", dependencies=["player:Alice", "synergy"]))
+        cache.put("c", self.create_entry("c", dependencies=["synergy"]))  # evicts "a"
+        
+        assert cache.evictions == 1
+        assert cache.dependents_of("player:Alice") == {"b"}
+        assert cache.remove_by_dependency("synergy") == 2
+        assert cache.size == 0
+        assert cache.dependents_of("player:Alice") == set()
+    
+    def test_oversized_entry_does_not_flush_cache(self):
+        """Test that an entry larger than the cache is rejected."""
+        cache = LRUCache(max_size=10, max_size_bytes=100)
+        cache.put("small", self.create_entry("small", "x" * 10))
+        
+        assert not cache.put("huge", self.create_entry("huge", "x" * 1000))
+        assert cache.get("small") is not None
+        assert cache.get("huge") is None
+    
+    def test_namespace_statistics(self):
+        """Test that hits and misses are counted per key namespace."""
+        manager = AnalyticsCacheManager(self.config)
+        manager.cache_analytics("optimize_team:players=a", {"score": 1}, persistent=False)
+        
+        manager.get_cached_analytics("optimize_team:players=a")
+        manager.get_cached_analytics("optimize_team:players=b")
+        manager.get_cached_analytics("trends:puuid=p")
+        
+        namespaces = manager.get_cache_statistics().namespaces
+        assert namespaces["optimize_team"].hits == 1
+        assert namespaces["optimize_team"].misses == 1
+        assert namespaces["optimize_team"].hit_rate == 0.5
+        assert namespaces["trends"].misses == 1
+    
+    def test_shared_manager_per_cache_directory(self):
+        """Test that engines on one cache directory get the same manager."""
+        shared = get_shared_cache_manager(self.config)
+        same_directory = Config(cache_directory=self.temp_dir + "/.", max_cache_size_mb=1)
+        
+        assert get_shared_cache_manager(same_directory) is shared
+        assert get_shared_cache_manager(Config(cache_directory=str(Path(self.temp_dir) / "other"))) is not shared
+
+
 class TestCacheStatistics:
     """Test Cache Statistics functionality."""
     
@@ -7,8 +7,11 @@ and query optimization.
 """
 
 import pytest
+import shutil
+import tempfile
 import time
 import threading
+from pathlib import Path
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 from unittest.mock import Mock, MagicMock, patch
@@ -24,6 +27,10 @@ from lol_team_optimizer.query_optimizer import QueryOptimizer, MatchIndex
 from lol_team_optimizer.analytics_models import AnalyticsFilters, DateRange
 from lol_team_optimizer.models import Match, MatchParticipant
 from lol_team_optimizer.config import Config
+from lol_team_optimizer.match_manager import MatchManager
+from lol_team_optimizer.baseline_manager import BaselineManager
+from lol_team_optimizer.analytics_cache_manager import AnalyticsCacheManager
+from lol_team_optimizer.historical_analytics_engine import HistoricalAnalyticsEngine
 
 
 class TestBatchProcessorPerformance:
@@ -814,6 +821,254 @@ class TestIntegratedPerformance:
               f"(+{memory_increase:.1f}MB)")
 
 
+
+class TestMultiprocessBatchAnalysis:
+    """Test batch player analysis in worker processes over a real match store."""
+    
+    def setup_method(self):
+        """Set up a match store with ten players in twelve shared matches."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config(data_directory=f"{self.temp_dir}/data", cache_directory=f"{self.temp_dir}/cache",
+                             analytics_batch_workers=2, analytics_process_batch_min=4)
+        self.puuids = [f"player_{i}" for i in range(10)]
+        self.match_manager = MatchManager(self.config)
+        self.match_manager.store_matches_batch([self.create_match_data(i) for i in range(12)])
+        self.engine = self.create_engine(self.config)
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def create_engine(self, config):
+        return HistoricalAnalyticsEngine(config, self.match_manager, BaselineManager(config, self.match_manager),
+                                         cache_manager=AnalyticsCacheManager(config))
+    
+    def create_match_data(self, index: int) -> dict:
+        """Create Riot API match data for the ten players."""
+        created = datetime.now() - timedelta(days=index)
+        positions = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+        participants = [{
+            "puuid": puuid,
+            "riotIdGameName": f"Player{i}", "riotIdTagline": "NA1",
+            "championId": 1 + i + index % 2,
+            "championName": f"Champion{1 + i + index % 2}",
+            "teamId": 100 if i < 5 else 200,
+            "individualPosition": positions[i % 5],
+            "kills": (i + index) % 7, "deaths": 1 + i % 3, "assists": 4 + index % 5,
+            "totalMinionsKilled": 120 + 5 * i, "neutralMinionsKilled": 10,
+            "visionScore": 15 + i, "goldEarned": 10000 + 200 * i,
+            "totalDamageDealtToChampions": 15000 + 500 * i,
+            "win": (i < 5) == (index % 2 == 0)
+        } for i, puuid in enumerate(self.puuids)]
+        return {
+            "metadata": {"matchId": f"NA1_{index}"},
+            "info": {
+                "gameCreation": int(created.timestamp() * 1000),
+                "gameDuration": 1800,
+                "queueId": 420,
+                "participants": participants,
+                "teams": [{"teamId": 100, "win": index % 2 == 0}, {"teamId": 200, "win": index % 2 == 1}]
+            }
+        }
+    
+    def test_worker_results_match_in_process_analysis(self):
+        """Test that worker processes return the same analytics as the engine itself."""
+        batch_result = self.engine.batch_processor.batch_analyze_players(self.puuids)
+        
+        assert not batch_result.errors
+        assert batch_result.progress.completed_tasks == len(self.puuids)
+        
+        local_config = Config(data_directory=self.config.data_directory,
+                              cache_directory=f"{self.temp_dir}/local_cache")
+        expected = self.create_engine(local_config).analyze_player_performance("player_3")
+        result = batch_result.results["analyze_player_player_3"]
+        assert result.overall_performance == expected.overall_performance
+        assert result.champion_performance == expected.champion_performance
+        
+        # Worker scratch caches are removed and the match store is left as it was
+        assert sorted(p.name for p in Path(self.config.cache_directory).iterdir()) == ["analytics", "baselines"]
+    
+    def test_cached_players_are_not_sent_to_workers(self):
+        """Test that results are cached by the parent and reused."""
+        self.engine.batch_processor.batch_analyze_players(self.puuids)
+        
+        with patch.object(self.engine.batch_processor.batch_processor, 'process_batch_multiprocess') as process:
+            batch_result = self.engine.batch_processor.batch_analyze_players(self.puuids)
+        
+        process.assert_not_called()
+        assert len(batch_result.results) == len(self.puuids)
+        assert batch_result.progress.completed_tasks == len(self.puuids)
+    
+    def test_small_batches_use_threads(self):
+        """Test that batches below the process threshold stay in threads."""
+        processor = self.engine.batch_processor
+        with patch.object(processor, 'batch_analyze_players_multiprocess') as multiprocess:
+            batch_result = processor.batch_analyze_players(self.puuids[:3])
+        
+        multiprocess.assert_not_called()
+        assert len(batch_result.results) == 3
+
+
+class TestQueryPlanExecution:
+    """Test the query executor against a real match store."""
+    
+    def setup_method(self):
+        """Set up a match store where two players share twenty matches."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config(data_directory=f"{self.temp_dir}/data", cache_directory=f"{self.temp_dir}/cache")
+        self.match_manager = MatchManager(self.config)
+        self.match_manager.store_matches_batch([self.create_match_data(i) for i in range(20)])
+        self.optimizer = QueryOptimizer(self.config, self.match_manager)
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def create_match_data(self, index: int) -> dict:
+        """Create Riot API match data; "alice" swaps between two champions and roles."""
+        created = datetime.now() - timedelta(days=index)
+        puuids = ["alice", "bob"] + [f"filler_{index}_{i}" for i in range(8)]
+        positions = ["MIDDLE" if index % 2 else "TOP", "JUNGLE", "UTILITY", "BOTTOM", "TOP",
+                     "TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+        participants = [{
+            "puuid": puuid,
+            "riotIdGameName": puuid, "riotIdTagline": "NA1",
+            "championId": (10 + index % 3) if i == 0 else 100 + i,
+            "championName": f"Champion{i}",
+            "teamId": 100 if i < 5 else 200,
+            "individualPosition": positions[i],
+            "kills": 3, "deaths": 2, "assists": 5,
+            "totalMinionsKilled": 150, "neutralMinionsKilled": 10,
+            "visionScore": 20, "goldEarned": 11000, "totalDamageDealtToChampions": 16000,
+            "win": (i < 5) == (index % 4 != 0)
+        } for i, puuid in enumerate(puuids)]
+        return {
+            "metadata": {"matchId": f"NA1_{index}"},
+            "info": {
+                "gameCreation": int(created.timestamp() * 1000),
+                "gameDuration": 1800,
+                "queueId": 440 if index % 5 == 0 else 420,
+                "participants": participants,
+                "teams": [{"teamId": 100, "win": index % 4 != 0}, {"teamId": 200, "win": index % 4 == 0}]
+            }
+        }
+    
+    def scan(self, puuid: str, filters: AnalyticsFilters) -> List[str]:
+        """Match IDs the optimizer's unindexed scan path returns."""
+        return [match.match_id for match, _ in self.optimizer._scan_player_matches(puuid, filters)]
+    
+    def test_player_queries_match_a_full_scan(self):
+        """Test that indexed player queries return what filtering every match returns."""
+        filter_sets = [
+            AnalyticsFilters(),
+            AnalyticsFilters(champions=[10, 12]),
+            AnalyticsFilters(roles=["middle"]),
+            AnalyticsFilters(champions=[11], roles=["top", "middle"], win_only=True),
+            AnalyticsFilters(queue_types=[440]),
+            AnalyticsFilters(teammates=["bob"], win_only=False),
+            AnalyticsFilters(date_range=DateRange(start_date=datetime.now() - timedelta(days=6, hours=12),
+                                                  end_date=datetime.now())),
+            AnalyticsFilters(roles=["TOP"], limit=3),
+        ]
+        
+        with patch.object(self.match_manager, 'get_matches_for_player',
+                          wraps=self.match_manager.get_matches_for_player) as player_matches:
+            for filters in filter_sets:
+                pairs = self.optimizer.execute_player_query("alice", filters)
+                assert [match.match_id for match, _ in pairs] == self.scan("alice", filters), filters
+                assert all(participant.puuid == "alice" for _, participant in pairs)
+        
+        # Only the reference scans decoded every match of the player
+        assert player_matches.call_count == len(filter_sets)
+        assert self.optimizer.execute_player_query("nobody", AnalyticsFilters()) == []
+    
+    def test_plan_orders_paths_by_cardinality(self):
+        """Test that the most selective index is intersected first and large ones are skipped."""
+        filters = AnalyticsFilters(champions=[10], roles=["top"], queue_types=[420, 440])
+        plan = self.optimizer.optimize_query(filters, puuids=["alice"])
+        
+        assert plan.use_indexes == ["by_player_champion_role", "by_queue"]
+        assert [path.estimated_rows for path in plan.access_paths] == [4, 20]
+        assert plan.estimated_rows == 4
+        
+        # A date range spanning all history is left to the residual check
+        filters = AnalyticsFilters(champions=[10], roles=["top"], date_range=DateRange(
+            start_date=datetime.now() - timedelta(days=400), end_date=datetime.now()
+        ))
+        now_ms = int(datetime.now().timestamp() * 1000)
+        self.optimizer.index.add_entries([
+            (f"OTHER_{i}", now_ms - i * 3600000, 420, [(f"other_{i}", 10, "top", True)]) for i in range(100)
+        ])
+        plan = self.optimizer.optimize_query(filters, puuids=["alice"])
+        assert plan.use_indexes == ["by_player_champion_role"]
+        assert len(self.optimizer.execute_player_query("alice", filters)) == plan.estimated_rows
+    
+    def test_index_follows_stored_and_removed_matches(self):
+        """Test that the index is maintained as the match store changes."""
+        self.match_manager.store_matches_batch([self.create_match_data(20)])
+        assert len(self.optimizer.execute_player_query("alice", AnalyticsFilters())) == 21
+        
+        self.match_manager.store_match(self.create_match_data(150))
+        assert self.match_manager.cleanup_old_matches(days=90) == 1
+        assert self.optimizer.index.total_matches_indexed == 21
+        assert "NA1_150" not in self.optimizer.index
+    
+    def test_index_snapshot_is_loaded_and_caught_up(self):
+        """Test that a new optimizer starts from the persisted index plus the changes since."""
+        assert self.optimizer.snapshot_file.exists()
+        self.match_manager.store_matches_batch([self.create_match_data(i) for i in (20, 21, 150)])
+        assert self.match_manager.cleanup_old_matches(days=90) == 1
+        
+        reopened_manager = MatchManager(self.config)
+        with patch.object(QueryOptimizer, '_table_entries', wraps=QueryOptimizer._table_entries) as table_entries:
+            optimizer = QueryOptimizer(self.config, reopened_manager)
+        
+        # Only the two matches stored since the snapshot were read from the participant table
+        (_, rows), _ = table_entries.call_args
+        assert table_entries.call_count == 1 and len(rows) == 20
+        stats = optimizer.index.get_statistics()
+        assert (stats['snapshot_matches'], stats['pending_changes'], stats['total_matches_indexed']) == (20, 2, 22)
+        
+        for filters in (AnalyticsFilters(), AnalyticsFilters(champions=[11], roles=["middle"]),
+                        AnalyticsFilters(queue_types=[440], win_only=False)):
+            pairs = optimizer.execute_player_query("alice", filters)
+            assert [match.match_id for match, _ in pairs] == self.scan("alice", filters), filters
+        
+        # Writing a snapshot folds the pending changes in
+        assert optimizer.save_index()
+        stats = optimizer.index.get_statistics()
+        assert (stats['snapshot_matches'], stats['pending_changes']) == (22, 0)
+        assert optimizer.index.postings('by_player', "filler_21_3") == {"NA1_21"}
+    
+    def test_index_snapshot_is_rebuilt_after_compaction(self):
+        """Test that a snapshot that no longer matches the store layout is rebuilt."""
+        self.match_manager.compact_storage()
+        
+        optimizer = QueryOptimizer(self.config, MatchManager(self.config))
+        
+        assert optimizer.index.snapshot.store_position == optimizer.match_manager.store_position()
+        assert optimizer.index.total_matches_indexed == 20
+        assert len(optimizer.execute_player_query("bob", AnalyticsFilters())) == 20
+    
+    def test_engine_routes_filtered_matches_through_the_optimizer(self):
+        """Test that engine analyses are served by the query executor."""
+        self.match_manager.store_matches_batch([self.create_match_data(i) for i in range(20, 40)])
+        engine = HistoricalAnalyticsEngine(self.config, self.match_manager,
+                                           BaselineManager(self.config, self.match_manager),
+                                           cache_manager=AnalyticsCacheManager(self.config))
+        
+        with patch.object(self.match_manager, 'get_matches_for_player') as player_matches:
+            analytics = engine.analyze_player_performance("alice", AnalyticsFilters(roles=["top"]))
+            champion = engine.analyze_champion_performance("alice", 10, "top")
+        
+        player_matches.assert_not_called()
+        assert analytics.overall_performance.games_played == 20
+        assert champion.performance.games_played == len(self.scan(
+            "alice", AnalyticsFilters(champions=[10], roles=["top"])
+        ))
+        assert engine.query_optimizer.get_query_statistics()['player_matches']['execution_count'] == 2
+
+
 if __name__ == "__main__":
     # Run performance tests
     pytest.main([__file__, "-v", "-s"])
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+Tests for the persistent API response cache.
+
+This module tests per-entry persistence, TTL expiry and sweeping, the size
+cap, compression, and migration of the legacy JSON cache.
+"""
+
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+import pytest
+
+from lol_team_optimizer.api_cache import ApiResponseCache
+from lol_team_optimizer.config import Config
+from lol_team_optimizer.riot_client import RiotAPIClient
+
+
+class TestApiResponseCache:
+    """Test cases for the ApiResponseCache class."""
+    
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = Path(self.temp_dir) / "api_cache.db"
+        self.caches = []
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        for cache in self.caches:
+            cache.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def create_cache(self, **kwargs) -> ApiResponseCache:
+        kwargs.setdefault("sweep_interval_seconds", 0)
+        cache = ApiResponseCache(self.db_path, **kwargs)
+        self.caches.append(cache)
+        return cache
+    
+    def test_put_get_and_persistence(self):
+        """Test that entries are readable immediately and after reopening."""
+        cache = self.create_cache()
+        expires_at = datetime.now() + timedelta(hours=1)
+        cache.put("key1", {"matchId": "NA1_1"}, expires_at)
+        
+        assert cache.get("key1") == {"matchId": "NA1_1"}
+        assert cache.get("missing") is None
+        cache.close()
+        self.caches.remove(cache)
+        
+        reopened = self.create_cache()
+        data, _, stored_expiry = reopened.get_entry("key1")
+        assert data == {"matchId": "NA1_1"}
+        assert abs((stored_expiry - expires_at).total_seconds()) < 0.001
+    
+    def test_expired_entries_are_hidden_and_swept(self):
+        """Test TTL expiry on read and removal by the sweep."""
+        cache = self.create_cache()
+        cache.put("old", [1, 2, 3], datetime.now() - timedelta(seconds=1))
+        cache.put("new", [4], datetime.now() + timedelta(hours=1))
+        
+        assert cache.get("old") is None
+        assert cache.sweep_expired() == 1
+        assert len(cache) == 1
+        assert cache.sweep_expired() == 0
+    
+    def test_background_sweep(self):
+        """Test that the background thread removes expired entries."""
+        cache = self.create_cache(sweep_interval_seconds=0.05)
+        cache.put("old", "value", datetime.now() - timedelta(seconds=1))
+        
+        for _ in range(100):
+            if len(cache) == 0:
+                break
+            cache._stop_sweep.wait(0.02)
+        assert len(cache) == 0
+    
+    def test_size_cap_evicts_soonest_expiring(self):
+        """Test that the cache stays under its size cap."""
+        cache = self.create_cache(max_size_bytes=1000, compress_min_bytes=None)
+        now = datetime.now()
+        for i in range(10):
+            cache.put(f"key{i}", "x" * 200, now + timedelta(minutes=i + 1))
+        
+        assert cache.total_bytes <= 1000
+        assert cache.get("key0") is None
+        assert cache.get("key9") == "x" * 200
+        
+        # Replacing an entry does not double count its size
+        total = cache.total_bytes
+        cache.put("key9", "x" * 200, now + timedelta(minutes=20))
+        assert cache.total_bytes == total
+    
+    def test_large_payloads_compressed(self):
+        """Test that large payloads are compressed and round-trip intact."""
+        cache = self.create_cache(compress_min_bytes=1024)
+        payload = {"participants": [{"puuid": f"p{i}", "kills": i} for i in range(200)]}
+        cache.put("match", payload, datetime.now() + timedelta(hours=1))
+        
+        assert cache.get("match") == payload
+        assert cache.total_bytes < len(json.dumps(payload)) / 2
+    
+    def test_failed_batch_leaves_total_unchanged(self):
+        """Test that a rolled back put_many does not count the sizes it wrote."""
+        cache = self.create_cache(compress_min_bytes=None)
+        expires_at = datetime.now() + timedelta(hours=1)
+        cache.put("kept", "x" * 100, expires_at)
+        total = cache.total_bytes
+        
+        with pytest.raises(TypeError):
+            cache.put_many({
+                "kept": ("y" * 300, datetime.now(), expires_at),
+                "new": ("z" * 200, datetime.now(), expires_at),
+                "broken": (object(), datetime.now(), expires_at)
+            })
+        
+        assert cache.total_bytes == total
+        assert cache.get("kept") == "x" * 100
+        assert cache.get("new") is None
+
+
+class TestRiotClientResponseCache:
+    """Test cases for the Riot API client's use of the persistent cache."""
+    
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config(
+            riot_api_key="test_api_key",
+            cache_directory=str(Path(self.temp_dir) / "cache"),
+            data_directory=str(Path(self.temp_dir) / "data")
+        )
+        self.clients = []
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        for client in self.clients:
+            client.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def create_client(self) -> RiotAPIClient:
+        client = RiotAPIClient(self.config)
+        self.clients.append(client)
+        return client
+    
+    def test_responses_survive_restart_without_rewrites(self):
+        """Test that stored responses persist and no JSON file is rewritten."""
+        client = self.create_client()
+        for i in range(20):
+            client._store_in_cache(f"key{i}", {"value": i})
+        
+        assert not (Path(self.config.cache_directory) / "api_cache.json").exists()
+        
+        restarted = self.create_client()
+        assert restarted.cache == {}
+        assert restarted._get_from_cache("key7") == {"value": 7}
+        assert "key7" in restarted.cache
+    
+    def test_memory_layer_is_bounded(self):
+        """Test that only recently used responses stay in memory."""
+        client = self.create_client()
+        client.memory_cache_size = 5
+        for i in range(10):
+            client._store_in_cache(f"key{i}", i)
+        
+        assert list(client.cache) == [f"key{i}" for i in range(5, 10)]
+        assert client._get_from_cache("key0") == 0
+    
+    def test_legacy_json_cache_imported(self):
+        """Test that an existing api_cache.json is imported once."""
+        cache_dir = Path(self.config.cache_directory)
+        now = datetime.now()
+        legacy = {
+            "fresh": {"data": {"a": 1}, "timestamp": now.isoformat(),
+                      "expires_at": (now + timedelta(hours=1)).isoformat()},
+            "stale": {"data": {"b": 2}, "timestamp": now.isoformat(),
+                      "expires_at": (now - timedelta(hours=1)).isoformat()}
+        }
+        with open(cache_dir / "api_cache.json", 'w') as f:
+            json.dump(legacy, f)
+        
+        client = self.create_client()
+        
+        assert client._get_from_cache("fresh") == {"a": 1}
+        assert client._get_from_cache("stale") is None
+        assert not (cache_dir / "api_cache.json").exists()
+        assert (cache_dir / "api_cache.json.migrated").exists()
+    
+    def test_close_stops_sweep(self):
+        """Test that closing the client stops the cache's sweep thread."""
+        client = RiotAPIClient(self.config)
+        sweeper = client.response_cache._sweeper
+        assert sweeper.is_alive()
+        
+        client.close()
+        
+        assert not sweeper.is_alive()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -6,8 +6,10 @@ and edge cases for performance baseline management.
 """
 
 import pytest
+import shutil
 import tempfile
 import json
+import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
 from unittest.mock import Mock, MagicMock, patch
@@ -16,6 +18,8 @@ from lol_team_optimizer.baseline_manager import (
     BaselineManager, BaselineContext, PlayerBaseline, ContextualBaseline,
     BaselineCache
 )
+from lol_team_optimizer.baseline_statistics import BaselineStatistics, RunningStats
+from lol_team_optimizer.match_manager import MatchManager
 from lol_team_optimizer.analytics_models import (
     PerformanceMetrics, ConfidenceInterval, InsufficientDataError,
     BaselineCalculationError
@@ -668,5 +672,133 @@ class TestBaselineManager:
                 manager.calculate_player_baseline(context)
 
 
+class TestBaselineRunningStatistics:
+    """Test baselines merged from per-bucket running statistics."""
+    
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.config.data_directory = str(Path(self.temp_dir) / "data")
+        self.config.cache_directory = str(Path(self.temp_dir) / "cache")
+        Path(self.config.cache_directory).mkdir(parents=True)
+        self.match_manager = MatchManager(self.config)
+        self.manager = BaselineManager(self.config, self.match_manager)
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def create_match_data(self, index: int, days_ago: float) -> dict:
+        """Create Riot API match data with the tracked player in a varying role and queue."""
+        created = datetime.now() - timedelta(days=days_ago)
+        positions = ["MIDDLE", "MIDDLE", "TOP"]
+        participants = [{
+            "puuid": "player",
+            "championId": 1 + index % 2,
+            "teamId": 100,
+            "individualPosition": positions[index % 3],
+            "kills": 3 + index % 5, "deaths": index % 4, "assists": 6 + index % 3,
+            "totalMinionsKilled": 150 + index, "neutralMinionsKilled": 10,
+            "visionScore": 20 + index, "goldEarned": 11000 + 100 * index,
+            "totalDamageDealtToChampions": 18000 + 250 * index,
+            "win": index % 3 != 0
+        }]
+        return {
+            "metadata": {"matchId": f"NA1_{index}"},
+            "info": {
+                "gameCreation": int(created.timestamp() * 1000),
+                "gameDuration": 1500 + 30 * index,
+                "queueId": 420 if index % 4 else 440,
+                "participants": participants,
+                "teams": [{"teamId": 100, "win": index % 3 != 0}]
+            }
+        }
+    
+    def table_metrics(self, **filters) -> PerformanceMetrics:
+        """Metrics computed directly from the participant table."""
+        table = self.match_manager.participant_table
+        return table.totals(table.select(puuid="player", **filters)).to_performance_metrics()
+    
+    def test_running_stats_merge_matches_numpy(self):
+        """Test that merged Welford moments equal a direct computation."""
+        values = np.random.default_rng(3).normal(10, 4, size=50)
+        first, second = RunningStats(), RunningStats()
+        for value in values[:20]:
+            first.add(value)
+        for value in values[20:]:
+            second.add(value)
+        first.merge(second)
+        
+        assert first.count == 50
+        assert first.mean == pytest.approx(values.mean())
+        assert first.variance == pytest.approx(values.var(ddof=1))
+    
+    def test_context_baselines_are_bucket_merges(self):
+        """Test that bucket merges equal aggregates over the selected rows."""
+        self.match_manager.store_matches_batch([self.create_match_data(i, i) for i in range(24)])
+        
+        overall = self.manager.get_overall_baseline("player")
+        role = self.manager.get_role_specific_baseline("player", "middle")
+        champion = self.manager.get_champion_specific_baseline("player", 2, "middle")
+        queue = self.manager.calculate_player_baseline(BaselineContext(puuid="player", queue_types=[420]))
+        
+        assert overall.baseline_metrics == self.table_metrics()
+        assert role.baseline_metrics == self.table_metrics(roles=["middle"])
+        assert champion.baseline_metrics == self.table_metrics(champion_ids=[2], roles=["middle"])
+        assert queue.baseline_metrics == self.table_metrics(queue_ids=[420])
+        
+        rows = self.match_manager.participant_table.select(puuid="player", roles=["middle"])
+        kda = self.match_manager.participant_table.metric_values(rows, 'avg_kda')
+        assert role.statistics.std_dev('avg_kda') == pytest.approx(kda.std(ddof=1))
+        
+        windowed = self.manager.get_overall_baseline("player", time_window_days=10)
+        assert windowed.temporal_weight_applied
+        assert windowed.sample_size in (10, 11)
+    
+    def test_new_matches_update_buckets_incrementally(self):
+        """Test that stored matches are added to existing statistics and cached baselines refresh."""
+        self.match_manager.store_matches_batch([self.create_match_data(i, i) for i in range(10)])
+        assert self.manager.get_overall_baseline("player").sample_size == 10
+        buckets = self.manager._player_buckets["player"]
+        
+        with patch.object(self.match_manager.participant_table, 'select',
+                          wraps=self.match_manager.participant_table.select) as select:
+            self.match_manager.store_match(self.create_match_data(10, 0.5))
+            self.manager.update_baselines("player", [self.match_manager.get_match("NA1_10")])
+            baseline = self.manager.get_overall_baseline("player")
+        
+        assert baseline.sample_size == 11
+        assert baseline.baseline_metrics == self.table_metrics()
+        assert self.manager._player_buckets["player"] is buckets
+        assert all(call.kwargs.get('rows') is not None for call in select.call_args_list)
+    
+    def test_removed_matches_rebuild_statistics(self):
+        """Test that cleaning up old matches drops the affected statistics and cached baselines."""
+        self.match_manager.store_matches_batch([self.create_match_data(i, i * 10) for i in range(12)])
+        assert self.manager.get_overall_baseline("player").sample_size == 12
+        assert self.manager.get_role_specific_baseline("player", "middle").baseline_metrics == \
+            self.table_metrics(roles=["middle"])
+        
+        self.match_manager.cleanup_old_matches(days=55)
+        
+        baseline = self.manager.get_overall_baseline("player")
+        assert baseline.sample_size == 6
+        assert baseline.baseline_metrics == self.table_metrics()
+        with pytest.raises(InsufficientDataError):  # only 4 middle games remain
+            self.manager.get_role_specific_baseline("player", "middle")
+    
+    def test_statistics_survive_cache_round_trip(self):
+        """Test that cached baselines keep their statistics."""
+        self.match_manager.store_matches_batch([self.create_match_data(i, i) for i in range(8)])
+        baseline = self.manager.get_overall_baseline("player")
+        
+        reloaded = BaselineCache(Path(self.config.cache_directory) / "baselines")
+        cached = reloaded.get(BaselineContext(puuid="player").cache_key)
+        
+        assert isinstance(cached.statistics, BaselineStatistics)
+        assert cached.statistics == baseline.statistics
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Tests for the materialized champion aggregates and matchup matrix.
+
+This module checks the aggregates and the matchup matrix against the
+per-match queries they replace, and that they follow matches being stored,
+removed and reloaded.
+"""
+
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+import pytest
+
+from lol_team_optimizer.champion_aggregates import ChampionMatchupMatrix, ChampionRoleAggregates, DAY_MS
+from lol_team_optimizer.config import Config
+from lol_team_optimizer.match_manager import MatchManager
+from lol_team_optimizer.participant_table import ParticipantTable
+from tests.match_data import POSITIONS, epoch_ms, raw_match
+
+
+def champion_match(match_id: str, created: datetime, champions: list, blue_wins: bool = True) -> dict:
+    """Create match data in Riot API format with the given ten champions."""
+    return raw_match(match_id, epoch_ms(created), [
+        {"puuid": f"{match_id}-p{i}", "championId": champion_id, "kills": i, "deaths": 2, "assists": 1}
+        for i, champion_id in enumerate(champions)
+    ], blue_wins)
+
+
+class TestChampionRoleAggregates:
+    """Test cases for ChampionRoleAggregates and ChampionMatchupMatrix through MatchManager."""
+    
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.config.data_directory = str(Path(self.temp_dir) / "data")
+        Path(self.config.data_directory).mkdir(parents=True)
+        self.match_manager = MatchManager(self.config)
+        
+        now = datetime.now()
+        self.matches = [
+            champion_match("NA1_1", now - timedelta(days=1), list(range(1, 11)), blue_wins=True),
+            champion_match("NA1_2", now - timedelta(days=10), list(range(1, 11)), blue_wins=False),
+            champion_match("NA1_3", now - timedelta(days=60), [1, 12, 13, 14, 15, 16, 17, 18, 19, 20], blue_wins=True),
+            champion_match("NA1_4", now - timedelta(days=200), [21, 2, 3, 4, 5, 1, 7, 8, 9, 10], blue_wins=False),
+        ]
+        self.match_manager.store_matches_batch(self.matches)
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_totals_match_per_match_queries(self):
+        """Test that aggregate totals agree with the per-match queries."""
+        for champion_id in (1, 2, 6, 21):
+            for role in ("top", "middle", None):
+                totals = self.match_manager.get_champion_role_totals(champion_id, role)
+                matches = [
+                    match for match in self.match_manager.get_matches_with_champions([champion_id])
+                    if role is None or match['role'] == role
+                ]
+                assert totals.games == len(matches)
+                assert totals.wins == sum(match['win'] for match in matches)
+    
+    def test_role_totals_and_kda(self):
+        """Test role-wide totals and summed KDA fields."""
+        top = self.match_manager.get_champion_role_totals(None, "TOP")
+        assert top.games == len(self.match_manager.get_matches_by_role("top"))
+        
+        champion = self.match_manager.get_champion_role_totals(6, "top")
+        assert (champion.games, champion.wins) == (2, 1)
+        assert (champion.kills, champion.deaths, champion.assists) == (10, 4, 2)
+        assert champion.avg_kda == pytest.approx(12 / 4)
+        assert self.match_manager.get_champion_role_totals(999).games == 0
+    
+    def test_time_windows(self):
+        """Test that windows count only matches on days inside them."""
+        now = datetime.now()
+        last_30 = self.match_manager.get_champion_role_totals(1, "top", start_time=now - timedelta(days=30), end_time=now)
+        last_90 = self.match_manager.get_champion_role_totals(1, "top", start_time=now - timedelta(days=90))
+        older = self.match_manager.get_champion_role_totals(1, end_time=now - timedelta(days=100))
+        
+        assert (last_30.games, last_30.wins) == (2, 1)
+        assert (last_90.games, last_90.wins) == (3, 2)
+        assert (older.games, older.wins) == (1, 1)  # bottom side of NA1_4
+        assert self.match_manager.get_champion_role_totals(
+            1, start_time=now + timedelta(days=5), end_time=now + timedelta(days=6)).games == 0
+    
+    def test_removal_and_reload(self):
+        """Test that removed matches are subtracted and the table is rebuilt on load."""
+        assert self.match_manager.cleanup_old_matches(90) == 1
+        assert self.match_manager.get_champion_role_totals(21).games == 0
+        assert self.match_manager.get_champion_role_totals(1).games == 3
+        
+        reloaded = MatchManager(self.config)
+        for champion_id in (1, 6, 21):
+            for role in ("top", "bottom", None):
+                assert reloaded.get_champion_role_totals(champion_id, role) == \
+                    self.match_manager.get_champion_role_totals(champion_id, role)
+    
+    def test_day_axis_grows_in_both_directions(self):
+        """Test out-of-order days and undated matches."""
+        table = ParticipantTable()
+        aggregates = ChampionRoleAggregates()
+        day = 19_000
+        for index, (match_day, champion_id) in enumerate([(day, 1), (day - 40, 1), (day + 300, 2), (None, 1)]):
+            timestamp = 0 if match_day is None else match_day * DAY_MS + 1000
+            match_id = f"M{index}"
+            table.append_match(match_id, timestamp, 420, 1800,
+                               [["p", champion_id, "MIDDLE", 100, True, 1, 1, 1, 0, 0, 0, 0]])
+            aggregates.add_rows(table, table.rows_for_matches([match_id]))
+        
+        assert aggregates.totals(1).games == 3
+        assert aggregates.totals(1, start_ms=0).games == 2  # the undated match is only in the all-time totals
+        assert aggregates.totals(1, "middle", (day - 40) * DAY_MS, (day - 40) * DAY_MS).games == 1
+        assert aggregates.totals(2, start_ms=(day + 1) * DAY_MS).games == 1
+        assert aggregates.counts([2, 1, 7], "middle", start_ms=day * DAY_MS).tolist() == [
+            [1, 1, 1, 1, 1], [1, 1, 1, 1, 1], [0, 0, 0, 0, 0]]
+    
+    def test_matchup_counts_match_per_match_queries(self):
+        """Test that matrix cells agree with get_champion_matchups for every pair."""
+        champions = sorted({p["championId"] for match in self.matches for p in match["info"]["participants"]})
+        enemies = [(champion_id, role) for champion_id in champions for role in POSITIONS]
+        for role in POSITIONS:
+            counts = self.match_manager.get_matchup_counts(champions, role, enemies)
+            for i, champion_id in enumerate(champions):
+                for j, (enemy_id, enemy_role) in enumerate(enemies):
+                    matchups = self.match_manager.get_champion_matchups(champion_id, enemy_id, role, enemy_role)
+                    assert counts[i, j].tolist() == [len(matchups), sum(m['win'] for m in matchups)]
+    
+    def test_matchup_counts_shape_and_unknowns(self):
+        """Test lookups of several champions, unknown champions and roles."""
+        counts = self.match_manager.get_matchup_counts([1, 999, 6], "top", [(6, "top"), (1, "utility"), (999, "top")])
+        
+        assert counts.shape == (3, 3, 2)
+        assert counts[0].tolist() == [[2, 1], [0, 0], [0, 0]]  # Teammates never count
+        assert counts[1].tolist() == [[0, 0], [0, 0], [0, 0]]
+        assert counts[2].tolist() == [[0, 0], [0, 0], [0, 0]]
+        assert self.match_manager.get_matchup_counts([1], "TOP", [(6, "TOP")]).tolist() == [[[2, 1]]]
+        assert self.match_manager.get_matchup_counts([1], "unknown", [(6, "top")]).tolist() == [[[0, 0]]]
+        assert self.match_manager.get_matchup_counts([], "top", [(6, "top")]).shape == (0, 1, 2)
+    
+    def test_matchups_follow_removal_and_reload(self):
+        """Test that removed matches leave the matrix and it is rebuilt on load."""
+        # NA1_4 has 21 (top, blue) losing to 1 (top, red)
+        assert self.match_manager.get_matchup_counts([21, 1], "top", [(1, "top"), (21, "top")]).tolist() == \
+            [[[1, 0], [0, 0]], [[0, 0], [1, 1]]]
+        self.match_manager.cleanup_old_matches(90)
+        assert self.match_manager.get_matchup_counts([21, 1], "top", [(1, "top"), (21, "top")]).tolist() == \
+            [[[0, 0], [0, 0]], [[0, 0], [0, 0]]]
+        
+        reloaded = MatchManager(self.config)
+        enemies = [(6, "top"), (7, "jungle"), (1, "bottom")]
+        assert reloaded.get_matchup_counts([1, 2, 21], "top", enemies).tolist() == \
+            self.match_manager.get_matchup_counts([1, 2, 21], "top", enemies).tolist()
+    
+    def test_bulk_and_incremental_matrix_builds_agree(self):
+        """Test that one bulk load equals adding the same matches one at a time."""
+        table = ParticipantTable()
+        for index in range(40):
+            table.append_match(f"M{index}", 1700000000000 + index, 420, 1800, [
+                [f"p{i}", (index * 5 + i) % 12 + 1, POSITIONS[i % 2], 100 if i < 2 else 200, (i < 2) == (index % 3 == 0),
+                 1, 1, 1, 0, 0, 0, 0]
+                for i in range(4)
+            ])
+        
+        bulk = ChampionMatchupMatrix()
+        bulk.add_rows(table, table.rows())
+        incremental = ChampionMatchupMatrix()
+        for index in range(40):
+            incremental.add_rows(table, table.rows_for_matches([f"M{index}"]))
+        
+        champions = list(range(1, 13))
+        enemies = [(champion_id, role) for champion_id in champions for role in ("top", "jungle")]
+        for role in ("top", "jungle"):
+            expected = incremental.counts(champions, role, enemies)
+            assert expected[..., 0].sum() > 0
+            assert bulk.counts(champions, role, enemies).tolist() == expected.tolist()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
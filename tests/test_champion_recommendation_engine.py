@@ -6,12 +6,17 @@ and various edge cases for the recommendation system.
 """
 
 import pytest
+import random
+import shutil
+import tempfile
+from pathlib import Path
 from unittest.mock import Mock, MagicMock, patch
 from datetime import datetime, timedelta
 from typing import Dict, List
+import numpy as np
 
 from lol_team_optimizer.champion_recommendation_engine import (
-    ChampionRecommendationEngine, RecommendationScore, TeamSynergyContext
+    CandidateScores, ChampionRecommendationEngine, RecommendationScore, TeamSynergyContext
 )
 from lol_team_optimizer.analytics_models import (
     ChampionRecommendation, TeamContext, ChampionPerformanceMetrics,
@@ -20,7 +25,11 @@ from lol_team_optimizer.analytics_models import (
     AnalyticsError, InsufficientDataError, ConfidenceInterval,
     SynergyAnalysis
 )
+from lol_team_optimizer.baseline_manager import BaselineManager
+from lol_team_optimizer.champion_aggregates import ChampionRoleTotals
 from lol_team_optimizer.config import Config
+from lol_team_optimizer.historical_analytics_engine import HistoricalAnalyticsEngine
+from lol_team_optimizer.match_manager import MatchManager
 
 
 @pytest.fixture
@@ -107,6 +116,23 @@ def sample_champion_performance():
     )
 
 
+def make_candidate_scores(champion_ids, performance_scores):
+    """Create CandidateScores with the given individual performance and neutral other components."""
+    n = len(champion_ids)
+    return CandidateScores(
+        champion_ids=np.array(champion_ids),
+        games_played=np.full(n, 20),
+        individual_performance=np.array(performance_scores, dtype=float),
+        ally_synergy=np.full(n, 0.5),
+        counter_pick=np.full(n, 0.5),
+        recent_form=np.full(n, 0.5),
+        meta_relevance=np.full(n, 0.5),
+        confidence=np.full(n, 0.7),
+        data_quality=np.full(n, 1.0),
+        sample_size_penalty=np.zeros(n)
+    )
+
+
 @pytest.fixture
 def sample_team_context():
     """Create sample team context."""
@@ -336,14 +362,8 @@ class TestChampionRecommendations:
         """Test successful champion recommendations generation."""
         # Setup mocks
         recommendation_engine.analytics_engine.analyze_champion_performance.return_value = sample_champion_performance
-        recommendation_engine._generate_single_recommendation = Mock(
-            return_value=ChampionRecommendation(
-                champion_id=1,
-                champion_name="TestChampion",
-                role="middle",
-                recommendation_score=0.8,
-                confidence=0.7
-            )
+        recommendation_engine.score_candidates = Mock(
+            return_value=make_candidate_scores([1, 2, 3, 4, 5], [0.2, 0.9, 0.5, 0.7, 0.1])
         )
         
         recommendations = recommendation_engine.get_champion_recommendations(
@@ -353,13 +373,17 @@ class TestChampionRecommendations:
         )
         
         assert isinstance(recommendations, list)
-        assert len(recommendations) <= 3
+        assert len(recommendations) == 3
         assert all(isinstance(rec, ChampionRecommendation) for rec in recommendations)
         
         # Should be sorted by score (descending)
-        if len(recommendations) > 1:
-            for i in range(len(recommendations) - 1):
-                assert recommendations[i].recommendation_score >= recommendations[i + 1].recommendation_score
+        assert [rec.champion_id for rec in recommendations] == [2, 4, 3]
+        for i in range(len(recommendations) - 1):
+            assert recommendations[i].recommendation_score >= recommendations[i + 1].recommendation_score
+        
+        # Candidates are scored together; details are only built for the returned ones
+        recommendation_engine.score_candidates.assert_called_once()
+        assert recommendation_engine.analytics_engine.analyze_champion_performance.call_count == 3
     
     def test_get_champion_recommendations_no_available_champions(self, recommendation_engine):
         """Test recommendations with no available champions."""
@@ -373,7 +397,7 @@ class TestChampionRecommendations:
     
     def test_get_champion_recommendations_insufficient_data(self, recommendation_engine):
         """Test recommendations with insufficient data for all champions."""
-        recommendation_engine._generate_single_recommendation = Mock(return_value=None)
+        recommendation_engine.score_candidates = Mock(return_value=make_candidate_scores([], []))
         
         with pytest.raises(InsufficientDataError):
             recommendation_engine.get_champion_recommendations(
@@ -387,15 +411,7 @@ class TestChampionRecommendations:
         """Test recommendations with team context filtering."""
         # Setup mocks
         recommendation_engine.analytics_engine.analyze_champion_performance.return_value = sample_champion_performance
-        recommendation_engine._generate_single_recommendation = Mock(
-            return_value=ChampionRecommendation(
-                champion_id=1,
-                champion_name="TestChampion",
-                role="middle",
-                recommendation_score=0.8,
-                confidence=0.7
-            )
-        )
+        recommendation_engine.score_candidates = Mock(return_value=make_candidate_scores([1, 2, 3], [0.5, 0.6, 0.7]))
         
         recommendations = recommendation_engine.get_champion_recommendations(
             puuid="test_player",
@@ -405,7 +421,9 @@ class TestChampionRecommendations:
         
         assert isinstance(recommendations, list)
         # Should only consider available champions (1, 2, 3) and exclude banned (99, 100)
-        recommendation_engine._generate_single_recommendation.assert_called()
+        args = recommendation_engine.score_candidates.call_args[0]
+        assert args[2] == [1, 2, 3]
+        assert args[3] is sample_team_context
     
     def test_get_champion_recommendations_custom_weights(self, recommendation_engine,
                                                        sample_champion_performance):
@@ -419,15 +437,8 @@ class TestChampionRecommendations:
         }
         
         recommendation_engine.analytics_engine.analyze_champion_performance.return_value = sample_champion_performance
-        recommendation_engine._generate_single_recommendation = Mock(
-            return_value=ChampionRecommendation(
-                champion_id=1,
-                champion_name="TestChampion",
-                role="middle",
-                recommendation_score=0.8,
-                confidence=0.7
-            )
-        )
+        candidate_scores = make_candidate_scores([1, 2], [0.4, 0.8])
+        recommendation_engine.score_candidates = Mock(return_value=candidate_scores)
         
         recommendations = recommendation_engine.get_champion_recommendations(
             puuid="test_player",
@@ -436,8 +447,11 @@ class TestChampionRecommendations:
         )
         
         assert isinstance(recommendations, list)
-        # Verify custom weights were passed to single recommendation generation
-        recommendation_engine._generate_single_recommendation.assert_called()
+        # Verify custom weights (after role adjustment) were used for the total scores
+        weights = recommendation_engine._apply_role_specific_weight_adjustments(custom_weights, "middle", None)
+        expected = candidate_scores.total_scores(weights)
+        assert recommendations[0].recommendation_score == pytest.approx(expected[1])
+        assert recommendations[1].recommendation_score == pytest.approx(expected[0])
 
 
 class TestSynergyAnalysis:
@@ -596,6 +610,7 @@ class TestEdgeCases:
     def test_analytics_engine_failure(self, recommendation_engine):
         """Test handling of analytics engine failures."""
         recommendation_engine.analytics_engine.analyze_champion_performance.side_effect = Exception("Engine failure")
+        recommendation_engine.score_candidates = Mock(return_value=make_candidate_scores([1, 2], [0.5, 0.6]))
         
         # Should handle gracefully and raise InsufficientDataError when all champions fail
         with pytest.raises(InsufficientDataError):
@@ -692,8 +707,9 @@ class TestTeamContextIntegration:
             enemy_composition={"middle": 50, "top": 51}
         )
         
-        # Mock counter advantage calculation
-        recommendation_engine._calculate_champion_counter_advantage = Mock(return_value=0.3)
+        # Mock matchup matrix: 8/10 in lane, too few games against top
+        get_counts = Mock(return_value=np.array([[[10, 8], [3, 3]]]))
+        recommendation_engine.analytics_engine.match_manager.get_matchup_counts = get_counts
         
         counter_score = recommendation_engine._calculate_counter_pick_score(
             champion_id=1,
@@ -701,9 +717,10 @@ class TestTeamContextIntegration:
             team_context=team_context
         )
         
-        assert 0.0 <= counter_score <= 1.0
-        # Should call counter advantage calculation for each enemy
-        assert recommendation_engine._calculate_champion_counter_advantage.call_count == 2
+        # Lane advantage (0.8 - 0.5) / 0.5 = 0.6 with weight 2, top neutral with weight 1
+        assert abs(counter_score - (0.6 * 2 / 3 + 1.0) / 2.0) < 1e-9
+        # The whole enemy draft is read in one call
+        get_counts.assert_called_once_with([1], "middle", [(50, "middle"), (51, "top")])
     
     def test_counter_pick_score_no_enemy_info(self, recommendation_engine, sample_team_context):
         """Test counter-pick score with no enemy information."""
@@ -759,13 +776,9 @@ class TestTeamContextIntegration:
     
     def test_get_champion_matchup_data(self, recommendation_engine):
         """Test champion matchup data retrieval."""
-        # Mock match manager response
-        mock_matchups = [
-            {'win': True}, {'win': False}, {'win': True}, {'win': True}  # 3/4 = 75%
-        ]
-        
-        recommendation_engine.analytics_engine.match_manager.get_champion_matchups = Mock(
-            return_value=mock_matchups
+        # Mock matchup matrix response: 3/4 = 75%
+        recommendation_engine.analytics_engine.match_manager.get_matchup_counts = Mock(
+            return_value=np.array([[[4, 3]]])
         )
         
         matchup_data = recommendation_engine._get_champion_matchup_data(
@@ -1049,23 +1062,14 @@ class TestMetaAnalysis:
     
     def test_recent_meta_performance_calculation(self, recommendation_engine):
         """Test recent meta performance calculation."""
-        # Mock recent matches with good performance
-        recent_matches = [
-            {'win': True}, {'win': True}, {'win': False}, {'win': True}  # 75% recent
-        ]
-        
-        # Mock overall matches with average performance
-        overall_matches = [
-            {'win': True}, {'win': False}, {'win': True}, {'win': False},
-            {'win': True}, {'win': False}, {'win': True}, {'win': False}  # 50% overall
-        ]
+        # Recent games with good performance, overall games with average performance
+        recent_totals = ChampionRoleTotals(games=4, wins=3)  # 75% recent
+        overall_totals = ChampionRoleTotals(games=12, wins=6)  # 50% overall
         
-        def mock_get_matches(champion_ids, filters=None):
-            if filters and hasattr(filters, 'date_range'):
-                return recent_matches
-            return overall_matches
+        def mock_get_totals(champion_id, role, start_time=None, end_time=None):
+            return recent_totals if start_time else overall_totals
         
-        recommendation_engine.analytics_engine.match_manager.get_matches_with_champions = mock_get_matches
+        recommendation_engine.analytics_engine.match_manager.get_champion_role_totals = mock_get_totals
         
         meta_score = recommendation_engine._calculate_recent_meta_performance(
             champion_id=1,
@@ -1079,17 +1083,11 @@ class TestMetaAnalysis:
     
     def test_champion_popularity_score(self, recommendation_engine):
         """Test champion popularity score calculation."""
-        # Mock role matches with champion picks
-        role_matches = [
-            {'champion_id': 1}, {'champion_id': 2}, {'champion_id': 1},
-            {'champion_id': 3}, {'champion_id': 1}, {'champion_id': 4},
-            {'champion_id': 1}, {'champion_id': 5}, {'champion_id': 1},
-            {'champion_id': 6}  # Champion 1 picked 5/10 times = 50% pick rate
-        ]
+        # Champion 1 picked in 5 of the role's 10 games = 50% pick rate
+        def mock_get_totals(champion_id, role, start_time=None, end_time=None):
+            return ChampionRoleTotals(games=10) if champion_id is None else ChampionRoleTotals(games=5)
         
-        recommendation_engine.analytics_engine.match_manager.get_matches_by_role = Mock(
-            return_value=role_matches
-        )
+        recommendation_engine.analytics_engine.match_manager.get_champion_role_totals = mock_get_totals
         
         popularity_score = recommendation_engine._calculate_champion_popularity_score(
             champion_id=1,
@@ -1101,5 +1099,126 @@ class TestMetaAnalysis:
         assert popularity_score <= 1.0
 
 
+class TestBatchCandidateScoring:
+    """Test score_candidates against the per-champion scoring on stored matches."""
+    
+    SCORE_FIELDS = (
+        "individual_performance_score", "team_synergy_score", "recent_form_score",
+        "meta_relevance_score", "confidence_score", "total_score", "games_played",
+        "data_quality_score", "sample_size_penalty"
+    )
+    
+    def setup_method(self):
+        """Build a real match store, baselines and analytics engine."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.config.data_directory = str(Path(self.temp_dir) / "data")
+        self.config.cache_directory = str(Path(self.temp_dir) / "cache")
+        Path(self.config.data_directory).mkdir(parents=True)
+        Path(self.config.cache_directory).mkdir(parents=True)
+        
+        match_manager = MatchManager(self.config)
+        match_manager.store_matches_batch(self._random_matches(300))
+        baseline_manager = BaselineManager(self.config, match_manager)
+        analytics_engine = HistoricalAnalyticsEngine(self.config, match_manager, baseline_manager)
+        champion_data = Mock()
+        champion_data.get_champions_by_role.return_value = list(range(1, 30))
+        champion_data.get_champion_name.side_effect = lambda champion_id: f"Champion{champion_id}"
+        self.engine = ChampionRecommendationEngine(self.config, analytics_engine, champion_data, baseline_manager)
+        
+        self.team_context = TeamContext(
+            existing_picks={
+                "jungle": PlayerRoleAssignment(puuid="ally1", player_name="Ally1", role="jungle",
+                                               champion_id=11, champion_name="Champion11"),
+                "bottom": PlayerRoleAssignment(puuid="ally2", player_name="Ally2", role="bottom",
+                                               champion_id=12, champion_name="Champion12")
+            },
+            target_role="middle",
+            target_player_puuid="me",
+            enemy_composition={"middle": 13, "top": 14}
+        )
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _random_matches(count):
+        """Create matches where "me" plays middle on champions 1-6 in every other game."""
+        rng = random.Random(7)
+        positions = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+        now = datetime.now()
+        matches = []
+        for index in range(count):
+            timestamp = int((now - timedelta(days=rng.uniform(0, 120))).timestamp() * 1000)
+            champions = rng.sample(range(7, 30), 10)
+            if index % 2 == 0:
+                champions[2] = rng.randint(1, 6)
+            blue_wins = rng.random() < 0.5
+            participants = []
+            for i, champion_id in enumerate(champions):
+                participants.append({
+                    "puuid": "me" if i == 2 and index % 2 == 0 else f"p{rng.randrange(100)}",
+                    "championId": champion_id,
+                    "championName": f"Champion{champion_id}",
+                    "teamId": 100 if i < 5 else 200,
+                    "individualPosition": positions[i % 5],
+                    "kills": rng.randrange(10), "deaths": rng.randrange(10), "assists": rng.randrange(15),
+                    "totalMinionsKilled": rng.randrange(250), "visionScore": rng.randrange(40),
+                    "win": (i < 5) == blue_wins
+                })
+            matches.append({
+                "metadata": {"matchId": f"NA1_{index}"},
+                "info": {
+                    "gameCreation": timestamp,
+                    "gameDuration": 1800,
+                    "gameEndTimestamp": timestamp + 1800000,
+                    "queueId": 420,
+                    "participants": participants,
+                    "teams": [{"teamId": 100, "win": blue_wins}, {"teamId": 200, "win": not blue_wins}]
+                }
+            })
+        return matches
+    
+    @pytest.mark.parametrize("with_context", [False, True])
+    def test_matches_per_champion_scores(self, with_context):
+        """Test that every batch component equals calculate_recommendation_score."""
+        team_context = self.team_context if with_context else None
+        weights = self.engine.default_weights
+        scores = self.engine.score_candidates("me", "middle", list(range(1, 30)), team_context)
+        
+        assert sorted(scores.champion_ids.tolist()) == [1, 2, 3, 4, 5, 6]
+        for index, champion_id in enumerate(scores.champion_ids):
+            expected = self.engine.calculate_recommendation_score(
+                "me", int(champion_id), "middle", team_context, None, weights)
+            actual = scores.score_breakdown(index, weights)
+            for field in self.SCORE_FIELDS:
+                assert getattr(actual, field) == pytest.approx(getattr(expected, field)), (champion_id, field)
+    
+    def test_filters_limit_and_minimum_games(self):
+        """Test that the row limit applies per champion before the minimum-games cut."""
+        self.engine.min_games_for_recommendation = 20
+        assert len(self.engine.score_candidates("me", "middle", list(range(1, 30)))) == 6
+        
+        scores = self.engine.score_candidates("me", "middle", [1, 2, 99], filters=AnalyticsFilters(limit=19))
+        assert len(scores) == 0
+        
+        scores = self.engine.score_candidates("me", "middle", [2, 1, 2], filters=AnalyticsFilters(limit=20))
+        assert scores.champion_ids.tolist() == [2, 1]
+        assert scores.games_played.tolist() == [20, 20]
+    
+    def test_recommendations_use_batch_ranking(self):
+        """Test that the top recommendations follow the batch total scores."""
+        weights = self.engine._apply_role_specific_weight_adjustments(
+            self.engine.default_weights, "middle", self.team_context)
+        scores = self.engine.score_candidates("me", "middle", list(range(1, 30)), self.team_context)
+        ranked = scores.champion_ids[np.argsort(-scores.total_scores(weights), kind='stable')]
+        
+        recommendations = self.engine.get_champion_recommendations(
+            "me", "middle", self.team_context, max_recommendations=3)
+        
+        assert [rec.champion_id for rec in recommendations] == ranked[:3].tolist()
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
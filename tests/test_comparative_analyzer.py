@@ -20,8 +20,45 @@ from lol_team_optimizer.analytics_models import (
     AnalyticsFilters, PerformanceMetrics, PerformanceDelta, DateRange,
     ComparativeRankings, AnalyticsError, InsufficientDataError
 )
-from lol_team_optimizer.models import Match, MatchParticipant
 from lol_team_optimizer.config import Config
+from lol_team_optimizer.match_manager import MatchManager
+from tests.match_data import epoch_ms, raw_match
+
+
+def store_matches(match_manager, rosters, **fields):
+    """
+    Store one match per roster, with stats that vary from match to match.
+    
+    Args:
+        match_manager: MatchManager to store into
+        rosters: PUUIDs playing in each match (at most ten per match)
+        **fields: Participant fields overriding the defaults for everyone
+    """
+    base_date = datetime.now() - timedelta(days=30)
+    matches = []
+    for i, roster in enumerate(rosters):
+        participants = [
+            {
+                "puuid": puuid,
+                "riotIdGameName": f"Name_{puuid}",
+                "riotIdTagline": "NA1",
+                "championId": 1 + (i % 5),
+                "championName": f"Champion_{1 + (i % 5)}",
+                "kills": 5 + (i % 10),
+                "deaths": 3 + (i % 5),
+                "assists": 8 + (i % 7),
+                "totalMinionsKilled": 150 + (i * 5) + slot,
+                "neutralMinionsKilled": 20 + (i * 2),
+                "visionScore": 40 + (i * 3) + slot,
+                "totalDamageDealtToChampions": 15000 + (i * 1000),
+                "goldEarned": 12000 + (i * 500),
+                **fields
+            }
+            for slot, puuid in enumerate(roster)
+        ]
+        matches.append(raw_match(f"NA1_{i}", epoch_ms(base_date + timedelta(days=i)), participants,
+                                 blue_wins=i % 3 != 0, gameDuration=1800 + (i * 60)))
+    match_manager.store_matches_batch(matches)
 
 
 class TestComparativeAnalyzer:
@@ -34,10 +71,14 @@ class TestComparativeAnalyzer:
         return config
     
     @pytest.fixture
-    def mock_match_manager(self):
-        """Create mock match manager."""
-        match_manager = Mock()
-        return match_manager
+    def match_manager(self, tmp_path):
+        """Create an empty match store."""
+        config = Config()
+        config.data_directory = str(tmp_path / "data")
+        config.cache_directory = str(tmp_path / "cache")
+        (tmp_path / "data").mkdir()
+        (tmp_path / "cache").mkdir()
+        return MatchManager(config)
     
     @pytest.fixture
     def mock_baseline_manager(self):
@@ -46,40 +87,9 @@ class TestComparativeAnalyzer:
         return baseline_manager
     
     @pytest.fixture
-    def analyzer(self, mock_config, mock_match_manager, mock_baseline_manager):
+    def analyzer(self, mock_config, match_manager, mock_baseline_manager):
         """Create ComparativeAnalyzer instance."""
-        return ComparativeAnalyzer(mock_config, mock_match_manager, mock_baseline_manager)
-    
-    @pytest.fixture
-    def sample_matches(self):
-        """Create sample match data."""
-        matches = []
-        base_date = datetime.now() - timedelta(days=30)
-        
-        for i in range(20):
-            match = Mock(spec=Match)
-            match.game_creation_datetime = base_date + timedelta(days=i)
-            match.game_duration = 1800 + (i * 60)  # 30-50 minutes
-            match.queue_id = 420  # Ranked Solo/Duo
-            
-            participant = Mock(spec=MatchParticipant)
-            participant.summoner_name = f"Player_{i % 3}"
-            participant.champion_id = 1 + (i % 5)
-            participant.champion_name = f"Champion_{participant.champion_id}"
-            participant.individual_position = ["top", "jungle", "middle", "bottom", "support"][i % 5]
-            participant.win = i % 3 != 0  # ~67% win rate
-            participant.kills = 5 + (i % 10)
-            participant.deaths = 3 + (i % 5)
-            participant.assists = 8 + (i % 7)
-            participant.total_minions_killed = 150 + (i * 5)
-            participant.neutral_minions_killed = 20 + (i * 2)
-            participant.vision_score = 40 + (i * 3)
-            participant.total_damage_dealt_to_champions = 15000 + (i * 1000)
-            participant.gold_earned = 12000 + (i * 500)
-            
-            matches.append((match, participant))
-        
-        return matches
+        return ComparativeAnalyzer(mock_config, match_manager, mock_baseline_manager)
     
     @pytest.fixture
     def sample_performance_metrics(self):
@@ -105,29 +115,23 @@ class TestComparativeAnalyzer:
             avg_game_duration=30.0
         )
     
-    def test_initialization(self, analyzer, mock_config, mock_match_manager, mock_baseline_manager):
+    def test_initialization(self, analyzer, mock_config, match_manager, mock_baseline_manager):
         """Test ComparativeAnalyzer initialization."""
         assert analyzer.config == mock_config
-        assert analyzer.match_manager == mock_match_manager
+        assert analyzer.match_manager == match_manager
         assert analyzer.baseline_manager == mock_baseline_manager
         assert analyzer.min_games_for_comparison == 10
         assert analyzer.min_peer_group_size == 5
         assert analyzer.significance_level == 0.05
         assert len(analyzer.comparison_metrics) == 6
     
-    def test_compare_players_success(self, analyzer, sample_matches):
+    def test_compare_players_success(self, analyzer, match_manager):
         """Test successful multi-player comparison."""
-        # Mock match manager to return different data for each player
-        def mock_get_matches(puuid):
-            # Return different subsets of matches for each player
-            if puuid == "player1":
-                return sample_matches[:15]  # 15 matches
-            elif puuid == "player2":
-                return sample_matches[5:20]  # 15 matches
-            else:
-                return sample_matches[10:]  # 10 matches
-        
-        analyzer.match_manager.get_player_matches.side_effect = mock_get_matches
+        # Different subsets of the matches for each player: 15, 15 and 10
+        spans = {"player1": (0, 15), "player2": (5, 20), "player3": (10, 20)}
+        store_matches(match_manager, [
+            [puuid for puuid, (start, end) in spans.items() if start <= i < end] for i in range(20)
+        ])
         
         # Test comparison
         player_puuids = ["player1", "player2", "player3"]
@@ -147,9 +151,7 @@ class TestComparativeAnalyzer:
     
     def test_compare_players_insufficient_data(self, analyzer):
         """Test comparison with insufficient data."""
-        # Mock match manager to return insufficient matches
-        analyzer.match_manager.get_player_matches.return_value = []
-        
+        # The store holds no matches for either player
         player_puuids = ["player1", "player2"]
         
         with pytest.raises(InsufficientDataError):
@@ -160,13 +162,11 @@ class TestComparativeAnalyzer:
         with pytest.raises(AnalyticsError, match="Need at least 2 players"):
             analyzer.compare_players(["player1"])
     
-    def test_calculate_percentile_rankings_success(self, analyzer, sample_matches):
+    def test_calculate_percentile_rankings_success(self, analyzer, match_manager):
         """Test successful percentile ranking calculation."""
-        # Mock match manager
-        analyzer.match_manager.get_player_matches.return_value = sample_matches
-        
         target_player = "target_player"
         comparison_pool = ["player1", "player2", "player3", "player4", "player5"]
+        store_matches(match_manager, [[target_player] + comparison_pool] * 20)
         
         rankings = analyzer.calculate_percentile_rankings(target_player, comparison_pool)
         
@@ -183,22 +183,18 @@ class TestComparativeAnalyzer:
     
     def test_calculate_percentile_rankings_insufficient_data(self, analyzer):
         """Test percentile ranking with insufficient data."""
-        # Mock match manager to return insufficient matches
-        analyzer.match_manager.get_player_matches.return_value = []
-        
+        # The store holds no matches for any player
         target_player = "target_player"
         comparison_pool = ["player1", "player2"]
         
         with pytest.raises(InsufficientDataError):
             analyzer.calculate_percentile_rankings(target_player, comparison_pool)
     
-    def test_analyze_peer_group_success(self, analyzer, sample_matches):
+    def test_analyze_peer_group_success(self, analyzer, match_manager):
         """Test successful peer group analysis."""
-        # Mock match manager
-        analyzer.match_manager.get_player_matches.return_value = sample_matches
-        
         target_player = "target_player"
         peer_pool = ["peer1", "peer2", "peer3", "peer4", "peer5", "peer6"]
+        store_matches(match_manager, [[target_player] + peer_pool] * 20)
         skill_tier = SkillTier.GOLD
         
         analysis = analyzer.analyze_peer_group(target_player, skill_tier, peer_pool)
@@ -222,16 +218,10 @@ class TestComparativeAnalyzer:
         for percentile in analysis.target_percentiles.values():
             assert 0 <= percentile <= 100
     
-    def test_analyze_peer_group_insufficient_peers(self, analyzer, sample_matches):
+    def test_analyze_peer_group_insufficient_peers(self, analyzer, match_manager):
         """Test peer group analysis with insufficient peers."""
-        # Mock match manager to return data for target but not enough peers
-        def mock_get_matches(puuid):
-            if puuid == "target_player":
-                return sample_matches
-            else:
-                return []  # No data for peers
-        
-        analyzer.match_manager.get_player_matches.side_effect = mock_get_matches
+        # Data for the target but none for the peers
+        store_matches(match_manager, [["target_player"]] * 20)
         
         target_player = "target_player"
         peer_pool = ["peer1", "peer2"]  # Too few peers
@@ -240,25 +230,15 @@ class TestComparativeAnalyzer:
         with pytest.raises(InsufficientDataError):
             analyzer.analyze_peer_group(target_player, skill_tier, peer_pool)
     
-    def test_calculate_role_specific_rankings_success(self, analyzer, sample_matches):
+    def test_calculate_role_specific_rankings_success(self, analyzer, match_manager):
         """Test successful role-specific ranking calculation."""
-        # Create matches with specific role
-        role_matches = []
-        for i, (match, participant) in enumerate(sample_matches):
-            # Set all participants to middle role for this test
-            participant.individual_position = "middle"
-            role_matches.append((match, participant))
-        
-        # Mock the _get_filtered_matches method directly to return role_matches for all players
-        def mock_get_filtered_matches(puuid, filters):
-            return role_matches
-        
-        analyzer._get_filtered_matches = mock_get_filtered_matches
-        
         player_puuid = "test_player"
         role = "middle"
         role_player_pool = ["test_player", "player1", "player2", "player3", "player4", "player5", "player6"]
         
+        # Every player plays the middle role in every match
+        store_matches(match_manager, [role_player_pool] * 20, individualPosition="MIDDLE")
+        
         ranking = analyzer.calculate_role_specific_rankings(
             player_puuid, role, role_player_pool
         )
@@ -283,26 +263,15 @@ class TestComparativeAnalyzer:
         for percentile in ranking.percentiles.values():
             assert 0 <= percentile <= 100
     
-    def test_calculate_champion_specific_rankings_success(self, analyzer, sample_matches):
+    def test_calculate_champion_specific_rankings_success(self, analyzer, match_manager):
         """Test successful champion-specific ranking calculation."""
-        # Create matches with specific champion
-        champion_matches = []
-        for i, (match, participant) in enumerate(sample_matches):
-            # Set all participants to champion 1 for this test
-            participant.champion_id = 1
-            participant.champion_name = "Champion_1"
-            champion_matches.append((match, participant))
-        
-        # Mock the _get_filtered_matches method directly to return champion_matches for all players
-        def mock_get_filtered_matches(puuid, filters):
-            return champion_matches
-        
-        analyzer._get_filtered_matches = mock_get_filtered_matches
-        
         player_puuid = "test_player"
         champion_id = 1
         champion_player_pool = ["test_player", "player1", "player2", "player3", "player4", "player5", "player6"]
         
+        # Every player is on champion 1 in every match
+        store_matches(match_manager, [champion_player_pool] * 20, championId=1, championName="Champion_1")
+        
         ranking = analyzer.calculate_champion_specific_rankings(
             player_puuid, champion_id, champion_player_pool
         )
@@ -470,28 +439,50 @@ class TestComparativeAnalyzer:
         percentile = analyzer._calculate_percentile(30.0, [10.0, 20.0, 30.0, 40.0, 50.0])
         assert percentile == 50.0
     
-    def test_extract_metric_values(self, analyzer, sample_matches):
-        """Test extraction of metric values from matches."""
+    def test_extract_metric_values(self, analyzer, match_manager):
+        """Test extraction of metric values from participant rows."""
+        store_matches(match_manager, [["player1"]] * 20)
+        rows = analyzer._get_filtered_rows("player1", None)
+        assert len(rows) == 20
+        
         # Test win rate extraction
-        win_values = analyzer._extract_metric_values(sample_matches, "win_rate")
-        assert len(win_values) == len(sample_matches)
+        win_values = analyzer._extract_metric_values(rows, "win_rate")
+        assert len(win_values) == len(rows)
         assert all(v in [0.0, 1.0] for v in win_values)
         
         # Test KDA extraction
-        kda_values = analyzer._extract_metric_values(sample_matches, "avg_kda")
-        assert len(kda_values) == len(sample_matches)
+        kda_values = analyzer._extract_metric_values(rows, "avg_kda")
+        assert len(kda_values) == len(rows)
         assert all(v >= 0 for v in kda_values)
         
         # Test CS per minute extraction
-        cs_values = analyzer._extract_metric_values(sample_matches, "avg_cs_per_min")
-        assert len(cs_values) == len(sample_matches)
+        cs_values = analyzer._extract_metric_values(rows, "avg_cs_per_min")
+        assert len(cs_values) == len(rows)
         assert all(v >= 0 for v in cs_values)
         
         # Test vision score extraction
-        vision_values = analyzer._extract_metric_values(sample_matches, "avg_vision_score")
-        assert len(vision_values) == len(sample_matches)
+        vision_values = analyzer._extract_metric_values(rows, "avg_vision_score")
+        assert len(vision_values) == len(rows)
         assert all(v >= 0 for v in vision_values)
     
+    def test_filtered_rows(self, analyzer, match_manager):
+        """Test that filters select the same games as checking each match."""
+        store_matches(match_manager, [["player1", "player2"]] * 20)
+        filters = AnalyticsFilters(champions=[1, 2], win_only=True, roles=["TOP"])
+        
+        rows = analyzer._get_filtered_rows("player1", filters)
+        
+        expected = sorted(
+            match.match_id for match, participant in match_manager.get_player_matches("player1")
+            if participant.champion_id in (1, 2) and participant.win
+        )
+        assert expected
+        assert sorted(match_manager.participant_table.match_ids(rows)) == expected
+        
+        filters.limit = 2
+        newest = analyzer._get_filtered_rows("player1", filters)
+        assert match_manager.participant_table.match_ids(newest) == sorted(expected, key=lambda m: -int(m[4:]))[:2]
+    
     def test_determine_mastery_level(self, analyzer):
         """Test mastery level determination."""
         # Test novice (few games)
@@ -514,13 +505,14 @@ class TestComparativeAnalyzer:
         mastery = analyzer._determine_mastery_level(60, {"win_rate": 95.0, "avg_kda": 90.0})
         assert mastery == "master"
     
-    def test_calculate_performance_metrics(self, analyzer, sample_matches):
+    def test_calculate_performance_metrics(self, analyzer, match_manager):
         """Test performance metrics calculation."""
-        performance = analyzer._calculate_performance_metrics(sample_matches)
+        store_matches(match_manager, [["player1"]] * 20)
+        performance = analyzer._calculate_performance_metrics(analyzer._get_filtered_rows("player1", None))
         
         # Verify basic metrics
         assert isinstance(performance, PerformanceMetrics)
-        assert performance.games_played == len(sample_matches)
+        assert performance.games_played == 20
         assert performance.wins + performance.losses == performance.games_played
         assert 0 <= performance.win_rate <= 1
         assert performance.avg_kda >= 0
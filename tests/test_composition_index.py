@@ -0,0 +1,220 @@
+"""
+Tests for the team composition signature index.
+
+This module checks index probes against brute-force scans of a real match
+store, through removals and reloads, and that the TeamCompositionAnalyzer
+gives the same answers with and without the index.
+"""
+
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock
+
+import numpy as np
+
+from lol_team_optimizer.composition_index import CompositionIndex, member_keys
+from lol_team_optimizer.config import Config
+from lol_team_optimizer.match_manager import MatchManager
+from lol_team_optimizer.team_composition_analyzer import TeamCompositionAnalyzer
+from tests.match_data import POSITIONS, ROLES, epoch_ms, raw_match
+
+
+def random_matches(count: int, seed: int = 7) -> list:
+    """Create matches whose blue side is drawn from a small pool of players and champions."""
+    rng = random.Random(seed)
+    now = datetime.now()
+    matches = []
+    for index in range(count):
+        blue = rng.sample(range(8), 5)
+        participants = []
+        for i in range(10):
+            champion_id = rng.randrange(1, 5)
+            participants.append({
+                "puuid": f"player{blue[i]}" if i < 5 else f"enemy{rng.randrange(50)}_{i}",
+                "summonerName": f"Summoner{i}",
+                "championId": champion_id,
+                "championName": f"Champion{champion_id}"
+            })
+        matches.append(raw_match(f"NA1_{index}", epoch_ms(now - timedelta(days=index % 200)),
+                                 participants, blue_wins=index % 2 == 0))
+    return matches
+
+
+def brute_force_teams(match_manager, members) -> set:
+    """Find (match_id, team_id) of teams holding every (puuid, role, champion) member by scanning."""
+    teams = set()
+    for match in match_manager.get_all_matches():
+        for team_id in (100, 200):
+            side = [p for p in match.participants if p.team_id == team_id]
+            if all(
+                any(p.puuid == puuid and ROLES[POSITIONS.index(p.individual_position)] == role
+                    and champion_id in (None, p.champion_id) for p in side)
+                for puuid, role, champion_id in members
+            ):
+                teams.add((match.match_id, team_id))
+    return teams
+
+
+class TestCompositionIndex:
+    """Test cases for the CompositionIndex class and its MatchManager queries."""
+    
+    def setup_method(self):
+        """Set up a real match store."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.config.data_directory = str(Path(self.temp_dir) / "data")
+        self.config.cache_directory = str(Path(self.temp_dir) / "cache")
+        Path(self.config.data_directory).mkdir(parents=True)
+        Path(self.config.cache_directory).mkdir(parents=True)
+        
+        self.match_manager = MatchManager(self.config)
+        self.match_manager.store_matches_batch(random_matches(400))
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def sample_members(self, match_manager, rng: random.Random) -> list:
+        """Pick 1 to 5 members of a stored blue side, with or without their champions."""
+        match = rng.choice(match_manager.get_all_matches())
+        side = [p for p in match.participants if p.team_id == 100]
+        return [
+            (side[i].puuid, ROLES[i], side[i].champion_id if rng.random() < 0.5 else None)
+            for i in sorted(rng.sample(range(5), rng.randint(1, 5)))
+        ]
+    
+    def assert_probes_match_scans(self, match_manager, trials: int = 40):
+        """Check exact and partial lookups against brute-force scans."""
+        rng = random.Random(3)
+        for _ in range(trials):
+            members = self.sample_members(match_manager, rng)
+            teams = match_manager.get_composition_teams(members)
+            assert len(teams) == len(set(teams))
+            assert set(teams) == brute_force_teams(match_manager, members)
+    
+    def test_lookups_match_brute_force(self):
+        """Test that full, partial and champion-free lookups equal scans."""
+        self.assert_probes_match_scans(self.match_manager)
+        
+        assert self.match_manager.get_composition_teams([("nobody", "top", None)]) == []
+        assert self.match_manager.get_composition_teams([("player0", "top", None), ("player1", "top", None)]) == []
+        # Two players in one match but on opposite teams are not a composition
+        enemy = self.match_manager.get_match("NA1_0").participants[5]
+        assert ("NA1_0", 100) not in self.match_manager.get_composition_teams([
+            (self.match_manager.get_match("NA1_0").participants[0].puuid, "top", None),
+            (enemy.puuid, "top", None)
+        ])
+    
+    def test_teams_sharing_players(self):
+        """Test that sharing queries find every team with enough players in the same roles."""
+        lineup = [(f"player{i}", role) for i, role in enumerate(ROLES)]
+        teams = set(self.match_manager.get_teams_sharing_players(lineup, 3))
+        
+        expected = set()
+        for match in self.match_manager.get_all_matches():
+            shared = sum(
+                (p.puuid, ROLES[POSITIONS.index(p.individual_position)]) in lineup
+                for p in match.participants if p.team_id == 100
+            )
+            if shared >= 3:
+                expected.add((match.match_id, 100))
+        assert teams == expected
+        assert self.match_manager.get_teams_sharing_players(lineup[:2], 3) == []
+    
+    def test_distinct_compositions(self):
+        """Test that distinct compositions count every full team once."""
+        distinct = self.match_manager.get_distinct_compositions()
+        assert sum(count for _, _, count in distinct) == 800
+        
+        seen = set()
+        for match_id, team_id, _ in distinct:
+            side = [p for p in self.match_manager.get_match(match_id).participants if p.team_id == team_id]
+            composition = frozenset((p.puuid, p.individual_position, p.champion_id) for p in side)
+            assert composition not in seen
+            seen.add(composition)
+    
+    def test_removal_and_reload(self):
+        """Test that cleanup unindexes matches and a reloaded manager rebuilds the index."""
+        removed = self.match_manager.cleanup_old_matches(100)
+        assert removed > 0
+        assert len(self.match_manager.composition_index) == 2 * (400 - removed)
+        self.assert_probes_match_scans(self.match_manager)
+        
+        reloaded = MatchManager(self.config)
+        assert len(reloaded.composition_index) == 2 * (400 - removed)
+        self.assert_probes_match_scans(reloaded)
+    
+    def test_dead_sides_are_dropped(self):
+        """Test that sides are renumbered once removed sides outnumber live ones."""
+        index = self.match_manager.composition_index
+        postings = index.posting_count
+        self.match_manager.cleanup_old_matches(20)
+        
+        assert len(index) == 2 * len(self.match_manager.get_all_matches())
+        assert index._side_count <= 2 * len(index)
+        assert index.posting_count < postings / 2
+        self.assert_probes_match_scans(self.match_manager)
+        
+        empty = CompositionIndex()
+        assert len(empty.sides_with_members(member_keys(np.arange(5), np.arange(5)))) == 0
+
+
+class TestAnalyzerWithCompositionIndex:
+    """Test that TeamCompositionAnalyzer answers equal the full-scan fallback."""
+    
+    def setup_method(self):
+        """Set up analyzers over the same store with and without the index."""
+        self.temp_dir = tempfile.mkdtemp()
+        config = Config()
+        config.data_directory = str(Path(self.temp_dir) / "data")
+        config.cache_directory = str(Path(self.temp_dir) / "cache")
+        Path(config.data_directory).mkdir(parents=True)
+        Path(config.cache_directory).mkdir(parents=True)
+        
+        match_manager = MatchManager(config)
+        match_manager.store_matches_batch(random_matches(300))
+        self.indexed = TeamCompositionAnalyzer(match_manager, Mock(), config)
+        
+        # The same manager seen through a Mock only exposes the pre-index API
+        fallback_manager = Mock(spec=["get_matches_for_player", "get_all_matches"])
+        fallback_manager.get_matches_for_player.side_effect = match_manager.get_matches_for_player
+        fallback_manager.get_all_matches.side_effect = match_manager.get_all_matches
+        self.fallback = TeamCompositionAnalyzer(fallback_manager, Mock(), config)
+        
+        self.compositions = self.indexed._get_all_historical_compositions()
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_historical_compositions(self):
+        """Test that both paths find the same distinct compositions."""
+        assert self.indexed._has_composition_index()
+        assert not self.fallback._has_composition_index()
+        
+        fallback_ids = [c.composition_id for c in self.fallback._get_all_historical_compositions()]
+        assert sorted(c.composition_id for c in self.compositions) == sorted(fallback_ids)
+    
+    def test_composition_matches(self):
+        """Test that index lookups find the matches the fallback scan finds."""
+        for composition in self.compositions[:25]:
+            indexed = self.indexed._find_composition_matches(composition)
+            fallback = self.fallback._find_composition_matches(composition)
+            assert indexed
+            assert sorted(match.match_id for match, _ in indexed) == \
+                sorted(match.match_id for match, _ in fallback)
+    
+    def test_similar_compositions(self):
+        """Test that candidate pruning keeps every composition above the threshold."""
+        found = 0
+        for threshold in (0.5, 0.6, 0.7):
+            for composition in self.compositions[:10]:
+                indexed = self.indexed.find_similar_compositions(composition, threshold)
+                fallback = self.fallback.find_similar_compositions(composition, threshold)
+                assert sorted((s.composition_id, s.similarity_score) for s in indexed) == \
+                    sorted((s.composition_id, s.similarity_score) for s in fallback)
+                found += len(indexed)
+        assert found > 0
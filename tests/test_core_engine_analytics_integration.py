@@ -120,7 +120,7 @@ class TestCoreEngineAnalyticsIntegration:
              patch('lol_team_optimizer.core_engine.SynergyManager'), \
              patch('lol_team_optimizer.core_engine.OptimizationEngine'), \
              patch('lol_team_optimizer.core_engine.DataMigrator'), \
-             patch('lol_team_optimizer.core_engine.AnalyticsCacheManager'), \
+             patch('lol_team_optimizer.core_engine.get_shared_cache_manager'), \
              patch('lol_team_optimizer.core_engine.BaselineManager'), \
              patch('lol_team_optimizer.core_engine.StatisticalAnalyzer'), \
              patch('lol_team_optimizer.core_engine.ChampionSynergyAnalyzer'), \
@@ -146,7 +146,7 @@ class TestCoreEngineAnalyticsIntegration:
              patch('lol_team_optimizer.core_engine.SynergyManager'), \
              patch('lol_team_optimizer.core_engine.OptimizationEngine'), \
              patch('lol_team_optimizer.core_engine.DataMigrator'), \
-             patch('lol_team_optimizer.core_engine.AnalyticsCacheManager', side_effect=Exception("Analytics init failed")):
+             patch('lol_team_optimizer.core_engine.get_shared_cache_manager', side_effect=Exception("Analytics init failed")):
             
             engine = CoreEngine()
             
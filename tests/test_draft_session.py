@@ -0,0 +1,165 @@
+"""
+Tests for incremental draft-session recommendations.
+
+This module drafts against a real match store and checks that the session's
+incrementally updated rankings equal full scoring with the same team context.
+"""
+
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock
+import numpy as np
+import pytest
+
+from lol_team_optimizer.baseline_manager import BaselineManager
+from lol_team_optimizer.champion_recommendation_engine import ChampionRecommendationEngine
+from lol_team_optimizer.config import Config
+from lol_team_optimizer.draft_session import DraftSession
+from lol_team_optimizer.historical_analytics_engine import HistoricalAnalyticsEngine
+from lol_team_optimizer.match_manager import MatchManager
+from tests.match_data import ROLES, epoch_ms, raw_match
+
+
+def random_matches(count: int) -> list:
+    """Create matches where player i plays role i in most games."""
+    rng = random.Random(11)
+    now = datetime.now()
+    matches = []
+    for index in range(count):
+        timestamp = epoch_ms(now - timedelta(days=rng.uniform(0, 120)))
+        champions = rng.sample(range(1, 25), 10)
+        blue_wins = rng.random() < 0.5
+        participants = [
+            {
+                "puuid": f"player{i}" if i < 5 and index % 5 != i else f"p{rng.randrange(100)}",
+                "championId": champion_id,
+                "championName": f"Champion{champion_id}",
+                "kills": rng.randrange(10), "deaths": rng.randrange(10), "assists": rng.randrange(15),
+                "totalMinionsKilled": rng.randrange(250), "visionScore": rng.randrange(40)
+            }
+            for i, champion_id in enumerate(champions)
+        ]
+        matches.append(raw_match(f"NA1_{index}", timestamp, participants, blue_wins))
+    return matches
+
+
+class TestDraftSession:
+    """Test cases for the DraftSession class."""
+    
+    def setup_method(self):
+        """Set up a real match store and recommendation engine."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.config.data_directory = str(Path(self.temp_dir) / "data")
+        self.config.cache_directory = str(Path(self.temp_dir) / "cache")
+        Path(self.config.data_directory).mkdir(parents=True)
+        Path(self.config.cache_directory).mkdir(parents=True)
+        
+        match_manager = MatchManager(self.config)
+        match_manager.store_matches_batch(random_matches(800))
+        baseline_manager = BaselineManager(self.config, match_manager)
+        analytics_engine = HistoricalAnalyticsEngine(self.config, match_manager, baseline_manager)
+        champion_data = Mock()
+        champion_data.get_champions_by_role.return_value = list(range(1, 25))
+        champion_data.get_champion_name.side_effect = lambda champion_id: f"Champion{champion_id}"
+        self.engine = ChampionRecommendationEngine(self.config, analytics_engine, champion_data, baseline_manager)
+        self.players = {role: f"player{i}" for i, role in enumerate(ROLES)}
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def assert_matches_full_scoring(self, session):
+        """Check every open role's ranking against score_candidates with the session's context."""
+        for role in session.open_roles:
+            team_context = session.team_context(role)
+            weights = self.engine.get_scoring_weights(role, team_context)
+            candidates = [
+                champion_id for champion_id in self.engine.get_candidate_champions(role, team_context)
+                if champion_id not in session.unavailable_champions
+            ]
+            scores = self.engine.score_candidates(self.players[role], role, candidates, team_context)
+            totals = scores.total_scores(weights)
+            expected = scores.champion_ids[np.argsort(-totals, kind='stable')][:5]
+            
+            ranking = session.ranking(role, max_recommendations=5)
+            assert [score.champion_id for score in ranking] == expected.tolist()
+            assert [score.total_score for score in ranking] == pytest.approx(np.sort(totals)[::-1][:5].tolist())
+    
+    def test_incremental_updates_match_full_scoring(self):
+        """Test that every pick and ban keeps the rankings equal to full re-scoring."""
+        session = DraftSession(self.engine, self.players)
+        assert session.open_roles == ROLES
+        self.assert_matches_full_scoring(session)
+        
+        for update in [
+            lambda: session.ban(3),
+            lambda: session.pick("jungle", 5),
+            lambda: session.enemy_pick("middle", 7),
+            lambda: session.enemy_pick("top", 8),
+            lambda: session.pick("support", 2),
+            lambda: session.ban(1),
+            lambda: session.pick("top", 6),
+        ]:
+            rankings = update()
+            assert list(rankings) == session.open_roles
+            self.assert_matches_full_scoring(session)
+        
+        assert session.open_roles == ["middle", "bottom"]
+        assert session.unavailable_champions == {1, 2, 3, 5, 6, 7, 8}
+    
+    def test_unavailable_champions_leave_every_role(self):
+        """Test that bans and picks remove champions from all open roles."""
+        session = DraftSession(self.engine, self.players)
+        top_choice = session.ranking("top")[0].champion_id
+        
+        rankings = session.ban(top_choice)
+        assert all(top_choice not in [score.champion_id for score in ranking] for ranking in rankings.values())
+        
+        rankings = session.enemy_pick("bottom", session.ranking("middle")[0].champion_id)
+        assert "bottom" in rankings  # enemy picks do not close our roles
+    
+    def test_invalid_updates(self):
+        """Test that repeated roles, unavailable champions and unknown roles are rejected."""
+        session = DraftSession(self.engine, self.players)
+        session.pick("top", 4)
+        
+        with pytest.raises(ValueError):
+            session.pick("top", 9)
+        with pytest.raises(ValueError):
+            session.enemy_pick("top", 4)
+        with pytest.raises(ValueError):
+            session.pick("mid", 9)
+        with pytest.raises(ValueError):
+            session.ranking("top")
+        with pytest.raises(ValueError):
+            DraftSession(self.engine, {"adc": "player3"})
+    
+    def test_partial_team_and_champion_pool(self):
+        """Test unknown teammates' picks and a restricted champion pool."""
+        session = DraftSession(self.engine, {"middle": "player2"}, available_champions=[1, 2, 3, 4, 20])
+        assert session.open_roles == ["middle"]
+        
+        rankings = session.pick("jungle", 20, player_name="Teammate")
+        assert set(score.champion_id for score in rankings["middle"]) <= {1, 2, 3, 4}
+        assert session.ally_picks["jungle"].puuid == "jungle_ally"
+        self.assert_matches_full_scoring(session)
+    
+    def test_full_recommendations(self):
+        """Test that full recommendations follow the session ranking."""
+        session = DraftSession(self.engine, self.players)
+        session.pick("jungle", 5)
+        session.enemy_pick("middle", 7)
+        
+        recommendations = session.recommendations("middle", max_recommendations=3)
+        
+        assert [rec.champion_id for rec in recommendations] == \
+            [score.champion_id for score in session.ranking("middle", max_recommendations=3)]
+        assert all(rec.role == "middle" for rec in recommendations)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
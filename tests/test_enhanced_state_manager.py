@@ -22,6 +22,8 @@ from lol_team_optimizer.web_state_models import (
     WebInterfaceState, UserPreferences, OperationState, CacheEntry,
     CacheStrategy, SessionStatus, ShareableResult, SQLiteStorage, FileStorage
 )
+from lol_team_optimizer.analytics_cache_manager import AnalyticsCacheManager
+from lol_team_optimizer.config import Config
 
 
 class TestCacheInvalidationManager:
@@ -167,6 +169,35 @@ class TestAdvancedCacheManager:
         assert stats.miss_count == 1
         assert stats.hit_rate == 2/3
     
+    def test_pattern_invalidation_uses_key_boundaries(self, cache_manager):
+        """Test that pattern invalidation matches whole '_' or ':' segments."""
+        cache_manager.put("user_12_profile", "profile_12")
+        cache_manager.put("user_123_profile", "profile_123")
+        cache_manager.put("team:user_12", "team_data")
+        
+        invalidated = cache_manager.invalidate_pattern("user_12_")
+        
+        assert invalidated == {"user_12_profile"}
+        assert cache_manager.get("user_123_profile") == "profile_123"
+        assert cache_manager.get("team:user_12") == "team_data"
+    
+    def test_shared_memory_tier(self, temp_storage):
+        """Test that the web cache serves entries cached by the analytics engines."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            analytics_cache = AnalyticsCacheManager(Config(cache_directory=temp_dir))
+            state_manager = EnhancedStateManager(persistent_storage=temp_storage,
+                                                 analytics_cache=analytics_cache)
+            
+            analytics_cache.cache_analytics("optimize_team:players=a", {"score": 1}, persistent=False)
+            state_manager.cache_result("analytics_summary", {"games": 20})
+            
+            assert state_manager.get_cached_result("optimize_team:players=a") == {"score": 1}
+            assert analytics_cache.get_cached_analytics("analytics_summary") == {"games": 20}
+            
+            info = state_manager.get_system_statistics()["cache"]
+            assert info["total_entries"] == 1
+            assert info["namespaces"]["optimize_team"]["hits"] == 1
+    
     def test_persistent_storage_integration(self, cache_manager):
         """Test integration with persistent storage."""
         # Put value in cache
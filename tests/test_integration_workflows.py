@@ -12,6 +12,7 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from lol_team_optimizer.config import Config
 from lol_team_optimizer.core_engine import CoreEngine
 from lol_team_optimizer.streamlined_cli import StreamlinedCLI
 from lol_team_optimizer.models import Player, ChampionMastery
@@ -19,12 +20,18 @@ from lol_team_optimizer.models import Player, ChampionMastery
 
 def create_mock_config():
     """Create a properly configured mock config object."""
-    mock_config = Mock()
+    mock_config = Mock(spec=Config)
     mock_config.cache_directory = "/tmp/cache"
     mock_config.data_directory = "/tmp/data"
     mock_config.individual_weight = 0.4
     mock_config.preference_weight = 0.3
     mock_config.synergy_weight = 0.3
+    mock_config.match_segment_max_mb = 64
+    mock_config.match_compaction_ratio = 0.5
+    mock_config.match_store_fsync = False
+    mock_config.match_cache_size = 5000
+    mock_config.analytics_batch_workers = 0
+    mock_config.analytics_process_batch_min = 16
     return mock_config
 
 
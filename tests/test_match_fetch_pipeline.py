@@ -0,0 +1,305 @@
+"""
+Tests for the concurrent match fetching pipeline.
+
+This module runs the Riot API client and the fetch pipeline against a local
+stub HTTP server to verify rate limiting, bounded concurrency, and batched
+storage.
+"""
+
+import json
+import re
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qs
+import pytest
+
+from lol_team_optimizer.config import Config
+from lol_team_optimizer.match_fetch_pipeline import MatchFetchPipeline
+from lol_team_optimizer.match_manager import MatchManager
+from lol_team_optimizer.riot_client import MultiWindowRateLimiter, RiotAPIClient
+
+
+def stub_match_data(match_id: str, puuid: str) -> dict:
+    """Create minimal match data in Riot API format."""
+    participants = []
+    for i in range(10):
+        participants.append({
+            "puuid": puuid if i == 0 else f"{match_id}-p{i}",
+            "riotIdGameName": f"Player{i}",
+            "riotIdTagline": "NA1",
+            "championId": i + 1,
+            "championName": f"Champion{i}",
+            "teamId": 100 if i < 5 else 200,
+            "individualPosition": ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"][i % 5],
+            "kills": 1, "deaths": 1, "assists": 1,
+            "win": i < 5
+        })
+    return {
+        "metadata": {"matchId": match_id},
+        "info": {
+            "gameCreation": int(time.time() * 1000),
+            "gameDuration": 1800,
+            "gameEndTimestamp": int(time.time() * 1000),
+            "gameMode": "CLASSIC",
+            "gameType": "MATCHED_GAME",
+            "mapId": 11,
+            "queueId": 420,
+            "gameVersion": "14.1.1",
+            "participants": participants,
+            "teams": [{"teamId": 100, "win": True}, {"teamId": 200, "win": False}]
+        }
+    }
+
+
+class StubRiotHandler(BaseHTTPRequestHandler):
+    """Serves match history and match detail endpoints from the server's state."""
+    
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.request_times.append(time.monotonic())
+        try:
+            time.sleep(server.latency)
+            with server.lock:
+                throttled = server.throttle > 0
+                if throttled:
+                    server.throttle -= 1
+                    server.throttled_at = time.monotonic()
+            if throttled:
+                self.send_response(429)
+                self.send_header("Retry-After", "1")
+                self.end_headers()
+                return
+            
+            url = urlparse(self.path)
+            history = re.fullmatch(r"/lol/match/v5/matches/by-puuid/([^/]+)/ids", url.path)
+            details = re.fullmatch(r"/lol/match/v5/matches/([^/]+)", url.path)
+            
+            if history:
+                params = parse_qs(url.query)
+                start, count = int(params["start"][0]), int(params["count"][0])
+                body = server.histories.get(history.group(1), [])[start:start + count]
+            elif details and details.group(1) in server.matches:
+                body = server.matches[details.group(1)]
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class TestMultiWindowRateLimiter:
+    """Test cases for the MultiWindowRateLimiter class."""
+    
+    def test_all_windows_enforced(self):
+        """Test that a request must fit every window."""
+        limiter = MultiWindowRateLimiter([(100, 120), (2, 1)])
+        
+        assert limiter.max_requests == 100
+        assert limiter.time_window == 120
+        limiter.record_request()
+        limiter.record_request()
+        assert not limiter.can_make_request()
+        assert 0 < limiter.wait_time() <= 1
+    
+    def test_acquire_waits_for_short_window(self):
+        """Test that acquire blocks until the short window frees up."""
+        limiter = MultiWindowRateLimiter([(3, 0.2), (100, 120)])
+        
+        start = time.monotonic()
+        for _ in range(7):
+            limiter.acquire()
+        
+        # Seven requests at three per 0.2s need at least two refills
+        assert time.monotonic() - start >= 0.4
+    
+    def test_penalty_blocks_every_thread(self):
+        """Test that block_until holds back acquire in all threads."""
+        limiter = MultiWindowRateLimiter([(100, 1)])
+        start = time.monotonic()
+        limiter.block_until(start + 0.3)
+        # An earlier deadline does not shorten the pending one
+        limiter.block_until(start)
+        
+        assert not limiter.can_make_request()
+        assert 0.2 < limiter.wait_time() <= 0.3
+        
+        times = []
+        
+        def worker():
+            limiter.acquire()
+            times.append(time.monotonic())
+        
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(times) == 4
+        assert min(times) - start >= 0.3 - 0.01
+    
+    def test_shared_between_threads(self):
+        """Test that concurrent callers together stay within the window."""
+        limiter = MultiWindowRateLimiter([(5, 0.25)])
+        times = []
+        lock = threading.Lock()
+        
+        def worker():
+            for _ in range(3):
+                limiter.acquire()
+                with lock:
+                    times.append(time.monotonic())
+        
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        times.sort()
+        assert len(times) == 12
+        for i in range(len(times) - 5):
+            assert times[i + 5] - times[i] >= 0.25 - 0.01
+
+
+class TestMatchFetchPipeline:
+    """Test cases for the MatchFetchPipeline class against a stub server."""
+    
+    def setup_method(self):
+        """Set up the stub server, client, and match manager."""
+        self.temp_dir = tempfile.mkdtemp()
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubRiotHandler)
+        self.server.lock = threading.Lock()
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.request_times = []
+        self.server.latency = 0.02
+        self.server.throttle = 0
+        self.server.histories = {
+            f"puuid-{p}": [f"NA1_{p}_{i}" for i in range(30)] for p in range(3)
+        }
+        self.server.matches = {
+            match_id: stub_match_data(match_id, puuid)
+            for puuid, match_ids in self.server.histories.items() for match_id in match_ids
+        }
+        self.server_thread = threading.Thread(target=self.server.serve_forever,
+                                              kwargs={"poll_interval": 0.05}, daemon=True)
+        self.server_thread.start()
+        
+        self.config = Config(
+            riot_api_key="test_api_key",
+            riot_api_base_url=f"http://127.0.0.1:{self.server.server_address[1]}",
+            riot_api_rate_limit=1000,
+            riot_api_rate_limit_per_second=200,
+            max_concurrent_requests=4,
+            data_directory=str(Path(self.temp_dir) / "data"),
+            cache_directory=str(Path(self.temp_dir) / "cache")
+        )
+        self.client = RiotAPIClient(self.config)
+        self.match_manager = MatchManager(self.config)
+    
+    def teardown_method(self):
+        """Stop the stub server and clean up."""
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_fetch_and_store_concurrently(self):
+        """Test that details are fetched in parallel and stored in batches."""
+        pipeline = MatchFetchPipeline(self.client, self.match_manager, store_batch_size=25)
+        match_ids = self.server.histories["puuid-0"] + self.server.histories["puuid-1"]
+        
+        with patch.object(self.match_manager, 'store_matches_batch',
+                          wraps=self.match_manager.store_matches_batch) as store:
+            result = pipeline.fetch_and_store(match_ids + match_ids[:5])
+        
+        assert result.requested == 60
+        assert result.fetched == 60
+        assert result.new_matches == 60
+        assert sorted(result.stored_match_ids) == sorted(match_ids)
+        assert [len(call.args[0]) for call in store.call_args_list] == [25, 25, 10]
+        assert 1 < self.server.max_in_flight <= 4
+        
+        # Stored matches are skipped without another request
+        requests_before = len(self.server.request_times)
+        again = pipeline.fetch_and_store(match_ids)
+        assert again.already_stored == 60
+        assert again.fetched == 0
+        assert len(self.server.request_times) == requests_before
+    
+    def test_failed_matches_reported(self):
+        """Test that matches the server does not have are reported as failed."""
+        pipeline = MatchFetchPipeline(self.client, self.match_manager)
+        
+        result = pipeline.fetch_and_store(["NA1_0_0", "NA1_MISSING"])
+        
+        assert result.new_matches == 1
+        assert result.failed_match_ids == ["NA1_MISSING"]
+        assert self.match_manager.has_match("NA1_0_0")
+    
+    def test_fetch_match_histories(self):
+        """Test that history pages for several players are fetched together."""
+        pipeline = MatchFetchPipeline(self.client, self.match_manager)
+        
+        histories = pipeline.fetch_match_histories(
+            {"puuid-0": (0, 20), "puuid-1": (20, 20), "puuid-unknown": (0, 20)}, queue=420)
+        
+        assert histories["puuid-0"] == self.server.histories["puuid-0"][:20]
+        assert histories["puuid-1"] == self.server.histories["puuid-1"][20:]
+        assert histories["puuid-unknown"] == []
+    
+    def test_rate_limit_penalty_pauses_every_worker(self):
+        """Test that a 429's Retry-After holds back all workers, not only the one that got it."""
+        self.server.throttle = 1
+        pipeline = MatchFetchPipeline(self.client, self.match_manager)
+        
+        result = pipeline.fetch_and_store(self.server.histories["puuid-2"][:20])
+        
+        assert result.fetched == 20
+        # Requests already sent may land just after the 429, but none start during the penalty
+        throttled_at = self.server.throttled_at
+        assert not [t for t in self.server.request_times if throttled_at + 0.1 < t < throttled_at + 0.95]
+        assert max(self.server.request_times) >= throttled_at + 0.95
+    
+    def test_rate_limit_respected(self):
+        """Test that concurrent fetches stay within the per-second window."""
+        self.config.riot_api_rate_limit_per_second = 10
+        self.client.close()
+        self.client = RiotAPIClient(self.config)
+        self.server.latency = 0
+        pipeline = MatchFetchPipeline(self.client, self.match_manager)
+        
+        result = pipeline.fetch_and_store(self.server.histories["puuid-2"][:25])
+        
+        assert result.fetched == 25
+        times = sorted(self.server.request_times)
+        for i in range(len(times) - 10):
+            assert times[i + 10] - times[i] >= 0.9
+        # The window is the bottleneck, so throughput stays close to it
+        assert result.elapsed_seconds < 3.5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,226 @@
+"""
+Tests for the streaming bulk importer of raw Riot match dumps.
+
+This module imports JSONL, gzip and whole-file JSON dumps into a temporary
+match store and checks deduplication, batching and error accounting.
+"""
+
+import gzip
+import json
+import shutil
+import tempfile
+from pathlib import Path
+import pytest
+
+from lol_team_optimizer.config import Config
+from lol_team_optimizer import match_importer
+from lol_team_optimizer.match_importer import MatchImporter, _iter_json_array, iter_dump_files, main
+from lol_team_optimizer.match_manager import MatchManager
+from tests.match_data import raw_match
+
+
+def importer_match(match_id: str, game_creation: int = 1700000000000) -> dict:
+    """Create a match-v5 record, including fields the importer prunes."""
+    return raw_match(match_id, game_creation, [
+        {
+            "puuid": f"{match_id}-p{i}",
+            "riotIdGameName": f"Player{i}",
+            "riotIdTagline": "NA1",
+            "championId": i + 1,
+            "championName": f"Champion{i}",
+            "kills": 2, "deaths": 1, "assists": 3,
+            "challenges": {"kda": 5.0}
+        }
+        for i in range(10)
+    ], gameVersion="14.1.1")
+
+
+class TestMatchImporter:
+    """Test cases for the MatchImporter class."""
+    
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_dir = Path(self.temp_dir) / "data"
+        self.dump_dir = Path(self.temp_dir) / "dumps"
+        self.dump_dir.mkdir(parents=True)
+        
+        self.config = Config()
+        self.config.data_directory = str(self.data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.match_manager = MatchManager(self.config)
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def write_jsonl(self, name: str, records: list) -> Path:
+        path = self.dump_dir / name
+        opener = gzip.open if name.endswith('.gz') else open
+        with opener(path, 'wt', encoding='utf-8') as f:
+            for record in records:
+                f.write(record if isinstance(record, str) else json.dumps(record))
+                f.write("\n")
+        return path
+    
+    def test_imports_jsonl_and_gzip_in_batches(self):
+        """Test that plain and gzipped JSONL dumps are stored in batches."""
+        self.write_jsonl("a.jsonl", [importer_match(f"NA1_{i}") for i in range(5)])
+        self.write_jsonl("b.jsonl.gz", [importer_match(f"NA1_{i}") for i in range(5, 12)])
+        (self.dump_dir / "notes.txt").write_text("not a dump")
+        
+        batch_sizes = []
+        self.match_manager.add_match_listener(lambda matches: batch_sizes.append(len(matches)))
+        progress = []
+        importer = MatchImporter(self.match_manager, batch_size=4,
+                                 progress_callback=lambda result: progress.append(result.new_matches))
+        result = importer.import_paths([self.dump_dir])
+        
+        assert result.files == 2
+        assert result.records_read == 12
+        assert result.new_matches == 12
+        assert batch_sizes == [4, 4, 4]
+        assert progress == [4, 8, 12]
+        assert result.bytes_read > 0
+        assert result.records_per_second > 0
+        
+        match = self.match_manager.get_match("NA1_7")
+        assert match is not None
+        assert len(match.participants) == 10
+        assert match.winning_team == 100
+    
+    def test_deduplicates_against_store_and_within_run(self):
+        """Test that stored matches and repeats in the dump are skipped."""
+        self.match_manager.store_match(importer_match("NA1_0"))
+        self.write_jsonl("dump.jsonl", [importer_match("NA1_0"), importer_match("NA1_1"), importer_match("NA1_1"), importer_match("NA1_2")])
+        
+        result = MatchImporter(self.match_manager, batch_size=100).import_paths([self.dump_dir])
+        
+        assert result.new_matches == 2
+        assert result.duplicates_skipped == 2
+        assert len(self.match_manager.get_all_matches()) == 3
+        
+        # A second run finds everything already stored
+        rerun = MatchImporter(self.match_manager).import_paths([self.dump_dir])
+        assert rerun.new_matches == 0
+        assert rerun.duplicates_skipped == 4
+    
+    def test_invalid_records_are_counted_and_skipped(self):
+        """Test that malformed lines and non-match records do not stop the import."""
+        self.write_jsonl("dump.jsonl", [
+            importer_match("NA1_1"),
+            '{"metadata": {"matchId": "NA1_BROKEN"',
+            {"metadata": {"matchId": "NA1_NO_INFO"}},
+            {"status": {"status_code": 404}},
+            "",
+            importer_match("NA1_2"),
+        ])
+        
+        result = MatchImporter(self.match_manager).import_paths([self.dump_dir])
+        
+        assert result.records_read == 5
+        assert result.new_matches == 2
+        assert result.invalid_records == 3
+        assert not self.match_manager.has_match("NA1_BROKEN")
+    
+    def test_records_the_store_cannot_parse_are_invalid(self):
+        """Test that a well-formed record the match manager rejects counts as invalid, not duplicate."""
+        unparsable = importer_match("NA1_2")
+        unparsable["info"]["participants"][0]["riotIdGameName"] = None
+        self.write_jsonl("dump.jsonl", [importer_match("NA1_1"), unparsable, importer_match("NA1_1")])
+        
+        result = MatchImporter(self.match_manager).import_paths([self.dump_dir])
+        
+        assert result.new_matches == 1
+        assert result.duplicates_skipped == 1
+        assert result.invalid_records == 1
+        assert result.failed_records == 0
+        assert not self.match_manager.has_match("NA1_2")
+    
+    def test_decode_workers_preserve_order(self):
+        """Test that decoding in worker processes stores the same matches in file order."""
+        self.write_jsonl("dump.jsonl", [importer_match(f"NA1_{i}") for i in range(450)] + [importer_match("NA1_3"), "not json"])
+        
+        stored = []
+        self.match_manager.add_match_listener(lambda matches: stored.extend(match.match_id for match in matches))
+        result = MatchImporter(self.match_manager, batch_size=100, workers=2).import_paths([self.dump_dir])
+        
+        assert result.new_matches == 450
+        assert result.duplicates_skipped == 1
+        assert result.invalid_records == 1
+        assert stored == [f"NA1_{i}" for i in range(450)]
+    
+    def test_whole_file_json_documents(self):
+        """Test single-match and match-list .json files."""
+        (self.dump_dir / "single.json").write_text(json.dumps(importer_match("NA1_1"), indent=2))
+        with gzip.open(self.dump_dir / "list.json.gz", 'wt', encoding='utf-8') as f:
+            json.dump([importer_match("NA1_2"), importer_match("NA1_3")], f)
+        
+        result = MatchImporter(self.match_manager).import_paths([self.dump_dir])
+        
+        assert result.new_matches == 3
+        assert [path.name for path in iter_dump_files([self.dump_dir])] == ["list.json.gz", "single.json"]
+    
+    def test_match_list_read_in_blocks(self, monkeypatch):
+        """Test that match lists are decoded element by element across read blocks."""
+        monkeypatch.setattr(match_importer, "READ_BLOCK_SIZE", 97)
+        matches = [importer_match(f"NA1_{i}") for i in range(20)]
+        (self.dump_dir / "list.json").write_text(" [\n" + ",\n ".join(json.dumps(m) for m in matches) + "\n] ")
+        damaged = json.dumps([importer_match(f"NA1_{i}") for i in range(20, 30)])
+        (self.dump_dir / "damaged.json").write_text(damaged[:len(damaged) // 2])
+        
+        result = MatchImporter(self.match_manager).import_paths([self.dump_dir])
+        
+        # The damaged list keeps the matches before the cut
+        assert result.invalid_records == 1
+        assert 20 < result.new_matches < 30
+        assert result.bytes_read == sum(path.stat().st_size for path in self.dump_dir.iterdir())
+        assert all(self.match_manager.has_match(f"NA1_{i}") for i in range(21))
+        assert list(_iter_json_array(iter([b"[ ]"]))) == []
+        assert list(_iter_json_array(iter([b"[1", b"2, [3", b"]]"]))) == [12, [3]]
+        with pytest.raises(ValueError):
+            list(_iter_json_array(iter([b"[1 2]"])))
+    
+    def test_truncated_gzip_keeps_complete_records(self):
+        """Test that a damaged archive is reported without losing earlier records."""
+        path = self.write_jsonl("dump.jsonl.gz", [importer_match(f"NA1_{i}") for i in range(50)])
+        data = path.read_bytes()
+        path.write_bytes(data[:len(data) * 3 // 4])
+        
+        result = MatchImporter(self.match_manager, batch_size=10).import_paths([path])
+        
+        assert result.invalid_records == 1
+        assert 0 < result.new_matches < 50
+        assert len(self.match_manager.get_all_matches()) == result.new_matches
+    
+    def test_imported_matches_survive_reload(self):
+        """Test that imported matches are persisted and indexed on reopen."""
+        self.write_jsonl("dump.jsonl", [importer_match(f"NA1_{i}") for i in range(3)])
+        MatchImporter(self.match_manager).import_paths([self.dump_dir])
+        
+        reloaded = MatchManager(self.config)
+        assert reloaded.has_match("NA1_2")
+        assert len(reloaded.get_matches_for_player("NA1_2-p3")) == 1
+    
+    def test_rejects_read_only_manager_and_bad_batch_size(self):
+        """Test importer argument validation."""
+        with pytest.raises(ValueError):
+            MatchImporter(self.match_manager, batch_size=0)
+        with pytest.raises(ValueError):
+            MatchImporter(MatchManager(self.config, read_only=True))
+    
+    def test_command_line_import(self, capsys):
+        """Test the command-line entry point."""
+        self.write_jsonl("dump.jsonl", [importer_match("NA1_1"), importer_match("NA1_2")])
+        cli_data_dir = Path(self.temp_dir) / "cli_data"
+        
+        assert main([str(self.dump_dir), "--data-dir", str(cli_data_dir), "--batch-size", "1"]) == 0
+        assert "Imported 2 new matches" in capsys.readouterr().out
+        
+        config = Config()
+        config.data_directory = str(cli_data_dir)
+        assert MatchManager(config).has_match("NA1_2")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -13,7 +13,9 @@ from unittest.mock import patch, MagicMock
 import pytest
 
 from lol_team_optimizer.match_manager import MatchManager
+from lol_team_optimizer.roster_index import RosterIndex
 from lol_team_optimizer.models import Match, MatchParticipant
+from lol_team_optimizer.analytics_models import AnalyticsFilters, DateRange
 from lol_team_optimizer.config import Config
 
 
@@ -128,14 +130,18 @@ class TestMatchManager:
         match_data1 = self.create_test_match_data("NA1_1111111111")
         match_data2 = self.create_test_match_data("NA1_2222222222")
         match_data3 = self.create_test_match_data("NA1_1111111111")  # Duplicate
+        malformed = self.create_test_match_data("NA1_3333333333")
+        malformed['info']['participants'][0]['riotIdGameName'] = None
         
-        matches_data = [match_data1, match_data2, match_data3]
+        matches_data = [match_data1, match_data2, match_data3, malformed]
         
         # Batch store
-        new_count, duplicate_count = self.match_manager.store_matches_batch(matches_data)
+        invalid = []
+        new_count, duplicate_count = self.match_manager.store_matches_batch(matches_data, invalid=invalid)
         
         assert new_count == 2
         assert duplicate_count == 1
+        assert invalid == [malformed]
         
         # Verify matches are stored
         stats = self.match_manager.get_match_statistics()
@@ -185,6 +191,27 @@ class TestMatchManager:
         known_players = match.get_known_players(known_puuids)
         assert len(known_players) == 3
     
+    def test_get_roster_masks(self):
+        """Test per-match roster masks and their upkeep when matches are removed."""
+        old_match_data = self.create_test_match_data("NA1_OLD_MATCH",
+                                                   ["player1", "player2"] + [f"old{i}" for i in range(8)])
+        old_match_data["info"]["gameCreation"] = int((datetime.now() - timedelta(days=100)).timestamp() * 1000)
+        new_match_data = self.create_test_match_data("NA1_NEW_MATCH",
+                                                   ["player3", "player1"] + [f"new{i}" for i in range(8)])
+        self.match_manager.store_matches_batch([old_match_data, new_match_data])
+        
+        roster = ["player1", "player2", "player3"]
+        assert self.match_manager.get_roster_masks(roster) == {"NA1_OLD_MATCH": 0b011, "NA1_NEW_MATCH": 0b101}
+        assert self.match_manager.get_roster_masks(roster, min_players=3) == {}
+        assert self.match_manager.get_match_rosters(roster) == {
+            "NA1_OLD_MATCH": {"player1", "player2"},
+            "NA1_NEW_MATCH": {"player1", "player3"},
+        }
+        
+        self.match_manager.cleanup_old_matches(90)
+        assert self.match_manager.get_roster_masks(roster) == {"NA1_NEW_MATCH": 0b101}
+        assert self.match_manager.get_matches_for_player("player2") == []
+    
     def test_match_participant_properties(self):
         """Test MatchParticipant calculated properties."""
         participant = MatchParticipant(
@@ -274,7 +301,7 @@ class TestMatchManager:
         self.match_manager.store_match(match_data)
         
         # Corrupt the index
-        self.match_manager._match_index = {}
+        self.match_manager._roster_index = RosterIndex()
         
         # Verify index is empty
         player_matches = self.match_manager.get_matches_for_player("test-puuid-1")
@@ -304,6 +331,160 @@ class TestMatchManager:
         # Verify index is loaded
         player_matches = new_manager.get_matches_for_player("test-puuid-1")
         assert len(player_matches) == 1
+    
+    def test_store_match_appends_without_rewriting(self):
+        """Test that storing a match does not rewrite previously stored matches."""
+        self.match_manager.store_match(self.create_test_match_data("NA1_1111111111"))
+        size_after_first = self.match_manager._store.total_bytes
+        
+        self.match_manager.store_match(self.create_test_match_data("NA1_2222222222"))
+        size_after_second = self.match_manager._store.total_bytes
+        
+        # Second write is a pure append of roughly one record
+        assert size_after_second - size_after_first == pytest.approx(size_after_first, rel=0.1)
+        assert not (self.data_dir / "matches.json").exists()
+        assert not (self.data_dir / "match_index.json").exists()
+    
+    def test_legacy_matches_file_migrated(self):
+        """Test that a legacy matches.json is imported into the segmented store."""
+        self.match_manager.store_match(self.create_test_match_data())
+        legacy_data = [self.match_manager._serialize_match(self.match_manager.get_match("NA1_1234567890"))]
+        
+        legacy_dir = Path(self.temp_dir) / "legacy"
+        legacy_dir.mkdir()
+        with open(legacy_dir / "matches.json", 'w', encoding='utf-8') as f:
+            json.dump(legacy_data, f)
+        
+        config = Config()
+        config.data_directory = str(legacy_dir)
+        manager = MatchManager(config)
+        
+        assert manager.get_match("NA1_1234567890") is not None
+        assert len(manager.get_matches_for_player("test-puuid-1")) == 1
+        assert not (legacy_dir / "matches.json").exists()
+        assert (legacy_dir / "matches.json.migrated").exists()
+    
+    def test_cleanup_persists_across_instances(self):
+        """Test that removed matches stay removed after reloading."""
+        old_match_data = self.create_test_match_data("NA1_OLD_MATCH")
+        old_match_data["info"]["gameCreation"] = int((datetime.now() - timedelta(days=100)).timestamp() * 1000)
+        self.match_manager.store_matches_batch([old_match_data, self.create_test_match_data("NA1_NEW_MATCH")])
+        
+        assert self.match_manager.cleanup_old_matches(90) == 1
+        
+        new_manager = MatchManager(self.config)
+        assert new_manager.get_match("NA1_OLD_MATCH") is None
+        assert new_manager.get_match("NA1_NEW_MATCH") is not None
+    
+    def test_matches_hydrated_lazily(self):
+        """Test that reloading indexes matches without decoding them all."""
+        self.match_manager.store_matches_batch(
+            [self.create_test_match_data(f"NA1_{i}") for i in range(5)])
+        
+        self.config.match_cache_size = 2
+        new_manager = MatchManager(self.config)
+        
+        assert new_manager.get_match_statistics()['total_matches'] == 5
+        assert new_manager._matches_cache.hydrated_count == 0
+        assert len(new_manager.get_matches_for_player("test-puuid-1", limit=3)) == 3
+        assert new_manager._matches_cache.hydrated_count == 2
+        
+        # Every match is still reachable through the dict-like cache view
+        assert len(new_manager._matches_cache) == 5
+        assert {m.match_id for m in new_manager._matches_cache.values()} == {f"NA1_{i}" for i in range(5)}
+        assert new_manager._matches_cache.hydrated_count == 2
+
+    
+    def test_participant_table_maintained(self):
+        """Test that the participant table follows stores, reloads, and cleanup."""
+        old_match_data = self.create_test_match_data("NA1_OLD_MATCH")
+        old_match_data["info"]["gameCreation"] = int((datetime.now() - timedelta(days=100)).timestamp() * 1000)
+        self.match_manager.store_matches_batch([old_match_data, self.create_test_match_data("NA1_NEW_MATCH")])
+        
+        table = self.match_manager.participant_table
+        assert len(table) == 20
+        rows = table.select(puuid="test-puuid-5", roles=["support"])
+        assert len(rows) == 2
+        totals = table.totals(rows)
+        assert totals.wins == 2
+        assert totals.cs == 2 * (250 + 50)
+        
+        # Reloading rebuilds the table from the store's offset index
+        new_manager = MatchManager(self.config)
+        assert len(new_manager.participant_table) == 20
+        assert new_manager._matches_cache.hydrated_count == 0
+        
+        new_manager.cleanup_old_matches(90)
+        assert new_manager.participant_table.match_ids(
+            new_manager.participant_table.select(puuid="test-puuid-1")) == ["NA1_NEW_MATCH"]
+    
+    def test_get_player_matches(self):
+        """Test that player matches are paired with the player's participant entry."""
+        self.match_manager.store_match(self.create_test_match_data())
+        
+        pairs = self.match_manager.get_player_matches("test-puuid-3")
+        assert len(pairs) == 1
+        match, participant = pairs[0]
+        assert match.match_id == "NA1_1234567890"
+        assert participant.puuid == "test-puuid-3"
+        assert self.match_manager.get_player_matches("unknown-puuid") == []
+
+    
+    def test_secondary_index_queries(self):
+        """Test champion, role, and matchup queries served from the secondary indexes."""
+        old_match_data = self.create_test_match_data("NA1_OLD_MATCH")
+        old_match_data["info"]["gameCreation"] = int((datetime.now() - timedelta(days=100)).timestamp() * 1000)
+        other_match_data = self.create_test_match_data("NA1_OTHER_MATCH")
+        for participant in other_match_data["info"]["participants"]:
+            participant["championId"] += 100
+        self.match_manager.store_matches_batch(
+            [old_match_data, self.create_test_match_data("NA1_NEW_MATCH"), other_match_data])
+        
+        matches = self.match_manager.get_matches_with_champions([5])
+        assert [m["match_id"] for m in matches] == ["NA1_NEW_MATCH", "NA1_OLD_MATCH"]
+        assert matches[0]["role"] == "support"
+        
+        same_team = self.match_manager.get_matches_with_champions([1, 5], same_team=True)
+        assert len(same_team) == 2 and all(m["win"] for m in same_team)
+        assert self.match_manager.get_matches_with_champions([1, 6], same_team=True) == []
+        
+        filters = AnalyticsFilters(
+            date_range=DateRange(start_date=datetime.now() - timedelta(days=30), end_date=datetime.now()),
+            roles=["support"]
+        )
+        assert [m["match_id"] for m in self.match_manager.get_matches_with_champions([5], filters=filters)] == [
+            "NA1_NEW_MATCH"]
+        
+        support_matches = self.match_manager.get_matches_by_role("support")
+        assert len(support_matches) == 6
+        assert self.match_manager.get_matches_by_role("UTILITY") == support_matches
+        
+        matchups = self.match_manager.get_champion_matchups(5, 10, "support", "utility")
+        assert [m["match_id"] for m in matchups] == ["NA1_NEW_MATCH", "NA1_OLD_MATCH"]
+        assert matchups[0]["win"] is True
+        assert matchups[0]["our_kda"] == (5 + 6) / 4
+        assert self.match_manager.get_champion_matchups(5, 10, "top", "support") == []
+        
+        teammates = self.match_manager.get_teammate_counts(5, [1, 6, 4, 999, 5])
+        assert teammates.tolist() == [[2, 2], [0, 0], [2, 2], [0, 0], [0, 0]]
+        assert self.match_manager.get_teammate_counts(999, [1]).tolist() == [[0, 0]]
+    
+    def test_secondary_indexes_follow_cleanup_and_reload(self):
+        """Test that the secondary indexes are rebuilt on reload and pruned on cleanup."""
+        old_match_data = self.create_test_match_data("NA1_OLD_MATCH")
+        old_match_data["info"]["gameCreation"] = int((datetime.now() - timedelta(days=100)).timestamp() * 1000)
+        self.match_manager.store_matches_batch([old_match_data, self.create_test_match_data("NA1_NEW_MATCH")])
+        
+        new_manager = MatchManager(self.config)
+        assert new_manager._champion_index[1] == {"NA1_OLD_MATCH", "NA1_NEW_MATCH"}
+        assert new_manager._matches_cache.hydrated_count == 0
+        assert [m.match_id for m in new_manager.get_recent_matches(days=30)] == ["NA1_NEW_MATCH"]
+        
+        assert new_manager.cleanup_old_matches(90) == 1
+        assert new_manager._champion_index[1] == {"NA1_NEW_MATCH"}
+        assert new_manager._champion_role_index[(5, "support")] == {"NA1_NEW_MATCH"}
+        assert new_manager._queue_index == {420: {"NA1_NEW_MATCH"}}
+        assert [match_id for _, match_id in new_manager._time_index] == ["NA1_NEW_MATCH"]
 
 
 if __name__ == "__main__":
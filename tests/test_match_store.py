@@ -0,0 +1,257 @@
+"""
+Tests for the append-only segmented match store.
+
+This module tests appends, tombstones, segment rolling, crash recovery,
+offset indexes, and compaction.
+"""
+
+import json
+import tempfile
+import shutil
+from pathlib import Path
+import pytest
+
+from lol_team_optimizer.match_store import MatchStore, MatchStoreError
+
+
+class TestMatchStore:
+    """Test cases for the MatchStore class."""
+    
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store_dir = Path(self.temp_dir) / "match_store"
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def create_store(self, **kwargs) -> MatchStore:
+        return MatchStore(self.store_dir, **kwargs)
+    
+    def test_put_and_get(self):
+        """Test that appended records can be read back."""
+        store = self.create_store()
+        store.put("NA1_1", {"match_id": "NA1_1", "queue_id": 420})
+        
+        assert "NA1_1" in store
+        assert len(store) == 1
+        assert store.get("NA1_1") == {"match_id": "NA1_1", "queue_id": 420}
+        assert store.get("missing") is None
+    
+    def test_append_only_writes(self):
+        """Test that inserts append instead of rewriting existing data."""
+        store = self.create_store()
+        store.put("NA1_1", {"match_id": "NA1_1"})
+        size_after_first = store.total_bytes
+        
+        store.put_batch([("NA1_2", {"match_id": "NA1_2"}, None), ("NA1_3", {"match_id": "NA1_3"}, None)])
+        
+        segment = store.store_dir / store._active
+        with open(segment, 'rb') as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 3
+        
+        # The offset index is a header plus one entry per record
+        with open(segment.with_suffix('.idx'), 'rb') as f:
+            assert len(f.read().splitlines()) == 4
+        assert store.total_bytes > size_after_first
+    
+    def test_persistence_and_delete(self):
+        """Test that puts and tombstones survive reopening."""
+        store = self.create_store()
+        store.put_batch([(f"NA1_{i}", {"match_id": f"NA1_{i}"}, None) for i in range(5)])
+        assert store.delete_batch(["NA1_0", "NA1_1", "unknown"]) == 2
+        
+        reopened = self.create_store()
+        assert len(reopened) == 3
+        assert "NA1_0" not in reopened
+        assert sorted(match_id for match_id, _ in reopened.iter_records()) == ["NA1_2", "NA1_3", "NA1_4"]
+    
+    def test_segment_rolling(self):
+        """Test that the active segment is sealed once it is full."""
+        store = self.create_store(segment_max_bytes=200)
+        for i in range(20):
+            store.put(f"NA1_{i}", {"match_id": f"NA1_{i}", "padding": "x" * 50})
+        
+        assert len(store._sealed) > 1
+        
+        with open(store.manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        assert manifest['sealed'] == store._sealed
+        
+        reopened = self.create_store(segment_max_bytes=200)
+        assert len(reopened) == 20
+        assert reopened.get("NA1_7")["padding"] == "x" * 50
+    
+    def test_torn_tail_is_repaired(self):
+        """Test recovery from a partially written final record."""
+        store = self.create_store()
+        store.put_batch([("NA1_1", {"match_id": "NA1_1"}, None), ("NA1_2", {"match_id": "NA1_2"}, None)])
+        
+        segment = store.store_dir / store._active
+        with open(segment, 'ab') as f:
+            f.write(b'P\tNA1_3\t{"match_id": "NA1_')
+        
+        reopened = self.create_store()
+        assert len(reopened) == 2
+        assert "NA1_3" not in reopened
+        
+        # New appends land after the repaired tail
+        reopened.put("NA1_4", {"match_id": "NA1_4"})
+        assert self.create_store().get("NA1_4") == {"match_id": "NA1_4"}
+    
+    def test_orphan_segments_removed(self):
+        """Test that segments not listed in the manifest are discarded."""
+        store = self.create_store()
+        store.put("NA1_1", {"match_id": "NA1_1"})
+        
+        orphan = store.store_dir / "seg-999999.log"
+        orphan.write_bytes(b'P\tNA1_X\t{}\n')
+        orphan_index = orphan.with_suffix('.idx')
+        orphan_index.write_text('{"summary_version": 0}\n')
+        
+        reopened = self.create_store()
+        assert not orphan.exists()
+        assert not orphan_index.exists()
+        assert "NA1_X" not in reopened
+    
+    def test_compaction(self):
+        """Test that compaction reclaims dead records and keeps live ones."""
+        store = self.create_store(segment_max_bytes=300, compaction_ratio=0.5)
+        store.put_batch([(f"NA1_{i}", {"match_id": f"NA1_{i}"}, None) for i in range(30)])
+        store.delete_batch([f"NA1_{i}" for i in range(25)])
+        
+        assert store.maybe_compact() is True
+        assert store.dead_bytes == 0
+        assert len(store) == 5
+        
+        reopened = self.create_store(segment_max_bytes=300)
+        assert sorted(reopened._locations) == [f"NA1_{i}" for i in range(25, 30)]
+        assert reopened.get("NA1_29") == {"match_id": "NA1_29"}
+        assert len(list(reopened.store_dir.glob("seg-*.log"))) == len(reopened._sealed) + (
+            1 if (reopened.store_dir / reopened._active).exists() else 0)
+    
+    def test_summaries_from_offset_index(self):
+        """Test that summaries are restored from the index without decoding records."""
+        summarize = lambda payload: [payload["queue_id"]]
+        store = self.create_store(summarize=summarize, summary_version=1)
+        store.put_batch([(f"NA1_{i}", {"match_id": f"NA1_{i}", "queue_id": 400 + i}, None) for i in range(3)])
+        store.delete_batch(["NA1_0"])
+        
+        decoded = []
+        
+        def counting_summarize(payload):
+            decoded.append(payload["match_id"])
+            return summarize(payload)
+        
+        reopened = self.create_store(summarize=counting_summarize, summary_version=1)
+        assert reopened.take_summaries() == {"NA1_1": [401], "NA1_2": [402]}
+        assert decoded == []
+        assert reopened.take_summaries() == {}
+    
+    def test_summary_version_change_rebuilds_index(self):
+        """Test that a stale index is rebuilt from its segment."""
+        store = self.create_store(summarize=lambda payload: 1, summary_version=1)
+        store.put_batch([("NA1_1", {"match_id": "NA1_1"}, None), ("NA1_2", {"match_id": "NA1_2"}, None)])
+        
+        reopened = self.create_store(summarize=lambda payload: payload["match_id"], summary_version=2)
+        assert reopened.take_summaries() == {"NA1_1": "NA1_1", "NA1_2": "NA1_2"}
+    
+    def test_unindexed_tail_is_scanned(self):
+        """Test that records missing from the index after a crash are recovered."""
+        store = self.create_store(summarize=lambda payload: payload["match_id"], summary_version=1)
+        store.put("NA1_1", {"match_id": "NA1_1"})
+        
+        # Simulate a crash between the segment append and the index append
+        segment = store.store_dir / store._active
+        with open(segment, 'ab') as f:
+            f.write(b'P\tNA1_2\t{"match_id":"NA1_2"}\n')
+        
+        reopened = self.create_store(summarize=lambda payload: payload["match_id"], summary_version=1)
+        assert reopened.take_summaries() == {"NA1_1": "NA1_1", "NA1_2": "NA1_2"}
+        assert reopened.get("NA1_2") == {"match_id": "NA1_2"}
+    
+    def test_reads_after_appends_to_mapped_segment(self):
+        """Test that memory-mapped reads see records appended after mapping."""
+        store = self.create_store()
+        store.put("NA1_1", {"match_id": "NA1_1"})
+        assert store.get("NA1_1") == {"match_id": "NA1_1"}
+        
+        store.put("NA1_2", {"match_id": "NA1_2"})
+        assert store.get("NA1_2") == {"match_id": "NA1_2"}
+        store.close()
+    
+    def test_compaction_preserves_summaries(self):
+        """Test that compacted segments carry their summaries forward."""
+        summarize = lambda payload: payload["match_id"].lower()
+        store = self.create_store(summarize=summarize, summary_version=1, segment_max_bytes=100)
+        store.put_batch([(f"NA1_{i}", {"match_id": f"NA1_{i}"}, None) for i in range(10)])
+        store.delete_batch([f"NA1_{i}" for i in range(8)])
+        store.compact()
+        
+        reopened = self.create_store(summarize=lambda payload: None, summary_version=1)
+        assert reopened.take_summaries() == {"NA1_8": "na1_8", "NA1_9": "na1_9"}
+    
+    def test_no_compaction_below_threshold(self):
+        """Test that compaction is skipped while little space is dead."""
+        store = self.create_store(compaction_ratio=0.5)
+        store.put_batch([(f"NA1_{i}", {"match_id": f"NA1_{i}"}, None) for i in range(10)])
+        store.delete_batch(["NA1_0"])
+        
+        assert store.maybe_compact() is False
+    
+    def test_read_only_view_leaves_files_untouched(self):
+        """Test that a read-only open neither repairs nor writes, and rejects writes."""
+        store = self.create_store()
+        store.put_batch([("NA1_1", {"match_id": "NA1_1"}, None), ("NA1_2", {"match_id": "NA1_2"}, None)])
+        
+        segment = store.store_dir / store._active
+        with open(segment, 'ab') as f:
+            f.write(b'P\tNA1_3\t{"match_id": "NA1_')  # still being appended by the writer
+        orphan = store.store_dir / "seg-999999.log"
+        orphan.write_bytes(b'P\tNA1_X\t{}\n')
+        files_before = {path.name: path.read_bytes() for path in store.store_dir.iterdir()}
+        
+        reader = self.create_store(read_only=True)
+        
+        assert len(reader) == 2
+        assert reader.get("NA1_2") == {"match_id": "NA1_2"}
+        assert {path.name: path.read_bytes() for path in store.store_dir.iterdir()} == files_before
+        with pytest.raises(MatchStoreError):
+            reader.put("NA1_4", {"match_id": "NA1_4"})
+        with pytest.raises(MatchStoreError):
+            reader.compact()
+        assert reader.maybe_compact() is False
+    
+    def test_read_only_open_of_missing_store(self):
+        """Test that a read-only open of a store that does not exist creates nothing."""
+        reader = self.create_store(read_only=True)
+        
+        assert len(reader) == 0
+        assert not self.store_dir.exists()
+    
+    def test_changes_since_position(self):
+        """Test that changes after a position are read back across segments until compaction."""
+        store = self.create_store(segment_max_bytes=300, compaction_ratio=0.9)
+        store.put_batch([(f"NA1_{i}", {"match_id": f"NA1_{i}"}, None) for i in range(3)])
+        position = json.loads(json.dumps(store.position()))
+        assert store.changes_since(position) == ([], [])
+        
+        store.put_batch([(f"NA1_{i}", {"match_id": f"NA1_{i}"}, None) for i in range(3, 20)])
+        store.delete_batch(["NA1_1", "NA1_5"])
+        store.put("NA1_5", {"match_id": "NA1_5", "replayed": True})
+        assert len(store._sealed) > 0
+        
+        reopened = self.create_store(segment_max_bytes=300)
+        stored, deleted = reopened.changes_since(position)
+        assert sorted(stored) == sorted(f"NA1_{i}" for i in range(3, 20))
+        assert deleted == ["NA1_1"]
+        
+        reopened.compact()
+        assert reopened.changes_since(position) is None
+        assert MatchStore(Path(self.temp_dir) / "other_store").changes_since(position) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,121 @@
+"""
+Tests for caching optimization results in the core engine.
+
+This module verifies that repeated optimizations of the same roster are
+served from the analytics cache, that the cache is shared through its
+persistent tier, and that player and synergy changes invalidate it.
+"""
+
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+from lol_team_optimizer.config import Config
+from lol_team_optimizer.core_engine import CoreEngine
+from lol_team_optimizer.models import Player
+
+
+class TestOptimizationResultCache:
+    """Test cases for the optimization result cache."""
+    
+    def setup_method(self):
+        """Set up an offline core engine with a few players."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config(
+            riot_api_key="test_api_key",
+            data_directory=str(Path(self.temp_dir) / "data"),
+            cache_directory=str(Path(self.temp_dir) / "cache")
+        )
+        self.engine = self.create_engine()
+        
+        roles = ["top", "jungle", "middle", "support", "bottom"]
+        for i in range(7):
+            preferences = {role: 1 + (i + j) % 5 for j, role in enumerate(roles)}
+            self.engine.data_manager.update_player(
+                Player(name=f"Player{i}", summoner_name=f"player{i}", role_preferences=preferences)
+            )
+        self.selection = [f"Player{i}" for i in range(7)]
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def create_engine(self) -> CoreEngine:
+        with patch('lol_team_optimizer.core_engine.Config', return_value=self.config), \
+             patch('lol_team_optimizer.core_engine.RiotAPIClient', side_effect=Exception("offline")), \
+             patch('lol_team_optimizer.core_engine.ChampionDataManager'):
+            return CoreEngine()
+    
+    def test_repeated_request_served_from_cache(self):
+        """Test that the same roster is optimized once and then returned from cache."""
+        success, _, first = self.engine.optimize_team_smart(self.selection)
+        assert success
+        
+        with patch.object(self.engine.optimizer, 'optimize_team') as optimize:
+            start = time.time()
+            success, message, second = self.engine.optimize_team_smart(self.selection)
+            elapsed = time.time() - start
+        
+        assert success
+        assert "(cached)" in message
+        assert not optimize.called
+        assert second.best_assignment.assignments == first.best_assignment.assignments
+        assert elapsed < 0.1
+    
+    def test_mutating_results_does_not_change_cache(self):
+        """Test that changes to a returned result do not leak into later cached results."""
+        _, _, first = self.engine.optimize_team_smart(self.selection)
+        expected = dict(first.best_assignment.assignments)
+        first.best_assignment.assignments.clear()
+        
+        _, _, second = self.engine.optimize_team_smart(self.selection)
+        assert second.best_assignment.assignments == expected
+        second.assignments.clear()
+        second.best_assignment.assignments["top"] = "Someone"
+        
+        success, message, third = self.engine.optimize_team_smart(self.selection)
+        assert "(cached)" in message
+        assert third.best_assignment.assignments == expected
+        assert third.best_assignment in third.assignments
+    
+    def test_cache_shared_through_persistent_tier(self):
+        """Test that another engine instance reuses the stored result."""
+        self.engine.optimize_team_smart(self.selection)
+        
+        other = self.create_engine()
+        with patch.object(other.optimizer, 'optimize_team') as optimize:
+            success, message, _ = other.optimize_team_smart(self.selection)
+        
+        assert success
+        assert "(cached)" in message
+        assert not optimize.called
+    
+    def test_player_update_invalidates_result(self):
+        """Test that changing any selected player forces a new optimization."""
+        self.engine.optimize_team_smart(self.selection)
+        
+        player = self.engine.data_manager.get_player_by_name("Player3")
+        player.role_preferences = {"top": 5, "jungle": 1, "middle": 1, "support": 1, "bottom": 1}
+        self.engine.data_manager.update_player(player)
+        
+        success, message, _ = self.engine.optimize_team_smart(self.selection)
+        assert success
+        assert "(cached)" not in message
+    
+    def test_synergy_change_invalidates_result(self):
+        """Test that a newer synergy database produces a new cache key."""
+        self.engine.optimize_team_smart(self.selection)
+        
+        self.engine.optimizer.synergy_database.last_updated = datetime.now()
+        
+        success, message, _ = self.engine.optimize_team_smart(self.selection)
+        assert success
+        assert "(cached)" not in message
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
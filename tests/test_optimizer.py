@@ -162,6 +162,57 @@ class TestOptimizationEngine:
         # Should have multiple combinations to choose from
         assert len(result.assignments) >= 1
     
+    def test_optimize_team_large_roster_matches_exhaustive_search(self):
+        """Test that a large roster yields the true best teams, not a truncated sample."""
+        rng = np.random.default_rng(7)
+        roster = []
+        for i in range(12):
+            preferences = {role: int(rng.integers(1, 6)) for role in self.engine.roles}
+            roster.append(Player(name=f"Player{i}", summoner_name=f"player{i}",
+                                 puuid=f"puuid{i}", role_preferences=preferences))
+        
+        result = self.engine.optimize_team(roster, top_k=5)
+        
+        from itertools import combinations
+        exhaustive = sorted(
+            (self.engine._optimize_single_team(list(team)).total_score
+             for team in combinations(roster, 5)),
+            reverse=True
+        )
+        assert len(result.assignments) == 5
+        assert [a.total_score for a in result.assignments] == pytest.approx(exhaustive[:5])
+    
+    def test_synergy_tensor_built_once_per_optimization(self):
+        """Test that team searches reuse one synergy tensor for the pool."""
+        roster = [Player(name=f"Player{i}", summoner_name=f"player{i}", puuid=f"puuid{i}",
+                         role_preferences={role: 1 + (i + r) % 5 for r, role in enumerate(self.engine.roles)})
+                  for i in range(8)]
+        
+        with patch.object(self.engine, '_build_synergy_tensor',
+                          wraps=self.engine._build_synergy_tensor) as build:
+            result = self.engine.optimize_team(roster, top_k=3)
+            assert build.call_count == 1
+            
+            self.engine.generate_alternative_compositions(roster, result)
+            assert build.call_count == 2
+    
+    def test_exhaustive_search_strategy(self):
+        """Test that the exhaustive strategy agrees with the default search."""
+        rng = np.random.default_rng(11)
+        roster = [
+            Player(name=f"Player{i}", summoner_name=f"player{i}", puuid=f"puuid{i}",
+                   role_preferences={role: int(rng.integers(1, 6)) for role in self.engine.roles})
+            for i in range(10)
+        ]
+        
+        default_result = self.engine.optimize_team(roster, top_k=3)
+        self.engine.search_strategy = "exhaustive"
+        self.engine.search_workers = 1
+        exhaustive_result = self.engine.optimize_team(roster, top_k=3)
+        
+        assert [a.total_score for a in exhaustive_result.assignments] == pytest.approx(
+            [a.total_score for a in default_result.assignments])
+    
     def test_build_cost_matrix(self):
         """Test cost matrix generation."""
         cost_matrix = self.engine._build_cost_matrix(self.players)
@@ -0,0 +1,148 @@
+"""
+Tests for the columnar participant table.
+
+This module tests row maintenance, masked selection, and vectorized
+aggregation over participant rows.
+"""
+
+from datetime import datetime
+import numpy as np
+import pytest
+
+from lol_team_optimizer.participant_table import ParticipantTable, normalize_role
+from lol_team_optimizer.models import Match, MatchParticipant
+
+
+def participant_row(puuid, champion_id=1, position="TOP", team_id=100, win=True,
+                    kills=5, deaths=2, assists=8, cs=180, vision=20, gold=12000, damage=15000):
+    return [puuid, champion_id, position, team_id, win, kills, deaths, assists, cs, vision, gold, damage]
+
+
+class TestParticipantTable:
+    """Test cases for the ParticipantTable class."""
+    
+    def setup_method(self):
+        """Set up test environment."""
+        self.now_ms = int(datetime.now().timestamp() * 1000)
+        self.table = ParticipantTable(capacity=4)
+    
+    def add_match(self, match_id, days_ago=0, queue_id=420, duration=1800, participants=None):
+        if participants is None:
+            participants = [
+                participant_row("p1", champion_id=1, position="TOP", win=True),
+                participant_row("p2", champion_id=2, position="UTILITY", win=True),
+                participant_row("p3", champion_id=3, position="MIDDLE", team_id=200, win=False),
+            ]
+        self.table.append_match(match_id, self.now_ms - days_ago * 86_400_000, queue_id, duration, participants)
+    
+    def test_append_and_select(self):
+        """Test that rows can be selected by player, role, queue, and time."""
+        self.add_match("NA1_1", days_ago=1)
+        self.add_match("NA1_2", days_ago=10, queue_id=440)
+        
+        assert len(self.table) == 6
+        assert self.table.match_count == 2
+        assert self.table.match_ids(self.table.select(puuid="p1")) == ["NA1_1", "NA1_2"]
+        assert len(self.table.select(roles=["support"])) == 2
+        assert self.table.match_ids(self.table.select(puuid="p1", queue_ids=[440])) == ["NA1_2"]
+        assert len(self.table.select(start_ms=self.now_ms - 5 * 86_400_000)) == 3
+        assert len(self.table.select(win=False)) == 2
+        assert len(self.table.select(puuid="unknown")) == 0
+    
+    def test_teammate_filter(self):
+        """Test selecting matches that include any of the given players."""
+        self.add_match("NA1_1")
+        self.add_match("NA1_2", participants=[participant_row("p1"), participant_row("p4")])
+        
+        rows = self.table.select(puuid="p1", teammates=["p4"])
+        assert self.table.match_ids(rows) == ["NA1_2"]
+    
+    def test_totals(self):
+        """Test unweighted and weighted aggregation."""
+        self.add_match("NA1_1")
+        self.add_match("NA1_2", participants=[participant_row("p1", win=False, kills=1, deaths=4)])
+        
+        rows = self.table.select(puuid="p1")
+        totals = self.table.totals(rows)
+        assert totals.games == 2
+        assert totals.wins == 1
+        assert totals.kills == 6
+        assert totals.deaths == 6
+        assert totals.duration == 3600
+        
+        metrics = totals.to_performance_metrics()
+        assert metrics.win_rate == 0.5
+        assert metrics.avg_kda == (6 + 16) / 6
+        assert metrics.avg_cs_per_min == 360 / 60
+        
+        weighted = self.table.totals(rows, np.array([1.0, 0.0]))
+        assert weighted.weight == 1.0
+        assert weighted.wins == 1.0
+        assert weighted.kills == 5.0
+    
+    def test_metric_values(self):
+        """Test per-row metric evaluation."""
+        self.add_match("NA1_1", duration=0, participants=[participant_row("p1", cs=100)])
+        self.add_match("NA1_2", duration=600, participants=[participant_row("p1", cs=100, deaths=0)])
+        
+        rows = self.table.select(puuid="p1")
+        assert self.table.metric_values(rows, "avg_cs_per_min").tolist() == [0.0, 10.0]
+        assert self.table.metric_values(rows, "avg_kda").tolist() == [6.5, 13.0]
+        assert self.table.metric_values(rows, "unknown").tolist() == []
+    
+    def test_remove_and_replace(self):
+        """Test that removed and replaced matches drop their old rows."""
+        self.add_match("NA1_1")
+        self.add_match("NA1_2")
+        assert self.table.remove_match("NA1_1") is True
+        assert self.table.remove_match("NA1_1") is False
+        
+        self.add_match("NA1_2", participants=[participant_row("p9")])
+        
+        assert "NA1_1" not in self.table
+        assert len(self.table) == 1
+        assert self.table.puuids(self.table.rows()) == ["p9"]
+    
+    def test_dead_rows_are_dropped(self):
+        """Test that rows stay consistent after dead rows are compacted."""
+        for i in range(1000):
+            self.add_match(f"NA1_{i}")
+        for i in range(600):
+            self.table.remove_match(f"NA1_{i}")
+        
+        assert len(self.table) == 1200
+        assert self.table._size < 3000
+        assert self.table.match_ids(self.table.select(puuid="p2"))[:2] == ["NA1_600", "NA1_601"]
+        assert self.table.remove_match("NA1_700") is True
+        assert len(self.table.select(puuid="p3")) == 399
+    
+    def test_from_pairs(self):
+        """Test building a standalone table from match/participant pairs."""
+        pairs = []
+        for i in range(3):
+            participant = MatchParticipant(puuid="p1", kills=i, deaths=1, assists=1,
+                                           total_minions_killed=100, neutral_minions_killed=20,
+                                           win=i > 0)
+            match = Match(match_id=f"NA1_{i}", game_creation=self.now_ms, game_duration=1200,
+                          game_end_timestamp=self.now_ms, participants=[participant])
+            pairs.append((match, participant))
+        
+        table = ParticipantTable.from_pairs(pairs)
+        totals = table.totals()
+        assert totals.games == 3
+        assert totals.wins == 2
+        assert totals.kills == 3
+        assert totals.cs == 360
+        assert table.days_ago(table.rows()).tolist() == [0, 0, 0]
+        assert ParticipantTable.from_pairs([]).totals().to_performance_metrics().games_played == 0
+    
+    def test_normalize_role(self):
+        """Test role normalization."""
+        assert normalize_role("UTILITY") == "support"
+        assert normalize_role("MID") == "middle"
+        assert normalize_role("Invalid") == "invalid"
+        assert normalize_role("") == ""
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
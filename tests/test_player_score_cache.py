@@ -0,0 +1,81 @@
+"""
+Tests for the per-player role score cache.
+
+This module verifies that the optimizer scores each player once, reuses
+those scores across calls, and rescores players changed through the
+DataManager.
+"""
+
+import shutil
+import tempfile
+import pytest
+
+from lol_team_optimizer.config import Config
+from lol_team_optimizer.data_manager import DataManager
+from lol_team_optimizer.models import Player
+from lol_team_optimizer.optimizer import OptimizationEngine
+from lol_team_optimizer.performance_calculator import PerformanceCalculator
+
+
+def make_players(count: int):
+    """Create players with distinct preferences."""
+    roles = ["top", "jungle", "middle", "support", "bottom"]
+    return [
+        Player(name=f"Player{i}", summoner_name=f"player{i}", puuid=f"puuid{i}",
+               role_preferences={role: 1 + (i + j) % 5 for j, role in enumerate(roles)})
+        for i in range(count)
+    ]
+
+
+class TestPlayerScoreCache:
+    """Test cases for score caching in the optimization engine."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.engine = OptimizationEngine(PerformanceCalculator())
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_each_player_scored_once_across_calls(self):
+        """Test that every player is scored once and then reused."""
+        players = make_players(9)
+        
+        first = self.engine.optimize_team(players)
+        assert self.engine.score_cache.misses == 9
+        
+        second = self.engine.optimize_team(players)
+        self.engine.generate_alternative_compositions(players, second)
+        assert self.engine.score_cache.misses == 9
+        assert second.best_assignment.total_score == pytest.approx(first.best_assignment.total_score)
+    
+    def test_update_player_invalidates_scores(self):
+        """Test that a player changed through DataManager is rescored."""
+        data_manager = DataManager(Config(data_directory=self.temp_dir, cache_directory=self.temp_dir))
+        players = make_players(5)
+        for player in players:
+            data_manager.update_player(player)
+        self.engine.optimize_team(players)
+        misses = self.engine.score_cache.misses
+        
+        players[0].role_preferences = {"top": 1, "jungle": 1, "middle": 1, "support": 1, "bottom": 5}
+        data_manager.update_player(players[0])
+        result = self.engine.optimize_team(players)
+        
+        assert self.engine.score_cache.misses == misses + 1
+        assert result.best_assignment.assignments["bottom"] == "Player0"
+    
+    def test_players_sharing_a_name_are_scored_separately(self):
+        """Test that a new Player object with a reused name is not served stale scores."""
+        self.engine.optimize_team(make_players(5))
+        misses = self.engine.score_cache.misses
+        
+        self.engine.optimize_team(make_players(5))
+        
+        assert self.engine.score_cache.misses == misses + 5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -20,9 +20,23 @@ from lol_team_optimizer.analytics_models import (
     AnalyticsFilters, DateRange, InsufficientDataError, AnalyticsError
 )
 from lol_team_optimizer.models import Match, MatchParticipant
+from lol_team_optimizer.participant_table import ParticipantTable
 from lol_team_optimizer.config import Config
 
 
+def participant_table_for(matches: List[Match]) -> ParticipantTable:
+    """Build the participant table a match manager holding these matches keeps."""
+    table = ParticipantTable()
+    for match in matches:
+        table.append_match(match.match_id, match.game_creation, match.queue_id, match.game_duration, [
+            [p.puuid, p.champion_id, p.individual_position, p.team_id, p.win, p.kills, p.deaths, p.assists,
+             p.total_minions_killed + p.neutral_minions_killed, p.vision_score, p.gold_earned,
+             p.total_damage_dealt_to_champions]
+            for p in match.participants
+        ])
+    return table
+
+
 class TestPlayerSynergyMatrix:
     """Test cases for PlayerSynergyMatrix class."""
     
@@ -34,9 +48,11 @@ class TestPlayerSynergyMatrix:
         return config
     
     @pytest.fixture
-    def mock_match_manager(self):
-        """Create mock match manager."""
-        return Mock()
+    def mock_match_manager(self, sample_matches):
+        """Create mock match manager whose participant table holds the sample matches."""
+        match_manager = Mock()
+        match_manager.participant_table = participant_table_for(sample_matches)
+        return match_manager
     
     @pytest.fixture
     def mock_baseline_manager(self):
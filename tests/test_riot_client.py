@@ -105,7 +105,9 @@ class TestRiotAPIClient:
     def client(self, config, tmp_path):
         """Create a test client with temporary cache directory."""
         config.cache_directory = str(tmp_path / "cache")
-        return RiotAPIClient(config)
+        client = RiotAPIClient(config)
+        yield client
+        client.close()
     
     def test_client_initialization(self, client, config):
         """Test client initializes correctly."""
@@ -192,20 +194,22 @@ class TestRiotAPIClient:
         assert result1 == result2
     
     @patch('requests.Session.get')
-    @patch('time.sleep')
-    def test_rate_limit_handling(self, mock_sleep, mock_get, client):
+    def test_rate_limit_handling(self, mock_get, client):
         """Test handling of rate limit responses."""
         # Mock rate limit response
         mock_response = Mock()
         mock_response.status_code = 429
         mock_response.headers = {'Retry-After': '5'}
         mock_get.return_value = mock_response
+        client.rate_limiter = Mock()
         
         with pytest.raises(requests.RequestException):
             client._make_request("/test/endpoint")
         
-        # Should have slept for retry-after duration
-        mock_sleep.assert_called_with(5)
+        # Should have held back the shared limiter for retry-after duration
+        assert client.rate_limiter.acquire.call_count == client.config.max_retries
+        deadline = client.rate_limiter.block_until.call_args[0][0]
+        assert 4 < deadline - time.monotonic() <= 5
     
     @patch('requests.Session.get')
     @patch('time.sleep')
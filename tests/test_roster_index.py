@@ -0,0 +1,104 @@
+"""
+Tests for the per-player roster index.
+
+This module tests dense match numbering, roster masks and thresholds, and
+renumbering after removals.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from lol_team_optimizer.roster_index import RosterIndex
+
+
+class TestRosterIndex:
+    """Test cases for the RosterIndex class."""
+    
+    def setup_method(self):
+        """Set up test environment."""
+        self.index = RosterIndex()
+    
+    def test_roster_masks_and_threshold(self):
+        """Test that masks record which roster members played and counts are thresholded."""
+        self.index.add_match("NA1_1", ["a", "b", "x1"])
+        self.index.add_match("NA1_2", ["a", "x2", "x3"])
+        self.index.add_match("NA1_3", ["a", "b", "c"])
+        
+        match_ids, masks = self.index.roster_masks(["a", "b", "c"], min_players=2)
+        assert match_ids == ["NA1_1", "NA1_3"]
+        assert masks[:, 0].tolist() == [0b011, 0b111]
+        
+        match_ids, masks = self.index.roster_masks(["c", "x2"], min_players=1)
+        assert dict(zip(match_ids, masks[:, 0].tolist())) == {"NA1_2": 0b10, "NA1_3": 0b01}
+        assert self.index.roster_masks(["nobody"], min_players=1)[0] == []
+    
+    def test_rosters_wider_than_one_word(self):
+        """Test that rosters of more than 64 players spill into further mask words."""
+        roster = [f"p{i}" for i in range(70)]
+        self.index.add_match("NA1_1", ["p0", "p65", "p69"])
+        
+        match_ids, masks = self.index.roster_masks(roster, min_players=3)
+        assert match_ids == ["NA1_1"]
+        assert masks.shape == (1, 2)
+        assert masks[0].tolist() == [1, (1 << 1) | (1 << 5)]
+    
+    def test_removal_and_renumbering(self):
+        """Test that removed matches disappear and survivors are renumbered densely."""
+        for i in range(3000):
+            self.index.add_match(f"NA1_{i}", ["core", f"other_{i}"])
+        for i in range(2500):
+            assert self.index.remove_match(f"NA1_{i}")
+        
+        assert len(self.index) == 500
+        assert self.index.player_count == 501
+        assert len(self.index._match_ids) < 3000
+        assert self.index.match_ids("core") == [f"NA1_{i}" for i in range(2500, 3000)]
+        assert self.index.match_ids("other_10") == []
+        
+        match_ids, _ = self.index.roster_masks(["core", "other_2999"], min_players=2)
+        assert match_ids == ["NA1_2999"]
+        assert not self.index.remove_match("NA1_0")
+    
+    def test_reindexing_replaces_the_old_roster(self):
+        """Test that re-indexing a match drops players who were only in its old roster."""
+        self.index.add_match("NA1_1", ["a", "b", "old"])
+        self.index.add_match("NA1_2", ["a", "old"])
+        self.index.add_match("NA1_1", ["a", "b", "new"])
+        
+        assert len(self.index) == 2
+        assert self.index.match_ids("old") == ["NA1_2"]
+        assert self.index.match_ids("new") == ["NA1_1"]
+        assert self.index.roster_masks(["b", "old"], min_players=2)[0] == []
+        
+        assert self.index.remove_match("NA1_2")
+        assert self.index.match_ids("old") == []
+        assert self.index.player_count == 3
+    
+    def test_lookup_cost_does_not_grow_with_history(self):
+        """Test that a roster lookup costs the same over a 10x larger history with the same postings."""
+        def lookup_time(filler_matches: int) -> float:
+            index = RosterIndex()
+            rng = np.random.default_rng(7)
+            core = [f"core_{i}" for i in range(10)]
+            for i in range(200):
+                members = [core[j] for j in rng.choice(10, size=rng.integers(1, 4), replace=False)]
+                index.add_match(f"NA1_{i}", members)
+            for i in range(filler_matches):
+                index.add_match(f"EUW1_{i}", [f"filler_{i}"])
+            
+            match_ids, masks = index.roster_masks(core, min_players=2)
+            assert match_ids and all(bin(mask).count("1") >= 2 for mask in masks[:, 0].tolist())
+            timings = []
+            for _ in range(200):
+                start = time.perf_counter()
+                index.roster_masks(core, min_players=2)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+        
+        small, large = lookup_time(50_000), lookup_time(500_000)
+        assert large < small * 2, f"Lookup took {small * 1000:.3f} ms, then {large * 1000:.3f} ms"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -137,6 +137,39 @@ class TestConfidenceIntervals:
         assert ci.sample_size == len(data)
         assert ci.lower_bound < ci.upper_bound
     
+    def test_bca_confidence_interval(self, analyzer, sample_data):
+        """Test bias-corrected and accelerated bootstrap interval."""
+        data = sample_data['normal_data']
+        
+        ci = analyzer.calculate_confidence_interval(
+            data,
+            confidence_level=0.95,
+            method=ConfidenceIntervalMethod.BCA
+        )
+        
+        assert ci.sample_size == len(data)
+        assert ci.lower_bound < np.mean(data) < ci.upper_bound
+        
+        # Reproducible for the same random state
+        again = StatisticalAnalyzer(random_state=42).calculate_confidence_interval(
+            data, confidence_level=0.95, method=ConfidenceIntervalMethod.BCA
+        )
+        assert (again.lower_bound, again.upper_bound) == (ci.lower_bound, ci.upper_bound)
+    
+    def test_bootstrap_chunking_matches_unchunked(self, sample_data):
+        """Test that chunked resampling gives the same intervals as one draw."""
+        from lol_team_optimizer.resampling import bootstrap_intervals
+        
+        series = [sample_data['normal_data'], sample_data['uniform_data']]
+        whole = bootstrap_intervals(series, n_resamples=500, rng=np.random.default_rng(7))
+        chunked = bootstrap_intervals(series, n_resamples=500, rng=np.random.default_rng(7),
+                                      max_chunk_elements=len(series[0]) * 7)
+        
+        assert len(chunked) == 2
+        for (low, high), (chunk_low, chunk_high) in zip(whole, chunked):
+            assert chunk_low == pytest.approx(low, rel=0.05)
+            assert chunk_high == pytest.approx(high, rel=0.05)
+    
     def test_wilson_confidence_interval(self, analyzer, sample_data):
         """Test Wilson score confidence interval for proportions."""
         data = sample_data['proportions']
@@ -254,6 +287,32 @@ class TestSignificanceTesting:
         assert result.test_type in ["independent_t_test", "mann_whitney_u"]
         assert 0 <= result.p_value <= 1
     
+    def test_permutation_test(self, analyzer):
+        """Test two-sample and one-sample permutation tests."""
+        rng = np.random.default_rng(0)
+        low = list(rng.normal(0, 1, 40))
+        high = list(rng.normal(1.5, 1, 40))
+        
+        result = analyzer.perform_significance_testing(low, high, test_type="permutation", n_permutations=2000)
+        assert result.test_type == "permutation"
+        assert result.statistic == pytest.approx(np.mean(low) - np.mean(high))
+        assert result.p_value < 0.01
+        assert result.effect_size < 0
+        
+        less = analyzer.perform_significance_testing(low, high, test_type="permutation", alternative="less")
+        greater = analyzer.perform_significance_testing(low, high, test_type="permutation", alternative="greater")
+        assert less.p_value < 0.01 < greater.p_value
+        
+        same = analyzer.perform_significance_testing(low[:20], low[20:], test_type="permutation")
+        assert same.p_value > 0.05
+        
+        one_sample = analyzer.perform_significance_testing(high, test_type="permutation")
+        assert one_sample.test_type == "one_sample_permutation"
+        assert one_sample.p_value < 0.01
+        
+        against_mean = analyzer.perform_one_sample_test(high, float(np.mean(high)), test_type="permutation")
+        assert against_mean.p_value > 0.9
+    
     def test_significance_testing_edge_cases(self, analyzer):
         """Test significance testing edge cases."""
         # Empty sample
@@ -0,0 +1,171 @@
+"""
+Tests for incremental synergy maintenance.
+
+This module tests that stored matches are applied to the synergy data once,
+that refreshes only load new matches, that pairs persist across restarts,
+and that a legacy synergy_data.json is imported.
+"""
+
+import json
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+from lol_team_optimizer.config import Config
+from lol_team_optimizer.match_manager import MatchManager
+from lol_team_optimizer.models import Player
+from lol_team_optimizer.synergy_manager import SynergyManager
+
+
+class TestSynergyManager:
+    """Test cases for the SynergyManager's stored-match synergies."""
+    
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = Config()
+        self.config.data_directory = str(Path(self.temp_dir) / "data")
+        self.cache_dir = Path(self.temp_dir) / "cache"
+        self.match_manager = MatchManager(self.config)
+        self.players = [
+            Player(name="Alice", summoner_name="Alice#NA1", puuid="puuid-0"),
+            Player(name="Bob", summoner_name="Bob#NA1", puuid="puuid-1"),
+            Player(name="Cara", summoner_name="Cara#NA1", puuid="puuid-5")
+        ]
+        self.managers = []
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        for manager in self.managers:
+            manager.synergy_store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def create_manager(self) -> SynergyManager:
+        manager = SynergyManager(cache_directory=str(self.cache_dir), match_manager=self.match_manager)
+        self.managers.append(manager)
+        return manager
+    
+    def create_match_data(self, match_id: str, win: bool = True) -> dict:
+        """Create Riot API match data; puuid-0..4 are on team 100."""
+        positions = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+        participants = [
+            {
+                "puuid": f"puuid-{i}",
+                "championId": 1 + i,
+                "teamId": 100 if i < 5 else 200,
+                "individualPosition": positions[i % 5],
+                "kills": 3, "deaths": 2, "assists": 4,
+                "visionScore": 20,
+                "win": win if i < 5 else not win
+            }
+            for i in range(10)
+        ]
+        return {
+            "metadata": {"matchId": match_id},
+            "info": {
+                "gameCreation": int(datetime.now().timestamp() * 1000),
+                "gameDuration": 1800,
+                "queueId": 420,
+                "participants": participants,
+                "teams": [{"teamId": 100, "win": win}, {"teamId": 200, "win": not win}]
+            }
+        }
+    
+    def test_replayed_matches_counted_once(self):
+        """Test that recalculating over the same matches changes nothing."""
+        self.match_manager.store_matches_batch([self.create_match_data("NA1_1"),
+                                                self.create_match_data("NA1_2", win=False)])
+        manager = self.create_manager()
+        
+        manager.calculate_synergies_from_stored_matches(self.players)
+        manager.calculate_synergies_from_stored_matches(self.players)
+        manager.apply_matches(self.match_manager.get_all_matches(), {p.puuid: p.name for p in self.players})
+        
+        synergy = manager.synergy_db.get_synergy("Alice", "Bob")
+        assert synergy.games_together == 2
+        assert synergy.wins_together == 1
+        assert manager.synergy_db.get_synergy("Alice", "Cara").games_together == 2
+    
+    def test_refresh_loads_only_new_matches(self):
+        """Test that a refresh after a scrape hydrates just the new matches."""
+        self.match_manager.store_matches_batch([self.create_match_data(f"NA1_{i}") for i in range(5)])
+        manager = self.create_manager()
+        manager.calculate_synergies_from_stored_matches(self.players)
+        
+        self.match_manager.store_match(self.create_match_data("NA1_new"))
+        with patch.object(self.match_manager, 'get_matches_by_ids',
+                          wraps=self.match_manager.get_matches_by_ids) as loader:
+            manager.calculate_synergies_from_stored_matches(self.players)
+        
+        assert list(loader.call_args[0][0]) == ["NA1_new"]
+        assert manager.synergy_db.get_synergy("Alice", "Bob").games_together == 6
+    
+    def test_stored_matches_applied_by_listener(self):
+        """Test that matches are folded in as MatchManager stores them."""
+        manager = self.create_manager()
+        manager.set_tracked_players(self.players)
+        self.match_manager.add_match_listener(manager.on_matches_stored)
+        before = manager.synergy_db.last_updated
+        
+        self.match_manager.store_match(self.create_match_data("NA1_1"))
+        self.match_manager.store_match(self.create_match_data("NA1_1"))
+        
+        assert manager.synergy_db.get_synergy("Alice", "Bob").games_together == 1
+        assert manager.synergy_db.last_updated != before
+        
+        manager.calculate_synergies_from_stored_matches(self.players)
+        assert manager.synergy_db.get_synergy("Alice", "Bob").games_together == 1
+    
+    def test_pairs_and_applied_matches_persist(self):
+        """Test that a restarted manager sees the same pairs and ledger."""
+        self.match_manager.store_matches_batch([self.create_match_data("NA1_1"),
+                                                self.create_match_data("NA1_2")])
+        manager = self.create_manager()
+        manager.calculate_synergies_from_stored_matches(self.players)
+        expected = manager.synergy_db.get_synergy("Alice", "Bob")
+        
+        restarted = self.create_manager()
+        synergy = restarted.synergy_db.get_synergy("Alice", "Bob")
+        assert synergy.games_together == expected.games_together
+        assert synergy.role_combinations == expected.role_combinations
+        assert synergy.champion_combinations == expected.champion_combinations
+        assert restarted.synergy_db.last_updated == manager.synergy_db.last_updated
+        
+        restarted.calculate_synergies_from_stored_matches(self.players)
+        assert restarted.synergy_db.get_synergy("Alice", "Bob").games_together == 2
+        assert not (self.cache_dir / "synergy_data.json").exists()
+    
+    def test_legacy_json_imported(self):
+        """Test that synergy_data.json is imported and its pairs rebuilt from stored matches."""
+        self.cache_dir.mkdir(parents=True)
+        legacy = {
+            "synergies": {
+                "Alice|Bob": {"games_together": 7, "wins_together": 4, "losses_together": 3,
+                              "role_combinations": {"jungle|top": {"games": 7, "wins": 4}},
+                              "champion_combinations": {"1|2": {"games": 7, "wins": 4}}},
+                "Dan|Eve": {"games_together": 3, "wins_together": 1, "losses_together": 2}
+            },
+            "last_updated": datetime.now().isoformat()
+        }
+        with open(self.cache_dir / "synergy_data.json", 'w') as f:
+            json.dump(legacy, f)
+        
+        manager = self.create_manager()
+        assert manager.synergy_db.get_synergy("Alice", "Bob").games_together == 7
+        assert manager.synergy_db.get_synergy("Alice", "Bob").champion_combinations == {(1, 2): {"games": 7, "wins": 4}}
+        assert not (self.cache_dir / "synergy_data.json").exists()
+        assert (self.cache_dir / "synergy_data.json.migrated").exists()
+        
+        self.match_manager.store_match(self.create_match_data("NA1_1"))
+        manager.calculate_synergies_from_stored_matches(self.players)
+        
+        restarted = self.create_manager()
+        assert restarted.synergy_db.get_synergy("Alice", "Bob").games_together == 1
+        assert restarted.synergy_db.get_synergy("Dan", "Eve").games_together == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,101 @@
+"""
+Tests for exact top-K team selection.
+
+This module checks the branch-and-bound search against exhaustive
+enumeration and verifies that large rosters are searched quickly.
+"""
+
+import time
+from itertools import combinations
+import numpy as np
+import pytest
+
+from lol_team_optimizer.team_selection import evaluate_all_teams, evaluate_teams, select_top_teams
+
+
+def random_roster(n_players: int, seed: int):
+    """Create random individual scores and symmetric pairwise synergy."""
+    rng = np.random.default_rng(seed)
+    scores = rng.uniform(0.2, 1.0, size=(n_players, 5))
+    synergy = rng.uniform(-0.1, 0.3, size=(n_players, 5, n_players, 5))
+    synergy = (synergy + synergy.transpose(2, 3, 0, 1)) / 2
+    return scores, synergy
+
+
+def exhaustive_totals(scores: np.ndarray, synergy: np.ndarray) -> np.ndarray:
+    """Score every five-player team, best first."""
+    teams = np.array(list(combinations(range(scores.shape[0]), 5)))
+    individual, team_synergy, _ = evaluate_teams(scores, synergy, teams)
+    return np.sort(individual + team_synergy)[::-1]
+
+
+class TestSelectTopTeams:
+    """Test cases for the select_top_teams function."""
+    
+    @pytest.mark.parametrize("n_players,seed", [(5, 0), (9, 1), (14, 2), (18, 3)])
+    def test_matches_exhaustive_search(self, n_players, seed):
+        """Test that the selected teams are exactly the best K."""
+        scores, synergy = random_roster(n_players, seed)
+        
+        teams, completed = select_top_teams(scores, synergy, k=10)
+        
+        expected = exhaustive_totals(scores, synergy)[:10]
+        assert completed
+        assert [team.total_score for team in teams] == pytest.approx(list(expected))
+        for team in teams:
+            assert len(set(team.player_indices)) == 5
+            assert sorted(team.role_indices) == [0, 1, 2, 3, 4]
+    
+    def test_large_roster_is_fast(self):
+        """Test that a 30-player roster is searched within the default budget."""
+        scores, synergy = random_roster(30, 4)
+        
+        start = time.monotonic()
+        teams, completed = select_top_teams(scores, synergy, k=10)
+        
+        assert completed
+        assert len(teams) == 10
+        assert time.monotonic() - start < 2.0
+    
+    def test_time_budget_returns_best_found(self):
+        """Test that an exhausted budget still returns teams found so far."""
+        scores, synergy = random_roster(30, 5)
+        
+        teams, completed = select_top_teams(scores, synergy, k=10, time_budget_seconds=1e-9)
+        
+        assert not completed
+        assert len(teams) <= 10
+    
+    def test_too_few_players(self):
+        """Test that fewer than five players is rejected."""
+        scores, synergy = random_roster(4, 6)
+        
+        with pytest.raises(ValueError, match="At least 5 players"):
+            select_top_teams(scores, synergy)
+
+
+class TestEvaluateAllTeams:
+    """Test cases for the exhaustive evaluate_all_teams function."""
+    
+    def test_serial_matches_branch_and_bound(self):
+        """Test that exhaustive scoring finds the same teams as the pruned search."""
+        scores, synergy = random_roster(15, 7)
+        
+        start = time.monotonic()
+        exhaustive = evaluate_all_teams(scores, synergy, k=10, max_workers=1)
+        elapsed = time.monotonic() - start
+        pruned, _ = select_top_teams(scores, synergy, k=10)
+        
+        assert [team.total_score for team in exhaustive] == pytest.approx(
+            [team.total_score for team in pruned])
+        assert exhaustive[0].player_indices == pruned[0].player_indices
+        assert elapsed < 0.5
+    
+    def test_process_pool_chunks(self):
+        """Test that chunked evaluation over worker processes merges the best teams."""
+        scores, synergy = random_roster(13, 8)
+        
+        teams = evaluate_all_teams(scores, synergy, k=5, max_workers=2, chunk_size=200)
+        
+        expected = exhaustive_totals(scores, synergy)[:5]
+        assert [team.total_score for team in teams] == pytest.approx(list(expected))